@@ -2,123 +2,22 @@
 Export Bart Torvik data to Tableau-ready CSV.
 Normalizes team names to match KenPom naming conventions.
 """
+import sys
 import pandas as pd
 from datetime import datetime
+from pathlib import Path
 from scraper_torvik import BartTorvikScraper
 
-
-# Team name mapping from Bart Torvik to KenPom format
-# KenPom uses full names, not abbreviations
-TEAM_NAME_MAPPING = {
-    # Common variations that need normalization - must match KenPom exactly
-    'Arkansas Pine Bluff': 'Arkansas Pine Bluff',
-    'Cal St. Bakersfield': 'Cal St. Bakersfield',
-    'Cal St. Fullerton': 'Cal St. Fullerton',
-    'Cal St. Northridge': 'CSUN',
-    'Central Connecticut': 'Central Connecticut',
-    'Charleston Southern': 'Charleston Southern',
-    'Coastal Carolina': 'Coastal Carolina',
-    'Eastern Illinois': 'Eastern Illinois',
-    'Eastern Kentucky': 'Eastern Kentucky',
-    'Eastern Michigan': 'Eastern Michigan',
-    'Eastern Washington': 'Eastern Washington',
-    'Fairleigh Dickinson': 'Fairleigh Dickinson',
-    'Florida Atlantic': 'Florida Atlantic',
-    'Florida Gulf Coast': 'Florida Gulf Coast',
-    'Georgia St.': 'Georgia St.',
-    'Grambling St.': 'Grambling St.',
-    'Illinois Chicago': 'Illinois Chicago',
-    'IU Indy': 'IU Indy',
-    'Le Moyne': 'Le Moyne',
-    'Lindenwood': 'Lindenwood',
-    'Long Beach St.': 'Long Beach St.',
-    'LIU': 'LIU',
-    'Louisiana Monroe': 'Louisiana Monroe',
-    'Loyola Chicago': 'Loyola Chicago',
-    'Loyola Marymount': 'Loyola Marymount',
-    'McNeese St.': 'McNeese',
-    'Maryland Eastern Shore': 'Maryland Eastern Shore',
-    'Miami FL': 'Miami FL',
-    'Miami OH': 'Miami OH',
-    'Mississippi St.': 'Mississippi St.',
-    'Montana St.': 'Montana St.',
-    'Nebraska Omaha': 'Nebraska Omaha',
-    'New Mexico St.': 'New Mexico St.',
-    'Nicholls St.': 'Nicholls',
-    'North Carolina A&T': 'North Carolina A&T',
-    'North Dakota': 'North Dakota',
-    'Northern Colorado': 'Northern Colorado',
-    'Northern Illinois': 'Northern Illinois',
-    'Northern Iowa': 'Northern Iowa',
-    'Northern Kentucky': 'Northern Kentucky',
-    'Northwestern': 'Northwestern',
-    'Oklahoma St.': 'Oklahoma St.',
-    'Oregon St.': 'Oregon St.',
-    'Penn St.': 'Penn St.',
-    'Portland St.': 'Portland St.',
-    'Purdue Fort Wayne': 'Purdue Fort Wayne',
-    'Queens': 'Queens',
-    'Saint Francis': 'Saint Francis',
-    'Saint Joseph\'s': 'Saint Joseph\'s',
-    'Saint Louis': 'Saint Louis',
-    'Saint Mary\'s': 'Saint Mary\'s',
-    'Saint Peter\'s': 'Saint Peter\'s',
-    'San Diego St.': 'San Diego St.',
-    'San Jose St.': 'San Jose St.',
-    'Southeastern Louisiana': 'Southeastern Louisiana',
-    'Southeast Missouri St.': 'Southeast Missouri',
-    'Southern': 'Southern',
-    'Southern Illinois': 'Southern Illinois',
-    'SIU Edwardsville': 'SIUE',
-    'Southern Indiana': 'Southern Indiana',
-    'Southern Miss': 'Southern Miss',
-    'South Carolina St.': 'South Carolina St.',
-    'St. Bonaventure': 'St. Bonaventure',
-    'St. John\'s': 'St. John\'s',
-    'St. Thomas': 'St. Thomas',
-    'Stony Brook': 'Stony Brook',
-    'TCU': 'TCU',
-    'Tennessee Tech': 'Tennessee Tech',
-    'Texas A&M Corpus Chris': 'Texas A&M Corpus Chris',
-    'Texas Southern': 'Texas Southern',
-    'UC Davis': 'UC Davis',
-    'UC Irvine': 'UC Irvine',
-    'UC Riverside': 'UC Riverside',
-    'UC San Diego': 'UC San Diego',
-    'UC Santa Barbara': 'UC Santa Barbara',
-    'UCF': 'UCF',
-    'UMBC': 'UMBC',
-    'UMKC': 'Kansas City',
-    'UMass Lowell': 'UMass Lowell',
-    'UNC Asheville': 'UNC Asheville',
-    'UNC Greensboro': 'UNC Greensboro',
-    'UNC Wilmington': 'UNC Wilmington',
-    'USC Upstate': 'USC Upstate',
-    'UT Rio Grande Valley': 'UT Rio Grande Valley',
-    'UTEP': 'UTEP',
-    'Utah St.': 'Utah St.',
-    'Utah Tech': 'Utah Tech',
-    'Utah Valley': 'Utah Valley',
-    'VMI': 'VMI',
-    'VCU': 'VCU',
-    'West Virginia': 'West Virginia',
-    'Western Carolina': 'Western Carolina',
-    'Western Illinois': 'Western Illinois',
-    'Western Kentucky': 'Western Kentucky',
-    'Western Michigan': 'Western Michigan',
-    'Wright St.': 'Wright St.',
-    'Youngstown St.': 'Youngstown St.',
-}
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import team_registry, tracing
 
 
 def normalize_team_name(torvik_name: str) -> str:
     """Normalize Bart Torvik team name to KenPom format."""
-    # Check if we have an explicit mapping
-    if torvik_name in TEAM_NAME_MAPPING:
-        return TEAM_NAME_MAPPING[torvik_name]
-    return torvik_name
+    return team_registry.canonical_name(torvik_name)
 
 
+@tracing.traced("run", source="torvik")
 def export_to_csv(filename='torvik_tableau.csv'):
     """
     Scrape Bart Torvik data and export to CSV for Tableau.
@@ -139,21 +38,23 @@ def export_to_csv(filename='torvik_tableau.csv'):
     print(f"Successfully scraped {len(teams_data)} teams")
     
     # Convert to DataFrame
-    df = pd.DataFrame(teams_data)
-    
-    # Normalize team names
-    print("\nNormalizing team names to match KenPom...")
-    df['team_name_normalized'] = df['team_name'].apply(normalize_team_name)
-    
-    # Add date components for Tableau
-    df['year'] = pd.to_datetime(df['date']).dt.year
-    df['month'] = pd.to_datetime(df['date']).dt.month
-    df['day'] = pd.to_datetime(df['date']).dt.day
+    with tracing.span("normalize", rows=len(teams_data)):
+        df = pd.DataFrame(teams_data)
+        
+        # Normalize team names (and ID them for joins)
+        print("\nNormalizing team names to match KenPom...")
+        df['team_name_normalized'] = team_registry.canonical_names(df['team_name'])
+        df['team_id'] = team_registry.map_series(df['team_name'])
+        
+        # Add date components for Tableau
+        df['year'] = pd.to_datetime(df['date']).dt.year
+        df['month'] = pd.to_datetime(df['date']).dt.month
+        df['day'] = pd.to_datetime(df['date']).dt.day
     
     # Reorder columns for Tableau
     column_order = [
         'date', 'year', 'month', 'day',
-        'rank', 'team_name', 'team_name_normalized', 'conference',
+        'rank', 'team_name', 'team_name_normalized', 'team_id', 'conference',
         'games', 'record',
         'adj_oe', 'adj_de', 'barthag', 'adj_tempo', 'wab',
         'efg_pct', 'efg_pct_d', 'tor', 'tord', 
@@ -168,7 +69,9 @@ def export_to_csv(filename='torvik_tableau.csv'):
     
     # Export to CSV
     print(f"\nExporting to {filename}...")
-    df.to_csv(filename, index=False)
+    with tracing.span("export.csv", path=filename, rows=len(df)) as s:
+        df.to_csv(filename, index=False)
+        s.set(bytes=tracing.file_size(filename))
     
     print(f"\n[SUCCESS] Exported {len(df)} teams to {filename}")
     print(f"Date: {df['date'].iloc[0]}")
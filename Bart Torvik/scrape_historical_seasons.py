@@ -2,18 +2,38 @@
 Scrape ALL teams from historical Bart Torvik seasons to calculate 
 proper season-specific mean and standard deviation for Four Factor metrics.
 This is needed to properly calculate Z-scores for historical champions.
+
+Seasons are loaded in a browser by default; with TORVIK_MODE=http (or
+--http) each season is one plain GET of trank.php over a pooled connection.
 """
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+from contextlib import nullcontext
 import pandas as pd
+import requests
+import os
 import re
-import time
+import sys
+from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import browser_pool, http_client, readiness, table_extract, tracing
+
+# Set TORVIK_DEBUG_HTML=1 to also save each rendered season page
+SAVE_DEBUG_HTML = os.environ.get("TORVIK_DEBUG_HTML") == "1"
+
+# 'browser' (Playwright) or 'http' (plain GET of trank.php)
+DEFAULT_MODE = os.environ.get("TORVIK_MODE", "browser")
+BASE_URL = os.environ.get("TORVIK_BASE_URL", "https://barttorvik.com").rstrip('/')
+
 
 class HistoricalSeasonScraper:
     """Scraper for full historical season data from Bart Torvik."""
     
+    # Same T-Rank table layout as the current-season scraper
+    TABLE_SPEC = {'selector': 'table', 'rows': 'tr', 'cells': 'td, th'}
+    
     # Selection Sunday dates for each year (pre-tournament)
     SELECTION_SUNDAY_DATES = {
         2008: "20080316",  # March 16, 2008
@@ -36,9 +56,12 @@ class HistoricalSeasonScraper:
         2025: "20250316",  # March 16, 2025
     }
     
-    def __init__(self):
-        """Initialize scraper."""
-        self.base_url = "https://barttorvik.com"
+    def __init__(self, mode: Optional[str] = None):
+        """Initialize scraper. `mode` is 'browser' or 'http' (default TORVIK_MODE)."""
+        self.mode = mode or DEFAULT_MODE
+        if self.mode not in ('browser', 'http'):
+            raise ValueError(f"Unknown mode {self.mode!r}: expected 'browser' or 'http'")
+        self.base_url = BASE_URL
         self.rankings_url = f"{self.base_url}/trank.php"
     
     def _parse_number(self, text: str) -> Optional[float]:
@@ -58,8 +81,8 @@ class HistoricalSeasonScraper:
         except ValueError:
             return None
     
-    def _parse_team_row(self, cells: List, year: int, date_used: str) -> Dict:
-        """Parse a row to extract team data."""
+    def _parse_team_row(self, cells: List[str], year: int, date_used: str) -> Dict:
+        """Parse a row's cell texts to extract team data."""
         # Extract season year (e.g., "2007-08" for 2008 season)
         season = f"{year-1}-{str(year)[2:]}"
         
@@ -73,44 +96,92 @@ class HistoricalSeasonScraper:
         #          8:EFG%, 9:EFGD%, 10:TOR, 11:TORD, 12:ORB, 13:DRB, 14:FTR, 15:FTRD,
         #          16:2P%, 17:2P%D, 18:3P%, 19:3P%D, 20:3PR, 21:3PRD, 22:AdjT, 23:WAB
         
-        data['rank'] = self._parse_number(cells[0].get_text(strip=True)) if len(cells) > 0 else None
+        data['rank'] = self._parse_number(cells[0]) if len(cells) > 0 else None
         
         # Team name - clean up any game info
-        team_full = cells[1].get_text(strip=True) if len(cells) > 1 else ""
+        team_full = cells[1] if len(cells) > 1 else ""
         team_name = re.split(r'(?:\([HANhant]\)|vs\.)\s*\d', team_full)[0].strip()
         data['team_name'] = team_name
         
-        data['conference'] = cells[2].get_text(strip=True) if len(cells) > 2 else None
-        data['games'] = self._parse_number(cells[3].get_text(strip=True)) if len(cells) > 3 else None
-        data['record'] = cells[4].get_text(strip=True) if len(cells) > 4 else None
-        data['adj_oe'] = self._parse_number(cells[5].get_text(strip=True)) if len(cells) > 5 else None
-        data['adj_de'] = self._parse_number(cells[6].get_text(strip=True)) if len(cells) > 6 else None
-        data['barthag'] = self._parse_number(cells[7].get_text(strip=True)) if len(cells) > 7 else None
-        data['efg_pct'] = self._parse_number(cells[8].get_text(strip=True)) if len(cells) > 8 else None
-        data['efg_pct_d'] = self._parse_number(cells[9].get_text(strip=True)) if len(cells) > 9 else None
-        data['tor'] = self._parse_number(cells[10].get_text(strip=True)) if len(cells) > 10 else None
-        data['tord'] = self._parse_number(cells[11].get_text(strip=True)) if len(cells) > 11 else None
-        data['orb'] = self._parse_number(cells[12].get_text(strip=True)) if len(cells) > 12 else None
-        data['drb'] = self._parse_number(cells[13].get_text(strip=True)) if len(cells) > 13 else None
-        data['ftr'] = self._parse_number(cells[14].get_text(strip=True)) if len(cells) > 14 else None
-        data['ftrd'] = self._parse_number(cells[15].get_text(strip=True)) if len(cells) > 15 else None
-        data['two_p_pct'] = self._parse_number(cells[16].get_text(strip=True)) if len(cells) > 16 else None
-        data['two_p_pct_d'] = self._parse_number(cells[17].get_text(strip=True)) if len(cells) > 17 else None
-        data['three_p_pct'] = self._parse_number(cells[18].get_text(strip=True)) if len(cells) > 18 else None
-        data['three_p_pct_d'] = self._parse_number(cells[19].get_text(strip=True)) if len(cells) > 19 else None
-        data['three_pr'] = self._parse_number(cells[20].get_text(strip=True)) if len(cells) > 20 else None
-        data['three_prd'] = self._parse_number(cells[21].get_text(strip=True)) if len(cells) > 21 else None
-        data['adj_tempo'] = self._parse_number(cells[22].get_text(strip=True)) if len(cells) > 22 else None
-        data['wab'] = self._parse_number(cells[23].get_text(strip=True)) if len(cells) > 23 else None
+        data['conference'] = cells[2] if len(cells) > 2 else None
+        data['games'] = self._parse_number(cells[3]) if len(cells) > 3 else None
+        data['record'] = cells[4] if len(cells) > 4 else None
+        data['adj_oe'] = self._parse_number(cells[5]) if len(cells) > 5 else None
+        data['adj_de'] = self._parse_number(cells[6]) if len(cells) > 6 else None
+        data['barthag'] = self._parse_number(cells[7]) if len(cells) > 7 else None
+        data['efg_pct'] = self._parse_number(cells[8]) if len(cells) > 8 else None
+        data['efg_pct_d'] = self._parse_number(cells[9]) if len(cells) > 9 else None
+        data['tor'] = self._parse_number(cells[10]) if len(cells) > 10 else None
+        data['tord'] = self._parse_number(cells[11]) if len(cells) > 11 else None
+        data['orb'] = self._parse_number(cells[12]) if len(cells) > 12 else None
+        data['drb'] = self._parse_number(cells[13]) if len(cells) > 13 else None
+        data['ftr'] = self._parse_number(cells[14]) if len(cells) > 14 else None
+        data['ftrd'] = self._parse_number(cells[15]) if len(cells) > 15 else None
+        data['two_p_pct'] = self._parse_number(cells[16]) if len(cells) > 16 else None
+        data['two_p_pct_d'] = self._parse_number(cells[17]) if len(cells) > 17 else None
+        data['three_p_pct'] = self._parse_number(cells[18]) if len(cells) > 18 else None
+        data['three_p_pct_d'] = self._parse_number(cells[19]) if len(cells) > 19 else None
+        data['three_pr'] = self._parse_number(cells[20]) if len(cells) > 20 else None
+        data['three_prd'] = self._parse_number(cells[21]) if len(cells) > 21 else None
+        data['adj_tempo'] = self._parse_number(cells[22]) if len(cells) > 22 else None
+        data['wab'] = self._parse_number(cells[23]) if len(cells) > 23 else None
         
         return data
     
+    def parse_season_html(self, html_content: str, year: int, date_used: str,
+                          verbose: bool = True) -> Optional[List[Dict]]:
+        """
+        Parse every team row of a rendered season page with _parse_team_row.
+        Returns None if the page has no rankings table. Needs no browser,
+        so saved pages can be parsed or benchmarked offline.
+        """
+        table = table_extract.from_html(html_content, **self.TABLE_SPEC)
+        if table is None:
+            print(f"    Warning: Could not find rankings table for {year}")
+            return None
+        return self.parse_season_table(table, year, date_used, verbose)
+    
+    def parse_season_table(self, table: table_extract.Table, year: int, date_used: str,
+                           verbose: bool = True) -> List[Dict]:
+        """Parse every team row of an extracted season table with _parse_team_row."""
+        rows = table.rows
+        if verbose:
+            print(f"    Parsing {len(rows)} rows...")
+        
+        # Parse all team data
+        teams_data = []
+        
+        for i, cells in enumerate(rows[1:], 1):  # Skip header
+            try:
+                if len(cells) < 8:
+                    continue
+                
+                # Get rank
+                rank_text = cells[0]
+                if not rank_text.isdigit():
+                    continue
+                
+                # Parse this team's data
+                team_data = self._parse_team_row(cells, year, date_used)
+                teams_data.append(team_data)
+                
+            except Exception as e:
+                print(f"    Error parsing row {i}: {e}")
+                continue
+        
+        return teams_data
+    
+    @tracing.traced("scrape_season", source="torvik")
     def scrape_season(self, year: int, browser=None) -> List[Dict]:
         """
         Scrape ALL teams for a given year before the NCAA tournament.
         Uses the Monday before Selection Sunday to ensure pre-tournament data.
         Returns list of team data dictionaries.
+        
+        Pages come from a fresh context of the shared browser pool unless a
+        browser is passed in; in 'http' mode the season is fetched without one.
         """
+        tracing.annotate(year=year)
         selection_sunday = self.SELECTION_SUNDAY_DATES.get(year)
         if not selection_sunday:
             print(f"  Skipping {year}: No pre-tournament date available")
@@ -120,97 +191,103 @@ class HistoricalSeasonScraper:
         # Using 'end' parameter to get data through Selection Sunday (pre-tournament)
         url = f"{self.rankings_url}?year={year}&end={selection_sunday}"
         
-        should_close = False
-        if browser is None:
-            should_close = True
+        if self.mode == 'http' and browser is None:
+            return self.fetch_season(year, selection_sunday)
         
         try:
-            if browser is None:
-                playwright = sync_playwright().start()
-                browser = playwright.chromium.launch(headless=True)
-            
-            page = browser.new_page()
-            
-            print(f"  Fetching ALL teams for {year} season (Selection Sunday {selection_sunday})...")
-            page.goto(url, wait_until='domcontentloaded', timeout=90000)
-            
-            # Wait for the main table to load
-            page.wait_for_selector('table', timeout=60000)
-            page.wait_for_selector('tbody tr', timeout=30000)
-            
-            # Wait longer for all teams to load
-            print(f"    Waiting for all teams to load...")
-            time.sleep(5)
-            
-            # Check row count
-            row_count = page.locator('tbody tr').count()
-            print(f"    Found {row_count} rows")
-            
-            # Get the page content
-            html_content = page.content()
-            
-            # Save for debugging
-            with open(f'torvik_debug_{year}.html', 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            # Parse the HTML
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Find the main rankings table
-            table = soup.find('table')
-            if not table:
-                print(f"    Warning: Could not find rankings table for {year}")
-                page.close()
-                if should_close:
-                    browser.close()
-                return []
-            
-            # Get all rows
-            rows = table.find_all('tr')
-            print(f"    Parsing {len(rows)} rows...")
-            
-            # Parse all team data
-            teams_data = []
-            
-            for i, row in enumerate(rows[1:], 1):  # Skip header
+            if browser is not None:
+                page = browser.new_page()
                 try:
-                    cells = row.find_all(['td', 'th'])
-                    if len(cells) < 8:
-                        continue
-                    
-                    # Get rank
-                    rank_text = cells[0].get_text(strip=True)
-                    if not rank_text.isdigit():
-                        continue
-                    
-                    # Parse this team's data
-                    team_data = self._parse_team_row(cells, year, selection_sunday)
-                    teams_data.append(team_data)
-                    
-                except Exception as e:
-                    print(f"    Error parsing row {i}: {e}")
-                    continue
-            
-            page.close()
-            
-            if should_close:
-                browser.close()
+                    return self._scrape_season_page(page, year, url, selection_sunday)
+                finally:
+                    page.close()
             
-            print(f"    Successfully parsed {len(teams_data)} teams for {year}")
-            return teams_data
+            with browser_pool.context(site="torvik") as context:
+                return self._scrape_season_page(context.new_page(), year, url, selection_sunday)
             
         except PlaywrightTimeout:
             print(f"    ERROR: Timeout loading data for {year}")
-            if should_close and browser:
-                browser.close()
             return []
         except Exception as e:
             print(f"    ERROR scraping {year}: {e}")
-            if should_close and browser:
-                browser.close()
             return []
     
+    def _scrape_season_page(self, page, year: int, url: str, selection_sunday: str) -> List[Dict]:
+        """Load one season's page in `page` and parse every team row."""
+        print(f"  Fetching ALL teams for {year} season (Selection Sunday {selection_sunday})...")
+        with tracing.span("page.goto", url=url, wait_until='domcontentloaded'):
+            page.goto(url, wait_until='domcontentloaded', timeout=90000)
+        
+        # Wait for the main table to load
+        with tracing.span("wait_for_selector", selector='table'):
+            page.wait_for_selector('table', timeout=60000)
+        with tracing.span("wait_for_selector", selector='tbody tr'):
+            page.wait_for_selector('tbody tr', timeout=30000)
+        
+        # Wait for all teams to load (older seasons have fewer than 365,
+        # so a settled row count also counts as loaded)
+        print(f"    Waiting for all teams to load...")
+        row_count = readiness.wait_for_rows(page, 'tbody tr', expected=readiness.FULL_TABLE_ROWS,
+                                            timeout_ms=15000)
+        print(f"    Found {row_count} rows")
+        
+        # Pull just the table's cell text out of the page
+        table = table_extract.extract_table(page, **self.TABLE_SPEC)
+        if table is None:
+            print(f"    Warning: Could not find rankings table for {year}")
+            return []
+        
+        # Save for debugging (opt-in: serializes the whole DOM)
+        if SAVE_DEBUG_HTML:
+            with tracing.span("page.content") as s:
+                html_content = page.content()
+                s.set(bytes=len(html_content), dom_rows=row_count)
+            with tracing.span("export.debug_html", path=f'torvik_debug_{year}.html', bytes=len(html_content)):
+                with open(f'torvik_debug_{year}.html', 'w', encoding='utf-8') as f:
+                    f.write(html_content)
+        
+        # Parse the rows
+        with tracing.span("parse", year=year) as s:
+            teams_data = self.parse_season_table(table, year, selection_sunday)
+            s.set(rows=len(teams_data))
+        
+        print(f"    Successfully parsed {len(teams_data)} teams for {year}")
+        return teams_data
+    
+    def fetch_season(self, year: int, selection_sunday: str) -> List[Dict]:
+        """
+        Fetch one season's trank.php table over plain HTTP and parse it into
+        the same rows as the browser path. The page is rendered server-side,
+        so one GET returns every team.
+        """
+        print(f"  Fetching ALL teams for {year} season over HTTP (Selection Sunday {selection_sunday})...")
+        try:
+            response = http_client.get("torvik", self.rankings_url,
+                                       params={'year': year, 'end': selection_sunday})
+        except requests.RequestException as e:
+            print(f"    ERROR fetching {year}: {e}")
+            return []
+        html_content = http_client.text(response)
+        
+        with tracing.span("extract.table", selector='table', bytes=len(html_content)) as s:
+            table = table_extract.scan_html(html_content)
+            s.set(rows=len(table) if table is not None else 0)
+        if table is None:
+            print(f"    Warning: Could not find rankings table for {year}")
+            return []
+        
+        if SAVE_DEBUG_HTML:
+            with tracing.span("export.debug_html", path=f'torvik_debug_{year}.html', bytes=len(html_content)):
+                with open(f'torvik_debug_{year}.html', 'w', encoding='utf-8') as f:
+                    f.write(html_content)
+        
+        with tracing.span("parse", year=year) as s:
+            teams_data = self.parse_season_table(table, year, selection_sunday)
+            s.set(rows=len(teams_data))
+        
+        print(f"    Successfully parsed {len(teams_data)} teams for {year}")
+        return teams_data
+    
     def scrape_all_seasons(self, start_year: int = 2008, end_year: int = 2025) -> pd.DataFrame:
         """
         Scrape all teams for multiple seasons.
@@ -223,23 +300,20 @@ class HistoricalSeasonScraper:
         
         all_teams = []
         
-        # Use shared browser for speed
-        with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(headless=True)
-            
+        # One warm browser for every season, a fresh context per season
+        # (in 'http' mode, one pooled connection instead)
+        with browser_pool.session() if self.mode == 'browser' else nullcontext():
             for year in range(start_year, end_year + 1):
                 if year == 2020:
                     print(f"\nSkipping {year}: No tournament (COVID-19)")
                     continue
                 
                 print(f"\nScraping {year} season...")
-                season_teams = self.scrape_season(year, browser=browser)
+                season_teams = self.scrape_season(year)
                 all_teams.extend(season_teams)
                 
                 # Be respectful with requests
-                time.sleep(2)
-            
-            browser.close()
+                tracing.sleep(2, reason="politeness delay")
         
         print("\n" + "="*60)
         print(f"Scraping complete! Total teams: {len(all_teams)}")
@@ -248,9 +322,10 @@ class HistoricalSeasonScraper:
         return pd.DataFrame(all_teams)
 
 
+@tracing.traced("run", source="torvik")
 def main():
     """Main function to scrape historical seasons and calculate statistics."""
-    scraper = HistoricalSeasonScraper()
+    scraper = HistoricalSeasonScraper(mode='http' if '--http' in sys.argv[1:] else None)
     
     # Scrape all championship seasons
     print("Scraping historical seasons to calculate proper Z-score baselines...")
@@ -264,7 +339,9 @@ def main():
     
     # Save raw historical data
     output_file = 'torvik_historical_all_teams.csv'
-    df.to_csv(output_file, index=False)
+    with tracing.span("export.csv", path=output_file, rows=len(df)) as s:
+        df.to_csv(output_file, index=False)
+        s.set(bytes=tracing.file_size(output_file))
     print(f"\nSaved raw data: {output_file}")
     
     # Calculate the four margins/edges for all teams
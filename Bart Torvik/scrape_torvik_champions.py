@@ -2,13 +2,17 @@
 Scraper for Past National Champions from BartTorvik.com
 Scrapes historical data for NCAA tournament champions with full stats.
 """
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
 import pandas as pd
 import re
-import time
+import sys
+from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import browser_pool, readiness, table_extract, tracing
+
 
 class TorvikChampionsScraper:
     """Scraper for Bart Torvik historical champions data."""
@@ -79,6 +83,7 @@ class TorvikChampionsScraper:
         except ValueError:
             return None
     
+    @tracing.traced("scrape_year", source="torvik")
     def scrape_year(self, year: int, browser=None) -> Optional[Dict]:
         """
         Scrape Bart Torvik data for a specific year's NCAA champion.
@@ -86,8 +91,11 @@ class TorvikChampionsScraper:
         
         Args:
             year: The year to scrape (e.g., 2024 for 2023-24 season)
-            browser: Optional browser instance to reuse
+            browser: Optional browser to open the page in (default: a fresh
+                context from the shared browser pool)
         """
+        tracing.annotate(year=year)
+        
         # Check if there was a champion this year
         champion_name = self.NCAA_CHAMPIONS.get(year)
         if champion_name is None:
@@ -104,105 +112,95 @@ class TorvikChampionsScraper:
         # Don't set begin parameter - let it default to start of season
         url = f"{self.rankings_url}?year={year}&end={selection_sunday}"
         
-        should_close = False
-        if browser is None:
-            should_close = True
-        
         try:
-            if browser is None:
-                playwright = sync_playwright().start()
-                browser = playwright.chromium.launch(headless=True)
-            
-            page = browser.new_page()
-            
-            print(f"  Fetching {year} pre-tournament data (Selection Sunday {selection_sunday}) for {champion_name}...")
-            page.goto(url, wait_until='domcontentloaded', timeout=90000)
-            
-            # Wait for the main table to load
-            page.wait_for_selector('table', timeout=60000)
-            page.wait_for_selector('tbody tr', timeout=30000)
-            
-            # Wait for data to fully load
-            time.sleep(3)
-            
-            # Get the page content
-            html_content = page.content()
-            
-            # Parse the HTML
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Find the main rankings table
-            table = soup.find('table')
-            if not table:
-                print(f"    Warning: Could not find rankings table for {year}")
-                page.close()
-                return None
-            
-            # Get all rows
-            rows = table.find_all('tr')
-            
-            # Find the NCAA champion in the rankings
-            champion_data = None
-            
-            for i, row in enumerate(rows[1:], 1):  # Skip header
+            if browser is not None:
+                page = browser.new_page()
                 try:
-                    cells = row.find_all(['td', 'th'])
-                    if len(cells) < 8:
-                        continue
-                    
-                    # Get rank
-                    rank_text = cells[0].get_text(strip=True)
-                    if not rank_text.isdigit():
-                        continue
-                    
-                    # Get team name
-                    team_cell = cells[1]
-                    team_full = team_cell.get_text(strip=True)
-                    
-                    # Clean team name - remove CHAMPS marker if present
-                    team_name = re.sub(r'\s*CHAMPS?\s*', '', team_full, flags=re.IGNORECASE).strip()
-                    # Remove game info patterns
-                    team_name = re.split(r'(?:\([HANhant]\)|vs\.)\s*\d', team_name)[0].strip()
-                    
-                    # Check if this is the NCAA champion
-                    # Use case-insensitive comparison and handle variations
-                    if self._is_champion_match(team_name, champion_name):
-                        # Parse all stats
-                        is_marked = 'CHAMPS' in team_full.upper()
-                        champion_data = self._parse_team_row(cells, year, team_name, is_marked, selection_sunday)
-                        break
-                    
-                except Exception as e:
-                    print(f"    Error parsing row {i}: {e}")
-                    continue
+                    return self._scrape_year_page(page, year, url, champion_name, selection_sunday)
+                finally:
+                    page.close()
             
-            page.close()
-            
-            if should_close:
-                browser.close()
-                playwright.stop()
-            
-            if champion_data is None:
-                print(f"    Warning: Could not find {champion_name} in {year} rankings")
-            else:
-                # Verify we got pre-tournament data
-                games = champion_data.get('games', 0)
-                print(f"    Found {champion_name} with {games} games played")
-            
-            return champion_data
+            with browser_pool.context(site="torvik") as context:
+                return self._scrape_year_page(context.new_page(), year, url, champion_name, selection_sunday)
             
         except PlaywrightTimeout:
             print(f"    ERROR: Timeout loading data for {year}")
-            if should_close and browser:
-                browser.close()
             return None
         except Exception as e:
             print(f"    ERROR scraping {year}: {e}")
-            if should_close and browser:
-                browser.close()
             return None
     
+    def _scrape_year_page(self, page, year: int, url: str, champion_name: str,
+                          selection_sunday: str) -> Optional[Dict]:
+        """Load one season's page in `page` and pick out the champion's row."""
+        print(f"  Fetching {year} pre-tournament data (Selection Sunday {selection_sunday}) for {champion_name}...")
+        with tracing.span("page.goto", url=url, wait_until='domcontentloaded'):
+            page.goto(url, wait_until='domcontentloaded', timeout=90000)
+        
+        # Wait for the main table to load
+        with tracing.span("wait_for_selector", selector='table'):
+            page.wait_for_selector('table', timeout=60000)
+        with tracing.span("wait_for_selector", selector='tbody tr'):
+            page.wait_for_selector('tbody tr', timeout=30000)
+        
+        # Wait for data to fully load
+        readiness.wait_for_rows(page, 'tbody tr', expected=readiness.FULL_TABLE_ROWS, timeout_ms=15000)
+        
+        # Pull just the table's cell text out of the page
+        table = table_extract.extract_table(page, 'table', rows='tr', cells='td, th')
+        if table is None:
+            print(f"    Warning: Could not find rankings table for {year}")
+            return None
+        
+        with tracing.span("parse", year=year, rows=len(table)):
+            champion_data = self.find_champion(table, year, champion_name, selection_sunday)
+        
+        if champion_data is None:
+            print(f"    Warning: Could not find {champion_name} in {year} rankings")
+        else:
+            # Verify we got pre-tournament data
+            games = champion_data.get('games', 0)
+            print(f"    Found {champion_name} with {games} games played")
+        
+        return champion_data
+    
+    def find_champion(self, table: table_extract.Table, year: int, champion_name: str,
+                      selection_sunday: str) -> Optional[Dict]:
+        """Find and parse the champion's row in an extracted T-Rank table."""
+        champion_data = None
+        
+        for i, cells in enumerate(table.rows[1:], 1):  # Skip header
+            try:
+                if len(cells) < 8:
+                    continue
+                
+                # Get rank
+                rank_text = cells[0]
+                if not rank_text.isdigit():
+                    continue
+                
+                # Get team name
+                team_full = cells[1]
+                
+                # Clean team name - remove CHAMPS marker if present
+                team_name = re.sub(r'\s*CHAMPS?\s*', '', team_full, flags=re.IGNORECASE).strip()
+                # Remove game info patterns
+                team_name = re.split(r'(?:\([HANhant]\)|vs\.)\s*\d', team_name)[0].strip()
+                
+                # Check if this is the NCAA champion
+                # Use case-insensitive comparison and handle variations
+                if self._is_champion_match(team_name, champion_name):
+                    # Parse all stats
+                    is_marked = 'CHAMPS' in team_full.upper()
+                    champion_data = self._parse_team_row(cells, year, team_name, is_marked, selection_sunday)
+                    break
+                
+            except Exception as e:
+                print(f"    Error parsing row {i}: {e}")
+                continue
+        
+        return champion_data
+        
     def _is_champion_match(self, team_name: str, champion_name: str) -> bool:
         """
         Check if a team name matches the expected champion.
@@ -228,8 +226,8 @@ class TorvikChampionsScraper:
         
         return False
     
-    def _parse_team_row(self, cells: List, year: int, team_name: str, is_marked_champion: bool, date_used: str) -> Dict:
-        """Parse a row to extract team data."""
+    def _parse_team_row(self, cells: List[str], year: int, team_name: str, is_marked_champion: bool, date_used: str) -> Dict:
+        """Parse a row's cell texts to extract team data."""
         data = {}
         
         # Year information
@@ -241,37 +239,37 @@ class TorvikChampionsScraper:
         data['is_marked_champion'] = is_marked_champion
         
         # Team info - append season to avoid duplicates
-        data['rank'] = int(cells[0].get_text(strip=True))
+        data['rank'] = int(cells[0])
         data['team_name'] = f"{team_name} {data['season']}"  # e.g., "Kansas 2007-08"
         data['team_name_normalized'] = f"{team_name} {data['season']}"  # Same format
-        data['conference'] = cells[2].get_text(strip=True) if len(cells) > 2 else None
-        data['games'] = self._parse_number(cells[3].get_text(strip=True)) if len(cells) > 3 else None
-        data['record'] = cells[4].get_text(strip=True) if len(cells) > 4 else None
+        data['conference'] = cells[2] if len(cells) > 2 else None
+        data['games'] = self._parse_number(cells[3]) if len(cells) > 3 else None
+        data['record'] = cells[4] if len(cells) > 4 else None
         
         # Column structure matches current torvik scraper
         # Columns: 0:Rank, 1:Team, 2:Conf, 3:G, 4:Rec, 5:AdjOE, 6:AdjDE, 7:Barthag,
         #          8:EFG%, 9:EFGD%, 10:TOR, 11:TORD, 12:ORB, 13:DRB, 14:FTR, 15:FTRD,
         #          16:2P%, 17:2P%D, 18:3P%, 19:3P%D, 20:3PR, 21:3PRD, 22:AdjT, 23:WAB
         
-        data['adj_oe'] = self._parse_number(cells[5].get_text(strip=True)) if len(cells) > 5 else None
-        data['adj_de'] = self._parse_number(cells[6].get_text(strip=True)) if len(cells) > 6 else None
-        data['barthag'] = self._parse_number(cells[7].get_text(strip=True)) if len(cells) > 7 else None
-        data['efg_pct'] = self._parse_number(cells[8].get_text(strip=True)) if len(cells) > 8 else None
-        data['efg_pct_d'] = self._parse_number(cells[9].get_text(strip=True)) if len(cells) > 9 else None
-        data['tor'] = self._parse_number(cells[10].get_text(strip=True)) if len(cells) > 10 else None
-        data['tord'] = self._parse_number(cells[11].get_text(strip=True)) if len(cells) > 11 else None
-        data['orb'] = self._parse_number(cells[12].get_text(strip=True)) if len(cells) > 12 else None
-        data['drb'] = self._parse_number(cells[13].get_text(strip=True)) if len(cells) > 13 else None
-        data['ftr'] = self._parse_number(cells[14].get_text(strip=True)) if len(cells) > 14 else None
-        data['ftrd'] = self._parse_number(cells[15].get_text(strip=True)) if len(cells) > 15 else None
-        data['two_p_pct'] = self._parse_number(cells[16].get_text(strip=True)) if len(cells) > 16 else None
-        data['two_p_pct_d'] = self._parse_number(cells[17].get_text(strip=True)) if len(cells) > 17 else None
-        data['three_p_pct'] = self._parse_number(cells[18].get_text(strip=True)) if len(cells) > 18 else None
-        data['three_p_pct_d'] = self._parse_number(cells[19].get_text(strip=True)) if len(cells) > 19 else None
-        data['three_pr'] = self._parse_number(cells[20].get_text(strip=True)) if len(cells) > 20 else None
-        data['three_prd'] = self._parse_number(cells[21].get_text(strip=True)) if len(cells) > 21 else None
-        data['adj_tempo'] = self._parse_number(cells[22].get_text(strip=True)) if len(cells) > 22 else None
-        data['wab'] = self._parse_number(cells[23].get_text(strip=True)) if len(cells) > 23 else None
+        data['adj_oe'] = self._parse_number(cells[5]) if len(cells) > 5 else None
+        data['adj_de'] = self._parse_number(cells[6]) if len(cells) > 6 else None
+        data['barthag'] = self._parse_number(cells[7]) if len(cells) > 7 else None
+        data['efg_pct'] = self._parse_number(cells[8]) if len(cells) > 8 else None
+        data['efg_pct_d'] = self._parse_number(cells[9]) if len(cells) > 9 else None
+        data['tor'] = self._parse_number(cells[10]) if len(cells) > 10 else None
+        data['tord'] = self._parse_number(cells[11]) if len(cells) > 11 else None
+        data['orb'] = self._parse_number(cells[12]) if len(cells) > 12 else None
+        data['drb'] = self._parse_number(cells[13]) if len(cells) > 13 else None
+        data['ftr'] = self._parse_number(cells[14]) if len(cells) > 14 else None
+        data['ftrd'] = self._parse_number(cells[15]) if len(cells) > 15 else None
+        data['two_p_pct'] = self._parse_number(cells[16]) if len(cells) > 16 else None
+        data['two_p_pct_d'] = self._parse_number(cells[17]) if len(cells) > 17 else None
+        data['three_p_pct'] = self._parse_number(cells[18]) if len(cells) > 18 else None
+        data['three_p_pct_d'] = self._parse_number(cells[19]) if len(cells) > 19 else None
+        data['three_pr'] = self._parse_number(cells[20]) if len(cells) > 20 else None
+        data['three_prd'] = self._parse_number(cells[21]) if len(cells) > 21 else None
+        data['adj_tempo'] = self._parse_number(cells[22]) if len(cells) > 22 else None
+        data['wab'] = self._parse_number(cells[23]) if len(cells) > 23 else None
         
         return data
     
@@ -292,12 +290,10 @@ class TorvikChampionsScraper:
         print(f"Scraping NCAA Tournament Champions from Bart Torvik ({start_year} to {end_year})...")
         print()
         
-        # Create a persistent browser for all requests
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            
+        # One warm browser for every season, a fresh context per season
+        with browser_pool.session():
             for year in range(start_year, end_year + 1):
-                champion_data = self.scrape_year(year, browser=browser)
+                champion_data = self.scrape_year(year)
                 
                 if champion_data:
                     champions_data.append(champion_data)
@@ -308,13 +304,12 @@ class TorvikChampionsScraper:
                     print(f"  ERROR {year}: Could not find {self.NCAA_CHAMPIONS[year]} in data")
                 
                 # Be polite to the server
-                time.sleep(2)
-            
-            browser.close()
+                tracing.sleep(2, reason="politeness delay")
         
         return champions_data
 
 
+@tracing.traced("run", source="torvik")
 def main():
     """Main function to scrape champions and save to CSV."""
     print("="*60)
@@ -356,7 +351,9 @@ def main():
     
     # Save to CSV
     output_file = 'torvik_champions.csv'
-    df.to_csv(output_file, index=False)
+    with tracing.span("export.csv", path=output_file, rows=len(df)) as s:
+        df.to_csv(output_file, index=False)
+        s.set(bytes=tracing.file_size(output_file))
     
     print()
     print("="*60)
@@ -1,21 +1,46 @@
 """
 Web scraper for BartTorvik.com college basketball data using Playwright.
 Uses browser automation to avoid blocking.
+
+The T-Rank table is rendered server-side by trank.php, so it can also be
+fetched over plain HTTP without a browser (TORVIK_MODE=http, or
+BartTorvikScraper(mode='http')). TORVIK_BASE_URL points either mode at
+another host, e.g. a local stand-in server.
 """
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
-import time
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+import requests
+import os
+import sys
 import re
+from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import browser_pool, http_client, readiness, table_extract, tracing
+
+# Set TORVIK_DEBUG_HTML=1 to also save the rendered page to torvik_debug.html
+SAVE_DEBUG_HTML = os.environ.get("TORVIK_DEBUG_HTML") == "1"
+
+# 'browser' (Playwright) or 'http' (plain GET of trank.php)
+DEFAULT_MODE = os.environ.get("TORVIK_MODE", "browser")
+BASE_URL = os.environ.get("TORVIK_BASE_URL", "https://barttorvik.com").rstrip('/')
+
 
 class BartTorvikScraper:
     """Scraper for BartTorvik.com data using Playwright browser automation."""
     
-    def __init__(self):
-        """Initialize scraper."""
-        self.base_url = "https://barttorvik.com"
+    # The T-Rank table; header rows repeat inside the body and are skipped by rank
+    TABLE_SPEC = {'selector': 'table', 'rows': 'tr', 'cells': 'td, th'}
+    
+    def __init__(self, mode: Optional[str] = None):
+        """Initialize scraper. `mode` is 'browser' or 'http' (default TORVIK_MODE)."""
+        self.mode = mode or DEFAULT_MODE
+        if self.mode not in ('browser', 'http'):
+            raise ValueError(f"Unknown mode {self.mode!r}: expected 'browser' or 'http'")
+        self.base_url = BASE_URL
         self.rankings_url = f"{self.base_url}/#"
+        self.trank_url = f"{self.base_url}/trank.php"
     
     def _parse_number(self, text: str) -> Optional[float]:
         """Parse number from text, handling various formats."""
@@ -34,139 +59,154 @@ class BartTorvikScraper:
         except ValueError:
             return None
     
+    def parse_rankings_html(self, html_content: str, verbose: bool = True) -> List[Dict]:
+        """
+        Parse team rows out of a rendered rankings page.
+        Needs no browser, so saved pages (e.g. torvik_debug.html) can be
+        parsed or benchmarked offline.
+        """
+        table = table_extract.from_html(html_content, **self.TABLE_SPEC)
+        if table is None:
+            print("ERROR: Could not find rankings table")
+            return []
+        return self.parse_rankings_table(table, verbose)
+    
+    def parse_rankings_table(self, table: table_extract.Table, verbose: bool = True) -> List[Dict]:
+        """Parse team rows out of the extracted rankings table (see TABLE_SPEC)."""
+        teams_data = []
+        rows = table.rows
+        
+        if verbose:
+            print(f"Found {len(rows)} total rows in table")
+            print(f"Headers: {table.headers[:10]}...")  # Print first 10 headers
+        
+        # Parse data rows
+        for i, cells in enumerate(rows[1:], 1):  # Skip header
+            try:
+                if len(cells) < 8:  # Need at least 8 columns for basic stats
+                    continue
+                
+                # Column structure:
+                # 0: Rank, 1: Team, 2: Conf, 3: G, 4: Record, 5: AdjOE, 6: AdjDE, 7: Barthag...
+                
+                rank_text = cells[0]
+                if not rank_text.isdigit():
+                    continue
+                
+                # Team name - may include game info like "Duke(H) 16 Florida" or "Teamvs. 123 Opponent"
+                # Extract just the first part before any game notation
+                team_full = cells[1]
+                # Remove game info patterns like "(H) 123 Opponent" or "vs. 123 Opponent"
+                team_name = re.split(r'(?:\([HANhant]\)|vs\.)\s*\d', team_full)[0].strip()
+                
+                # Skip if no team name
+                if not team_name:
+                    continue
+                
+                # Get conference
+                conf = cells[2] if len(cells) > 2 else None
+                
+                # Parse metrics based on actual column structure
+                # Columns: 0:Rank, 1:Team, 2:Conf, 3:G, 4:Rec, 5:AdjOE, 6:AdjDE, 7:Barthag,
+                #          8:EFG%, 9:EFGD%, 10:TOR, 11:TORD, 12:ORB, 13:DRB, 14:FTR, 15:FTRD,
+                #          16:2P%, 17:2P%D, 18:3P%, 19:3P%D, 20:3PR, 21:3PRD, 22:AdjT, 23:WAB
+                
+                team_data = {
+                    'rank': int(rank_text),
+                    'team': team_name,
+                    'team_name': team_name,  # For database compatibility
+                    'conference': conf,
+                    'conf': conf,
+                    'games': self._parse_number(cells[3]),
+                    'record': cells[4],
+                    'adj_oe': self._parse_number(cells[5]),
+                    'adj_de': self._parse_number(cells[6]),
+                    'barthag': self._parse_number(cells[7]),
+                    'efg_pct': self._parse_number(cells[8]) if len(cells) > 8 else None,
+                    'efg_pct_d': self._parse_number(cells[9]) if len(cells) > 9 else None,
+                    'tor': self._parse_number(cells[10]) if len(cells) > 10 else None,
+                    'tord': self._parse_number(cells[11]) if len(cells) > 11 else None,
+                    'orb': self._parse_number(cells[12]) if len(cells) > 12 else None,
+                    'drb': self._parse_number(cells[13]) if len(cells) > 13 else None,
+                    'ftr': self._parse_number(cells[14]) if len(cells) > 14 else None,
+                    'ftrd': self._parse_number(cells[15]) if len(cells) > 15 else None,
+                    'two_p_pct': self._parse_number(cells[16]) if len(cells) > 16 else None,
+                    'two_p_pct_d': self._parse_number(cells[17]) if len(cells) > 17 else None,
+                    'three_p_pct': self._parse_number(cells[18]) if len(cells) > 18 else None,
+                    'three_p_pct_d': self._parse_number(cells[19]) if len(cells) > 19 else None,
+                    'three_pr': self._parse_number(cells[20]) if len(cells) > 20 else None,
+                    'three_prd': self._parse_number(cells[21]) if len(cells) > 21 else None,
+                    'adj_tempo': self._parse_number(cells[22]) if len(cells) > 22 else None,
+                    'wab': self._parse_number(cells[23]) if len(cells) > 23 else None,
+                    'date': datetime.now().strftime('%Y-%m-%d')
+                }
+                
+                teams_data.append(team_data)
+            
+            except Exception as e:
+                print(f"Error parsing row {i}: {e}")
+                continue
+        
+        return teams_data
+    
+    @tracing.traced("scrape", source="torvik")
     def scrape_rankings(self) -> List[Dict]:
         """
-        Scrape current rankings from Bart Torvik using Playwright.
+        Scrape current rankings from Bart Torvik using Playwright
+        (or over plain HTTP in 'http' mode).
         Returns list of team data dictionaries.
         """
+        if self.mode == 'http':
+            return self.fetch_rankings()
+        
         print(f"Fetching data from {self.rankings_url} using browser automation...")
         
         try:
-            with sync_playwright() as p:
-                # Launch browser
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+            # Fresh context from the shared browser, ads and trackers blocked
+            with browser_pool.context(site="torvik") as context:
+                page = context.new_page()
                 
                 # Navigate to Bart Torvik
                 print("Loading BartTorvik.com...")
-                page.goto(self.rankings_url, wait_until='domcontentloaded', timeout=90000)
+                with tracing.span("page.goto", url=self.rankings_url, wait_until='domcontentloaded'):
+                    page.goto(self.rankings_url, wait_until='domcontentloaded', timeout=90000)
                 
                 # Wait for the main table to load
                 print("Waiting for rankings table...")
-                page.wait_for_selector('table', timeout=60000)
+                with tracing.span("wait_for_selector", selector='table'):
+                    page.wait_for_selector('table', timeout=60000)
                 
                 # Wait for data rows to populate (DataTables loads via JS)
                 print("Waiting for table data to load...")
-                page.wait_for_selector('tbody tr', timeout=30000)
-                
-                # Wait a bit more for all 365 teams to load
-                time.sleep(5)
+                with tracing.span("wait_for_selector", selector='tbody tr'):
+                    page.wait_for_selector('tbody tr', timeout=30000)
                 
-                # Check how many rows are loaded
-                row_count = page.locator('tbody tr').count()
+                # Wait until all ~365 teams are in (or the row count settles)
+                row_count = readiness.wait_for_rows(page, 'tbody tr', expected=readiness.FULL_TABLE_ROWS,
+                                                    timeout_ms=15000)
                 print(f"Found {row_count} rows loaded")
                 
-                # Get the page content
-                html_content = page.content()
-                
-                # Save for debugging
-                with open('torvik_debug.html', 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-                
-                # Parse the HTML
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(html_content, 'html.parser')
-                
-                # Find the main rankings table
-                table = soup.find('table')
-                if not table:
+                # Pull just the table's cell text out of the page
+                table = table_extract.extract_table(page, **self.TABLE_SPEC)
+                if table is None:
                     print("ERROR: Could not find rankings table")
-                    browser.close()
                     return []
                 
-                # Get all rows
-                teams_data = []
-                rows = table.find_all('tr')
-                
-                print(f"Found {len(rows)} total rows in table")
-                
-                # Parse header to understand column structure
-                header_row = rows[0] if rows else None
-                headers = []
-                if header_row:
-                    headers = [th.get_text(strip=True) for th in header_row.find_all(['th', 'td'])]
-                    print(f"Headers: {headers[:10]}...")  # Print first 10 headers
-                
-                # Parse data rows
-                for i, row in enumerate(rows[1:], 1):  # Skip header
-                    try:
-                        cells = row.find_all(['td', 'th'])
-                        if len(cells) < 8:  # Need at least 8 columns for basic stats
-                            continue
-                        
-                        # Column structure:
-                        # 0: Rank, 1: Team, 2: Conf, 3: G, 4: Record, 5: AdjOE, 6: AdjDE, 7: Barthag...
-                        
-                        rank_text = cells[0].get_text(strip=True)
-                        if not rank_text.isdigit():
-                            continue
-                        
-                        # Team name - may include game info like "Duke(H) 16 Florida" or "Teamvs. 123 Opponent"
-                        # Extract just the first part before any game notation
-                        team_full = cells[1].get_text(strip=True)
-                        # Remove game info patterns like "(H) 123 Opponent" or "vs. 123 Opponent"
-                        team_name = re.split(r'(?:\([HANhant]\)|vs\.)\s*\d', team_full)[0].strip()
-                        
-                        # Skip if no team name
-                        if not team_name:
-                            continue
-                        
-                        # Get conference
-                        conf = cells[2].get_text(strip=True) if len(cells) > 2 else None
-                        
-                        # Parse metrics based on actual column structure
-                        # Columns: 0:Rank, 1:Team, 2:Conf, 3:G, 4:Rec, 5:AdjOE, 6:AdjDE, 7:Barthag,
-                        #          8:EFG%, 9:EFGD%, 10:TOR, 11:TORD, 12:ORB, 13:DRB, 14:FTR, 15:FTRD,
-                        #          16:2P%, 17:2P%D, 18:3P%, 19:3P%D, 20:3PR, 21:3PRD, 22:AdjT, 23:WAB
-                        
-                        team_data = {
-                            'rank': int(rank_text),
-                            'team': team_name,
-                            'team_name': team_name,  # For database compatibility
-                            'conference': conf,
-                            'conf': conf,
-                            'games': self._parse_number(cells[3].get_text(strip=True)),
-                            'record': cells[4].get_text(strip=True),
-                            'adj_oe': self._parse_number(cells[5].get_text(strip=True)),
-                            'adj_de': self._parse_number(cells[6].get_text(strip=True)),
-                            'barthag': self._parse_number(cells[7].get_text(strip=True)),
-                            'efg_pct': self._parse_number(cells[8].get_text(strip=True)) if len(cells) > 8 else None,
-                            'efg_pct_d': self._parse_number(cells[9].get_text(strip=True)) if len(cells) > 9 else None,
-                            'tor': self._parse_number(cells[10].get_text(strip=True)) if len(cells) > 10 else None,
-                            'tord': self._parse_number(cells[11].get_text(strip=True)) if len(cells) > 11 else None,
-                            'orb': self._parse_number(cells[12].get_text(strip=True)) if len(cells) > 12 else None,
-                            'drb': self._parse_number(cells[13].get_text(strip=True)) if len(cells) > 13 else None,
-                            'ftr': self._parse_number(cells[14].get_text(strip=True)) if len(cells) > 14 else None,
-                            'ftrd': self._parse_number(cells[15].get_text(strip=True)) if len(cells) > 15 else None,
-                            'two_p_pct': self._parse_number(cells[16].get_text(strip=True)) if len(cells) > 16 else None,
-                            'two_p_pct_d': self._parse_number(cells[17].get_text(strip=True)) if len(cells) > 17 else None,
-                            'three_p_pct': self._parse_number(cells[18].get_text(strip=True)) if len(cells) > 18 else None,
-                            'three_p_pct_d': self._parse_number(cells[19].get_text(strip=True)) if len(cells) > 19 else None,
-                            'three_pr': self._parse_number(cells[20].get_text(strip=True)) if len(cells) > 20 else None,
-                            'three_prd': self._parse_number(cells[21].get_text(strip=True)) if len(cells) > 21 else None,
-                            'adj_tempo': self._parse_number(cells[22].get_text(strip=True)) if len(cells) > 22 else None,
-                            'wab': self._parse_number(cells[23].get_text(strip=True)) if len(cells) > 23 else None,
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        }
-                        
-                        teams_data.append(team_data)
-                        
-                    except Exception as e:
-                        print(f"Error parsing row {i}: {e}")
-                        continue
+                # Save for debugging (opt-in: serializes the whole DOM)
+                if SAVE_DEBUG_HTML:
+                    with tracing.span("page.content") as s:
+                        html_content = page.content()
+                        s.set(bytes=len(html_content), dom_rows=row_count)
+                    with tracing.span("export.debug_html", path='torvik_debug.html', bytes=len(html_content)):
+                        with open('torvik_debug.html', 'w', encoding='utf-8') as f:
+                            f.write(html_content)
+                
+                # Parse the rows
+                with tracing.span("parse") as s:
+                    teams_data = self.parse_rankings_table(table)
+                    s.set(rows=len(teams_data))
                 
                 print(f"Successfully parsed {len(teams_data)} teams")
-                browser.close()
                 return teams_data
                 
         except PlaywrightTimeout:
@@ -177,11 +217,46 @@ class BartTorvikScraper:
             import traceback
             traceback.print_exc()
             return []
+    
+    def fetch_rankings(self, params: Optional[Dict] = None) -> List[Dict]:
+        """
+        Fetch current rankings from trank.php over plain HTTP and parse the
+        server-rendered table into the same rows as scrape_rankings().
+        `params` are extra trank.php query parameters (year, end, conlimit...).
+        """
+        print(f"Fetching data from {self.trank_url} over HTTP...")
+        
+        try:
+            response = http_client.get("torvik", self.trank_url, params=params)
+            html_content = http_client.text(response)
+            
+            with tracing.span("extract.table", selector='table', bytes=len(html_content)) as s:
+                table = table_extract.scan_html(html_content)
+                s.set(rows=len(table) if table is not None else 0)
+            if table is None:
+                print("ERROR: Could not find rankings table")
+                return []
+            
+            if SAVE_DEBUG_HTML:
+                with tracing.span("export.debug_html", path='torvik_debug.html', bytes=len(html_content)):
+                    with open('torvik_debug.html', 'w', encoding='utf-8') as f:
+                        f.write(html_content)
+            
+            with tracing.span("parse") as s:
+                teams_data = self.parse_rankings_table(table)
+                s.set(rows=len(teams_data))
+            
+            print(f"Successfully parsed {len(teams_data)} teams")
+            return teams_data
+            
+        except requests.RequestException as e:
+            print(f"ERROR: Could not fetch {self.trank_url}: {e}")
+            return []
 
 
 def main():
     """Test the scraper."""
-    scraper = BartTorvikScraper()
+    scraper = BartTorvikScraper(mode='http' if '--http' in sys.argv[1:] else None)
     teams = scraper.scrape_rankings()
     
     if teams:
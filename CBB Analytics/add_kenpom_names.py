@@ -1,108 +1,13 @@
 """
 Add KenPom team name column to CBB Analytics data for easier merging in Tableau
 """
+import sys
+from pathlib import Path
+
 import pandas as pd
 
-# Manual mapping from CBB Analytics team names to KenPom team names
-TEAM_NAME_MAPPING = {
-    # A
-    'A&M-Corpus Christi': 'Texas A&M Corpus Chris',
-    'Alcorn': 'Alcorn St.',
-    'App State': 'Appalachian St.',
-    'Ark.-Pine Bluff': 'Arkansas Pine Bluff',
-    'Army West Point': 'Army',
-    
-    # B
-    'Boston U.': 'Boston University',
-    
-    # C
-    'CSU Bakersfield': 'Cal St. Bakersfield',
-    'California Baptist': 'Cal Baptist',
-    'Central Ark.': 'Central Arkansas',
-    'Central Conn. St.': 'Central Connecticut',
-    'Central Mich.': 'Central Michigan',
-    'Charleston So.': 'Charleston Southern',
-    'Col. of Charleston': 'Charleston',
-    
-    # D
-    'Detroit': 'Detroit Mercy',
-    
-    # E
-    'ETSU': 'East Tennessee St.',
-    'Eastern Ill.': 'Eastern Illinois',
-    'Eastern Ky.': 'Eastern Kentucky',
-    'Eastern Mich.': 'Eastern Michigan',
-    'Eastern Wash.': 'Eastern Washington',
-    
-    # F
-    'FDU': 'Fairleigh Dickinson',
-    'FGCU': 'Florida Gulf Coast',
-    'Fla. Atlantic': 'Florida Atlantic',
-    
-    # G
-    'Ga. Southern': 'Georgia Southern',
-    'Gardner-Webb': 'Gardner Webb',
-    'Grambling': 'Grambling St.',
-    
-    # L
-    'LMU (CA)': 'Loyola Marymount',
-    'Lamar University': 'Lamar',
-    
-    # M
-    'Middle Tenn.': 'Middle Tennessee',
-    'Mississippi Val.': 'Mississippi Valley St.',
-    
-    # N
-    'N.C. A&T': 'North Carolina A&T',
-    'N.C. Central': 'North Carolina Central',
-    'NC State': 'N.C. State',
-    'NIU': 'Northern Illinois',
-    'North Ala.': 'North Alabama',
-    'Northern Ariz.': 'Northern Arizona',
-    'Northern Colo.': 'Northern Colorado',
-    'Northern Ky.': 'Northern Kentucky',
-    
-    # O
-    'Ole Miss': 'Mississippi',
-    
-    # Q
-    'Queens (NC)': 'Queens',
-    
-    # S
-    'SFA': 'Stephen F. Austin',
-    'Saint Mary\'s (CA)': 'Saint Mary\'s',
-    'Sam Houston': 'Sam Houston St.',
-    'Seattle U': 'Seattle',
-    'South Fla.': 'South Florida',
-    'Southeast Mo. St.': 'Southeast Missouri',
-    'Southeastern La.': 'Southeastern Louisiana',
-    'Southern California': 'USC',
-    'Southern Ill.': 'Southern Illinois',
-    'Southern Ind.': 'Southern Indiana',
-    'Southern Miss.': 'Southern Miss',
-    'Southern U.': 'Southern',
-    'St. John\'s (NY)': 'St. John\'s',
-    
-    # U
-    'UAlbany': 'Albany',
-    'UConn': 'Connecticut',
-    'UIC': 'Illinois Chicago',
-    'UIW': 'Incarnate Word',
-    'ULM': 'Louisiana Monroe',
-    'UMES': 'Maryland Eastern Shore',
-    'UNCW': 'UNC Wilmington',
-    'UNI': 'Northern Iowa',
-    'UT Martin': 'Tennessee Martin',
-    'UTRGV': 'UT Rio Grande Valley',
-    
-    # W
-    'WI Green Bay': 'Green Bay',
-    'West Ga.': 'West Georgia',
-    'Western Caro.': 'Western Carolina',
-    'Western Ill.': 'Western Illinois',
-    'Western Ky.': 'Western Kentucky',
-    'Western Mich.': 'Western Michigan',
-}
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import team_registry
 
 
 def add_kenpom_team_names():
@@ -113,19 +18,19 @@ def add_kenpom_team_names():
     
     print(f"Loaded {len(df)} teams from CBB Analytics")
     
-    # Add the kenpom_team_name column
-    # Use the mapping if available, otherwise use the same name
-    df['kenpom_team_name'] = df['team_kenpom'].apply(
-        lambda x: TEAM_NAME_MAPPING.get(x, x)
-    )
+    # Add the kenpom_team_name and team_id columns
+    # Use the team registry if it knows the name, otherwise use the same name
+    df['kenpom_team_name'] = team_registry.canonical_names(df['team_kenpom'])
+    df['team_id'] = team_registry.map_series(df['team_kenpom'])
     
     # Verify the mapping
-    print(f"\nAdded 'kenpom_team_name' column")
+    print(f"\nAdded 'kenpom_team_name' and 'team_id' columns")
     
     # Count how many were mapped vs unchanged
     mapped = df['kenpom_team_name'] != df['team_kenpom']
     print(f"  Mapped {mapped.sum()} team names")
     print(f"  Unchanged {(~mapped).sum()} team names")
+    print(f"  {df['team_id'].isna().sum()} teams not in the team registry")
     
     # Show some examples of mappings
     print("\nSample mappings:")
@@ -13,317 +13,35 @@ Scrapes comprehensive team data from cbbanalytics.com including:
 - Win/Loss by Lead/Deficit
 
 Team names are normalized to match KenPom format for Tableau integration.
+
+Capture mode (--capture or CBB_CAPTURE=1) reads the JSON responses the app
+renders its tables from instead of the rendered table, so values and
+percentiles come back as separate fields and need no prefix cleaning. Only
+categories that declare their "api_fields" are captured; until one does,
+the CLI scrapes the rendered table.
 """
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
 import pandas as pd
 from datetime import datetime
 import re
-import time
 import os
+import sys
 import traceback
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import browser_pool, net_capture, percentile_clean, readiness, session_vault, table_extract, team_registry, tracing
+from shared.percentile_clean import clean_percentile_value
+
 # Load environment variables from .env file in the same directory as this script
 script_dir = Path(__file__).parent
 env_path = script_dir / '.env'
 load_dotenv(dotenv_path=env_path)
 
 
-# Team name mapping to match KenPom format
-TEAM_NAME_MAPPING = {
-    "Iowa State": "Iowa St.",
-    "Michigan State": "Michigan St.",
-    "Connecticut": "Connecticut",
-    "NC State": "N.C. State",
-    "Ohio State": "Ohio St.",
-    "Saint Mary's": "Saint Mary's",
-    "Miami (Fla.)": "Miami FL",
-    "Miami (OH)": "Miami OH",
-    "Utah State": "Utah St.",
-    "Ole Miss": "Mississippi",
-    "San Diego State": "San Diego St.",
-    "Florida State": "Florida St.",
-    "Kansas State": "Kansas St.",
-    "Oklahoma State": "Oklahoma St.",
-    "Boise State": "Boise St.",
-    "Arizona State": "Arizona St.",
-    "Penn State": "Penn St.",
-    "McNeese State": "McNeese",
-    "Colorado State": "Colorado St.",
-    "Mississippi State": "Mississippi St.",
-    "Wichita State": "Wichita St.",
-    "Illinois State": "Illinois St.",
-    "New Mexico State": "New Mexico St.",
-    "Fresno State": "Fresno St.",
-    "Morgan State": "Morgan St.",
-    "Ball State": "Ball St.",
-    "Sacramento State": "Sacramento St.",
-    "Portland State": "Portland St.",
-    "Montana State": "Montana St.",
-    "Weber State": "Weber St.",
-    "San Jose State": "San Jose St.",
-    "Appalachian State": "Appalachian St.",
-    "Arkansas State": "Arkansas St.",
-    "Georgia State": "Georgia St.",
-    "Louisiana State": "LSU",
-    "Murray State": "Murray St.",
-    "Norfolk State": "Norfolk St.",
-    "North Carolina State": "N.C. State",
-    "North Dakota State": "North Dakota St.",
-    "South Carolina State": "South Carolina St.",
-    "South Dakota State": "South Dakota St.",
-    "St. John's": "St. John's",
-    "St. Mary's": "Saint Mary's",
-    "Alabama State": "Alabama St.",
-    "Alcorn State": "Alcorn St.",
-    "Arkansas-Little Rock": "Little Rock",
-    "Arkansas-Pine Bluff": "Arkansas Pine Bluff",
-    "Cal State Bakersfield": "Cal St. Bakersfield",
-    "Cal State Fullerton": "Cal St. Fullerton",
-    "Cal State Northridge": "CSUN",
-    "California Baptist": "Cal Baptist",
-    "Chicago State": "Chicago St.",
-    "Cleveland State": "Cleveland St.",
-    "College of Charleston": "Charleston",
-    "Coppin State": "Coppin St.",
-    "Delaware State": "Delaware St.",
-    "Detroit": "Detroit Mercy",
-    "East Tennessee State": "East Tennessee St.",
-    "Florida International": "FIU",
-    "Fort Wayne": "Purdue Fort Wayne",
-    "Gardner-Webb": "Gardner Webb",
-    "Grambling": "Grambling St.",
-    "Idaho State": "Idaho St.",
-    "Illinois-Chicago": "Illinois Chicago",
-    "Indiana State": "Indiana St.",
-    "Jackson State": "Jackson St.",
-    "Jacksonville State": "Jacksonville St.",
-    "Kennesaw State": "Kennesaw St.",
-    "Kent State": "Kent St.",
-    "Long Beach State": "Long Beach St.",
-    "Long Island": "LIU",
-    "Louisiana-Lafayette": "Louisiana",
-    "Louisiana-Monroe": "Louisiana Monroe",
-    "Loyola Maryland": "Loyola MD",
-    "Maryland-Eastern Shore": "Maryland Eastern Shore",
-    "Mississippi Valley State": "Mississippi Valley St.",
-    "Missouri State": "Missouri St.",
-    "Missouri-Kansas City": "Kansas City",
-    "Morehead State": "Morehead St.",
-    "Nicholls State": "Nicholls",
-    "Northwestern State": "Northwestern St.",
-    "Omaha": "Nebraska Omaha",
-    "Oregon State": "Oregon St.",
-    "Prairie View": "Prairie View A&M",
-    "SIU Edwardsville": "SIUE",
-    "Saint Bonaventure": "St. Bonaventure",
-    "Saint Francis (PA)": "Saint Francis",
-    "Sam Houston State": "Sam Houston St.",
-    "South Carolina Upstate": "USC Upstate",
-    "Southeast Missouri State": "Southeast Missouri",
-    "Southern Mississippi": "Southern Miss",
-    "St. Thomas (MN)": "St. Thomas",
-    "Tarleton State": "Tarleton St.",
-    "Tennessee State": "Tennessee St.",
-    "Tennessee-Martin": "Tennessee Martin",
-    "Texas A&M-Corpus Christi": "Texas A&M Corpus Chris",
-    "Texas State": "Texas St.",
-    "Texas-Rio Grande Valley": "UT Rio Grande Valley",
-    "Washington State": "Washington St.",
-    "Wright State": "Wright St.",
-    "Youngstown State": "Youngstown St.",
-    "Bethune-Cookman": "Bethune Cookman",
-}
-
-
-def clean_percentile_value(val):
-    """
-    Remove percentile prefix from values.
-    CBB Analytics displays percentile rankings alongside actual values,
-    which get scraped as concatenated strings (e.g., "2347.9%" = percentile 23 + actual 47.9%)
-    """
-    if pd.isna(val) or val == '' or val == '-':
-        return val
-    
-    val_str = str(val).strip()
-    
-    if len(val_str) < 4:
-        return val
-    
-    # Check if value is already clean (no percentile prefix needed)
-    try:
-        val_float = float(val_str.replace('%', ''))
-        # If it's a percentage in 0-150% range, might already be clean
-        if val_str.endswith('%') and 0 <= val_float <= 150:
-            # But percentages like "2347.9%" clearly have prefixes
-            if val_float <= 100 and len(val_str) <= 7:  # e.g., "45.3%" or "99.9%"
-                return val  # Already clean
-        # If it's a non-percentage value in typical basketball ranges, might be clean
-        elif not val_str.endswith('%'):
-            # ORtg/DRtg range: 85-130
-            # PTS/G range: 50-100
-            # Per-game stats: 0-20
-            has_leading_zero = val_str[0] == '0' and len(val_str) > 3
-            if (not has_leading_zero and
-                (85 <= val_float <= 130 or 50 <= val_float <= 100 or 0 <= val_float <= 20) 
-                and len(val_str) <= 6):
-                return val  # Already clean
-    except:
-        pass  # Continue with percentile removal logic
-    
-    # Pattern 1: "87+17.6" -> "17.6" (for Net Rtg with +)
-    match = re.match(r'^(\d{1,3})\+(.+)$', val_str)
-    if match and 0 <= int(match.group(1)) <= 100:
-        return match.group(2)
-    
-    # Pattern 2: "87-17.6" -> "-17.6" (for negative Net Rtg)
-    match = re.match(r'^(\d{1,3})(-\d+\.?\d*)$', val_str)
-    if match and 0 <= int(match.group(1)) <= 100:
-        return match.group(2)
-    
-    # Pattern 3: Percentage values like "2347.9%" or "645.3%" (percentile + percentage)
-    if val_str.endswith('%') and val_str[0].isdigit() and '.' in val_str:
-        candidates = []
-        
-        # Try 1-digit and 2-digit percentiles for percentage values
-        for percentile_len in [1, 2]:
-            if len(val_str) <= percentile_len + 1:
-                continue
-            
-            percentile_str = val_str[:percentile_len]
-            remaining = val_str[percentile_len:]
-            
-            try:
-                percentile = int(percentile_str)
-                if not (0 <= percentile <= 100):
-                    continue
-                
-                actual_val = float(remaining.replace('%', ''))
-                if 0 <= actual_val <= 150:
-                    candidates.append((percentile_len, remaining, actual_val))
-            except:
-                continue
-        
-        if candidates:
-            candidates_sorted = sorted(candidates, key=lambda x: (x[0], -x[2]))
-            
-            # Prefer values in typical percentage range (30-100%)
-            for percentile_len, remaining, actual_val in candidates_sorted:
-                if 30 <= actual_val <= 100:
-                    val_part = remaining.replace('%', '')
-                    if '.' in val_part:
-                        parts = val_part.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        val_part = '.'.join(parts)
-                    return val_part + '%'
-            
-            # If no candidate in typical range, try any value <= 100%
-            for percentile_len, remaining, actual_val in candidates_sorted:
-                if actual_val <= 100:
-                    val_part = remaining.replace('%', '')
-                    if '.' in val_part:
-                        parts = val_part.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        val_part = '.'.join(parts)
-                    return val_part + '%'
-            
-            # Take first candidate (shortest percentile)
-            percentile_len, remaining, actual_val = candidates_sorted[0]
-            val_part = remaining.replace('%', '')
-            if '.' in val_part:
-                parts = val_part.split('.')
-                parts[0] = parts[0].lstrip('0') or '0'
-                val_part = '.'.join(parts)
-            return val_part + '%'
-    
-    # Universal pattern for non-percentage numbers
-    if val_str[0].isdigit() and '.' in val_str and not val_str.endswith('%'):
-        # CHECK IF ALREADY CLEAN FIRST
-        try:
-            current_val = float(val_str)
-            has_leading_zero = val_str[0] == '0' and len(val_str) > 4
-            if not has_leading_zero and current_val < 150 and len(val_str) <= 6:
-                # ORtg/DRtg range (85-135)
-                if 85 <= current_val <= 135:
-                    return val
-                # PTS/G, assists, rebounds, etc. range (0-85)
-                if 0 <= current_val < 85:
-                    return val
-        except:
-            pass
-        
-        candidates = []
-        
-        # Try all possible percentile lengths (1-3 digits)
-        for percentile_len in [1, 2, 3]:
-            if len(val_str) <= percentile_len:
-                continue
-            
-            percentile_str = val_str[:percentile_len]
-            remaining = val_str[percentile_len:]
-            
-            try:
-                percentile = int(percentile_str)
-                if not (0 <= percentile <= 100):
-                    continue
-                actual_val = float(remaining)
-                candidates.append((percentile_len, remaining, actual_val))
-            except:
-                continue
-        
-        if candidates:
-            candidates_sorted = sorted(candidates, key=lambda x: x[0])
-            
-            # First priority: ORtg/DRtg range (85-135)
-            for percentile_len, actual_val_str, actual_val in candidates_sorted:
-                if 85 <= actual_val <= 135:
-                    if '.' in actual_val_str:
-                        parts = actual_val_str.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        return '.'.join(parts)
-                    return actual_val_str.lstrip('0') or '0'
-            
-            # Second priority: Medium/large ranges (20-85)
-            for percentile_len, actual_val_str, actual_val in candidates_sorted:
-                if 20 <= actual_val < 85:
-                    if '.' in actual_val_str:
-                        parts = actual_val_str.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        return '.'.join(parts)
-                    return actual_val_str.lstrip('0') or '0'
-            
-            # Third priority: Small per-game stats (0-20)
-            for percentile_len, actual_val_str, actual_val in candidates_sorted:
-                if 0 <= actual_val < 20:
-                    if '.' in actual_val_str:
-                        parts = actual_val_str.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        return '.'.join(parts)
-                    return actual_val_str.lstrip('0') or '0'
-            
-            # Fourth priority: Values over 130
-            for percentile_len, actual_val_str, actual_val in candidates_sorted:
-                if actual_val > 130:
-                    if '.' in actual_val_str:
-                        parts = actual_val_str.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        return '.'.join(parts)
-                    return actual_val_str.lstrip('0') or '0'
-            
-            # Fallback: Return first candidate
-            result = candidates_sorted[0][1]
-            if '.' in result:
-                parts = result.split('.')
-                parts[0] = parts[0].lstrip('0') or '0'
-                result = '.'.join(parts)
-            return result
-    
-    return val
-
-
 # Category configurations with required columns
 # All categories are on the same page - we switch using dropdown/selector
 CATEGORIES = {
@@ -384,6 +102,88 @@ CATEGORIES = {
     },
 }
 
+# Capture mode: build each category from the app's JSON API responses.
+# CBB_SAVE_CAPTURE=<dir> also writes every payload to disk. A category is
+# captured only if it declares "api_fields" ({field: column}, flattened
+# field names such as "stats.ortg"), which pick and rename its fields; when
+# every field is already in the first payload no click is needed. Other
+# categories are scraped from the rendered table.
+CAPTURE_MODE = os.environ.get("CBB_CAPTURE") == "1"
+CAPTURE_SAVE_DIR = os.environ.get("CBB_SAVE_CAPTURE")
+
+# Fields the API may use for the team name, in order of preference
+API_TEAM_FIELDS = ('teamMarket', 'teamName', 'team_name', 'market', 'team', 'name', 'school')
+
+# A field with one of these suffixes is the percentile of the field without it
+PERCENTILE_SUFFIX = re.compile(r'[_ .]?(?:pctile|pctl|percentile)$', re.IGNORECASE)
+
+# Fewer rows than this and a payload isn't a team table
+MIN_TEAM_ROWS = 50
+
+
+def _team_field(columns) -> Optional[str]:
+    """The column holding team names in a flattened API payload."""
+    for field in API_TEAM_FIELDS:
+        if field in columns:
+            return field
+    return next((c for c in columns if 'team' in c.lower() and not c.lower().endswith('id')), None)
+
+
+def is_team_payload(url: str, data) -> bool:
+    """Whether a captured JSON payload holds a team stats table."""
+    records = net_capture.find_records(data, min_rows=MIN_TEAM_ROWS)
+    return bool(records) and _team_field(records[0].keys()) is not None
+
+
+def has_fields(records: Optional[List[Dict]], api_fields: Dict[str, str]) -> bool:
+    """Whether captured team rows carry every one of `api_fields` (flattened names)."""
+    if not records:
+        return False
+    columns = set(pd.json_normalize(records[:1]).columns)
+    return _team_field(columns) is not None and all(field in columns for field in api_fields)
+
+
+def capture_supported() -> bool:
+    """Whether any category declares the API fields capture mode needs."""
+    return any(category.get('api_fields') for category in CATEGORIES.values())
+
+
+def frame_from_records(records: List[Dict], api_fields: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    DataFrame from captured API rows: nested objects flattened ("a.b"), the
+    team name as 'Team', and each percentile field as '<column> Pctile'
+    beside its value. With `api_fields` ({field: column}) only those fields
+    (and their percentiles) are kept, renamed to the table's column names.
+    """
+    df = pd.json_normalize(records)
+    team_field = _team_field(df.columns)
+    
+    # Percentile fields by the field they rank
+    percentiles = {}
+    for col in df.columns:
+        match = PERCENTILE_SUFFIX.search(col)
+        if match and col[:match.start()] in df.columns:
+            percentiles[col[:match.start()]] = col
+    
+    if api_fields:
+        keep = [team_field] if team_field else []
+        renames = {}
+        for field, column in api_fields.items():
+            if field in df.columns:
+                keep.append(field)
+                renames[field] = column
+                if field in percentiles:
+                    keep.append(percentiles[field])
+                    renames[percentiles[field]] = f"{column} Pctile"
+        df = df[keep].rename(columns=renames)
+    else:
+        df = df.rename(columns={pct: f"{field} Pctile" for field, pct in percentiles.items()})
+    
+    if team_field:
+        df = df.rename(columns={team_field: 'Team'})
+        df = df[['Team'] + [c for c in df.columns if c != 'Team']]
+    return df
+
 
 def normalize_team_name(team_name: str) -> str:
     """
@@ -396,37 +196,38 @@ def normalize_team_name(team_name: str) -> str:
     # Remove common prefixes/numbers that might appear
     clean_name = re.sub(r'^\d+\.\s*', '', team_name).strip()
     
-    # Apply custom mapping if exists
-    if clean_name in TEAM_NAME_MAPPING:
-        return TEAM_NAME_MAPPING[clean_name]
-    
-    return clean_name
+    return team_registry.canonical_name(clean_name)
 
 
 class CBBAnalyticsScraper:
     """Scraper for CBBAnalytics.com team statistics."""
     
-    def __init__(self, email: str, password: str):
+    def __init__(self, email: str, password: str, capture: Optional[bool] = None):
         """
         Initialize scraper with authentication.
         
         Args:
             email: CBB Analytics account email
             password: CBB Analytics account password
+            capture: Read the app's JSON responses instead of the rendered
+                table (default CBB_CAPTURE)
         """
         self.base_url = "https://cbbanalytics.com"
         self.season_id = "41097"  # Current season ID
         self.email = email
         self.password = password
+        self.capture = CAPTURE_MODE if capture is None else capture
     
+    @tracing.traced("login")
     def login(self, page):
         """Login to CBBAnalytics.com."""
         print("\nLogging in to CBBAnalytics.com...")
         
         try:
             # Go to home page first
-            page.goto(self.base_url, wait_until='networkidle', timeout=30000)
-            time.sleep(2)
+            with tracing.span("page.goto", url=self.base_url, wait_until='networkidle'):
+                page.goto(self.base_url, wait_until='networkidle', timeout=30000)
+            tracing.sleep(2, reason="homepage settle")
             
             # Click the "Login" button to open the modal
             print("  Looking for login button...")
@@ -435,7 +236,7 @@ class CBBAnalyticsScraper:
                 page.wait_for_selector('a.login-button', timeout=10000, state='visible')
                 page.click('a.login-button')
                 print("  ✓ Clicked login button")
-                time.sleep(3)  # Wait for modal to fully appear
+                tracing.sleep(3, reason="login modal")  # Wait for modal to fully appear
             except Exception as e:
                 print(f"  ⚠️  Could not click login button: {e}")
                 # Save debug HTML to see what's on the page
@@ -468,11 +269,11 @@ class CBBAnalyticsScraper:
                         if next_button:
                             next_button.click()
                             print("  ✓ Clicked 'Next' button")
-                            time.sleep(2)
+                            tracing.sleep(2)
                     except:
                         pass
                     
-                    time.sleep(2)  # Give form time to react or show password field
+                    tracing.sleep(2)  # Give form time to react or show password field
                     break
                 except:
                     continue
@@ -497,7 +298,7 @@ class CBBAnalyticsScraper:
                     page.fill(selector, self.password)
                     print(f"  ✓ Filled password with selector: {selector}")
                     password_filled = True
-                    time.sleep(1)  # Give form time to react
+                    tracing.sleep(1)  # Give form time to react
                     break
                 except:
                     continue
@@ -532,7 +333,7 @@ class CBBAnalyticsScraper:
                 return False
             
             # Wait for navigation after login
-            time.sleep(5)
+            tracing.sleep(5, reason="login redirect")
             
             # Check if login was successful
             current_url = page.url.lower()
@@ -550,6 +351,21 @@ class CBBAnalyticsScraper:
             print(f"  ❌ Login error: {e}")
             return False
     
+    def is_logged_in(self, page) -> bool:
+        """
+        Cheap check for a stored session: the stats page opens without a
+        redirect to the login page and shows no login button.
+        """
+        url = f"{self.base_url}/stats/{self.season_id}/division/d1/team-box"
+        with tracing.span("page.goto", url=url, wait_until='domcontentloaded'):
+            page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        current_url = page.url.lower()
+        if "login" in current_url or "sign" in current_url:
+            return False
+        readiness.wait_for_rows(page, 'table tbody tr', timeout_ms=10000)
+        return page.locator('a.login-button').count() == 0
+    
+    @tracing.traced("scrape_category")
     def scrape_category(self, page, category_key: str, first_load: bool = False) -> Optional[pd.DataFrame]:
         """
         Scrape data for a specific category by selecting it from the dropdown.
@@ -563,40 +379,24 @@ class CBBAnalyticsScraper:
             DataFrame with scraped data or None if failed
         """
         category = CATEGORIES[category_key]
+        tracing.annotate(category=category_key)
         
         print(f"\nScraping {category['name']}...")
         
         try:
             # If not first load, we need to select the category
             if not first_load:
-                print(f"  Switching to category: {category['selector_text']}")
-                
-                # Look for button/span with category name (based on HTML structure)
-                selectors_to_try = [
-                    f'span.button:has-text("{category["selector_text"]}")',
-                    f'button:has-text("{category["selector_text"]}")',
-                    f'span:has-text("{category["selector_text"]}")',
-                ]
-                
-                category_found = False
-                for selector in selectors_to_try:
-                    try:
-                        page.click(selector, timeout=5000)
-                        print(f"  ✓ Clicked '{category['selector_text']}'")
-                        category_found = True
-                        time.sleep(4)  # Wait for new data to load
-                        break
-                    except Exception as e:
-                        continue
-                
-                if not category_found:
+                before = readiness.snapshot(page, 'table')
+                if self._click_category(page, category):
+                    readiness.wait_for_change(page, 'table', before)  # Wait for new data to load
+                else:
                     print(f"  ⚠️  Could not switch to category")
             
-            # Scroll to trigger lazy-loading
+            # Scroll to trigger lazy-loading, then wait for the rows to settle
             page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(2)
+            readiness.wait_for_rows(page, 'table tbody tr', expected=readiness.FULL_TABLE_ROWS,
+                                    stable_ms=500, timeout_ms=10000)
             page.evaluate("window.scrollTo(0, 0)")
-            time.sleep(2)
             # Check if we hit a login wall
             current_url = page.url.lower()
             if "login" in current_url or "sign" in current_url:
@@ -637,18 +437,16 @@ class CBBAnalyticsScraper:
                     f.write(page.content())
                 return None
             
-            # Get page HTML
-            html_content = page.content()
-            
-            # Parse with pandas
-            tables = pd.read_html(html_content)
-            
-            if not tables:
+            # Pull the largest table (usually the data table) out of the page,
+            # with the same headers and text pd.read_html would give
+            table = table_extract.extract_table(page, 'table', largest=True, text='collapse')
+            if table is None or not table.rows:
                 print(f"  ⚠️  No tables found in HTML")
                 return None
             
-            # Get the largest table (usually the data table)
-            df = max(tables, key=len) if len(tables) > 1 else tables[0]
+            with tracing.span("parse") as s:
+                df = table.to_frame()
+                s.set(rows=len(df))
             
             print(f"  ✓ Found table with {len(df)} rows and {len(df.columns)} columns")
             
@@ -657,10 +455,11 @@ class CBBAnalyticsScraper:
                 df.columns = ['_'.join(map(str, col)).strip('_') for col in df.columns.values]
             
             # Clean the data - separate percentile from actual values
-            df = self.clean_percentile_values(df)
-            
-            # Normalize team names
-            df = self.normalize_team_names_in_df(df)
+            with tracing.span("normalize", rows=len(df)):
+                df = self.clean_percentile_values(df)
+                
+                # Normalize team names
+                df = self.normalize_team_names_in_df(df)
             
             return df
             
@@ -669,6 +468,92 @@ class CBBAnalyticsScraper:
             traceback.print_exc()
             return None
     
+    def _click_category(self, page, category: Dict) -> bool:
+        """Click the category's button on the stats page; whether one was found."""
+        print(f"  Switching to category: {category['selector_text']}")
+        
+        # Look for button/span with category name (based on HTML structure)
+        selectors_to_try = [
+            f'span.button:has-text("{category["selector_text"]}")',
+            f'button:has-text("{category["selector_text"]}")',
+            f'span:has-text("{category["selector_text"]}")',
+        ]
+        
+        for selector in selectors_to_try:
+            try:
+                page.click(selector, timeout=5000)
+                print(f"  ✓ Clicked '{category['selector_text']}'")
+                return True
+            except Exception as e:
+                continue
+        return False
+    
+    @tracing.traced("capture_category")
+    def capture_category(self, page, capture: net_capture.ResponseCapture, category_key: str,
+                         baseline: Optional[List[Dict]] = None) -> Optional[pd.DataFrame]:
+        """
+        Build one category's DataFrame from the app's JSON responses.
+        
+        Only the category's "api_fields" are kept. When they are all in
+        `baseline` (the rows loaded with the page) the category comes
+        straight from that payload; otherwise it is selected and the first
+        team payload carrying all of them is used. No paging, scrolling or
+        DOM reads. A category without "api_fields" is not captured.
+        
+        Args:
+            page: Playwright page object (already on the stats page)
+            capture: ResponseCapture attached before the stats page loaded
+            category_key: Key from CATEGORIES dict
+            baseline: Team rows from the payload the page loaded with
+        
+        Returns:
+            DataFrame with values and '<column> Pctile' percentiles, or None
+        """
+        category = CATEGORIES[category_key]
+        tracing.annotate(category=category_key)
+        api_fields = category.get('api_fields')
+        
+        print(f"\nCapturing {category['name']}...")
+        if not api_fields:
+            print(f"  ⚠️  No api_fields declared for this category")
+            return None
+        
+        try:
+            records = None
+            if has_fields(baseline, api_fields):
+                records = baseline
+            else:
+                mark = capture.mark()
+                if self._click_category(page, category):
+                    hit = capture.wait_for(
+                        lambda url, data: has_fields(net_capture.find_records(data, min_rows=MIN_TEAM_ROWS), api_fields),
+                        since=mark, timeout_ms=15000)
+                    if hit:
+                        records = net_capture.find_records(hit[1], min_rows=MIN_TEAM_ROWS)
+                        print(f"  ✓ Captured {hit[0]}")
+                if records is None:
+                    print(f"  ⚠️  No API response with this category's fields")
+                    return None
+            
+            with tracing.span("parse") as s:
+                df = frame_from_records(records, api_fields)
+                s.set(rows=len(df))
+            
+            print(f"  ✓ Built table with {len(df)} rows and {len(df.columns)} columns")
+            if len(df) < readiness.FULL_TABLE_ROWS:
+                print(f"  ⚠️  Only {len(df)} teams in the payload")
+            
+            with tracing.span("normalize", rows=len(df)):
+                df = self.normalize_team_names_in_df(df)
+            
+            return df
+            
+        except Exception as e:
+            print(f"  ❌ Error capturing {category['name']}: {str(e)}")
+            traceback.print_exc()
+            return None
+    
+    @tracing.traced("scrape", source="cbb_analytics")
     def scrape_all_categories(self):
         """
         Scrape all stat categories from CBB Analytics.
@@ -683,68 +568,31 @@ class CBBAnalyticsScraper:
         
         all_data = {}
         
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            
-            context = browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
-            
+        # Context from the shared browser; images, fonts and trackers blocked
+        with browser_pool.context(
+            site="cbb_analytics",
+            viewport={'width': 1920, 'height': 1080},
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        ) as context:
             page = context.new_page()
             
-            # Login first
-            if not self.login(page):
+            # Login first (or reuse the stored session if it's still valid)
+            if not session_vault.ensure_login(context, page, "cbb_analytics",
+                                              login=self.login, probe=self.is_logged_in):
                 print("\n❌ Login failed - cannot proceed with scraping")
-                browser.close()
                 return {}
             
             # Navigate to the main stats page (only once)
             url = f"{self.base_url}/stats/{self.season_id}/division/d1/team-box"
+            if self.capture:
+                return self._capture_all_categories(page, url)
             print(f"\nNavigating to stats page: {url}")
-            page.goto(url, wait_until='networkidle', timeout=60000)
+            with tracing.span("page.goto", url=url, wait_until='networkidle'):
+                page.goto(url, wait_until='networkidle', timeout=60000)
             print("  ✓ Stats page loaded")
-            time.sleep(5)
+            readiness.wait_for_rows(page, 'table tbody tr', timeout_ms=15000)
             
-            # Change pagination to show 500 rows (all teams)
-            print("\n  Changing pagination to 500 rows...")
-            try:
-                # Try to find and click the rows per page dropdown
-                pagination_selectors = [
-                    'select[aria-label*="rows"]',
-                    'select.pagination-select',
-                    'select[class*="pageSize"]',
-                    'select[class*="per-page"]',
-                    'select',  # Last resort - find any select
-                ]
-                
-                pagination_changed = False
-                for selector in pagination_selectors:
-                    try:
-                        # Find all select elements
-                        selects = page.query_selector_all(selector)
-                        for select in selects:
-                            # Check if this select has option for 500
-                            options = select.query_selector_all('option')
-                            option_values = [opt.get_attribute('value') for opt in options]
-                            
-                            if '500' in option_values or '500' in [opt.inner_text() for opt in options]:
-                                # Found the right select, click it and select 500
-                                select.select_option('500')
-                                print(f"  ✓ Changed to 500 rows per page")
-                                pagination_changed = True
-                                time.sleep(3)  # Wait for table to reload with all data
-                                break
-                    except Exception as e:
-                        continue
-                    
-                    if pagination_changed:
-                        break
-                
-                if not pagination_changed:
-                    print(f"  ⚠️  Could not change pagination - may need manual adjustment")
-            except Exception as e:
-                print(f"  ⚠️  Pagination error: {e}")
+            self._show_all_rows(page)
             
             # Scrape each category by switching the selector
             first = True
@@ -753,16 +601,102 @@ class CBBAnalyticsScraper:
                 first = False
                 if df is not None:
                     all_data[category_key] = df
-                time.sleep(2)  # Be nice to the server
+                tracing.sleep(2, reason="between categories")  # Be nice to the server
+        
+        return all_data
+    
+    def _show_all_rows(self, page):
+        """Change pagination to show 500 rows (all teams)."""
+        print("\n  Changing pagination to 500 rows...")
+        try:
+            # Try to find and click the rows per page dropdown
+            pagination_selectors = [
+                'select[aria-label*="rows"]',
+                'select.pagination-select',
+                'select[class*="pageSize"]',
+                'select[class*="per-page"]',
+                'select',  # Last resort - find any select
+            ]
             
-            browser.close()
+            pagination_changed = False
+            for selector in pagination_selectors:
+                try:
+                    # Find all select elements
+                    selects = page.query_selector_all(selector)
+                    for select in selects:
+                        # Check if this select has option for 500
+                        options = select.query_selector_all('option')
+                        option_values = [opt.get_attribute('value') for opt in options]
+                        
+                        if '500' in option_values or '500' in [opt.inner_text() for opt in options]:
+                            # Found the right select, click it and select 500
+                            before = readiness.snapshot(page, 'table')
+                            select.select_option('500')
+                            print(f"  ✓ Changed to 500 rows per page")
+                            pagination_changed = True
+                            readiness.wait_for_change(page, 'table', before)  # Wait for table to reload with all data
+                            break
+                except Exception as e:
+                    continue
+                
+                if pagination_changed:
+                    break
+            
+            if not pagination_changed:
+                print(f"  ⚠️  Could not change pagination - may need manual adjustment")
+        except Exception as e:
+            print(f"  ⚠️  Pagination error: {e}")
+    
+    def _capture_all_categories(self, page, url: str) -> Dict[str, pd.DataFrame]:
+        """
+        Capture-mode body of scrape_all_categories (already logged in).
         
+        A category that no captured payload covers is scraped from the
+        rendered table instead (percentile prefixes cleaned straight away,
+        since merge_and_export leaves captured frames as they are), so
+        capture mode never returns fewer categories than the DOM path.
+        """
+        all_data = {}
+        table_ready = False
+        capture = net_capture.ResponseCapture(page, match='cbbanalytics', save_dir=CAPTURE_SAVE_DIR)
+        try:
+            print(f"\nNavigating to stats page (capturing API responses): {url}")
+            with tracing.span("page.goto", url=url, wait_until='domcontentloaded'):
+                page.goto(url, wait_until='domcontentloaded', timeout=60000)
+            hit = capture.wait_for(is_team_payload, timeout_ms=30000)
+            baseline = None
+            if hit is None:
+                print(f"  ⚠️  No team stats payload among {len(capture)} JSON responses")
+            else:
+                print(f"  ✓ Team stats payload: {hit[0]}")
+                baseline = net_capture.find_records(hit[1], min_rows=MIN_TEAM_ROWS)
+            
+            for category_key in CATEGORIES.keys():
+                df = None
+                if baseline:
+                    df = self.capture_category(page, capture, category_key, baseline=baseline)
+                if df is None:
+                    print(f"  Falling back to the rendered table for {CATEGORIES[category_key]['name']}")
+                    if not table_ready:
+                        readiness.wait_for_rows(page, 'table tbody tr', timeout_ms=15000)
+                        self._show_all_rows(page)
+                        table_ready = True
+                    df = self.scrape_category(page, category_key, first_load=False)
+                    if df is not None:
+                        with tracing.span("normalize.clean_percentiles", rows=len(df)):
+                            df = self.clean_percentile_values(df)
+                if df is not None:
+                    all_data[category_key] = df
+                tracing.sleep(2, reason="between categories")  # Be nice to the server
+        finally:
+            capture.close()
         return all_data
     
     def clean_percentile_values(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Clean columns that have percentile + value concatenated.
-        Uses the comprehensive clean_percentile_value function.
+        Uses the comprehensive clean_percentile_value function, column at a
+        time (percentile_clean.clean_series).
         """
         # Find and skip certain columns
         skip_columns = set()
@@ -778,7 +712,7 @@ class CBBAnalyticsScraper:
                 continue
             try:
                 # Apply the comprehensive cleaning function to the entire column
-                df[col] = df[col].apply(clean_percentile_value)
+                df[col] = percentile_clean.clean_series(df[col])
             except Exception as e:
                 # If any error, leave column as-is
                 pass
@@ -800,7 +734,9 @@ class CBBAnalyticsScraper:
         
         if team_col:
             df['team_original'] = df[team_col]
-            df['team_kenpom'] = df[team_col].apply(normalize_team_name)
+            # Row numbers ("12. ") dropped, then one registry lookup per distinct name
+            names = df[team_col].astype(str).str.replace(r'^\d+\.\s*', '', regex=True)
+            df['team_kenpom'] = team_registry.canonical_names(names)
             # Drop rows where team_kenpom is NaN or empty
             df = df[df['team_kenpom'].notna() & (df['team_kenpom'] != '')]
             # Drop duplicate teams within this category
@@ -808,13 +744,17 @@ class CBBAnalyticsScraper:
         
         return df
     
-    def merge_and_export(self, all_data: Dict[str, pd.DataFrame], output_file: str = 'cbb_analytics_tableau_cleaned.csv'):
+    @tracing.traced("merge_and_export", source="cbb_analytics")
+    def merge_and_export(self, all_data: Dict[str, pd.DataFrame], output_file: str = 'cbb_analytics_tableau_cleaned.csv',
+                         clean_percentiles: bool = True):
         """
         Merge all category data and export to CSV for Tableau.
         
         Args:
             all_data: Dictionary of DataFrames by category
             output_file: Output CSV filename
+            clean_percentiles: Strip percentile prefixes from scraped values
+                (captured frames are already clean)
         """
         if not all_data:
             print("\nNo data to export")
@@ -855,36 +795,44 @@ class CBBAnalyticsScraper:
                     )
                     print(f"    After merge: {len(combined_df)} rows")
         
-        # Clean percentile prefixes from all numeric columns
-        print("\n" + "=" * 70)
-        print("Cleaning data (removing percentile prefixes)...")
-        print("=" * 70)
-        
-        # Identify columns to clean (skip team names, records, GP)
-        skip_columns = {team_col, 'team_original', 'scrape_date', 'scrape_timestamp'}
-        
-        # Add any column with 'team', 'record', 'gp' in name to skip list
-        for col in combined_df.columns:
-            col_lower = col.lower()
-            if 'team' in col_lower or 'record' in col_lower or col_lower == 'gp':
-                skip_columns.add(col)
-        
-        numeric_cols = [col for col in combined_df.columns if col not in skip_columns]
-        
-        print(f"  Cleaning {len(numeric_cols)} columns...")
-        
-        # Apply cleaning function to numeric columns
-        for col in numeric_cols:
-            combined_df[col] = combined_df[col].apply(clean_percentile_value)
+        # Clean percentile prefixes from all numeric columns (captured frames
+        # already carry values and percentiles as separate fields)
+        if clean_percentiles:
+            print("\n" + "=" * 70)
+            print("Cleaning data (removing percentile prefixes)...")
+            print("=" * 70)
+            
+            # Identify columns to clean (skip team names, records, GP)
+            skip_columns = {team_col, 'team_original', 'scrape_date', 'scrape_timestamp'}
+            
+            # Add any column with 'team', 'record', 'gp' in name to skip list
+            for col in combined_df.columns:
+                col_lower = col.lower()
+                if 'team' in col_lower or 'record' in col_lower or col_lower == 'gp':
+                    skip_columns.add(col)
+            
+            numeric_cols = [col for col in combined_df.columns if col not in skip_columns]
+            
+            print(f"  Cleaning {len(numeric_cols)} columns...")
+            
+            # Apply cleaning function to numeric columns
+            with tracing.span("normalize.clean_percentiles", rows=len(combined_df), columns=len(numeric_cols)):
+                percentile_clean.clean_columns(combined_df, numeric_cols)
+            
+            print(f"  ✓ Cleaned all numeric values")
         
-        print(f"  ✓ Cleaned all numeric values")
+        # Registry ID for joins with the other sources
+        if team_col:
+            combined_df['team_id'] = team_registry.map_series(combined_df[team_col])
         
         # Add scrape metadata
         combined_df['scrape_date'] = datetime.now().strftime('%Y-%m-%d')
         combined_df['scrape_timestamp'] = datetime.now().isoformat()
         
         # Export to CSV
-        combined_df.to_csv(output_file, index=False)
+        with tracing.span("export.csv", path=output_file, rows=len(combined_df)) as s:
+            combined_df.to_csv(output_file, index=False)
+            s.set(bytes=tracing.file_size(output_file))
         
         print(f"\n✓ Exported {len(combined_df)} records to {output_file}")
         print(f"  Columns: {len(combined_df.columns)}")
@@ -900,6 +848,7 @@ class CBBAnalyticsScraper:
         return combined_df
 
 
+@tracing.traced("run", source="cbb_analytics")
 def main():
     """Main scraper function."""
     # Read .env file directly
@@ -937,15 +886,21 @@ def main():
     print(f"Email: {email}")
     print("=" * 70)
     
+    # Capture mode only once a category maps its API fields
+    capture = '--capture' in sys.argv[1:] or CAPTURE_MODE
+    if capture and not capture_supported():
+        print("Capture mode needs api_fields on a category - scraping the rendered table")
+        capture = False
+    
     # Create scraper with authentication
-    scraper = CBBAnalyticsScraper(email=email, password=password)
+    scraper = CBBAnalyticsScraper(email=email, password=password, capture=capture)
     
     # Scrape all categories
     all_data = scraper.scrape_all_categories()
     
     # Export to CSV
     if all_data:
-        scraper.merge_and_export(all_data)
+        scraper.merge_and_export(all_data, clean_percentiles=not scraper.capture)
         print("\n" + "=" * 70)
         print("Scraping completed successfully!")
         print("=" * 70)
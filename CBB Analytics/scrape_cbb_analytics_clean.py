@@ -3,340 +3,31 @@ CBB Analytics Scraper
 Scrapes Division I college basketball statistics from cbbanalytics.com
 Requires login credentials in .env file
 Automatically cleans percentile prefixes from scraped data
+
+--parallel [N] (or CBB_PARALLEL=N) scrapes categories concurrently in N
+headless pages that share one login.
+
+--seasons 41097,40000-40002 scrapes several seasons into the Parquet
+archive (season_archive.py) instead of the CSV, one partition per
+season/category; partitions already archived are skipped, so an
+interrupted run resumes where it stopped.
 """
 
+import argparse
+import contextvars
 import os
-import time
+import queue
+import sys
+import threading
 import traceback
-import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import pandas as pd
-from playwright.sync_api import sync_playwright
-
-# Team name mapping to match KenPom format
-TEAM_NAME_MAPPING = {
-    "Albany (NY)": "Albany",
-    "Arkansas-Little Rock": "Little Rock",
-    "Arkansas-Pine Bluff": "Arkansas Pine Bluff",
-    "Bethune-Cookman": "Bethune Cookman",
-    "Central Connecticut": "Central Connecticut St.",
-    "Charleston Southern": "Charleston So.",
-    "College of Charleston": "Col. of Charleston",
-    "Connecticut": "UConn",
-    "Detroit Mercy": "Detroit",
-    "Florida Atlantic": "FAU",
-    "Florida Gulf Coast": "Florida Gulf Coast",
-    "Fordham": "Fordham",
-    "Green Bay": "WI Green Bay",
-    "Hawai'i": "Hawaii",
-    "Illinois-Chicago": "UIC",
-    "IUPUI": "IUPUI",
-    "LIU Brooklyn": "LIU",
-    "Long Island University": "LIU",
-    "Loyola Chicago": "Loyola Chicago",
-    "Loyola Maryland": "Loyola MD",
-    "Louisiana-Lafayette": "Louisiana",
-    "Louisiana-Monroe": "ULM",
-    "LSU": "LSU",
-    "Maryland-Baltimore County": "UMBC",
-    "Maryland-Eastern Shore": "MD Eastern Shore",
-    "Massachusetts": "Massachusetts",
-    "Miami (FL)": "Miami FL",
-    "Miami (OH)": "Miami OH",
-    "Mississippi": "Ole Miss",
-    "Missouri-Kansas City": "UMKC",
-    "Mount Saint Mary's": "Mt. St. Mary's",
-    "Nevada-Las Vegas": "UNLV",
-    "Nevada-Reno": "Nevada",
-    "North Carolina State": "NC State",
-    "Nicholls State": "Nicholls",
-    "Northwestern State": "Northwestern St.",
-    "Omaha": "Nebraska Omaha",
-    "Oregon State": "Oregon St.",
-    "Prairie View": "Prairie View A&M",
-    "SIU Edwardsville": "SIUE",
-    "Saint Bonaventure": "St. Bonaventure",
-    "Saint Francis (PA)": "Saint Francis",
-    "Sam Houston State": "Sam Houston St.",
-    "South Carolina Upstate": "USC Upstate",
-    "Southeast Missouri State": "Southeast Missouri",
-    "Southern Mississippi": "Southern Miss",
-    "St. Thomas (MN)": "St. Thomas",
-    "Tarleton State": "Tarleton St.",
-    "Tennessee State": "Tennessee St.",
-    "Tennessee-Martin": "Tennessee Martin",
-    "Texas A&M-Corpus Christi": "Texas A&M Corpus Chris",
-    "Texas State": "Texas St.",
-    "Texas-Rio Grande Valley": "UT Rio Grande Valley",
-    "Washington State": "Washington St.",
-    "Wright State": "Wright St.",
-    "Youngstown State": "Youngstown St.",
-}
-
-
-def clean_percentile_value(val):
-    """
-    Remove percentile prefix from values
-    CBB Analytics displays percentile rankings alongside actual values,
-    which get scraped as concatenated strings (e.g., "2347.9%" = percentile 23 + actual 47.9%)
-    """
-    if pd.isna(val) or val == '' or val == '-':
-        return val
-    
-    val_str = str(val).strip()
-    
-    if len(val_str) < 4:
-        return val
-    
-    # Check if value is already clean (no percentile prefix needed)
-    # Values already in typical ranges don't need cleaning
-    try:
-        val_float = float(val_str.replace('%', ''))
-        # If it's a percentage in 0-150% range, might already be clean
-        if val_str.endswith('%') and 0 <= val_float <= 150:
-            # But percentages like "2347.9%" clearly have prefixes
-            if val_float <= 100 and len(val_str) <= 7:  # e.g., "45.3%" or "99.9%"
-                return val  # Already clean
-        # If it's a non-percentage value in typical basketball ranges, might be clean
-        elif not val_str.endswith('%'):
-            # ORtg/DRtg range: 85-130
-            # PTS/G range: 50-100
-            # Per-game stats: 0-20
-            # If value is in these ranges AND has reasonable length AND no leading zeros, it might be clean
-            has_leading_zero = val_str[0] == '0' and len(val_str) > 3  # "093.6" or "0130.4"
-            if (not has_leading_zero and
-                (85 <= val_float <= 130 or 50 <= val_float <= 100 or 0 <= val_float <= 20) 
-                and len(val_str) <= 6):  # e.g., "88.1" or "93.9" (not "1199.7" or "093.6")
-                return val  # Already clean
-    except:
-        pass  # Continue with percentile removal logic
-    
-    # Pattern 1: "87+17.6" -> "17.6" (for Net Rtg with +)
-    match = re.match(r'^(\d{1,3})\+(.+)$', val_str)
-    if match and 0 <= int(match.group(1)) <= 100:
-        return match.group(2)
-    
-    # Pattern 2: "87-17.6" -> "-17.6" (for negative Net Rtg)
-    match = re.match(r'^(\d{1,3})(-\d+\.?\d*)$', val_str)
-    if match and 0 <= int(match.group(1)) <= 100:
-        return match.group(2)
-    
-    # Pattern 3: Percentage values like "2347.9%" or "645.3%" (percentile + percentage)
-    if val_str.endswith('%') and val_str[0].isdigit() and '.' in val_str:
-        candidates = []
-        
-        # Try 1-digit and 2-digit percentiles for percentage values
-        for percentile_len in [1, 2]:
-            if len(val_str) <= percentile_len + 1:
-                continue
-            
-            percentile_str = val_str[:percentile_len]
-            remaining = val_str[percentile_len:]
-            
-            try:
-                percentile = int(percentile_str)
-                if not (0 <= percentile <= 100):
-                    continue
-                
-                actual_val = float(remaining.replace('%', ''))
-                if 0 <= actual_val <= 150:
-                    candidates.append((percentile_len, remaining, actual_val))
-            except:
-                continue
-        
-        if candidates:
-            candidates_sorted = sorted(candidates, key=lambda x: (x[0], -x[2]))
-            
-            # Prefer values in typical percentage range (30-100%)
-            for percentile_len, remaining, actual_val in candidates_sorted:
-                if 30 <= actual_val <= 100:
-                    val_part = remaining.replace('%', '')
-                    if '.' in val_part:
-                        parts = val_part.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        val_part = '.'.join(parts)
-                    return val_part + '%'
-            
-            # If no candidate in typical range, try any value <= 100%
-            for percentile_len, remaining, actual_val in candidates_sorted:
-                if actual_val <= 100:
-                    val_part = remaining.replace('%', '')
-                    if '.' in val_part:
-                        parts = val_part.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        val_part = '.'.join(parts)
-                    return val_part + '%'
-            
-            # Take first candidate (shortest percentile)
-            percentile_len, remaining, actual_val = candidates_sorted[0]
-            val_part = remaining.replace('%', '')
-            if '.' in val_part:
-                parts = val_part.split('.')
-                parts[0] = parts[0].lstrip('0') or '0'
-                val_part = '.'.join(parts)
-            return val_part + '%'
-    
-    # Universal pattern for non-percentage numbers
-    if val_str[0].isdigit() and '.' in val_str and not val_str.endswith('%'):
-        # CHECK IF ALREADY CLEAN FIRST
-        try:
-            current_val = float(val_str)
-            # If value is already in expected ranges and short enough, it's probably clean
-            # BUT: Check for leading zeros (e.g., "0130.4") or values that are too long
-            # Clean values should be like "130.4" (5 chars), not "0130.4" (6 chars with leading 0)
-            has_leading_zero = val_str[0] == '0' and len(val_str) > 4  # "0130.4" has leading 0
-            if not has_leading_zero and current_val < 150 and len(val_str) <= 6:
-                # ORtg/DRtg range (85-135)
-                if 85 <= current_val <= 135:
-                    return val
-                # PTS/G, assists, rebounds, etc. range (0-85)
-                if 0 <= current_val < 85:
-                    return val
-        except:
-            pass
-        
-        candidates = []
-        
-        # Try all possible percentile lengths (1-3 digits)
-        for percentile_len in [1, 2, 3]:
-            if len(val_str) <= percentile_len:
-                continue
-            
-            percentile_str = val_str[:percentile_len]
-            remaining = val_str[percentile_len:]
-            
-            try:
-                percentile = int(percentile_str)
-                if not (0 <= percentile <= 100):
-                    continue
-                actual_val = float(remaining)
-                candidates.append((percentile_len, remaining, actual_val))
-            except:
-                continue
-        
-        if candidates:
-            candidates_sorted = sorted(candidates, key=lambda x: x[0])
-            
-            # First priority: ORtg/DRtg range (85-135) - extended to 135 to catch outliers
-            for percentile_len, actual_val_str, actual_val in candidates_sorted:
-                if 85 <= actual_val <= 135:
-                    if '.' in actual_val_str:
-                        parts = actual_val_str.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        return '.'.join(parts)
-                    return actual_val_str.lstrip('0') or '0'
-            
-            # Second priority: Medium/large ranges (20-85)
-            for percentile_len, actual_val_str, actual_val in candidates_sorted:
-                if 20 <= actual_val < 85:
-                    if '.' in actual_val_str:
-                        parts = actual_val_str.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        return '.'.join(parts)
-                    return actual_val_str.lstrip('0') or '0'
-            
-            # Third priority: Small per-game stats (0-20)
-            for percentile_len, actual_val_str, actual_val in candidates_sorted:
-                if 0 <= actual_val < 20:
-                    if '.' in actual_val_str:
-                        parts = actual_val_str.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        return '.'.join(parts)
-                    return actual_val_str.lstrip('0') or '0'
-            
-            # Fourth priority: Values over 130
-            for percentile_len, actual_val_str, actual_val in candidates_sorted:
-                if actual_val > 130:
-                    if '.' in actual_val_str:
-                        parts = actual_val_str.split('.')
-                        parts[0] = parts[0].lstrip('0') or '0'
-                        return '.'.join(parts)
-                    return actual_val_str.lstrip('0') or '0'
-            
-            # Fallback: Return first candidate
-            result = candidates_sorted[0][1]
-            if '.' in result:
-                parts = result.split('.')
-                parts[0] = parts[0].lstrip('0') or '0'
-                result = '.'.join(parts)
-            return result
-    
-    return val
-
-
-# KenPom team name mapping for Tableau joins
-KENPOM_TEAM_MAPPING = {
-    'A&M-Corpus Christi': 'Texas A&M Corpus Chris',
-    'Alcorn': 'Alcorn St.',
-    'App State': 'Appalachian St.',
-    'Ark.-Pine Bluff': 'Arkansas Pine Bluff',
-    'Army West Point': 'Army',
-    'Boston U.': 'Boston University',
-    'CSU Bakersfield': 'Cal St. Bakersfield',
-    'California Baptist': 'Cal Baptist',
-    'Central Ark.': 'Central Arkansas',
-    'Central Conn. St.': 'Central Connecticut',
-    'Central Mich.': 'Central Michigan',
-    'Charleston So.': 'Charleston Southern',
-    'Col. of Charleston': 'Charleston',
-    'Detroit': 'Detroit Mercy',
-    'ETSU': 'East Tennessee St.',
-    'Eastern Ill.': 'Eastern Illinois',
-    'Eastern Ky.': 'Eastern Kentucky',
-    'Eastern Mich.': 'Eastern Michigan',
-    'Eastern Wash.': 'Eastern Washington',
-    'FDU': 'Fairleigh Dickinson',
-    'FGCU': 'Florida Gulf Coast',
-    'Fla. Atlantic': 'Florida Atlantic',
-    'Ga. Southern': 'Georgia Southern',
-    'Gardner-Webb': 'Gardner Webb',
-    'Grambling': 'Grambling St.',
-    'LMU (CA)': 'Loyola Marymount',
-    'Lamar University': 'Lamar',
-    'Middle Tenn.': 'Middle Tennessee',
-    'Mississippi Val.': 'Mississippi Valley St.',
-    'N.C. A&T': 'North Carolina A&T',
-    'N.C. Central': 'North Carolina Central',
-    'NC State': 'N.C. State',
-    'NIU': 'Northern Illinois',
-    'North Ala.': 'North Alabama',
-    'Northern Ariz.': 'Northern Arizona',
-    'Northern Colo.': 'Northern Colorado',
-    'Northern Ky.': 'Northern Kentucky',
-    'Ole Miss': 'Mississippi',
-    'Queens (NC)': 'Queens',
-    'SFA': 'Stephen F. Austin',
-    "Saint Mary's (CA)": "Saint Mary's",
-    'Sam Houston': 'Sam Houston St.',
-    'Seattle U': 'Seattle',
-    'South Fla.': 'South Florida',
-    'Southeast Mo. St.': 'Southeast Missouri',
-    'Southeastern La.': 'Southeastern Louisiana',
-    'Southern California': 'USC',
-    'Southern Ill.': 'Southern Illinois',
-    'Southern Ind.': 'Southern Indiana',
-    'Southern Miss.': 'Southern Miss',
-    'Southern U.': 'Southern',
-    "St. John's (NY)": "St. John's",
-    'UAlbany': 'Albany',
-    'UConn': 'Connecticut',
-    'UIC': 'Illinois Chicago',
-    'UIW': 'Incarnate Word',
-    'ULM': 'Louisiana Monroe',
-    'UMES': 'Maryland Eastern Shore',
-    'UNCW': 'UNC Wilmington',
-    'UNI': 'Northern Iowa',
-    'UT Martin': 'Tennessee Martin',
-    'UTRGV': 'UT Rio Grande Valley',
-    'WI Green Bay': 'Green Bay',
-    'West Ga.': 'West Georgia',
-    'Western Caro.': 'Western Carolina',
-    'Western Ill.': 'Western Illinois',
-    'Western Ky.': 'Western Kentucky',
-    'Western Mich.': 'Western Michigan',
-}
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import browser_pool, percentile_clean, readiness, session_vault, table_extract, team_registry, tracing
+from shared.percentile_clean import clean_percentile_value
 
 # Category configurations with required columns
 CATEGORIES = {
@@ -410,11 +101,21 @@ CATEGORIES = {
 }
 
 
+# Pages scraping categories at once in parallel mode (1 = one page, in order)
+DEFAULT_CONCURRENCY = int(os.environ.get("CBB_PARALLEL", "1"))
+
+# Season scraped when none is given (CBB Analytics' ID for 2025-26)
+DEFAULT_SEASON_ID = os.environ.get("CBB_SEASON", "41097")
+
+VIEWPORT = {'width': 1920, 'height': 1080}
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
 class CBBAnalyticsScraper:
-    def __init__(self):
+    def __init__(self, season_id=None):
         self.base_url = "https://cbbanalytics.com"
-        self.season_id = "41097"  # 2025-26 season
-        self.stats_url = f"{self.base_url}/stats/{self.season_id}/division/d1/team-box"
+        self.season_id = str(season_id or DEFAULT_SEASON_ID)
+        self.stats_url = self.season_url(self.season_id)
         
         # Load credentials
         env_path = Path(__file__).parent / '.env'
@@ -438,6 +139,11 @@ class CBBAnalyticsScraper:
         if not self.email or not self.password:
             raise ValueError("Missing credentials in .env file")
     
+    def season_url(self, season_id) -> str:
+        """Team box score page of a season"""
+        return f"{self.base_url}/stats/{season_id}/division/d1/team-box"
+    
+    @tracing.traced("login")
     def login(self, page):
         """Login to CBB Analytics"""
         print("\nLogging in to CBB Analytics...")
@@ -445,8 +151,9 @@ class CBBAnalyticsScraper:
         try:
             # Go to homepage with more flexible wait
             print(f"  Loading {self.base_url}...")
-            page.goto(self.base_url, wait_until="domcontentloaded", timeout=90000)
-            time.sleep(3)
+            with tracing.span("page.goto", url=self.base_url, wait_until='domcontentloaded'):
+                page.goto(self.base_url, wait_until="domcontentloaded", timeout=90000)
+            tracing.sleep(3, reason="homepage settle")
             
             # Click login button in navbar
             login_buttons = [
@@ -462,7 +169,7 @@ class CBBAnalyticsScraper:
                     page.click(selector, timeout=5000)
                     print(f"  ✓ Clicked login button")
                     clicked_login = True
-                    time.sleep(2)
+                    tracing.sleep(2)
                     break
                 except:
                     continue
@@ -486,7 +193,7 @@ class CBBAnalyticsScraper:
                     page.fill(selector, self.email)
                     print(f"  ✓ Filled email")
                     email_filled = True
-                    time.sleep(1)
+                    tracing.sleep(1)
                     break
                 except:
                     continue
@@ -508,7 +215,7 @@ class CBBAnalyticsScraper:
                     page.click(selector, timeout=5000)
                     print(f"  ✓ Clicked Next button")
                     next_clicked = True
-                    time.sleep(2)
+                    tracing.sleep(2)
                     break
                 except:
                     continue
@@ -531,7 +238,7 @@ class CBBAnalyticsScraper:
                     page.fill(selector, self.password)
                     print(f"  ✓ Filled password")
                     password_filled = True
-                    time.sleep(1)
+                    tracing.sleep(1)
                     break
                 except:
                     continue
@@ -563,7 +270,7 @@ class CBBAnalyticsScraper:
                 return False
             
             # Wait for navigation
-            time.sleep(5)
+            tracing.sleep(5, reason="login redirect")
             
             # Check if login successful
             current_url = page.url.lower()
@@ -579,38 +286,30 @@ class CBBAnalyticsScraper:
             traceback.print_exc()
             return False
     
-    def clean_numeric_columns(self, df):
+    def is_logged_in(self, page) -> bool:
+        """
+        Cheap check for a stored session: the stats page opens without a
+        redirect to the login page and shows no login button.
+        """
+        with tracing.span("page.goto", url=self.stats_url, wait_until='domcontentloaded'):
+            page.goto(self.stats_url, wait_until='domcontentloaded', timeout=30000)
+        current_url = page.url.lower()
+        if "login" in current_url or "sign" in current_url:
+            return False
+        readiness.wait_for_rows(page, 'table tbody tr', timeout_ms=10000)
+        return page.locator('a:has-text("Login"), button:has-text("Login"), .login-link').count() == 0
+    
+    @staticmethod
+    def clean_numeric_columns(df):
         """Clean numeric columns by removing percentile values that are concatenated"""
-        import re
-        
         for col in df.columns:
             # Skip team-related columns
             if 'team' in col.lower() or col == 'team_kenpom':
                 continue
             
             # Check if column has values that look like they have percentiles concatenated
-            if df[col].dtype == 'object':
-                def extract_first_number(val):
-                    if pd.isna(val):
-                        return val
-                    val_str = str(val)
-                    # Match pattern like "126.2" or "-5.3" at the start, ignore what comes after
-                    # This handles cases like "95126.2" -> "126.2" or "126.2" -> "126.2"
-                    match = re.search(r'^(\d+)?(-?\d+\.?\d*)', val_str)
-                    if match:
-                        # If we have a digit followed by another number, take the second (e.g., "95126.2" -> "126.2")
-                        if match.group(1) and match.group(2):
-                            # Check if this looks like percentile + value (e.g., 95126.2)
-                            full_match = match.group(1) + match.group(2)
-                            # If the first group is 2 digits and looks like percentile (0-100)
-                            if len(match.group(1)) <= 2 and int(match.group(1)) <= 100:
-                                return match.group(2)
-                            return full_match
-                        # Otherwise just return the number
-                        return match.group(2) if match.group(2) else match.group(1)
-                    return val
-                
-                df[col] = df[col].apply(extract_first_number)
+            if pd.api.types.is_string_dtype(df[col]):
+                df[col] = percentile_clean.extract_first_numbers(df[col])
         
         return df
     
@@ -637,15 +336,10 @@ class CBBAnalyticsScraper:
             team_col = df.columns[0]
             print(f"    Using first column as team: '{team_col}'")
         
-        def normalize_name(name):
-            if pd.isna(name):
-                return name
-            name_str = str(name).strip()
-            return TEAM_NAME_MAPPING.get(name_str, name_str)
-        
-        df['team_kenpom'] = df[team_col].apply(normalize_name)
+        df['team_kenpom'] = team_registry.canonical_names(df[team_col])
         return df
     
+    @tracing.traced("scrape_category")
     def scrape_category(self, page, category_key, first_load=True):
         """
         Scrape a specific category from CBB Analytics.
@@ -660,6 +354,7 @@ class CBBAnalyticsScraper:
             DataFrame with scraped data or None if failed
         """
         category = CATEGORIES[category_key]
+        tracing.annotate(category=category_key)
         
         print(f"\nScraping {category['name']}...")
         
@@ -671,7 +366,8 @@ class CBBAnalyticsScraper:
             try:
                 # Click the React-Select dropdown to open it (force click to bypass overlay)
                 page.click('.cbb-select.cbb-table-types-select', force=True, timeout=5000)
-                time.sleep(1)
+                with tracing.span("wait_for_selector", selector='div[role="option"]'):
+                    page.wait_for_selector('div[role="option"]', timeout=5000)
                 
                 # DEBUG: Print all available dropdown options
                 if first_load:  # Only print on first load to avoid spam
@@ -692,6 +388,7 @@ class CBBAnalyticsScraper:
                 ]
                 
                 clicked_option = False
+                before = readiness.snapshot(page, 'table')
                 for selector in selectors_to_try:
                     try:
                         page.click(selector, timeout=5000)
@@ -704,7 +401,7 @@ class CBBAnalyticsScraper:
                 if not clicked_option:
                     print(f"  ⚠️  Could not find option: {category['selector_text']}")
                     return None
-                time.sleep(4)  # Wait for data to load
+                readiness.wait_for_change(page, 'table', before)  # Wait for data to load
                 
             except Exception as e:
                 print(f"  ⚠️  Could not switch to category: {str(e)}")
@@ -727,10 +424,11 @@ class CBBAnalyticsScraper:
                 for selector in page_size_selectors:
                     try:
                         if page.locator(selector).count() > 0:
+                            before = readiness.snapshot(page, 'table')
                             page.select_option(selector, value='500')
                             print(f"  ✓ Changed page size to 500")
                             page_size_changed = True
-                            time.sleep(4)  # Wait for table to reload with all teams
+                            readiness.wait_for_change(page, 'table', before)  # Wait for table to reload with all teams
                             break
                     except:
                         continue
@@ -739,33 +437,34 @@ class CBBAnalyticsScraper:
                     # Try clicking approach for React Select
                     try:
                         # Look for text "Show 25" or "25" near bottom of page
+                        before = readiness.snapshot(page, 'table')
                         page.click('text="Show 25"', timeout=3000)
-                        time.sleep(1)
                         page.click('text="500"', timeout=3000)
                         print(f"  ✓ Changed page size to 500")
-                        time.sleep(4)
+                        readiness.wait_for_change(page, 'table', before)
                     except:
                         print(f"  ⚠️  Could not change page size, using default (25)")
             except Exception as e:
                 print(f"  ⚠️  Page size change failed: {str(e)}")
             
-            # Scroll to trigger lazy loading
+            # Scroll to trigger lazy loading, then wait for the rows to settle
             page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(2)
+            readiness.wait_for_rows(page, 'table tbody tr', expected=readiness.FULL_TABLE_ROWS,
+                                    stable_ms=500, timeout_ms=10000)
             page.evaluate("window.scrollTo(0, 0)")
-            time.sleep(2)
             
-            # Get HTML and parse tables (should have all 365 teams if page size was set to 500)
+            # Pull the largest table (usually the data table) out of the page,
+            # with the same headers and text pd.read_html would give
+            # (should have all 365 teams if page size was set to 500)
             print(f"  Extracting table data...")
-            html = page.content()
-            tables = pd.read_html(html)
-            
-            if not tables:
+            table = table_extract.extract_table(page, 'table', largest=True, text='collapse')
+            if table is None or not table.rows:
                 print(f"  ⚠️  No tables found")
                 return None
             
-            # Get the largest table (usually the data table)
-            df = max(tables, key=len) if len(tables) > 1 else tables[0]
+            with tracing.span("parse") as s:
+                df = table.to_frame()
+                s.set(rows=len(df))
             
             # Flatten MultiIndex columns if present
             if isinstance(df.columns, pd.MultiIndex):
@@ -774,7 +473,8 @@ class CBBAnalyticsScraper:
             print(f"  ✓ Found table with {len(df)} rows and {len(df.columns)} columns")
             
             # Normalize team names
-            df = self.normalize_team_names_in_df(df)
+            with tracing.span("normalize", rows=len(df)):
+                df = self.normalize_team_names_in_df(df)
             
             return df
             
@@ -783,10 +483,13 @@ class CBBAnalyticsScraper:
             traceback.print_exc()
             return None
     
-    def scrape_all_categories(self):
+    @tracing.traced("scrape", source="cbb_analytics")
+    def scrape_all_categories(self, concurrency: int = 1):
         """
         Scrape all stat categories from CBB Analytics.
         All categories are on the same page - we switch between them.
+        With concurrency > 1 they are split over that many headless pages
+        instead (see scrape_categories_parallel).
         
         Returns:
             Dictionary mapping category keys to DataFrames
@@ -795,27 +498,33 @@ class CBBAnalyticsScraper:
         print("CBB Analytics Scraper - Division I Statistics")
         print("=" * 70)
         
+        if concurrency > 1:
+            return self.scrape_categories_parallel(concurrency)
+        
         all_data = {}
         
-        with sync_playwright() as p:
-            # Launch browser
-            browser = p.chromium.launch(headless=False)  # Visible for debugging
-            context = browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
+        # Context from the shared browser (visible for debugging); images,
+        # fonts and trackers blocked
+        with browser_pool.context(
+            site="cbb_analytics",
+            headless=False,
+            viewport=VIEWPORT,
+            user_agent=USER_AGENT
+        ) as context:
             page = context.new_page()
             
             try:
-                # Login first
-                if not self.login(page):
+                # Login first (or reuse the stored session if it's still valid)
+                if not session_vault.ensure_login(context, page, "cbb_analytics",
+                                                  login=self.login, probe=self.is_logged_in):
                     print("\n❌ Login failed - cannot proceed")
                     return all_data
                 
                 # Navigate to stats page
                 print(f"\nNavigating to stats page...")
-                page.goto(self.stats_url, wait_until="domcontentloaded", timeout=90000)
-                time.sleep(5)
+                with tracing.span("page.goto", url=self.stats_url, wait_until='domcontentloaded'):
+                    page.goto(self.stats_url, wait_until="domcontentloaded", timeout=90000)
+                readiness.wait_for_rows(page, 'table tbody tr', timeout_ms=15000)
                 
                 print(f"  ✓ Loaded page: {page.title()}")
                 
@@ -826,13 +535,11 @@ class CBBAnalyticsScraper:
                     if df is not None:
                         all_data[category_key] = df
                     first_load = False
-                    time.sleep(2)  # Pause between categories
+                    tracing.sleep(2, reason="between categories")  # Pause between categories
                 
             except Exception as e:
                 print(f"\n❌ Fatal error: {str(e)}")
                 traceback.print_exc()
-            finally:
-                browser.close()
         
         print("\n" + "=" * 70)
         print(f"Scraping complete! Collected {len(all_data)}/{len(CATEGORIES)} categories")
@@ -840,39 +547,246 @@ class CBBAnalyticsScraper:
         
         return all_data
     
-    def merge_and_export(self, all_data, output_file="cbb_analytics_tableau_cleaned.csv"):
-        """Merge all category DataFrames, clean data (remove percentile prefixes), and export to CSV"""
-        if not all_data:
-            print("\n⚠️  No data to export")
-            return
+    def scrape_categories_parallel(self, concurrency: int) -> dict:
+        """
+        Scrape the categories concurrently in up to `concurrency` headless
+        pages (see run_tasks).
         
-        print(f"\nMerging {len(all_data)} categories...")
+        Returns:
+            Dictionary mapping category keys to DataFrames, in CATEGORIES order
+        """
+        results = {}
+        
+        def keep(season_id, category_key, df):
+            results[category_key] = df
+        
+        self.run_tasks([(self.season_id, key) for key in CATEGORIES], concurrency, keep)
+        
+        all_data = {key: results[key] for key in CATEGORIES if key in results}
+        print("\n" + "=" * 70)
+        print(f"Scraping complete! Collected {len(all_data)}/{len(CATEGORIES)} categories")
+        print("=" * 70)
+        return all_data
+    
+    def run_tasks(self, tasks, concurrency: int, handle) -> int:
+        """
+        Scrape (season_id, category_key) tasks in up to `concurrency` headless
+        pages. One login (or stored session) is taken first; each worker
+        thread then opens its own page with that storage state and takes
+        tasks off a shared queue until none are left, loading a season's
+        stats page only when its next task is for a different season than
+        the last. Playwright's sync API is bound to its thread, so every
+        worker has its own browser from the pool.
+        
+        Args:
+            tasks: (season_id, category_key) pairs, scraped in this order
+            concurrency: Most pages open at once
+            handle: Called as handle(season_id, category_key, df) for every
+                scraped category, one call at a time
+        
+        Returns:
+            Number of tasks that produced data
+        """
+        workers = max(1, min(concurrency, len(tasks)))
+        seasons = len({season_id for season_id, _ in tasks})
+        print(f"Parallel mode: {len(tasks)} categories from {seasons} season(s) over {workers} pages")
+        
+        # Log in once and hand the session to every worker
+        with browser_pool.context(site="cbb_analytics", viewport=VIEWPORT, user_agent=USER_AGENT) as context:
+            page = context.new_page()
+            if not session_vault.ensure_login(context, page, "cbb_analytics",
+                                              login=self.login, probe=self.is_logged_in):
+                print("\n❌ Login failed - cannot proceed")
+                return 0
+            state = context.storage_state()
+        
+        pending = queue.Queue()
+        for task in tasks:
+            pending.put(task)
+        done = []
+        lock = threading.Lock()
+        
+        def worker(number: int):
+            # Fresh contexts: a persistent profile can only be open once
+            with tracing.span("worker", worker=number), browser_pool.session(), \
+                    browser_pool.context(site="cbb_analytics", persistent=False,
+                                         viewport=VIEWPORT, user_agent=USER_AGENT) as context:
+                page = context.new_page()
+                session_vault.restore(context, page, state)
+                loaded = None
+                
+                while True:
+                    try:
+                        season_id, category_key = pending.get_nowait()
+                    except queue.Empty:
+                        break
+                    if season_id != loaded:
+                        url = self.season_url(season_id)
+                        with tracing.span("page.goto", url=url, wait_until='domcontentloaded'):
+                            page.goto(url, wait_until="domcontentloaded", timeout=90000)
+                        readiness.wait_for_rows(page, 'table tbody tr', timeout_ms=15000)
+                        loaded = season_id
+                    tracing.annotate(season=season_id)
+                    df = self.scrape_category(page, category_key, first_load=False)
+                    if df is not None:
+                        with lock:
+                            handle(season_id, category_key, df)
+                            done.append((season_id, category_key))
+                    if not pending.empty():
+                        tracing.sleep(2, reason="between categories")  # Pause between categories
+        
+        # Each thread runs in a copy of this context so its spans nest under "scrape"
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, worker, n) for n in range(workers)]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"\n❌ Worker failed: {str(e)}")
+                    traceback.print_exc()
         
-        # Start with the first DataFrame
-        merged_df = None
+        return len(done)
+    
+    @tracing.traced("scrape_seasons", source="cbb_analytics")
+    def scrape_seasons(self, season_ids, archive, concurrency: int = 1, overwrite: bool = False) -> int:
+        """
+        Scrape every category of several seasons into a SeasonArchive, one
+        partition per season/category, written as soon as the category is
+        scraped. Partitions already in the archive are the checkpoints: they
+        are skipped (unless `overwrite`), so a rerun only fetches what is
+        missing. All seasons share one login and `concurrency` pages.
         
+        Returns:
+            Number of partitions written
+        """
+        season_ids = [str(season_id) for season_id in season_ids]
+        print("=" * 70)
+        print(f"CBB Analytics Scraper - {len(season_ids)} season(s) into {archive.root}")
+        print("=" * 70)
+        
+        if overwrite:
+            tasks = [(season_id, key) for season_id in season_ids for key in CATEGORIES]
+        else:
+            tasks = archive.missing(season_ids, CATEGORIES)
+        skipped = len(season_ids) * len(CATEGORIES) - len(tasks)
+        if skipped:
+            print(f"  Skipping {skipped} season/categories already archived")
+        if not tasks:
+            print("  ✓ Every season is already archived")
+            return 0
+        
+        def store(season_id, category_key, df):
+            df = df.copy()
+            percentile_clean.clean_columns(df, self.percentile_columns(df))
+            path = archive.write_partition(season_id, category_key, df)
+            print(f"  ✓ Archived {path}")
+        
+        written = self.run_tasks(tasks, concurrency, store)
+        print("\n" + "=" * 70)
+        print(f"Archived {written}/{len(tasks)} season/categories"
+              + (f" ({len(tasks) - written} left for the next run)" if written < len(tasks) else ""))
+        print("=" * 70)
+        return written
+    
+    @staticmethod
+    def percentile_columns(df, skip=('team_kenpom', 'Record', 'Conf_Record', 'GP')):
+        """
+        Columns whose values look numeric (the first non-null one has a
+        digit), i.e. the ones that may carry a percentile prefix.
+        """
+        numeric_cols = []
+        for col in df.columns:
+            if col not in skip:
+                # Check if column has numeric-like values
+                sample = df[col].dropna().head(5)
+                if len(sample) > 0:
+                    try:
+                        # Try to convert to string and check if it looks numeric
+                        str_val = str(sample.iloc[0])
+                        if any(c.isdigit() for c in str_val):
+                            numeric_cols.append(col)
+                    except:
+                        pass
+        return numeric_cols
+    
+    @staticmethod
+    def merge_categories(all_data, key='team_kenpom'):
+        """
+        Join the category DataFrames side by side on the team key, each stat
+        column prefixed with its category key ("<category>_<column>").
+        
+        Every frame is indexed by the key once and all of them are aligned in
+        a single outer concat, rather than merged one at a time into a growing
+        frame. Rows without a key are dropped, and where a key repeats within
+        a category its first row is kept. Teams come out sorted by key.
+        
+        Returns:
+            The merged DataFrame, its key column placed as in the first
+            category, or None if no category has the key
+        """
+        frames = []
+        position = None
         for category_key, df in all_data.items():
             category = CATEGORIES[category_key]
             print(f"  Processing {category['name']}: {len(df)} teams, {len(df.columns)} columns")
             
-            if 'team_kenpom' not in df.columns:
-                print(f"    ⚠️  Missing team_kenpom column, skipping")
+            if key not in df.columns:
+                print(f"    ⚠️  Missing {key} column, skipping")
                 continue
             
-            # Keep ALL columns from the DataFrame
-            df_filtered = df.copy()
-            
-            # Rename columns to include category prefix (except team_kenpom)
-            rename_dict = {col: f"{category_key}_{col}" for col in df_filtered.columns if col != 'team_kenpom'}
-            df_filtered = df_filtered.rename(columns=rename_dict)
-            
-            print(f"    ✓ Keeping {len(df_filtered.columns)-1} stat columns")
-            
-            # Merge
-            if merged_df is None:
-                merged_df = df_filtered
-            else:
-                merged_df = merged_df.merge(df_filtered, on='team_kenpom', how='outer')
+            if position is None:
+                position = df.columns.get_loc(key)
+            keyed = df.set_index(key)
+            keyed = keyed[keyed.index.notna()]
+            repeated = keyed.index.duplicated()
+            if repeated.any():
+                print(f"    ⚠️  {repeated.sum()} repeated teams, keeping the first row of each")
+                keyed = keyed[~repeated]
+            frames.append(keyed.add_prefix(f"{category_key}_"))
+            print(f"    ✓ Keeping {len(keyed.columns)} stat columns")
+        
+        if not frames:
+            return None
+        merged_df = pd.concat(frames, axis=1, join='outer', sort=True)
+        merged_df.insert(position, key, merged_df.index)
+        return merged_df.reset_index(drop=True)
+    
+    @staticmethod
+    def stat_column_names(columns, keep=('team_kenpom', 'kenpom_team_name', 'team_id', 'scrape_date',
+                                         'scrape_timestamp', 'season_id')):
+        """
+        Map each prefixed column to its stat name, the part after the last
+        underscore (e.g. "traditional_boxscore_Traditional Box Score_PTS/G"
+        -> "PTS/G"). Repeats become "PTS/G_2", "PTS/G_3", ... in column order.
+        
+        Returns:
+            Dictionary for DataFrame.rename (columns in `keep` left out)
+        """
+        rename_dict = {}
+        seen = {}
+        for col in columns:
+            if col in keep:
+                continue
+            clean_name = col.split('_')[-1]
+            # Stat names have no underscore, so "<name>_<n>" never meets one
+            seen[clean_name] = seen.get(clean_name, 0) + 1
+            if seen[clean_name] > 1:
+                clean_name = f"{clean_name}_{seen[clean_name]}"
+            rename_dict[col] = clean_name
+        return rename_dict
+    
+    @tracing.traced("merge_and_export", source="cbb_analytics")
+    def merge_and_export(self, all_data, output_file="cbb_analytics_tableau_cleaned.csv"):
+        """Merge all category DataFrames, clean data (remove percentile prefixes), and export to CSV"""
+        if not all_data:
+            print("\n⚠️  No data to export")
+            return
+        
+        print(f"\nMerging {len(all_data)} categories...")
+        
+        with tracing.span("merge", categories=len(all_data)) as s:
+            merged_df = self.merge_categories(all_data)
+            s.set(rows=0 if merged_df is None else len(merged_df))
         
         if merged_df is None:
             print("  ❌ No data to merge")
@@ -883,25 +797,13 @@ class CBBAnalyticsScraper:
         print("="*70)
         
         # Apply cleaning to all numeric columns
-        numeric_cols = []
-        for col in merged_df.columns:
-            if col not in ['team_kenpom', 'Record', 'Conf_Record', 'GP']:
-                # Check if column has numeric-like values
-                sample = merged_df[col].dropna().head(5)
-                if len(sample) > 0:
-                    try:
-                        # Try to convert to string and check if it looks numeric
-                        str_val = str(sample.iloc[0])
-                        if any(c.isdigit() for c in str_val):
-                            numeric_cols.append(col)
-                    except:
-                        pass
+        numeric_cols = self.percentile_columns(merged_df)
         
         print(f"  Cleaning {len(numeric_cols)} columns...")
         
-        # Apply cleaning function to numeric columns
-        for col in numeric_cols:
-            merged_df[col] = merged_df[col].apply(clean_percentile_value)
+        # Apply cleaning function to numeric columns (all of them in one pass)
+        with tracing.span("normalize.clean_percentiles", rows=len(merged_df), columns=len(numeric_cols)):
+            percentile_clean.clean_columns(merged_df, numeric_cols)
         
         print(f"  ✓ Cleaned all numeric values")
         
@@ -911,23 +813,7 @@ class CBBAnalyticsScraper:
         
         # Remove category prefixes from column names
         # e.g., "traditional_boxscore_PTS/G" -> "PTS/G"
-        rename_dict = {}
-        for col in merged_df.columns:
-            if col not in ['team_kenpom', 'kenpom_team_name', 'scrape_date', 'scrape_timestamp', 'season_id']:
-                # Split by underscore and take the last part as the clean name
-                # Handle cases like "traditional_boxscore_Traditional Box Score_PTS/G" -> "PTS/G"
-                parts = col.split('_')
-                clean_name = parts[-1]  # Get the last part (the actual stat name)
-                
-                # If we already have this column name, append a number to avoid duplicates
-                if clean_name in rename_dict.values():
-                    counter = 2
-                    while f"{clean_name}_{counter}" in rename_dict.values():
-                        counter += 1
-                    clean_name = f"{clean_name}_{counter}"
-                
-                rename_dict[col] = clean_name
-        
+        rename_dict = self.stat_column_names(merged_df.columns)
         merged_df = merged_df.rename(columns=rename_dict)
         print(f"  ✓ Cleaned {len(rename_dict)} column names")
         
@@ -940,13 +826,13 @@ class CBBAnalyticsScraper:
         else:
             print(f"  ✓ No null columns to remove")
         
-        # Add KenPom team name mapping for Tableau joins
-        print("\nAdding KenPom team name mapping...")
-        merged_df['kenpom_team_name'] = merged_df['team_kenpom'].apply(
-            lambda x: KENPOM_TEAM_MAPPING.get(x, x)
-        )
-        mapped_count = (merged_df['kenpom_team_name'] != merged_df['team_kenpom']).sum()
-        print(f"  ✓ Mapped {mapped_count} team names for KenPom compatibility")
+        # Add KenPom team name and registry ID for Tableau joins
+        print("\nAdding KenPom team names and IDs...")
+        merged_df['kenpom_team_name'] = team_registry.canonical_names(merged_df['team_kenpom'])
+        merged_df['team_id'] = team_registry.map_series(merged_df['team_kenpom'])
+        unknown = merged_df['team_id'].isna().sum()
+        print(f"  ✓ Identified {len(merged_df) - unknown} teams"
+              + (f" ({unknown} not in the team registry)" if unknown else ""))
         
         # Add metadata
         merged_df['scrape_date'] = datetime.now().strftime('%Y-%m-%d')
@@ -957,7 +843,9 @@ class CBBAnalyticsScraper:
         merged_df = merged_df.sort_values('team_kenpom')
         
         # Export - default to cleaned file
-        merged_df.to_csv(output_file, index=False)
+        with tracing.span("export.csv", path=output_file, rows=len(merged_df)) as s:
+            merged_df.to_csv(output_file, index=False)
+            s.set(bytes=tracing.file_size(output_file))
         
         print("\n" + "="*70)
         print(f"✓ Exported cleaned data: {output_file}")
@@ -965,17 +853,58 @@ class CBBAnalyticsScraper:
         print(f"  Teams: {len(merged_df)}")
         print(f"  Columns: {len(merged_df.columns)}")
         print(f"  All percentile prefixes removed")
-        print(f"  KenPom team names added")
+        print(f"  KenPom team names and IDs added")
         print(f"  Ready for Tableau!")
         print("="*70)
 
 
+def parse_seasons(text: str) -> list:
+    """Season IDs from "41097", "41097,40000" or a range "40000-40002" (inclusive)"""
+    season_ids = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(bound) for bound in part.split('-', 1))
+            step = 1 if end >= start else -1
+            season_ids.extend(str(season_id) for season_id in range(start, end + step, step))
+        else:
+            season_ids.append(str(int(part)))
+    # Keep the first of any repeats, in the order given
+    return list(dict.fromkeys(season_ids))
+
+
+@tracing.traced("run", source="cbb_analytics")
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Scrape CBB Analytics team statistics")
+    parser.add_argument("--parallel", type=int, nargs="?", const=4, default=DEFAULT_CONCURRENCY, metavar="N",
+                        help="Scrape categories in N headless pages at once (default 4 when given; "
+                             "CBB_PARALLEL; 1 = one visible page)")
+    parser.add_argument("--seasons", metavar="IDS",
+                        help="Season IDs to archive instead of exporting the CSV, "
+                             "e.g. 41097,40000-40002 (skips those already archived)")
+    parser.add_argument("--archive", metavar="DIR",
+                        help="Archive directory for --seasons (default CBB_ARCHIVE_DIR or season_archive/)")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Scrape --seasons again even where already archived")
+    args = parser.parse_args()
+    
     scraper = CBBAnalyticsScraper()
     
+    if args.seasons:
+        from season_archive import SeasonArchive, DEFAULT_ARCHIVE_DIR
+        archive = SeasonArchive(args.archive or DEFAULT_ARCHIVE_DIR)
+        try:
+            season_ids = parse_seasons(args.seasons)
+        except ValueError:
+            parser.error(f"--seasons: expected IDs or ranges like 41097,40000-40002, got {args.seasons!r}")
+        scraper.scrape_seasons(season_ids, archive, concurrency=args.parallel, overwrite=args.overwrite)
+        return
+    
     # Scrape all categories
-    all_data = scraper.scrape_all_categories()
+    all_data = scraper.scrape_all_categories(concurrency=args.parallel)
     
     # Merge and export
     if all_data:
@@ -0,0 +1,179 @@
+"""
+Columnar archive of CBB Analytics seasons.
+Each scraped category of each season is written as its own compressed
+Parquet file under season=<season_id>/category=<category_key>/, indexed by
+(season_id, team_kenpom). A partition that exists is complete (files are
+renamed into place), so it doubles as the checkpoint for multi-season runs:
+a rerun only scrapes the season/category pairs that are missing.
+"""
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import tracing
+
+
+DEFAULT_ARCHIVE_DIR = os.environ.get(
+    "CBB_ARCHIVE_DIR", str(Path(__file__).resolve().parent / "season_archive")
+)
+
+INDEX_COLUMNS = ['season_id', 'team_kenpom']
+
+# A stat column is stored as numbers when every value parses once a
+# trailing "%" is dropped; records ("12-3") and names stay strings
+_NUMERIC = re.compile(r'^-?\d+(\.\d+)?%?$')
+
+# Cells the site shows for "no value"; they don't make a column text
+_PLACEHOLDERS = ['-', '']
+
+
+def to_columns(df: pd.DataFrame, season_id: str) -> pd.DataFrame:
+    """
+    A cleaned category frame as stored: indexed by (season_id, team_kenpom),
+    sorted by team, numeric stat columns as float64 (a trailing "%" dropped,
+    "-" and empty cells as NaN).
+    """
+    df = df[df['team_kenpom'].notna()].drop_duplicates('team_kenpom')
+    df = df.assign(season_id=str(season_id)).set_index(INDEX_COLUMNS).sort_index()
+    for col in df.columns:
+        text = df[col].astype('string').str.strip()
+        text = text.mask(text.isin(_PLACEHOLDERS))
+        if text.dropna().str.match(_NUMERIC).all():
+            df[col] = pd.to_numeric(text.str.rstrip('%').astype(object), errors='coerce').astype('float64')
+        else:
+            df[col] = df[col].astype('string')
+    return df
+
+
+def _unify(tables: List[pa.Table]) -> List[pa.Table]:
+    """
+    Cast each season's table to one schema: a column stored with different
+    types in different seasons becomes float64 if all of them are numeric,
+    otherwise text.
+    """
+    types = {}
+    for table in tables:
+        for field in table.schema:
+            types.setdefault(field.name, set()).add(field.type)
+    target = {}
+    for name, found in types.items():
+        if len(found) < 2:
+            continue
+        if all(pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_null(t) for t in found):
+            target[name] = pa.float64()
+        else:
+            target[name] = pa.large_string()
+    if not target:
+        return tables
+    return [
+        table.cast(pa.schema([
+            field.with_type(target.get(field.name, field.type)) for field in table.schema
+        ], metadata=table.schema.metadata))
+        for table in tables
+    ]
+
+
+class SeasonArchive:
+    """Parquet archive of scraped categories, partitioned by season and category."""
+    
+    def __init__(self, root: str = DEFAULT_ARCHIVE_DIR, compression: str = 'zstd'):
+        """
+        Args:
+            root: Directory holding the season=/category= partitions
+            compression: Parquet codec for new partition files
+        """
+        self.root = Path(root)
+        self.compression = compression
+    
+    def partition_path(self, season_id: str, category_key: str) -> Path:
+        """Directory holding one season's category."""
+        return self.root / f"season={season_id}" / f"category={category_key}"
+    
+    def has_partition(self, season_id: str, category_key: str) -> bool:
+        """Check whether a season's category has already been archived."""
+        return (self.partition_path(season_id, category_key) / "part.parquet").exists()
+    
+    def completed(self) -> Set[Tuple[str, str]]:
+        """Every (season_id, category_key) present in the archive."""
+        return {
+            (path.parent.parent.name.split('=', 1)[1], path.parent.name.split('=', 1)[1])
+            for path in self.root.glob("season=*/category=*/part.parquet")
+        }
+    
+    def missing(self, season_ids: Iterable[str], category_keys: Iterable[str]) -> List[Tuple[str, str]]:
+        """The (season_id, category_key) pairs still to scrape, in season order."""
+        done = self.completed()
+        category_keys = list(category_keys)
+        return [(str(season), key) for season in season_ids for key in category_keys
+                if (str(season), key) not in done]
+    
+    def write_partition(self, season_id: str, category_key: str, df: pd.DataFrame) -> Path:
+        """
+        Write one season's category as a Parquet partition, replacing any
+        existing file.
+        
+        The file is written next to its final name and renamed into place so
+        a partition is never half-written, even if the run is interrupted.
+        """
+        frame = to_columns(df, season_id)
+        with tracing.span("archive.write", season=season_id, category=category_key, rows=len(frame)):
+            table = pa.Table.from_pandas(frame, preserve_index=True)
+            partition = self.partition_path(season_id, category_key)
+            partition.mkdir(parents=True, exist_ok=True)
+            final_path = partition / "part.parquet"
+            # Dot-prefixed so the glob in completed() ignores it mid-write
+            tmp_path = partition / ".part.parquet.tmp"
+            pq.write_table(table, tmp_path, compression=self.compression)
+            os.replace(tmp_path, final_path)
+        return final_path
+    
+    def read(self, category_key: str, seasons: Optional[Iterable[str]] = None,
+             columns: Optional[List[str]] = None, teams: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        One category across seasons, indexed by (season_id, team_kenpom).
+        
+        Only the requested seasons' files are opened and only `columns` are
+        read from them. Columns a season doesn't have come back empty; a
+        column stored as numbers in one season and text in another comes
+        back as text.
+        
+        Args:
+            category_key: Category to read
+            seasons: Season IDs to include (default: all archived)
+            columns: Stat columns to return (default: all)
+            teams: Team names (team_kenpom) to include
+        """
+        wanted = None if seasons is None else {str(s) for s in seasons}
+        tables = []
+        for path in sorted(self.root.glob(f"season=*/category={category_key}/part.parquet")):
+            if wanted is not None and path.parent.parent.name.split('=', 1)[1] not in wanted:
+                continue
+            read_columns = None
+            if columns is not None:
+                present = set(pq.read_schema(path).names)
+                read_columns = INDEX_COLUMNS + [c for c in columns if c in present]
+            filters = [('team_kenpom', 'in', list(teams))] if teams is not None else None
+            tables.append(pq.read_table(path, columns=read_columns, filters=filters))
+        if not tables:
+            return pd.DataFrame(columns=INDEX_COLUMNS).set_index(INDEX_COLUMNS)
+        
+        df = pa.concat_tables(_unify(tables), promote_options='permissive').to_pandas()
+        if df.index.names != INDEX_COLUMNS:
+            df = df.set_index(INDEX_COLUMNS)
+        return df if columns is None else df.reindex(columns=columns)
+
+
+if __name__ == "__main__":
+    archive = SeasonArchive()
+    done = sorted(archive.completed())
+    print(f"{len(done)} season/category partition(s) in {archive.root}")
+    for season in sorted({season for season, _ in done}):
+        keys = [key for s, key in done if s == season]
+        print(f"  season {season}: {len(keys)} categories ({', '.join(keys)})")
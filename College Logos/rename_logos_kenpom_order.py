@@ -5,10 +5,14 @@ This ensures Tableau's shape palette matches your data exactly.
 """
 import pandas as pd
 import shutil
+import sys
 from pathlib import Path
 import re
 from team_name_mapping import KENPOM_TO_ESPN
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import team_matcher, team_registry
+
 # Read the KenPom team names in the EXACT order from the CSV
 sheet_path = r"c:\Users\spenc\Downloads\Sheet 16_Summary.csv"
 df = pd.read_csv(sheet_path)
@@ -99,6 +103,22 @@ for logo_file in existing_logos:
     clean_name = sanitize_for_matching(logo_file.stem)
     logo_lookup[clean_name] = logo_file
 
+# Trigram index over the same names, for teams no exact key finds
+logo_index = team_matcher.NgramIndex(logo_lookup)
+
+def fuzzy_logo(name):
+    """Closest logo to a team name, if it is a confident match (see shared/team_matcher.py)."""
+    folded = team_matcher.fold(name)
+    hits = [hit for hit in logo_index.search(name, limit=5)
+            if team_matcher.covers(folded, team_matcher.fold(hit[1]))]
+    if not hits:
+        return None, 0.0
+    score, _, logo = hits[0]
+    runner_up = hits[1][0] if len(hits) > 1 else 0.0
+    if score >= team_matcher.MIN_SCORE and score - runner_up >= team_matcher.MIN_MARGIN:
+        return logo, score
+    return None, score
+
 print(f"\nSample sanitized logo names:")
 for i, (key, val) in enumerate(list(logo_lookup.items())[:10]):
     print(f"  {key:30} <- {val.name}")
@@ -111,10 +131,11 @@ for idx, team_name in enumerate(kenpom_teams, 1):
     if not team_name or team_name == "Team":
         continue
     
-    # Try the manual mapping first
+    # Try the manual mapping first (any spelling the team registry knows)
     found = False
-    if team_name in KENPOM_TO_ESPN:
-        espn_name = KENPOM_TO_ESPN[team_name]
+    kenpom_name = team_registry.canonical_name(team_name)
+    if kenpom_name in KENPOM_TO_ESPN:
+        espn_name = KENPOM_TO_ESPN[kenpom_name]
         clean_espn = sanitize_for_matching(espn_name)
         
         if clean_espn in logo_lookup:
@@ -147,7 +168,23 @@ for idx, team_name in enumerate(kenpom_teams, 1):
             matched += 1
             found = True
             print(f"[OK] {idx:03d}. {team_name} -> {new_filename} (direct match)")
+    
+    if not found:
+        # Try the closest logo name
+        source_logo, score = fuzzy_logo(team_name)
+        if source_logo is not None:
+            ext = source_logo.suffix
+            
+            safe_name = team_name.replace('/', '-').replace('.', '').replace('&', 'and')
+            new_filename = f"{idx:03d}_{safe_name}{ext}"
+            dest_path = output_dir / new_filename
+            
+            shutil.copy2(source_logo, dest_path)
+            matched += 1
+            found = True
+            print(f"[OK] {idx:03d}. {team_name} -> {new_filename} (fuzzy match {source_logo.name}, {score:.2f})")
         else:
+            clean_kenpom = sanitize_for_matching(team_name)
             missing.append((team_name, f"Tried: '{clean_kenpom}'"))
             print(f"[MISS] {idx:03d}. {team_name} - NOT FOUND (tried '{clean_kenpom}')")
 
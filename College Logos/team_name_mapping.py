@@ -1,5 +1,6 @@
 """
 Manual mapping of KenPom team names to ESPN logo filenames.
+Keys are the canonical names of shared/team_registry.py (TEAMS).
 This handles all the variations between the two sources.
 """
 
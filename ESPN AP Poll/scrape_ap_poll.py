@@ -2,30 +2,106 @@
 Scraper for ESPN AP Poll Week 6 - Men's College Basketball
 Extracts rankings and normalizes team names to match KenPom format.
 """
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+import sys
 import pandas as pd
 from datetime import datetime
+from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import browser_pool, readiness, table_extract, team_registry, tracing
 
-# Team name mapping from ESPN to KenPom format
-ESPN_TO_KENPOM = {
-    'UConn': 'Connecticut',
-    'Michigan State': 'Michigan St.',
-    'North Carolina': 'North Carolina',
-    'Texas Tech': 'Texas Tech',
-    'St. John\'s': 'St. John\'s',
-    'Saint Mary\'s': 'Saint Mary\'s',
-    # Most teams match already
-}
+# The AP Poll is the first table on the page; team names are the last link
+# in the team cell
+AP_TABLE_SPEC = {'selector': 'table', 'rows': 'tr', 'cells': 'td, th', 'link_columns': (1,)}
 
 
 def normalize_team_name(espn_name: str) -> str:
     """Normalize ESPN team name to KenPom format."""
-    if espn_name in ESPN_TO_KENPOM:
-        return ESPN_TO_KENPOM[espn_name]
-    return espn_name
+    return team_registry.canonical_name(espn_name)
 
 
+def parse_ap_poll_html(html_content: str, verbose: bool = True):
+    """
+    Parse the AP Poll (first table) out of a rendered ESPN rankings page.
+    Returns None if the page has no tables. Needs no browser, so saved
+    pages can be parsed or benchmarked offline.
+    """
+    table = table_extract.from_html(html_content, **AP_TABLE_SPEC)
+    if table is None:
+        print("ERROR: No tables found on page")
+        return None
+    return parse_ap_poll_table(table, verbose)
+
+
+def parse_ap_poll_table(table: table_extract.Table, verbose: bool = True):
+    """Parse the extracted AP Poll table (see AP_TABLE_SPEC)."""
+    ap_poll_data = []
+    rows = table.rows
+    
+    if verbose:
+        print(f"Parsing AP Poll - found {len(rows)} rows\n")
+    
+    for cells, (team_links,) in zip(rows, table.row_links()):
+        if len(cells) < 4:
+            continue
+        
+        # Extract rank (first cell)
+        rank_text = cells[0]
+        if not rank_text.isdigit():
+            continue
+        
+        rank = int(rank_text)
+        
+        # Extract team name - ESPN has multiple links, need the last one with actual team name
+        if len(team_links) >= 2:
+            # The last link usually has the full team name
+            team_name = team_links[-1]
+        elif team_links:
+            team_name = team_links[0]
+        else:
+            # Fallback: parse from text
+            team_cell = cells[1]
+            # Team name appears like "ARIZArizona(33)"
+            # Find the parentheses and work backwards
+            if '(' in team_cell:
+                before_paren = team_cell.split('(')[0].strip()
+                # Remove abbreviation at start (usually 3-4 chars)
+                import re
+                # Match pattern like "ARIZArizona" - remove first occurrence
+                match = re.search(r'[A-Z]{3,4}([A-Z][a-z]+.*)', before_paren)
+                if match:
+                    team_name = match.group(1)
+                else:
+                    team_name = before_paren
+            else:
+                team_name = team_cell
+        
+        # Extract record (third cell)
+        record = cells[2]
+        
+        # Extract points (fourth cell)
+        points = cells[3]
+        
+        # Extract previous rank (fifth cell)
+        prev_rank = cells[4] if len(cells) > 4 else 'NR'
+        
+        ap_poll_data.append({
+            'rank': rank,
+            'team_espn': team_name,
+            'team_kenpom': normalize_team_name(team_name),
+            'record': record,
+            'points': points,
+            'previous_rank': prev_rank,
+            'poll': 'AP',
+            'week': 6,
+            'date': '2025-12-08'
+        })
+    
+    return ap_poll_data
+
+
+@tracing.traced("scrape", source="espn")
 def scrape_ap_poll():
     """Scrape AP Poll Week 6 from ESPN."""
     url = "https://www.espn.com/mens-college-basketball/rankings"
@@ -34,104 +110,31 @@ def scrape_ap_poll():
     print(f"URL: {url}\n")
     
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
+        # Fresh context from the shared browser, ads and trackers blocked
+        with browser_pool.context(site="espn") as context:
+            page = context.new_page()
             
             # Navigate to ESPN rankings
             print("Loading ESPN rankings page...")
-            page.goto(url, wait_until='domcontentloaded', timeout=90000)
+            with tracing.span("page.goto", url=url, wait_until='domcontentloaded'):
+                page.goto(url, wait_until='domcontentloaded', timeout=90000)
             
             # Wait for the rankings table to load
             print("Waiting for AP Poll table...")
-            import time
-            time.sleep(3)
-            page.wait_for_selector('table', timeout=60000)
+            with tracing.span("wait_for_selector", selector='table'):
+                page.wait_for_selector('table', timeout=60000)
+            readiness.wait_for_rows(page, 'table tbody tr', expected=25, timeout_ms=10000)
             
-            # Get page content
-            html_content = page.content()
-            
-            # Parse with BeautifulSoup
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Find all tables (AP Poll should be first)
-            tables = soup.find_all('table')
-            
-            if not tables:
+            # Pull just the AP Poll table's cell text out of the page
+            table = table_extract.extract_table(page, **AP_TABLE_SPEC)
+            if table is None:
                 print("ERROR: No tables found on page")
-                browser.close()
                 return None
             
-            print(f"Found {len(tables)} tables on page")
-            
-            # Parse AP Poll table (first table)
-            ap_poll_data = []
-            ap_table = tables[0]
-            rows = ap_table.find_all('tr')
-            
-            print(f"Parsing AP Poll - found {len(rows)} rows\n")
-            
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
-                
-                if len(cells) < 4:
-                    continue
-                
-                # Extract rank (first cell)
-                rank_text = cells[0].get_text(strip=True)
-                if not rank_text.isdigit():
-                    continue
-                
-                rank = int(rank_text)
-                
-                # Extract team name - ESPN has multiple links, need the last one with actual team name
-                team_links = cells[1].find_all('a')
-                if len(team_links) >= 2:
-                    # The last link usually has the full team name
-                    team_name = team_links[-1].get_text(strip=True)
-                elif team_links:
-                    team_name = team_links[0].get_text(strip=True)
-                else:
-                    # Fallback: parse from text
-                    team_cell = cells[1].get_text(strip=True)
-                    # Team name appears like "ARIZArizona(33)"
-                    # Find the parentheses and work backwards
-                    if '(' in team_cell:
-                        before_paren = team_cell.split('(')[0].strip()
-                        # Remove abbreviation at start (usually 3-4 chars)
-                        import re
-                        # Match pattern like "ARIZArizona" - remove first occurrence
-                        match = re.search(r'[A-Z]{3,4}([A-Z][a-z]+.*)', before_paren)
-                        if match:
-                            team_name = match.group(1)
-                        else:
-                            team_name = before_paren
-                    else:
-                        team_name = team_cell
-                
-                # Extract record (third cell)
-                record = cells[2].get_text(strip=True)
-                
-                # Extract points (fourth cell)
-                points = cells[3].get_text(strip=True)
-                
-                # Extract previous rank (fifth cell)
-                prev_rank = cells[4].get_text(strip=True) if len(cells) > 4 else 'NR'
-                
-                ap_poll_data.append({
-                    'rank': rank,
-                    'team_espn': team_name,
-                    'team_kenpom': normalize_team_name(team_name),
-                    'record': record,
-                    'points': points,
-                    'previous_rank': prev_rank,
-                    'poll': 'AP',
-                    'week': 6,
-                    'date': '2025-12-08'
-                })
-            
-            browser.close()
+            # Parse the AP Poll table
+            with tracing.span("parse") as s:
+                ap_poll_data = parse_ap_poll_table(table)
+                s.set(rows=len(ap_poll_data))
             
             print(f"Successfully scraped {len(ap_poll_data)} teams from AP Poll")
             return ap_poll_data
@@ -153,13 +156,16 @@ def export_to_csv(data, filename='ap_poll_week6.csv'):
         return False
     
     df = pd.DataFrame(data)
+    df['team_id'] = team_registry.map_series(df['team_kenpom'])
     
     # Reorder columns
-    columns = ['rank', 'team_espn', 'team_kenpom', 'record', 'points', 'previous_rank', 'poll', 'week', 'date']
+    columns = ['rank', 'team_espn', 'team_kenpom', 'team_id', 'record', 'points', 'previous_rank', 'poll', 'week', 'date']
     df = df[columns]
     
     # Export
-    df.to_csv(filename, index=False)
+    with tracing.span("export.csv", source="espn", path=filename, rows=len(df)) as s:
+        df.to_csv(filename, index=False)
+        s.set(bytes=tracing.file_size(filename))
     print(f"\n[SUCCESS] Exported {len(df)} teams to {filename}")
     
     # Show preview
@@ -172,6 +178,7 @@ def export_to_csv(data, filename='ap_poll_week6.csv'):
     return True
 
 
+@tracing.traced("run", source="espn")
 def main():
     """Main function."""
     print("=" * 70)
@@ -7,17 +7,21 @@ import argparse
 import csv
 import logging
 import os
+import re
 import sqlite3
 import sys
 import time
 import math
 from datetime import datetime
+from pathlib import Path
 from zipfile import ZipFile, ZIP_DEFLATED
 from typing import Optional
 
 import pandas as pd
 from apscheduler.schedulers.background import BackgroundScheduler
-from playwright.sync_api import sync_playwright
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared import browser_pool, readiness, run_history, team_registry, tracing
 
 # Configuration
 URL = os.environ.get("TEAM_RATINGS_URL", "https://evanmiya.com/?team_ratings")
@@ -28,155 +32,6 @@ ZIP_OUTPUT = os.environ.get("TEAM_RATINGS_ZIP", "team_ratings.csv.zip")
 MAX_RETRIES = int(os.environ.get("TEAM_RATINGS_MAX_RETRIES", "4"))
 RETRY_BASE_SLEEP = float(os.environ.get("TEAM_RATINGS_RETRY_BASE", "2.0"))
 
-# Team name mapping to match KenPom format
-TEAM_NAME_MAPPING = {
-    # Remove emojis and normalize to KenPom format
-    "Iowa State": "Iowa St.",
-    "Michigan State": "Michigan St.",
-    "Connecticut": "Connecticut",
-    "NC State": "N.C. State",
-    "Ohio State": "Ohio St.",
-    "Saint Mary's": "Saint Mary's",
-    "Miami (Fla.)": "Miami FL",
-    "Miami (OH)": "Miami OH",
-    "Utah State": "Utah St.",
-    "Ole Miss": "Mississippi",
-    "San Diego State": "San Diego St.",
-    "Florida State": "Florida St.",
-    "Kansas State": "Kansas St.",
-    "Oklahoma State": "Oklahoma St.",
-    "Boise State": "Boise St.",
-    "Arizona State": "Arizona St.",
-    "Penn State": "Penn St.",
-    "McNeese State": "McNeese",
-    "Colorado State": "Colorado St.",
-    "Mississippi State": "Mississippi St.",
-    "Wichita State": "Wichita St.",
-    "Illinois State": "Illinois St.",
-    "New Mexico State": "New Mexico St.",
-    "Fresno State": "Fresno St.",
-    "Morgan State": "Morgan St.",
-    "Ball State": "Ball St.",
-    "Sacramento State": "Sacramento St.",
-    "Portland State": "Portland St.",
-    "Montana State": "Montana St.",
-    "Weber State": "Weber St.",
-    "San Jose State": "San Jose St.",
-    "Appalachian State": "Appalachian St.",
-    "Arkansas State": "Arkansas St.",
-    "Georgia State": "Georgia St.",
-    "Louisiana State": "LSU",
-    "Murray State": "Murray St.",
-    "Norfolk State": "Norfolk St.",
-    "North Carolina State": "N.C. State",
-    "North Dakota State": "North Dakota St.",
-    "South Carolina State": "South Carolina St.",
-    "South Dakota State": "South Dakota St.",
-    "St. John's": "St. John's",
-    "St. Mary's": "Saint Mary's",
-    # Additional mappings from verification
-    "Alabama State": "Alabama St.",
-    "Alcorn State": "Alcorn St.",
-    "Arkansas-Little Rock": "Little Rock",
-    "Arkansas-Pine Bluff": "Arkansas Pine Bluff",
-    "Cal State Bakersfield": "Cal St. Bakersfield",
-    "Cal State Fullerton": "Cal St. Fullerton",
-    "Cal State Northridge": "CSUN",
-    "California Baptist": "Cal Baptist",
-    "Chicago State": "Chicago St.",
-    "Cleveland State": "Cleveland St.",
-    "College of Charleston": "Charleston",
-    "Coppin State": "Coppin St.",
-    "Delaware State": "Delaware St.",
-    "Detroit": "Detroit Mercy",
-    "East Tennessee State": "East Tennessee St.",
-    "Florida International": "FIU",
-    "Fort Wayne": "Purdue Fort Wayne",
-    "Gardner-Webb": "Gardner Webb",
-    "Grambling": "Grambling St.",
-    "Idaho State": "Idaho St.",
-    "Illinois-Chicago": "Illinois Chicago",
-    "Indiana State": "Indiana St.",
-    "Jackson State": "Jackson St.",
-    "Jacksonville State": "Jacksonville St.",
-    "Kennesaw State": "Kennesaw St.",
-    "Kent State": "Kent St.",
-    "Long Beach State": "Long Beach St.",
-    "Long Island": "LIU",
-    "Louisiana-Lafayette": "Louisiana",
-    "Louisiana-Monroe": "Louisiana Monroe",
-    "Loyola Maryland": "Loyola MD",
-    "Maryland-Eastern Shore": "Maryland Eastern Shore",
-    "Mississippi Valley State": "Mississippi Valley St.",
-    "Missouri State": "Missouri St.",
-    "Missouri-Kansas City": "Kansas City",
-    "Morehead State": "Morehead St.",
-    "Nicholls State": "Nicholls",
-    "North Texas": "North Texas",
-    "Northwestern State": "Northwestern St.",
-    "Omaha": "Nebraska Omaha",
-    "Oregon State": "Oregon St.",
-    "Prairie View": "Prairie View A&M",
-    "SIU Edwardsville": "SIUE",
-    "Saint Bonaventure": "St. Bonaventure",
-    "Saint Francis (PA)": "Saint Francis",
-    "Sam Houston State": "Sam Houston St.",
-    "South Carolina Upstate": "USC Upstate",
-    "Southeast Missouri State": "Southeast Missouri",
-    "Southern Mississippi": "Southern Miss",
-    "St. Thomas (MN)": "St. Thomas",
-    "Tarleton State": "Tarleton St.",
-    "Tennessee State": "Tennessee St.",
-    "Tennessee-Martin": "Tennessee Martin",
-    "Texas A&M-Corpus Christi": "Texas A&M Corpus Chris",
-    "Texas State": "Texas St.",
-    "Texas-Rio Grande Valley": "UT Rio Grande Valley",
-    "Washington State": "Washington St.",
-    "Wright State": "Wright St.",
-    "Youngstown State": "Youngstown St.",
-    "Bethune-Cookman": "Bethune Cookman",
-    # Teams that just need emoji removal (keep same name)
-    "Baylor": "Baylor",
-    "Binghamton": "Binghamton",
-    "Boston University": "Boston University",
-    "Central Michigan": "Central Michigan",
-    "Creighton": "Creighton",
-    "Dayton": "Dayton",
-    "Delaware": "Delaware",
-    "Drake": "Drake",
-    "East Carolina": "East Carolina",
-    "Eastern Washington": "Eastern Washington",
-    "George Mason": "George Mason",
-    "Georgetown": "Georgetown",
-    "IU Indy": "IU Indy",
-    "Kansas": "Kansas",
-    "Kentucky": "Kentucky",
-    "Longwood": "Longwood",
-    "Loyola Marymount": "Loyola Marymount",
-    "Minnesota": "Minnesota",
-    "Missouri": "Missouri",
-    "Niagara": "Niagara",
-    "North Carolina": "North Carolina",
-    "Pittsburgh": "Pittsburgh",
-    "Rhode Island": "Rhode Island",
-    "Rider": "Rider",
-    "Rutgers": "Rutgers",
-    "Siena": "Siena",
-    "Temple": "Temple",
-    "Texas A&M": "Texas A&M",
-    "Texas Tech": "Texas Tech",
-    "UCLA": "UCLA",
-    "UNLV": "UNLV",
-    "USC": "USC",
-    "Utah": "Utah",
-    "VMI": "VMI",
-    "Virginia Tech": "Virginia Tech",
-    "Washington": "Washington",
-    "Western Illinois": "Western Illinois",
-    "Western Michigan": "Western Michigan",
-    "Wisconsin": "Wisconsin",
-}
-
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", filename=LOG, filemode="a")
 console = logging.StreamHandler()
 console.setLevel(logging.INFO)
@@ -214,7 +69,8 @@ def extract_table_from_page(page):
     selector = "#team_ratings_page-team_ratings"
     logging.info("Waiting for table container %s", selector)
     try:
-        page.wait_for_selector(selector, timeout=15000)
+        with tracing.span("wait_for_selector", selector=selector):
+            page.wait_for_selector(selector, timeout=15000)
     except Exception:
         logging.warning("Container not found quickly, continuing to try to locate table")
 
@@ -316,7 +172,9 @@ def extract_table_from_page(page):
         return {headers: headers, rows: rows, row_count: rows.length, header_count: headers.length};
     }
     """
-    result = page.evaluate(script, table)
+    with tracing.span("extract.evaluate") as span:
+        result = page.evaluate(script, table)
+        span.set(rows=result.get("row_count", 0))
     headers = result.get("headers") or []
     rows = result.get("rows") or []
     row_count = result.get("row_count", 0)
@@ -336,40 +194,33 @@ def extract_table_from_page(page):
     return df
 
 
+# Emojis Evan Miya puts after team names (hot streak, injuries, ...)
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F700-\U0001F77F"  # alchemical symbols
+    "\U0001F780-\U0001F7FF"  # Geometric Shapes Extended
+    "\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
+    "\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
+    "\U0001FA00-\U0001FA6F"  # Chess Symbols
+    "\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
+    "\U00002702-\U000027B0"  # Dingbats
+    "\U000024C2-\U0001F251" 
+    "]+", 
+    flags=re.UNICODE
+)
+
+
 def normalize_team_names(team_name: str) -> str:
     """Normalize team names to match KenPom format.
     
-    Removes emojis and applies custom mapping to standardize names.
+    Removes emojis and resolves the name through the shared team registry.
     """
-    import re
-    
-    # Remove emojis using a comprehensive pattern
-    # This covers all emoji ranges including newer emojis
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F1E0-\U0001F1FF"  # flags (iOS)
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F680-\U0001F6FF"  # transport & map symbols
-        "\U0001F700-\U0001F77F"  # alchemical symbols
-        "\U0001F780-\U0001F7FF"  # Geometric Shapes Extended
-        "\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
-        "\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
-        "\U0001FA00-\U0001FA6F"  # Chess Symbols
-        "\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
-        "\U00002702-\U000027B0"  # Dingbats
-        "\U000024C2-\U0001F251" 
-        "]+", 
-        flags=re.UNICODE
-    )
-    
-    clean_name = emoji_pattern.sub('', team_name).strip()
-    
-    # Apply custom mapping if exists
-    if clean_name in TEAM_NAME_MAPPING:
-        return TEAM_NAME_MAPPING[clean_name]
-    
-    return clean_name
+    clean_name = EMOJI_PATTERN.sub('', team_name).strip()
+    return team_registry.canonical_name(clean_name)
 
 
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -414,7 +265,9 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     if "Team" in df.columns:
         logging.info("Normalizing team names...")
         original_teams = df["Team"].head(5).tolist()
-        df["Team"] = df["Team"].apply(normalize_team_names)
+        # Emojis stripped in one pass, then one registry lookup per distinct name
+        df["Team"] = team_registry.canonical_names(df["Team"].astype(str).str.replace(EMOJI_PATTERN, '', regex=True))
+        df["team_id"] = team_registry.map_series(df["Team"])
         normalized_teams = df["Team"].head(5).tolist()
         logging.info(f"Sample before: {original_teams}")
         logging.info(f"Sample after: {normalized_teams}")
@@ -429,7 +282,9 @@ def save_to_csv(df: pd.DataFrame, path: str, overwrite: bool = True):
     df_out["scrape_time_utc"] = timestamp
     # Always overwrite for snapshot semantics
     try:
-        df_out.to_csv(path, index=False)
+        with tracing.span("export.csv", path=path, rows=len(df_out)) as span:
+            df_out.to_csv(path, index=False)
+            span.set(bytes=tracing.file_size(path))
         logging.info("Wrote fresh snapshot CSV (%d rows) to %s", len(df_out), path)
     except Exception as e:
         logging.error("Failed writing CSV: %s", e)
@@ -442,7 +297,8 @@ def save_to_sqlite(df: pd.DataFrame, db_path: str, table_name: str = "team_ratin
     df2["scrape_time_utc"] = datetime.utcnow().isoformat()
     conn = sqlite3.connect(db_path)
     try:
-        df2.to_sql(table_name, conn, if_exists="replace", index=False)
+        with tracing.span("db.write", path=db_path, rows=len(df2)):
+            df2.to_sql(table_name, conn, if_exists="replace", index=False)
         logging.info("Replaced data in sqlite %s table %s (%d rows)", db_path, table_name, len(df2))
     finally:
         conn.close()
@@ -452,34 +308,36 @@ def zip_csv(csv_path: str, zip_path: str):
     if not os.path.exists(csv_path):
         logging.warning("CSV not found to zip: %s", csv_path)
         return
-    with ZipFile(zip_path, mode="w", compression=ZIP_DEFLATED) as zf:
-        arcname = os.path.basename(csv_path)
-        zf.write(csv_path, arcname=arcname)
+    with tracing.span("export.zip", path=zip_path) as span:
+        with ZipFile(zip_path, mode="w", compression=ZIP_DEFLATED) as zf:
+            arcname = os.path.basename(csv_path)
+            zf.write(csv_path, arcname=arcname)
+        span.set(bytes=tracing.file_size(zip_path))
     logging.info("Zipped CSV to %s", zip_path)
 
 
+@tracing.traced("scrape_attempt")
 def _scrape_once() -> Optional[pd.DataFrame]:
     """Perform a single browser visit & attempt to pull the table."""
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
+    with browser_pool.context(site="evanmiya") as context:
         page = context.new_page()
-        page.goto(URL, timeout=60000)
+        with tracing.span("page.goto", url=URL, wait_until='load'):
+            page.goto(URL, timeout=60000)
         
         # Wait for the Shiny app to initialize and populate data
-        time.sleep(3)
         selector = "#team_ratings_page-team_ratings"
         logging.info("Waiting for table container to populate with data")
         
         # Wait for actual data rows to appear, not just the container
         try:
-            page.wait_for_selector(f"{selector} [role='row']", timeout=20000)
+            with tracing.span("wait_for_selector", selector=f"{selector} [role='row']"):
+                page.wait_for_selector(f"{selector} [role='row']", timeout=20000)
             logging.info("Data rows detected in table")
         except Exception:
             logging.warning("Timed out waiting for data rows; proceeding anyway")
         
-        # Additional wait for JS to finish rendering
-        time.sleep(2)
+        # Let reactable finish rendering: done once the row count holds
+        readiness.wait_for_rows(page, f"{selector} [role='row']", stable_ms=500, timeout_ms=10000)
         
         # Check if table is paginated and expand to show all rows
         try:
@@ -506,8 +364,9 @@ def _scrape_once() -> Optional[pd.DataFrame]:
                 if options:
                     max_option = max(options, key=lambda x: int(x['value']) if x['value'].isdigit() else 0)
                     logging.info("Selecting option: %s", max_option)
+                    before = readiness.snapshot(page, selector)
                     page_size_selector.select_option(value=max_option['value'])
-                    time.sleep(3)
+                    readiness.wait_for_change(page, selector, before, timeout_ms=10000)
                     logging.info("Selected page size %s", max_option['value'])
                 else:
                     logging.warning("No valid options found in page size selector")
@@ -516,31 +375,35 @@ def _scrape_once() -> Optional[pd.DataFrame]:
         except Exception as e:
             logging.warning("Could not expand pagination: %s", e)
         
-        try:
+        with tracing.span("extract") as span:
             df = extract_table_from_page(page)
-        finally:
-            context.close(); browser.close()
+            span.set(rows=len(df))
     return df
 
+@run_history.recorded("evanmiya")
+@tracing.traced("run", source="evanmiya")
 def do_scrape(output_csv=OUT_CSV, output_db=OUT_DB, make_zip: bool = True, zip_path: str = ZIP_OUTPUT):
     logging.info("Starting scrape of %s", URL)
     attempt = 0
     last_exc: Optional[Exception] = None
     df: Optional[pd.DataFrame] = None
-    while attempt < MAX_RETRIES:
-        try:
-            df = _scrape_once()
-            if df is not None and not df.empty:
-                break
-            logging.warning("Empty dataframe on attempt %d", attempt + 1)
-        except Exception as e:
-            last_exc = e
-            logging.warning("Attempt %d failed: %s", attempt + 1, e)
-        attempt += 1
-        if attempt < MAX_RETRIES:
-            sleep_sec = RETRY_BASE_SLEEP * math.pow(2, attempt - 1)
-            logging.info("Retrying in %.1f seconds (attempt %d/%d)", sleep_sec, attempt + 1, MAX_RETRIES)
-            time.sleep(sleep_sec)
+    # Retries reuse the same browser (fresh context each time); it is
+    # closed once the attempts are over
+    with browser_pool.session():
+        while attempt < MAX_RETRIES:
+            try:
+                df = _scrape_once()
+                if df is not None and not df.empty:
+                    break
+                logging.warning("Empty dataframe on attempt %d", attempt + 1)
+            except Exception as e:
+                last_exc = e
+                logging.warning("Attempt %d failed: %s", attempt + 1, e)
+            attempt += 1
+            if attempt < MAX_RETRIES:
+                sleep_sec = RETRY_BASE_SLEEP * math.pow(2, attempt - 1)
+                logging.info("Retrying in %.1f seconds (attempt %d/%d)", sleep_sec, attempt + 1, MAX_RETRIES)
+                tracing.sleep(sleep_sec, reason="retry backoff")
 
     if df is None or df.empty:
         logging.error("Failed to scrape data after %d attempts", MAX_RETRIES)
@@ -549,7 +412,8 @@ def do_scrape(output_csv=OUT_CSV, output_db=OUT_DB, make_zip: bool = True, zip_p
         return False
 
     try:
-        df = normalize_columns(df)
+        with tracing.span("normalize", rows=len(df)):
+            df = normalize_columns(df)
         save_to_csv(df, output_csv)
         save_to_sqlite(df, output_db)
         if make_zip:
@@ -0,0 +1,466 @@
+"""
+Local read-only HTTP API over the ratings stores.
+Serves JSON straight from SQLite with pagination, conference filters,
+gzip and weak ETags tied to each store's data version, so consumers can
+poll with If-None-Match and get a 304 before any query runs.
+Standard library only (asyncio); binds to localhost by default.
+
+Endpoints (all GET/HEAD):
+    /api/version
+    /api/kenpom/latest?conference=ACC,SEC&limit=100&offset=0
+    /api/kenpom/teams/<team_name>?start=YYYY-MM-DD&end=YYYY-MM-DD&resolution=daily|weekly
+    /api/kenpom/snapshots/<YYYY-MM-DD>?conference=...
+    /api/evanmiya/latest?conference=...
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from database import KenPomDB, RANKING_COLUMNS
+from query_data import RankingsHistory
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Pagination bounds for every list endpoint
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Bodies smaller than this aren't worth compressing
+GZIP_MIN_BYTES = 1024
+
+# Serialized responses kept in memory, keyed by ETag and encoding
+RESPONSE_CACHE_SIZE = 256
+
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_SECONDS = 15
+
+MAX_HEADER_BYTES = 16384
+
+# Evan Miya's scraper replaces this SQLite table on every run
+EVANMIYA_DB = os.environ.get(
+    "TEAM_RATINGS_DB",
+    str(Path(__file__).resolve().parent.parent / "Evan Miya" / "scraper" / "team_ratings.db")
+)
+
+STATUS_TEXT = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class APIError(Exception):
+    """Error returned to the client as a JSON body with an HTTP status."""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _param(query: Dict[str, List[str]], name: str) -> Optional[str]:
+    """Last value of a query parameter, or None."""
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _page(query: Dict[str, List[str]]) -> Tuple[int, int]:
+    """Validated (limit, offset) from the query string."""
+    try:
+        limit = int(_param(query, 'limit') or DEFAULT_PAGE_SIZE)
+        offset = int(_param(query, 'offset') or 0)
+    except ValueError:
+        raise APIError(400, "limit and offset must be integers")
+    if not 1 <= limit <= MAX_PAGE_SIZE or offset < 0:
+        raise APIError(400, f"limit must be 1-{MAX_PAGE_SIZE} and offset non-negative")
+    return limit, offset
+
+
+def _conferences(query: Dict[str, List[str]]) -> Optional[List[str]]:
+    """Conference filter: repeated and/or comma-separated values."""
+    names = [name.strip() for value in query.get('conference', []) for name in value.split(',')]
+    return [name for name in names if name] or None
+
+
+def _date(value: Optional[str], name: str) -> Optional[str]:
+    """Validate a YYYY-MM-DD parameter."""
+    if value is None:
+        return None
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise APIError(400, f"{name} must be a YYYY-MM-DD date")
+    return value
+
+
+def _paged(rows: List[Dict], total: int, limit: int, offset: int, **extra) -> Dict:
+    """Standard envelope for list responses."""
+    return dict(extra, total=total, limit=limit, offset=offset, rows=rows)
+
+
+class RatingsAPI:
+    """Routes API paths to queries against the ratings stores."""
+    
+    def __init__(self, db: Optional[KenPomDB] = None, evanmiya_db: str = EVANMIYA_DB):
+        self.db = db if db is not None else KenPomDB(read_only=True)
+        self.history = RankingsHistory(self.db)
+        self.evanmiya_db = evanmiya_db
+        self.routes = [
+            ('kenpom', re.compile(r'^/api/kenpom/latest$'), self.kenpom_latest),
+            ('kenpom', re.compile(r'^/api/kenpom/teams/(?P<team>[^/]+)$'), self.kenpom_team),
+            ('kenpom', re.compile(r'^/api/kenpom/snapshots/(?P<date>[^/]+)$'), self.kenpom_snapshot),
+            ('evanmiya', re.compile(r'^/api/evanmiya/latest$'), self.evanmiya_latest),
+            ('all', re.compile(r'^/api/version$'), self.versions),
+        ]
+    
+    def route(self, path: str):
+        """Find (source, handler, path params) for a request path."""
+        for source, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match:
+                return source, handler, {k: unquote(v) for k, v in match.groupdict().items()}
+        raise APIError(404, f"No such endpoint: {path}")
+    
+    def version(self, source: str) -> str:
+        """Current data version of a store; changes whenever its data does."""
+        if source == 'kenpom':
+            return self.db.data_version()
+        if source == 'evanmiya':
+            try:
+                stat = os.stat(self.evanmiya_db)
+            except OSError:
+                return "missing"
+            return f"{stat.st_mtime_ns:x}.{stat.st_size:x}"
+        return '-'.join(self.version(name) for name in ('kenpom', 'evanmiya'))
+    
+    def versions(self, query, params) -> Dict:
+        """GET /api/version - data version of every store."""
+        latest = self.history.latest_date()
+        return {
+            'kenpom': {'version': self.version('kenpom'), 'latest_date': latest},
+            'evanmiya': {'version': self.version('evanmiya')},
+        }
+    
+    def _kenpom_page(self, source_sql: str, where: List[str], args: List,
+                     order: str, limit: int, offset: int) -> Tuple[List[Dict], int]:
+        """Count and fetch one page of KenPom rows joined to team names."""
+        columns = ', '.join(f"r.{col}" for col in RANKING_COLUMNS)
+        where_sql = ' AND '.join(where) or '1'
+        with self.db.read_connection() as conn:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM {source_sql} r JOIN teams t ON r.team_id = t.id WHERE {where_sql}",
+                args
+            ).fetchone()[0]
+            rows = conn.execute(f"""
+                SELECT r.date, t.team_name, t.conference, {columns}
+                FROM {source_sql} r
+                JOIN teams t ON r.team_id = t.id
+                WHERE {where_sql}
+                ORDER BY {order}
+                LIMIT ? OFFSET ?
+            """, args + [limit, offset]).fetchall()
+        return [dict(row) for row in rows], total
+    
+    @staticmethod
+    def _conference_filter(conferences: Optional[List[str]], where: List[str], args: List):
+        """Add a case-insensitive conference IN (...) condition."""
+        if conferences:
+            where.append(f"t.conference COLLATE NOCASE IN ({', '.join('?' * len(conferences))})")
+            args.extend(conferences)
+    
+    def kenpom_latest(self, query, params) -> Dict:
+        """GET /api/kenpom/latest - most recent rankings, by rank."""
+        limit, offset = _page(query)
+        where, args = [], []
+        self._conference_filter(_conferences(query), where, args)
+        rows, total = self._kenpom_page('latest_rankings', where, args, 'r.rank', limit, offset)
+        return _paged(rows, total, limit, offset, date=self.history.latest_date())
+    
+    def kenpom_snapshot(self, query, params) -> Dict:
+        """GET /api/kenpom/snapshots/<date> - rankings as they stood on a date."""
+        requested = _date(params['date'], 'date')
+        limit, offset = _page(query)
+        with self.db.read_connection() as conn:
+            date = conn.execute(
+                "SELECT MAX(date) FROM snapshots WHERE date <= ?", (requested,)
+            ).fetchone()[0]
+        if date is None:
+            raise APIError(404, f"No daily snapshot on or before {requested}")
+        
+        where, args = ['r.date = ?'], [date]
+        self._conference_filter(_conferences(query), where, args)
+        rows, total = self._kenpom_page('rankings_daily', where, args, 'r.rank', limit, offset)
+        return _paged(rows, total, limit, offset, requested_date=requested, date=date)
+    
+    def kenpom_team(self, query, params) -> Dict:
+        """
+        GET /api/kenpom/teams/<team_name> - one team's history, oldest first.
+        
+        resolution=weekly returns min/max/mean per week, which also covers
+        seasons that have been compacted out of the daily table.
+        """
+        team = params['team']
+        start = _date(_param(query, 'start'), 'start')
+        end = _date(_param(query, 'end'), 'end')
+        limit, offset = _page(query)
+        resolution = _param(query, 'resolution') or 'daily'
+        
+        with self.db.read_connection() as conn:
+            row = conn.execute("SELECT id FROM teams WHERE team_name = ?", (team,)).fetchone()
+        if row is None:
+            raise APIError(404, f"Unknown team: {team}")
+        
+        if resolution == 'weekly':
+            weeks = self.history.team_weekly(team, start, end, metrics=RANKING_COLUMNS)
+            return _paged(weeks[offset:offset + limit], len(weeks), limit, offset,
+                          team=team, resolution=resolution)
+        if resolution != 'daily':
+            raise APIError(400, "resolution must be daily or weekly")
+        
+        where = ["r.team_id = ?", "r.date >= COALESCE(?, '0000-00-00')",
+                 "r.date <= COALESCE(?, '9999-12-31')"]
+        rows, total = self._kenpom_page('rankings_daily', where, [row['id'], start, end],
+                                        'r.date', limit, offset)
+        return _paged(rows, total, limit, offset, team=team, resolution=resolution)
+    
+    def evanmiya_latest(self, query, params) -> Dict:
+        """
+        GET /api/evanmiya/latest - the most recent Evan Miya ratings.
+        
+        Team names there are already normalized to KenPom's, so the
+        conference filter goes through the KenPom teams table.
+        """
+        limit, offset = _page(query)
+        if not os.path.exists(self.evanmiya_db):
+            raise APIError(503, "Evan Miya ratings database not found")
+        
+        conferences = _conferences(query)
+        teams = None
+        if conferences:
+            with self.db.read_connection() as conn:
+                teams = [row[0] for row in conn.execute(
+                    f"SELECT team_name FROM teams WHERE conference COLLATE NOCASE "
+                    f"IN ({', '.join('?' * len(conferences))})", conferences
+                )]
+        
+        where_sql, args = '1', []
+        if teams is not None:
+            where_sql = f'"Team" IN ({", ".join("?" * len(teams))})' if teams else '0'
+            args = teams
+        
+        conn = sqlite3.connect(f"{Path(self.evanmiya_db).resolve().as_uri()}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM team_ratings WHERE {where_sql}", args
+            ).fetchone()[0]
+            rows = conn.execute(f"""
+                SELECT * FROM team_ratings
+                WHERE {where_sql}
+                ORDER BY CAST("Relative Ranking" AS INTEGER)
+                LIMIT ? OFFSET ?
+            """, args + [limit, offset]).fetchall()
+        except sqlite3.OperationalError as e:
+            raise APIError(503, f"Evan Miya ratings unavailable: {e}")
+        finally:
+            conn.close()
+        return _paged([dict(row) for row in rows], total, limit, offset)
+    
+    def close(self):
+        """Close the underlying database."""
+        self.db.close()
+
+
+class APIServer:
+    """Minimal asyncio HTTP/1.1 server in front of a RatingsAPI."""
+    
+    def __init__(self, api: RatingsAPI, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.api = api
+        self.host = host
+        self.port = port
+        self._cache: OrderedDict = OrderedDict()
+    
+    def _cached(self, key: Tuple) -> Optional[bytes]:
+        """Look up a serialized body, marking it recently used."""
+        body = self._cache.get(key)
+        if body is not None:
+            self._cache.move_to_end(key)
+        return body
+    
+    def _store(self, key: Tuple, body: bytes):
+        """Cache a serialized body, evicting the least recently used."""
+        self._cache[key] = body
+        self._cache.move_to_end(key)
+        while len(self._cache) > RESPONSE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    @staticmethod
+    def _etag(source: str, version: str, path: str, query: Dict) -> str:
+        """Weak ETag: the store's version plus a digest of the normalized request."""
+        request = path + '?' + '&'.join(f"{k}={','.join(v)}" for k, v in sorted(query.items()))
+        digest = hashlib.blake2b(request.encode('utf-8'), digest_size=6).hexdigest()
+        return f'W/"{source}-{version}-{digest}"'
+    
+    @staticmethod
+    def _etag_matches(header: Optional[str], etag: str) -> bool:
+        """If-None-Match uses weak comparison, so W/ prefixes are ignored."""
+        if not header:
+            return False
+        if header.strip() == '*':
+            return True
+        opaque = etag[2:] if etag.startswith('W/') else etag
+        return any(
+            (tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip()) == opaque
+            for tag in header.split(',')
+        )
+    
+    async def respond(self, method: str, target: str, headers: Dict[str, str]):
+        """Build (status, headers, body) for one request."""
+        if method not in ('GET', 'HEAD'):
+            raise APIError(405, "Only GET and HEAD are supported")
+        
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        source, handler, params = self.api.route(url.path)
+        version = await asyncio.to_thread(self.api.version, source)
+        etag = self._etag(source, version, url.path, query)
+        out = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        
+        # Conditional request: answered from the version alone, no query runs
+        if self._etag_matches(headers.get('if-none-match'), etag):
+            return 304, out, b''
+        
+        use_gzip = 'gzip' in headers.get('accept-encoding', '').lower()
+        body = self._cached((etag, 'identity'))
+        if body is None:
+            payload = await asyncio.to_thread(handler, query, params)
+            payload = dict(payload, version=version) if source != 'all' else payload
+            body = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+            self._store((etag, 'identity'), body)
+        
+        if use_gzip and len(body) >= GZIP_MIN_BYTES:
+            compressed = self._cached((etag, 'gzip'))
+            if compressed is None:
+                compressed = gzip.compress(body, compresslevel=6)
+                self._store((etag, 'gzip'), compressed)
+            body = compressed
+            out['Content-Encoding'] = 'gzip'
+        
+        out['Content-Type'] = 'application/json; charset=utf-8'
+        return 200, out, body
+    
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until it closes or goes idle."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_SECONDS)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, 'GET', 431, {}, self._error_body("Headers too large"), False)
+                    return
+                
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, protocol = lines[0].split(' ', 2)
+                except ValueError:
+                    await self._write(writer, 'GET', 400, {}, self._error_body("Malformed request line"), False)
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+                
+                # Requests shouldn't carry a body, but drain one if sent
+                try:
+                    length = int(headers.get('content-length', '0') or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._write(writer, method, 400, {}, self._error_body("Invalid Content-Length"), False)
+                    return
+                if length:
+                    await reader.readexactly(length)
+                
+                connection = headers.get('connection', '').lower()
+                keep_alive = (connection != 'close' if protocol == 'HTTP/1.1'
+                              else connection == 'keep-alive')
+                
+                try:
+                    status, out, body = await self.respond(method, target, headers)
+                except APIError as e:
+                    status, out, body = e.status, {}, self._error_body(e.message)
+                    if e.status == 405:
+                        out['Allow'] = 'GET, HEAD'
+                except Exception as e:
+                    print(f"Error serving {target}: {e}")
+                    status, out, body = 500, {}, self._error_body("Internal server error")
+                
+                await self._write(writer, method, status, out, body, keep_alive)
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+    
+    @staticmethod
+    def _error_body(message: str) -> bytes:
+        """JSON body for an error response."""
+        return json.dumps({'error': message}).encode('utf-8')
+    
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, method: str, status: int,
+                     headers: Dict[str, str], body: bytes, keep_alive: bool):
+        """Write a response; HEAD and 304 responses carry headers only."""
+        headers = dict(headers)
+        if status != 304:
+            headers.setdefault('Content-Type', 'application/json; charset=utf-8')
+            headers['Content-Length'] = str(len(body))
+        headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+        head = f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n" + ''.join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        ) + "\r\n"
+        writer.write(head.encode('latin-1'))
+        if method != 'HEAD' and status != 304:
+            writer.write(body)
+        await writer.drain()
+    
+    async def serve_forever(self):
+        """Listen until cancelled."""
+        server = await asyncio.start_server(
+            self.handle_client, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        print(f"Ratings API listening on http://{self.host}:{self.port}/api/version")
+        async with server:
+            await server.serve_forever()
+
+
+def run(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Start the API server and block until interrupted."""
+    api = RatingsAPI()
+    try:
+        asyncio.run(APIServer(api, host, port).serve_forever())
+    except KeyboardInterrupt:
+        print("\nAPI server stopped.")
+    finally:
+        api.close()
+
+
+if __name__ == "__main__":
+    # python api_server.py [port] [host]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    host = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_HOST
+    run(host, port)
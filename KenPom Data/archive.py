@@ -0,0 +1,204 @@
+"""
+Columnar archive of KenPom rankings history.
+Each daily snapshot is written as a compressed Parquet file under
+season=YYYY/date=YYYY-MM-DD/, so multi-season readers can prune by
+partition and project only the columns they need.
+"""
+import os
+import sys
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable, Set
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from database import KenPomDB, RANKING_COLUMNS, season_for_date
+
+
+DEFAULT_ARCHIVE_DIR = "rankings_archive"
+
+# Columns stored in each snapshot file (season and date live in the path)
+SNAPSHOT_SCHEMA = pa.schema(
+    [('team_name', pa.string()), ('conference', pa.string()), ('rank', pa.int32())]
+    + [(col, pa.float64()) for col in RANKING_COLUMNS if col != 'rank']
+)
+
+# Hive-style partition keys encoded in the directory names
+PARTITION_SCHEMA = pa.schema([('season', pa.int32()), ('date', pa.string())])
+
+
+class RankingsArchive:
+    """Parquet archive of daily rankings snapshots, partitioned by season and date."""
+    
+    def __init__(self, root: str = DEFAULT_ARCHIVE_DIR, compression: str = 'zstd'):
+        """
+        Args:
+            root: Directory holding the season=/date= partitions
+            compression: Parquet codec for new snapshot files
+        """
+        self.root = Path(root)
+        self.compression = compression
+    
+    def partition_path(self, date: str) -> Path:
+        """Directory holding the snapshot for a date."""
+        return self.root / f"season={season_for_date(date)}" / f"date={date}"
+    
+    def has_snapshot(self, date: str) -> bool:
+        """Check whether a date has already been archived."""
+        return (self.partition_path(date) / "snapshot.parquet").exists()
+    
+    def archived_dates(self) -> Set[str]:
+        """All dates present in the archive."""
+        return {
+            path.parent.name.split('=', 1)[1]
+            for path in self.root.glob("season=*/date=*/snapshot.parquet")
+        }
+    
+    def write_snapshot(self, date: str, rows: List[Dict]) -> Path:
+        """
+        Write one day's rows as a Parquet partition, replacing any existing file.
+        
+        The file is written next to its final name and renamed into place so
+        readers never see a half-written partition.
+        """
+        table = pa.Table.from_pylist(
+            [{name: row.get(name) for name in SNAPSHOT_SCHEMA.names} for row in rows],
+            schema=SNAPSHOT_SCHEMA
+        )
+        
+        partition = self.partition_path(date)
+        partition.mkdir(parents=True, exist_ok=True)
+        final_path = partition / "snapshot.parquet"
+        # Dot-prefixed so dataset discovery ignores it mid-write
+        tmp_path = partition / ".snapshot.parquet.tmp"
+        pq.write_table(table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, final_path)
+        return final_path
+    
+    def archive_from_db(self, db: KenPomDB, dates: Optional[Iterable[str]] = None,
+                        overwrite: bool = False) -> int:
+        """
+        Copy daily snapshots from SQLite into the archive.
+        
+        A date that reconstructs to no rows still gets an (empty) partition,
+        so the archive records it as covered.
+        
+        Args:
+            db: Source database
+            dates: Dates to archive (default: every stored snapshot date)
+            overwrite: Rewrite dates that are already archived
+        
+        Returns:
+            Number of snapshots written
+        """
+        columns = ', '.join(f"r.{col}" for col in RANKING_COLUMNS)
+        with db.read_connection() as conn:
+            if dates is None:
+                dates = [row[0] for row in conn.execute(
+                    "SELECT date FROM snapshots ORDER BY date"
+                )]
+            
+            written = 0
+            for date in dates:
+                if not overwrite and self.has_snapshot(date):
+                    continue
+                rows = conn.execute(f"""
+                    SELECT t.team_name, t.conference, {columns}
+                    FROM rankings_daily r
+                    JOIN teams t ON r.team_id = t.id
+                    WHERE r.date = ?
+                    ORDER BY r.rank
+                """, (date,)).fetchall()
+                self.write_snapshot(date, [dict(row) for row in rows])
+                written += 1
+        
+        return written
+    
+    def dataset(self) -> ds.Dataset:
+        """Open the archive as a memory-mapped, hive-partitioned Arrow dataset."""
+        return ds.dataset(
+            str(self.root),
+            format='parquet',
+            partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'),
+            filesystem=fs.LocalFileSystem(use_mmap=True),
+        )
+    
+    def read_table(self, columns: Optional[List[str]] = None,
+                   seasons: Optional[Iterable[int]] = None,
+                   start_date: Optional[str] = None, end_date: Optional[str] = None,
+                   teams: Optional[Iterable[str]] = None) -> pa.Table:
+        """
+        Read archived rows as an Arrow table.
+        
+        Season and date filters prune whole partitions before any file is
+        opened; `columns` limits which column chunks are read from each file.
+        
+        Args:
+            columns: Columns to return (default: all, including season and date)
+            seasons: Seasons to include, by ending year
+            start_date: First date to include (YYYY-MM-DD)
+            end_date: Last date to include (YYYY-MM-DD)
+            teams: Team names to include
+        """
+        if not self.root.exists():
+            return pa.table({})
+        
+        conditions = []
+        if seasons is not None:
+            conditions.append(ds.field('season').isin([int(s) for s in seasons]))
+        if start_date is not None:
+            conditions.append(ds.field('date') >= start_date)
+        if end_date is not None:
+            conditions.append(ds.field('date') <= end_date)
+        if teams is not None:
+            conditions.append(ds.field('team_name').isin(list(teams)))
+        
+        filter_expr = None
+        for condition in conditions:
+            filter_expr = condition if filter_expr is None else filter_expr & condition
+        
+        return self.dataset().to_table(columns=columns, filter=filter_expr)
+    
+    def read(self, **kwargs):
+        """Same as read_table, returned as a pandas DataFrame."""
+        return self.read_table(**kwargs).to_pandas()
+
+
+def archive_new_snapshots(db: Optional[KenPomDB] = None,
+                          root: str = DEFAULT_ARCHIVE_DIR) -> int:
+    """
+    Archive every date in the database that isn't in the archive yet.
+    
+    The most recent date is always rewritten, since a same-day rerun of the
+    scraper may have replaced its rows.
+    """
+    own_db = db is None
+    db = db or KenPomDB(read_only=True)
+    try:
+        archive = RankingsArchive(root)
+        archived = archive.archived_dates()
+        with db.read_connection() as conn:
+            db_dates = [row[0] for row in conn.execute(
+                "SELECT date FROM snapshots ORDER BY date"
+            )]
+        dates = [date for date in db_dates if date not in archived]
+        if db_dates and db_dates[-1] not in dates:
+            dates.append(db_dates[-1])
+        return archive.archive_from_db(db, dates=dates, overwrite=True)
+    finally:
+        if own_db:
+            db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild":
+        db = KenPomDB(read_only=True)
+        try:
+            count = RankingsArchive().archive_from_db(db, overwrite=True)
+        finally:
+            db.close()
+    else:
+        count = archive_new_snapshots()
+    print(f"[SUCCESS] Archived {count} daily snapshot(s) to {DEFAULT_ARCHIVE_DIR}/")
@@ -3,26 +3,205 @@ SQLite database operations for KenPom data storage.
 """
 import sqlite3
 import os
+import hashlib
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable
+
+
+# Metric columns stored per team per day in the rankings table
+RANKING_COLUMNS = (
+    'rank', 'adj_em', 'adj_o', 'adj_d', 'adj_tempo',
+    'luck', 'sos_adj_em', 'opp_o', 'opp_d', 'ncsos_adj_em'
+)
+
+# Per-metric summary columns kept in the weekly and season rollup tables
+ROLLUP_STATS = ('min', 'max', 'mean')
+ROLLUP_COLUMNS = tuple(f"{col}_{stat}" for col in RANKING_COLUMNS for stat in ROLLUP_STATS)
+
+# Columns copied from rankings into the materialized latest_rankings table
+LATEST_COLUMNS = ('team_id', 'date') + RANKING_COLUMNS + ('created_at',)
+
+# A rankings row with every metric NULL marks a team that dropped out of a
+# snapshot; rankings_daily stops carrying the team forward from that date
+TOMBSTONE_CONDITION = ' AND '.join(f"r.{col} IS NULL" for col in RANKING_COLUMNS)
+
+
+def _canonical_metric(value):
+    """Coerce a metric to the form SQLite hands back (REAL/INTEGER affinity)."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def metrics_hash(values: tuple) -> str:
+    """
+    Stable short hash of a team's metric tuple, used for change detection.
+    Numbers are compared as floats so 100 from the scraper matches 100.0
+    read back from a REAL column.
+    """
+    canonical = tuple(_canonical_metric(v) for v in values)
+    return hashlib.blake2b(repr(canonical).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def season_for_date(date: str) -> int:
+    """
+    College basketball season a date belongs to, named by its ending year
+    (e.g. 2025-11-15 and 2026-03-01 are both in the 2026 season).
+    """
+    year, month = int(date[:4]), int(date[5:7])
+    return year + 1 if month >= 7 else year
+
+
+# Connection tuning applied to every connection in WAL mode.
+# synchronous=NORMAL is durable across application crashes in WAL mode,
+# negative cache_size is in KiB, mmap_size lets readers skip read() syscalls.
+WAL_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'cache_size': -32000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+
+# How long a connection waits on a lock before raising "database is locked"
+BUSY_TIMEOUT_SECONDS = 30
+
+# Number of read-only connections kept per database
+READ_POOL_SIZE = 4
+
+
+def _apply_pragmas(conn: sqlite3.Connection, pragmas: Dict):
+    """Apply a dict of PRAGMA settings to a connection."""
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+class ReadConnectionPool:
+    """
+    Small thread-safe pool of read-only SQLite connections.
+    
+    With the database in WAL mode, these readers never block the writer and
+    never see "database is locked" while a scrape is committing.
+    """
+    
+    def __init__(self, db_path: str, size: int = READ_POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new read-only connection."""
+        uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT_SECONDS,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        _apply_pragmas(conn, {k: v for k, v in WAL_PRAGMAS.items() if k != 'synchronous'})
+        return conn
+    
+    def _acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, open a new one, or wait for one to free up."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+        
+        return self._idle.get()
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a read-only connection for the duration of a with-block."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+    
+    def close(self):
+        """Close every connection the pool has opened."""
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all = []
+            self._idle = queue.LifoQueue()
 
 
 class KenPomDB:
     """Database handler for KenPom data."""
     
-    def __init__(self, db_path: str = "kenpom_data.db"):
-        """Initialize database connection."""
+    def __init__(self, db_path: str = "kenpom_data.db", wal: bool = True,
+                 read_only: bool = False, delta: bool = True):
+        """
+        Initialize database connection.
+        
+        Args:
+            db_path: SQLite database file
+            wal: Use WAL journaling so readers and the writer don't block each other
+            read_only: Skip schema creation; for exports and viewers that only
+                       read from an existing database
+            delta: Have ingest_snapshot store only teams whose metrics changed
+                   since the previous snapshot (read full days via rankings_daily)
+        """
         self.db_path = db_path
+        self.wal = wal
+        self.delta = delta
         self.conn = None
-        self._create_tables()
+        self._read_pool: Optional[ReadConnectionPool] = None
+        self._team_ids: Dict[str, int] = {}
+        if not read_only or not self._schema_ready():
+            self._create_tables()
     
     def _get_connection(self):
         """Get or create database connection."""
         if self.conn is None:
-            self.conn = sqlite3.connect(self.db_path)
+            self.conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS)
             self.conn.row_factory = sqlite3.Row
+            if self.wal:
+                self.conn.execute("PRAGMA journal_mode = WAL")
+                _apply_pragmas(self.conn, WAL_PRAGMAS)
         return self.conn
     
+    def _schema_ready(self) -> bool:
+        """Check whether an existing database already has the current schema."""
+        if not os.path.exists(self.db_path):
+            return False
+        with self.read_connection() as conn:
+            found = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master"
+                " WHERE name IN ('rankings_daily', 'compacted_seasons', 'data_generation')"
+            ).fetchone()[0]
+        return found == 3
+    
+    @contextmanager
+    def read_connection(self):
+        """
+        Borrow a pooled read-only connection.
+        
+        Falls back to the main connection when WAL is disabled, since
+        rollback-journal readers would contend with the writer anyway.
+        """
+        if not self.wal:
+            yield self._get_connection()
+            return
+        
+        if self._read_pool is None:
+            self._read_pool = ReadConnectionPool(self.db_path)
+        with self._read_pool.connection() as conn:
+            yield conn
+    
     def _create_tables(self):
         """Create database tables if they don't exist."""
         conn = self._get_connection()
@@ -79,11 +258,146 @@ class KenPomDB:
             )
         """)
         
+        # Latest rankings table - materialized copy of the most recent date's
+        # rows, kept in sync by the insert paths so "current rankings" reads
+        # don't scan the full history
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS latest_rankings (
+                team_id INTEGER PRIMARY KEY,
+                date DATE NOT NULL,
+                rank INTEGER,
+                adj_em REAL,
+                adj_o REAL,
+                adj_d REAL,
+                adj_tempo REAL,
+                luck REAL,
+                sos_adj_em REAL,
+                opp_o REAL,
+                opp_d REAL,
+                ncsos_adj_em REAL,
+                created_at TIMESTAMP,
+                FOREIGN KEY (team_id) REFERENCES teams(id)
+            )
+        """)
+        
+        # Snapshots table - one row per stored day; the calendar that
+        # rankings_daily expands delta-encoded rows over
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                date DATE PRIMARY KEY,
+                team_count INTEGER,
+                rows_written INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Rollups of compacted seasons (see retention.py). Once a season is
+        # compacted its daily rows are gone and these are all that remain.
+        rollup_columns = ',\n                '.join(f"{col} REAL" for col in ROLLUP_COLUMNS)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS rankings_weekly (
+                team_id INTEGER NOT NULL,
+                season INTEGER NOT NULL,
+                week_start DATE NOT NULL,
+                first_date DATE,
+                last_date DATE,
+                days INTEGER,
+                {rollup_columns},
+                FOREIGN KEY (team_id) REFERENCES teams(id),
+                PRIMARY KEY (team_id, week_start)
+            )
+        """)
+        
+        # One row per team per compacted season: season-wide stats plus the
+        # team's ratings as of Selection Sunday
+        selection_columns = ',\n                '.join(
+            f"{col} {'INTEGER' if col == 'rank' else 'REAL'}" for col in RANKING_COLUMNS
+        )
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS rankings_season (
+                team_id INTEGER NOT NULL,
+                season INTEGER NOT NULL,
+                selection_date DATE,
+                first_date DATE,
+                last_date DATE,
+                days INTEGER,
+                {selection_columns},
+                {rollup_columns},
+                FOREIGN KEY (team_id) REFERENCES teams(id),
+                PRIMARY KEY (team_id, season)
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS compacted_seasons (
+                season INTEGER PRIMARY KEY,
+                first_date DATE,
+                last_date DATE,
+                snapshots INTEGER,
+                rows_removed INTEGER,
+                compacted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Single-row write counter, bumped by every transaction that changes
+        # stored data (part of data_version)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS data_generation (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                generation INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO data_generation (id, generation) VALUES (1, 0)")
+        
         # Create indexes for better query performance
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_rankings_date ON rankings(date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_rankings_team_date ON rankings(team_id, date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_date ON games(date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_team ON games(team_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rankings_weekly_season ON rankings_weekly(season, week_start)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rankings_season_season ON rankings_season(season)")
+        
+        # Full daily rankings reconstructed from delta-encoded rows: for each
+        # snapshot date, every team's most recent row on or before that date
+        # (one idx_rankings_team_date seek per team), minus dropped teams.
+        # CROSS JOIN pins the loop order snapshots -> teams -> rankings
+        ranking_select = ', '.join(f"r.{col}" for col in RANKING_COLUMNS)
+        cursor.execute(f"""
+            CREATE VIEW IF NOT EXISTS rankings_daily AS
+            SELECT s.date AS date, t.id AS team_id, {ranking_select},
+                   r.created_at, r.date AS stored_date
+            FROM snapshots s
+            CROSS JOIN teams t
+            CROSS JOIN rankings r ON r.team_id = t.id
+             AND r.date = (SELECT MAX(r2.date) FROM rankings r2
+                           WHERE r2.team_id = t.id AND r2.date <= s.date)
+            WHERE NOT ({TOMBSTONE_CONDITION})
+        """)
+        
+        # Databases created before snapshots existed hold one full row per
+        # team per day: record their dates, and tombstone each team after
+        # its last day in a run so it isn't carried forward
+        if cursor.execute("SELECT 1 FROM snapshots LIMIT 1").fetchone() is None:
+            cursor.execute("""
+                INSERT INTO snapshots (date, team_count, rows_written)
+                SELECT date, COUNT(*), COUNT(*) FROM rankings GROUP BY date
+            """)
+            cursor.execute("""
+                INSERT INTO rankings (team_id, date)
+                SELECT r.team_id, s.next_date
+                FROM rankings r
+                JOIN (SELECT date, LEAD(date) OVER (ORDER BY date) AS next_date
+                      FROM snapshots) s ON s.date = r.date
+                WHERE s.next_date IS NOT NULL
+                  AND NOT EXISTS (SELECT 1 FROM rankings r3
+                                  WHERE r3.team_id = r.team_id AND r3.date = s.next_date)
+            """)
+        
+        # Populate latest_rankings for databases created before it existed
+        if cursor.execute("SELECT 1 FROM latest_rankings LIMIT 1").fetchone() is None:
+            latest_date = cursor.execute("SELECT MAX(date) FROM snapshots").fetchone()[0]
+            if latest_date is not None:
+                self._update_latest(cursor, latest_date)
         
         conn.commit()
     
@@ -101,35 +415,224 @@ class KenPomDB:
         result = cursor.fetchone()
         conn.commit()
         
+        if result:
+            self._team_ids[team_name] = result['id']
         return result['id'] if result else None
     
     def insert_ranking(self, team_id: int, date: str, ranking_data: Dict):
-        """Insert ranking data for a team on a specific date."""
+        """
+        Insert ranking data for a team on a specific date.
+        
+        Always writes a full row. Prefer ingest_snapshot for whole days; it
+        also handles change detection and teams dropping out.
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            INSERT OR REPLACE INTO rankings (
-                team_id, date, rank, adj_em, adj_o, adj_d, adj_tempo,
-                luck, sos_adj_em, opp_o, opp_d, ncsos_adj_em
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            team_id,
-            date,
-            ranking_data.get('rank'),
-            ranking_data.get('adj_em'),
-            ranking_data.get('adj_o'),
-            ranking_data.get('adj_d'),
-            ranking_data.get('adj_tempo'),
-            ranking_data.get('luck'),
-            ranking_data.get('sos_adj_em'),
-            ranking_data.get('opp_o'),
-            ranking_data.get('opp_d'),
-            ranking_data.get('ncsos_adj_em')
-        ))
+        self._check_not_compacted(cursor, date)
+        cursor.execute(self._ranking_upsert_sql(), self._ranking_params(team_id, date, ranking_data))
+        cursor.execute("INSERT OR IGNORE INTO snapshots (date) VALUES (?)", (date,))
+        self._update_latest(cursor, date, team_ids=[team_id])
+        self._bump_generation(cursor)
         
         conn.commit()
     
+    @staticmethod
+    def _bump_generation(cursor):
+        """Advance the write counter, inside the caller's transaction."""
+        cursor.execute("UPDATE data_generation SET generation = generation + 1 WHERE id = 1")
+    
+    @staticmethod
+    def _check_not_compacted(cursor, date: str):
+        """Refuse daily writes into a season that has been rolled up."""
+        season = season_for_date(date)
+        if cursor.execute(
+            "SELECT 1 FROM compacted_seasons WHERE season = ?", (season,)
+        ).fetchone():
+            raise ValueError(
+                f"Season {season} has been compacted into rollups; "
+                f"daily rows for {date} can no longer be stored"
+            )
+    
+    @staticmethod
+    def _ranking_upsert_sql() -> str:
+        """Build the INSERT OR REPLACE statement for one rankings row."""
+        columns = ', '.join(('team_id', 'date') + RANKING_COLUMNS)
+        placeholders = ', '.join('?' * (len(RANKING_COLUMNS) + 2))
+        return f"INSERT OR REPLACE INTO rankings ({columns}) VALUES ({placeholders})"
+    
+    @staticmethod
+    def _ranking_params(team_id: int, date: str, ranking_data: Dict) -> tuple:
+        """Order a ranking dict into the parameter tuple for the upsert statement."""
+        return (team_id, date) + tuple(ranking_data.get(col) for col in RANKING_COLUMNS)
+    
+    def _update_latest(self, cursor, date: str, team_ids: Optional[List[int]] = None):
+        """
+        Keep latest_rankings in step with a write to rankings for `date`.
+        
+        A newer date replaces the table's contents, as does a full rewrite
+        of the current date; passing `team_ids` refreshes just those teams
+        in place; an older date is a backfill and leaves the table alone. Runs inside the caller's
+        transaction so both tables commit together.
+        """
+        current = cursor.execute("SELECT MAX(date) FROM latest_rankings").fetchone()[0]
+        if current is not None and date < current:
+            return
+        
+        if current is None or date > current:
+            team_ids = None
+        if team_ids is None:
+            cursor.execute("DELETE FROM latest_rankings")
+        
+        columns = ', '.join(LATEST_COLUMNS)
+        copy_sql = f"""
+            INSERT OR REPLACE INTO latest_rankings ({columns})
+            SELECT {columns} FROM rankings_daily WHERE date = ?
+        """
+        if team_ids is None:
+            cursor.execute(copy_sql, (date,))
+        else:
+            cursor.executemany(copy_sql + " AND team_id = ?",
+                               [(date, team_id) for team_id in team_ids])
+    
+    def _load_team_ids(self, cursor, team_names: Iterable[str]):
+        """Fill the name -> id cache for any names not already cached."""
+        missing = [name for name in set(team_names) if name not in self._team_ids]
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(
+                f"SELECT id, team_name FROM teams WHERE team_name IN ({placeholders})", chunk
+            )
+            for row in cursor.fetchall():
+                self._team_ids[row['team_name']] = row['id']
+    
+    def _snapshot_metrics(self, cursor, date: str) -> Dict[int, tuple]:
+        """Full reconstructed snapshot for a date as {team_id: metric tuple}."""
+        columns = ', '.join(RANKING_COLUMNS)
+        cursor.execute(f"SELECT team_id, {columns} FROM rankings_daily WHERE date = ?", (date,))
+        return {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+    
+    def _pin_snapshot(self, cursor, date: str) -> Dict[int, tuple]:
+        """
+        Write every team's reconstructed row for `date` explicitly, so the
+        snapshot no longer depends on rows from earlier dates.
+        
+        Returns the pinned metrics, to be passed to _seal_snapshot once
+        the earlier rows have been changed.
+        """
+        pinned = self._snapshot_metrics(cursor, date)
+        cursor.executemany(
+            self._ranking_upsert_sql().replace('OR REPLACE', 'OR IGNORE'),
+            [(team_id, date) + values for team_id, values in pinned.items()]
+        )
+        return pinned
+    
+    def _seal_snapshot(self, cursor, date: str, pinned: Dict[int, tuple]):
+        """
+        Tombstone teams that now show through into a pinned snapshot but
+        were absent from it, so they stay absent there.
+        """
+        leaked = set(self._snapshot_metrics(cursor, date)) - set(pinned)
+        cursor.executemany(
+            "INSERT INTO rankings (team_id, date) VALUES (?, ?)",
+            [(team_id, date) for team_id in leaked]
+        )
+    
+    def ingest_snapshot(self, date: str, rows: List[Dict]) -> Dict:
+        """
+        Store a full daily snapshot in a single transaction.
+        
+        Each row is a scraped team dict with at least 'team_name' plus any of
+        RANKING_COLUMNS (and optionally 'conference'). Teams are inserted if
+        new, IDs are resolved from an in-memory cache, and rankings are
+        written with executemany.
+        
+        In delta mode each team's metric tuple is hashed and compared with
+        the previous snapshot; only changed teams get a row, and teams that
+        dropped out get a tombstone. Re-ingesting a date replaces it, and
+        ingesting an older date first pins the following snapshot so its
+        reconstruction doesn't change.
+        
+        Returns:
+            Dict with 'teams' (teams in the snapshot) and 'rows_written'
+        """
+        rows = [row for row in rows if row.get('team_name')]
+        if not rows:
+            return {'teams': 0, 'rows_written': 0}
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        self._check_not_compacted(cursor, date)
+        
+        new_teams = {}
+        try:
+            # Everything below is committed together as one transaction
+            self._load_team_ids(cursor, (row['team_name'] for row in rows))
+            for row in rows:
+                if row['team_name'] not in self._team_ids:
+                    new_teams.setdefault(row['team_name'], row.get('conference'))
+            if new_teams:
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO teams (team_name, conference) VALUES (?, ?)",
+                    list(new_teams.items())
+                )
+                self._load_team_ids(cursor, new_teams.keys())
+            
+            incoming = {
+                self._team_ids[row['team_name']]: tuple(row.get(col) for col in RANKING_COLUMNS)
+                for row in rows
+            }
+            
+            # Backfill: materialize the next snapshot before touching this
+            # date, so rows written here can't leak into its reconstruction
+            next_date = cursor.execute(
+                "SELECT MIN(date) FROM snapshots WHERE date > ?", (date,)
+            ).fetchone()[0]
+            if next_date is not None:
+                next_snapshot = self._pin_snapshot(cursor, next_date)
+            
+            # Compare against the snapshot before this date
+            previous_date = cursor.execute(
+                "SELECT MAX(date) FROM snapshots WHERE date < ?", (date,)
+            ).fetchone()[0]
+            previous = self._snapshot_metrics(cursor, previous_date) if previous_date else {}
+            previous_hashes = {team_id: metrics_hash(values) for team_id, values in previous.items()}
+            
+            cursor.execute("DELETE FROM rankings WHERE date = ?", (date,))
+            
+            params = [
+                (team_id, date) + values
+                for team_id, values in incoming.items()
+                if not self.delta or previous_hashes.get(team_id) != metrics_hash(values)
+            ]
+            params.extend(
+                (team_id, date) + (None,) * len(RANKING_COLUMNS)
+                for team_id in previous if team_id not in incoming
+            )
+            cursor.executemany(self._ranking_upsert_sql(), params)
+            
+            if next_date is not None:
+                self._seal_snapshot(cursor, next_date, next_snapshot)
+            
+            cursor.execute("""
+                INSERT OR REPLACE INTO snapshots (date, team_count, rows_written)
+                VALUES (?, ?, ?)
+            """, (date, len(incoming), len(params)))
+            self._update_latest(cursor, date)
+            self._bump_generation(cursor)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            # The rolled-back teams rows are gone, so are their cached IDs
+            for team_name in new_teams:
+                self._team_ids.pop(team_name, None)
+            raise
+        
+        return {'teams': len(incoming), 'rows_written': len(params)}
+    
     def insert_game(self, date: str, team_id: int, opponent_name: str,
                    opponent_id: Optional[int] = None, location: Optional[str] = None,
                    predicted_score: Optional[float] = None, actual_score: Optional[int] = None,
@@ -149,29 +652,49 @@ class KenPomDB:
         conn.commit()
     
     def get_latest_rankings(self, limit: int = 50) -> List[Dict]:
-        """Get latest rankings for all teams."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        latest_date = cursor.execute("SELECT MAX(date) FROM rankings").fetchone()[0]
-        
-        cursor.execute("""
-            SELECT t.team_name, t.conference, r.rank, r.adj_em, r.adj_o, r.adj_d,
-                   r.adj_tempo, r.luck, r.date
-            FROM rankings r
-            JOIN teams t ON r.team_id = t.id
-            WHERE r.date = ?
-            ORDER BY r.rank
-            LIMIT ?
-        """, (latest_date, limit))
+        """Get latest rankings for all teams (served from latest_rankings)."""
+        with self.read_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT t.team_name, t.conference, r.rank, r.adj_em, r.adj_o, r.adj_d,
+                       r.adj_tempo, r.luck, r.date
+                FROM latest_rankings r
+                JOIN teams t ON r.team_id = t.id
+                ORDER BY r.rank
+                LIMIT ?
+            """, (limit,))
+            
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def data_version(self) -> str:
+        """
+        Opaque version string that changes whenever stored rankings change.
         
-        return [dict(row) for row in cursor.fetchall()]
+        Built from the rankings AUTOINCREMENT counter (advanced by every row
+        written, never rolled back by deletes), the number of compacted
+        seasons and stored snapshots, and the data_generation counter that
+        each ingest, insert_ranking and compaction bumps. The counter is
+        what catches writes that add no ranking rows: a new date whose
+        metrics all match the previous day, or a rerun that only deletes.
+        """
+        with self.read_connection() as conn:
+            row = conn.execute("""
+                SELECT (SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'rankings'),
+                       (SELECT COUNT(*) FROM compacted_seasons),
+                       (SELECT COUNT(*) FROM snapshots),
+                       (SELECT COALESCE(MAX(generation), 0) FROM data_generation)
+            """).fetchone()
+        return '.'.join(str(value) for value in row)
     
     def close(self):
         """Close database connection."""
         if self.conn:
             self.conn.close()
             self.conn = None
+        if self._read_pool:
+            self._read_pool.close()
+            self._read_pool = None
 
 
 
@@ -6,6 +6,11 @@ import pandas as pd
 from database import KenPomDB
 from datetime import datetime
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import tracing
 
 
 def export_to_csv(output_file='kenpom_tableau.csv', latest_only=True):
@@ -17,12 +22,12 @@ def export_to_csv(output_file='kenpom_tableau.csv', latest_only=True):
         latest_only: If True, only export the most recent date's data (one row per team).
                      If False, export all historical data.
     """
-    db = KenPomDB()
-    conn = db._get_connection()
+    db = KenPomDB(read_only=True)
     
     try:
         if latest_only:
-            # Export only the latest date's data (one row per team)
+            # Export only the latest date's data (one row per team),
+            # read from the materialized latest_rankings table
             query = """
                 SELECT 
                     r.date,
@@ -39,13 +44,12 @@ def export_to_csv(output_file='kenpom_tableau.csv', latest_only=True):
                     r.opp_d,
                     r.ncsos_adj_em,
                     r.created_at
-                FROM rankings r
+                FROM latest_rankings r
                 JOIN teams t ON r.team_id = t.id
-                WHERE r.date = (SELECT MAX(date) FROM rankings)
                 ORDER BY r.rank ASC
             """
         else:
-            # Export all historical data
+            # Export all historical data (full days rebuilt from delta-encoded rows)
             query = """
                 SELECT 
                     r.date,
@@ -62,13 +66,15 @@ def export_to_csv(output_file='kenpom_tableau.csv', latest_only=True):
                     r.opp_d,
                     r.ncsos_adj_em,
                     r.created_at
-                FROM rankings r
+                FROM rankings_daily r
                 JOIN teams t ON r.team_id = t.id
                 ORDER BY r.date DESC, r.rank ASC
             """
         
-        # Read into pandas DataFrame
-        df = pd.read_sql_query(query, conn)
+        # Read into pandas DataFrame (pooled read-only connection, doesn't block the scraper)
+        with tracing.span("db.read", source="kenpom", latest_only=latest_only) as s, db.read_connection() as conn:
+            df = pd.read_sql_query(query, conn)
+            s.set(rows=len(df))
         
         # Convert date column to datetime
         df['date'] = pd.to_datetime(df['date'])
@@ -79,7 +85,9 @@ def export_to_csv(output_file='kenpom_tableau.csv', latest_only=True):
         df['day'] = df['date'].dt.day
         
         # Export to CSV
-        df.to_csv(output_file, index=False)
+        with tracing.span("export.csv", source="kenpom", path=output_file, rows=len(df)) as s:
+            df.to_csv(output_file, index=False)
+            s.set(bytes=tracing.file_size(output_file))
         
         if latest_only:
             print(f"[SUCCESS] Exported {len(df)} records (latest date only) to {output_file}")
@@ -102,8 +110,7 @@ def export_to_csv(output_file='kenpom_tableau.csv', latest_only=True):
 
 def export_to_excel(output_file='kenpom_tableau.xlsx'):
     """Export data to Excel with multiple sheets for Tableau."""
-    db = KenPomDB()
-    conn = db._get_connection()
+    db = KenPomDB(read_only=True)
     
     try:
         # Main rankings data
@@ -122,7 +129,7 @@ def export_to_excel(output_file='kenpom_tableau.xlsx'):
                 r.opp_o,
                 r.opp_d,
                 r.ncsos_adj_em
-            FROM rankings r
+            FROM rankings_daily r
             JOIN teams t ON r.team_id = t.id
             ORDER BY r.date DESC, r.rank ASC
         """
@@ -143,9 +150,8 @@ def export_to_excel(output_file='kenpom_tableau.xlsx'):
                 r.opp_d,
                 r.ncsos_adj_em,
                 r.date
-            FROM rankings r
+            FROM latest_rankings r
             JOIN teams t ON r.team_id = t.id
-            WHERE r.date = (SELECT MAX(date) FROM rankings)
             ORDER BY r.rank ASC
         """
         
@@ -161,9 +167,10 @@ def export_to_excel(output_file='kenpom_tableau.xlsx'):
         """
         
         # Read queries into DataFrames
-        df_latest = pd.read_sql_query(latest_query, conn)
-        df_all = pd.read_sql_query(all_rankings_query, conn)
-        df_teams = pd.read_sql_query(teams_query, conn)
+        with db.read_connection() as conn:
+            df_latest = pd.read_sql_query(latest_query, conn)
+            df_all = pd.read_sql_query(rankings_query, conn)
+            df_teams = pd.read_sql_query(teams_query, conn)
         
         # Convert dates
         df_latest['date'] = pd.to_datetime(df_latest['date'])
@@ -4,9 +4,13 @@ Can be run manually or scheduled for daily execution.
 """
 import sys
 from datetime import datetime
+from pathlib import Path
 from scraper_playwright import KenPomScraperPlaywright
 from database import KenPomDB
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import tracing
+
 
 def format_value(value, default='N/A'):
     """Format a value for display, handling None."""
@@ -15,6 +19,7 @@ def format_value(value, default='N/A'):
     return value
 
 
+@tracing.traced("scrape_and_store", source="kenpom")
 def scrape_and_store():
     """Main function to scrape KenPom data and store in database."""
     print("=" * 60)
@@ -40,42 +45,16 @@ def scrape_and_store():
         print("\n[2/3] Storing data in database...")
         today = datetime.now().strftime('%Y-%m-%d')
         
-        stored_count = 0
-        for team_data in rankings_data:
-            try:
-                # Insert or get team
-                team_id = db.insert_team(
-                    team_name=team_data.get('team_name'),
-                    conference=team_data.get('conference')
-                )
-                
-                if not team_id:
-                    print(f"Warning: Could not get team_id for {team_data.get('team_name')}")
-                    continue
-                
-                # Prepare ranking data
-                ranking_data = {
-                    'rank': team_data.get('rank'),
-                    'adj_em': team_data.get('adj_em'),
-                    'adj_o': team_data.get('adj_o'),
-                    'adj_d': team_data.get('adj_d'),
-                    'adj_tempo': team_data.get('adj_tempo'),
-                    'luck': team_data.get('luck'),
-                    'sos_adj_em': team_data.get('sos_adj_em'),
-                    'opp_o': team_data.get('opp_o'),
-                    'opp_d': team_data.get('opp_d'),
-                    'ncsos_adj_em': team_data.get('ncsos_adj_em')
-                }
-                
-                # Insert ranking
-                db.insert_ranking(team_id, today, ranking_data)
-                stored_count += 1
-                
-            except Exception as e:
-                print(f"Error storing data for {team_data.get('team_name', 'unknown')}: {e}")
-                continue
+        with tracing.span("db.write", source="kenpom", rows=len(rankings_data)) as s:
+            result = db.ingest_snapshot(today, rankings_data)
+            s.set(rows_written=result['rows_written'])
+        stored_count = result['teams']
+        skipped = len(rankings_data) - stored_count
+        if skipped:
+            print(f"Warning: Skipped {skipped} rows without a team name")
         
-        print(f"Successfully stored {stored_count} team rankings")
+        print(f"Successfully stored {stored_count} team rankings "
+              f"({result['rows_written']} rows changed since the previous snapshot)")
         
         # Display summary
         print("\n[3/3] Summary:")
@@ -114,7 +93,7 @@ def scrape_and_store():
 
 def view_data():
     """View stored data from database."""
-    db = KenPomDB()
+    db = KenPomDB(read_only=True)
     
     try:
         print("\nLatest KenPom Rankings:")
@@ -0,0 +1,261 @@
+"""
+Time-series queries over the KenPom rankings history.
+Each query is a single indexed SQL pass (window functions over the
+rankings_daily view) so callers never load the whole table into pandas.
+Seasons compacted by retention.py are only available through the weekly
+and season rollup queries.
+"""
+import sys
+from typing import List, Dict, Optional, Sequence
+from database import KenPomDB, RANKING_COLUMNS, ROLLUP_STATS
+from retention import weekly_rollup_query
+
+
+# Metrics returned for a team trajectory
+TRAJECTORY_METRICS = ('rank', 'adj_em', 'adj_o', 'adj_d', 'adj_tempo')
+
+
+def _check_metrics(metrics: Sequence[str]) -> List[str]:
+    """Validate metric names before they are interpolated into SQL."""
+    unknown = [m for m in metrics if m not in RANKING_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown metric(s): {', '.join(unknown)}")
+    return list(metrics)
+
+
+class RankingsHistory:
+    """Read-only query API over the rankings history in a KenPomDB."""
+    
+    def __init__(self, db: Optional[KenPomDB] = None):
+        """Wrap an existing KenPomDB, or open the default database read-only."""
+        self.db = db if db is not None else KenPomDB(read_only=True)
+    
+    def _fetch(self, sql: str, params: tuple = ()) -> List[Dict]:
+        """Run a query on a pooled read connection and return dict rows."""
+        with self.db.read_connection() as conn:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+    
+    def latest_date(self) -> Optional[str]:
+        """Most recent snapshot date stored."""
+        rows = self._fetch("SELECT MAX(date) AS date FROM latest_rankings")
+        return rows[0]['date'] if rows else None
+    
+    def team_trajectory(self, team_name: str, start_date: Optional[str] = None,
+                        end_date: Optional[str] = None,
+                        metrics: Sequence[str] = TRAJECTORY_METRICS) -> List[Dict]:
+        """
+        One team's daily metrics between two dates, oldest first.
+        
+        Each row also carries `<metric>_change`, the change since the
+        previous stored day for that team.
+        """
+        metrics = _check_metrics(metrics)
+        select = ',\n                   '.join(
+            f"r.{m}, r.{m} - LAG(r.{m}) OVER (ORDER BY r.date) AS {m}_change"
+            for m in metrics
+        )
+        sql = f"""
+            SELECT r.date,
+                   {select}
+            FROM rankings_daily r
+            WHERE r.team_id = (SELECT id FROM teams WHERE team_name = ?)
+              AND r.date >= COALESCE(?, '0000-00-00')
+              AND r.date <= COALESCE(?, '9999-12-31')
+            ORDER BY r.date
+        """
+        return self._fetch(sql, (team_name, start_date, end_date))
+    
+    def snapshot_as_of(self, date: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Rankings as they stood on `date`: the most recent snapshot on or
+        before that date, ordered by rank.
+        """
+        columns = ', '.join(f"r.{c}" for c in RANKING_COLUMNS)
+        sql = f"""
+            SELECT t.team_name, t.conference, r.date, {columns}
+            FROM rankings_daily r
+            JOIN teams t ON r.team_id = t.id
+            WHERE r.date = (SELECT MAX(date) FROM snapshots WHERE date <= ?)
+            ORDER BY r.rank
+            LIMIT ?
+        """
+        return self._fetch(sql, (date, -1 if limit is None else limit))
+    
+    def rolling_averages(self, team_name: str, window_days: int = 7,
+                         start_date: Optional[str] = None, end_date: Optional[str] = None,
+                         metrics: Sequence[str] = TRAJECTORY_METRICS) -> List[Dict]:
+        """
+        Trailing N-calendar-day averages of a team's metrics.
+        
+        The window is measured in days, not rows, so missed scrape days
+        shrink the sample instead of stretching the window.
+        """
+        metrics = _check_metrics(metrics)
+        window_days = int(window_days)
+        if window_days < 1:
+            raise ValueError("window_days must be at least 1")
+        
+        window = f"(ORDER BY julianday(r.date) RANGE BETWEEN {window_days - 1} PRECEDING AND CURRENT ROW)"
+        select = ',\n                       '.join(
+            f"r.{m}, AVG(r.{m}) OVER {window} AS {m}_avg_{window_days}d" for m in metrics
+        )
+        # Window over the full team history so the first rows in range
+        # still average over days before start_date
+        sql = f"""
+            SELECT * FROM (
+                SELECT r.date,
+                       COUNT(*) OVER {window} AS days_in_window,
+                       {select}
+                FROM rankings_daily r
+                WHERE r.team_id = (SELECT id FROM teams WHERE team_name = ?)
+                  AND r.date <= COALESCE(?, '9999-12-31')
+            )
+            WHERE date >= COALESCE(?, '0000-00-00')
+            ORDER BY date
+        """
+        return self._fetch(sql, (team_name, end_date, start_date))
+    
+    def biggest_movers(self, date: Optional[str] = None, days: int = 1,
+                       metric: str = 'adj_em', limit: int = 10) -> List[Dict]:
+        """
+        Teams whose `metric` moved the most between `date - days` and `date`.
+        
+        Use days=1 for daily movers and days=7 for weekly. Both ends are
+        as-of snapshots, so gaps in the scrape history are tolerated.
+        Results are ordered by absolute change, largest first.
+        """
+        metric = _check_metrics([metric])[0]
+        date = date or self.latest_date()
+        if date is None:
+            return []
+        
+        sql = f"""
+            SELECT t.team_name, t.conference,
+                   prev.date AS previous_date, cur.date AS date,
+                   prev.{metric} AS previous, cur.{metric} AS current,
+                   cur.{metric} - prev.{metric} AS change
+            FROM rankings_daily cur
+            JOIN rankings_daily prev ON prev.team_id = cur.team_id
+             AND prev.date = (SELECT MAX(date) FROM snapshots
+                              WHERE date <= date(:date, :offset))
+            JOIN teams t ON t.id = cur.team_id
+            WHERE cur.date = (SELECT MAX(date) FROM snapshots WHERE date <= :date)
+              AND cur.{metric} IS NOT NULL AND prev.{metric} IS NOT NULL
+            ORDER BY ABS(change) DESC
+            LIMIT :limit
+        """
+        with self.db.read_connection() as conn:
+            rows = conn.execute(sql, {
+                'date': date,
+                'offset': f"-{int(days)} days",
+                'limit': limit,
+            }).fetchall()
+        return [dict(row) for row in rows]
+    
+    def team_weekly(self, team_name: str, start_date: Optional[str] = None,
+                    end_date: Optional[str] = None,
+                    metrics: Sequence[str] = TRAJECTORY_METRICS) -> List[Dict]:
+        """
+        One team's weekly min/max/mean per metric, oldest first.
+        
+        Compacted seasons come straight from rankings_weekly; weeks still
+        held at daily resolution are aggregated on the fly. Dates filter
+        on the Monday each week starts.
+        """
+        metrics = _check_metrics(metrics)
+        columns = ', '.join(f"{m}_{stat}" for m in metrics for stat in ROLLUP_STATS)
+        team_filter = "team_id = (SELECT id FROM teams WHERE team_name = :team)"
+        sql = f"""
+            SELECT week_start, first_date, last_date, days, {columns}
+            FROM (
+                SELECT week_start, first_date, last_date, days, {columns}
+                FROM rankings_weekly
+                WHERE {team_filter}
+                UNION ALL
+                SELECT week_start, first_date, last_date, days, {columns}
+                FROM ({weekly_rollup_query('r.' + team_filter)})
+            )
+            WHERE week_start >= COALESCE(:start, '0000-00-00')
+              AND week_start <= COALESCE(:end, '9999-12-31')
+            ORDER BY week_start
+        """
+        with self.db.read_connection() as conn:
+            rows = conn.execute(sql, {'team': team_name, 'start': start_date, 'end': end_date})
+            return [dict(row) for row in rows.fetchall()]
+    
+    def season_summary(self, season: int, limit: Optional[int] = None,
+                       metrics: Sequence[str] = TRAJECTORY_METRICS) -> List[Dict]:
+        """
+        A compacted season's Selection Sunday ratings with season-long
+        min/max/mean, ordered by Selection Sunday rank.
+        """
+        metrics = _check_metrics(metrics)
+        selection = ', '.join(f"s.{m}" for m in metrics)
+        stats = ', '.join(f"s.{m}_{stat}" for m in metrics for stat in ROLLUP_STATS)
+        sql = f"""
+            SELECT t.team_name, t.conference, s.selection_date, s.days,
+                   {selection}, {stats}
+            FROM rankings_season s
+            JOIN teams t ON s.team_id = t.id
+            WHERE s.season = ?
+            ORDER BY s.rank IS NULL, s.rank
+            LIMIT ?
+        """
+        return self._fetch(sql, (int(season), -1 if limit is None else limit))
+    
+    def close(self):
+        """Close the underlying database."""
+        self.db.close()
+
+
+def print_rows(rows: List[Dict]):
+    """Print query results as a simple aligned table."""
+    if not rows:
+        print("No data found.")
+        return
+    
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(f"{r[c]}") for r in rows)) for c in columns}
+    print("  ".join(f"{c:<{widths[c]}}" for c in columns))
+    print("-" * (sum(widths.values()) + 2 * (len(columns) - 1)))
+    for row in rows:
+        print("  ".join(f"{row[c]!s:<{widths[c]}}" for c in columns))
+
+
+if __name__ == "__main__":
+    usage = """Usage: python query_data.py <command> [args]
+  team <team_name> [start_date] [end_date]   Daily trajectory for one team
+  asof <date>                                Rankings as of a date
+  rolling <team_name> [days]                 Trailing N-day averages (default 7)
+  movers [days] [metric]                     Biggest movers (default 1 day, adj_em)
+  weekly <team_name> [start_date] [end_date] Weekly min/max/mean for one team
+  season <season>                            Selection Sunday summary of a compacted season"""
+    
+    if len(sys.argv) < 2:
+        print(usage)
+        sys.exit(1)
+    
+    history = RankingsHistory()
+    command, args = sys.argv[1].lower(), sys.argv[2:]
+    
+    try:
+        if command == "team" and args:
+            print_rows(history.team_trajectory(*args[:3]))
+        elif command == "asof" and args:
+            print_rows(history.snapshot_as_of(args[0]))
+        elif command == "rolling" and args:
+            days = int(args[1]) if len(args) > 1 else 7
+            print_rows(history.rolling_averages(args[0], window_days=days))
+        elif command == "movers":
+            days = int(args[0]) if args else 1
+            metric = args[1] if len(args) > 1 else 'adj_em'
+            print_rows(history.biggest_movers(days=days, metric=metric))
+        elif command == "weekly" and args:
+            print_rows(history.team_weekly(*args[:3]))
+        elif command == "season" and args:
+            print_rows(history.season_summary(int(args[0])))
+        else:
+            print(usage)
+            sys.exit(1)
+    finally:
+        history.close()
@@ -0,0 +1,255 @@
+"""
+Tiered retention for the KenPom rankings history.
+The current season keeps full daily resolution. Past seasons are rolled
+into rankings_weekly and rankings_season (min/max/mean per metric, plus
+each team's ratings as of Selection Sunday) and their daily rows are
+dropped, so the rankings table stays about one season deep.
+
+Daily detail for compacted seasons remains in the Parquet archive
+(archive.py): a season is only compacted once the archive holds every one
+of its snapshot dates, otherwise it is skipped and its daily rows stay.
+"""
+import sys
+from datetime import date as Date, timedelta
+from typing import List, Dict, Optional, Set
+
+from database import KenPomDB, RANKING_COLUMNS, ROLLUP_COLUMNS
+
+
+# SQL expression for season_for_date() over a `date` column
+SEASON_SQL = ("CAST(strftime('%Y', {col}) AS INTEGER)"
+              " + (CAST(strftime('%m', {col}) AS INTEGER) >= 7)")
+
+# SQL expression for the Monday starting the week of a `date` column
+WEEK_START_SQL = "date({col}, '-6 days', 'weekday 1')"
+
+
+def selection_sunday(season: int) -> str:
+    """
+    Selection Sunday of a season (by ending year): the Sunday falling
+    between March 11 and March 17.
+    """
+    day = Date(season, 3, 11)
+    return (day + timedelta(days=(6 - day.weekday()) % 7)).isoformat()
+
+
+def _rollup_select(source: str = 'r') -> str:
+    """MIN/MAX/AVG select list matching ROLLUP_COLUMNS."""
+    functions = {'min': 'MIN', 'max': 'MAX', 'mean': 'AVG'}
+    return ', '.join(
+        f"{functions[name.rsplit('_', 1)[1]]}({source}.{name.rsplit('_', 1)[0]}) AS {name}"
+        for name in ROLLUP_COLUMNS
+    )
+
+
+def weekly_rollup_query(where: str) -> str:
+    """
+    SELECT producing rankings_weekly rows (minus season) from rankings_daily
+    rows matching `where`.
+    """
+    week = WEEK_START_SQL.format(col='r.date')
+    return f"""
+        SELECT r.team_id, {week} AS week_start,
+               MIN(r.date) AS first_date, MAX(r.date) AS last_date,
+               COUNT(*) AS days, {_rollup_select()}
+        FROM rankings_daily r
+        WHERE {where}
+        GROUP BY r.team_id, week_start
+    """
+
+
+class RankingsRetention:
+    """Compacts past seasons of a KenPomDB into weekly and season rollups."""
+    
+    def __init__(self, db: Optional[KenPomDB] = None, keep_seasons: int = 1,
+                 archive_root: Optional[str] = None, require_archive: bool = True):
+        """
+        Args:
+            db: Database to compact (default: open kenpom_data.db)
+            keep_seasons: Most recent seasons kept at daily resolution
+            archive_root: Parquet archive checked before compacting
+                          (default: archive.DEFAULT_ARCHIVE_DIR)
+            require_archive: Only compact seasons whose every snapshot date
+                             is in the archive
+        """
+        if keep_seasons < 1:
+            raise ValueError("keep_seasons must be at least 1")
+        self.db = db if db is not None else KenPomDB()
+        self.keep_seasons = keep_seasons
+        self.archive_root = archive_root
+        self.require_archive = require_archive
+    
+    def archived_dates(self) -> Optional[Set[str]]:
+        """Dates in the Parquet archive, or None if it can't be read (e.g. no pyarrow)."""
+        try:
+            from archive import DEFAULT_ARCHIVE_DIR, RankingsArchive
+        except ImportError as e:
+            print(f"Warning: Cannot check the Parquet archive: {e}")
+            return None
+        return RankingsArchive(self.archive_root or DEFAULT_ARCHIVE_DIR).archived_dates()
+    
+    def unarchived_dates(self, season: int) -> Optional[List[str]]:
+        """
+        A season's snapshot dates missing from the archive (empty when it is
+        fully archived), or None if the archive can't be read.
+        """
+        archived = self.archived_dates()
+        if archived is None:
+            return None
+        with self.db.read_connection() as conn:
+            dates = [row[0] for row in conn.execute(
+                f"SELECT date FROM snapshots WHERE {SEASON_SQL.format(col='date')} = ? ORDER BY date",
+                (season,)
+            )]
+        return [date for date in dates if date not in archived]
+    
+    def pending_seasons(self) -> List[int]:
+        """Seasons old enough to compact that still hold daily rows, oldest first."""
+        season = SEASON_SQL.format(col='date')
+        with self.db.read_connection() as conn:
+            seasons = [row[0] for row in conn.execute(
+                f"SELECT DISTINCT {season} FROM snapshots ORDER BY 1"
+            )]
+        if not seasons:
+            return []
+        cutoff = seasons[-1] - self.keep_seasons + 1
+        return [s for s in seasons if s < cutoff]
+    
+    def compact_season(self, season: int) -> Dict:
+        """
+        Roll one season into rankings_weekly and rankings_season, then drop
+        its daily rows and snapshots, all in one transaction.
+        
+        The snapshot after the season is pinned first, so reconstruction of
+        later days doesn't depend on anything being removed.
+        
+        Unless require_archive is off, a season with snapshot dates missing
+        from the Parquet archive is left alone, since its daily rows would
+        otherwise be gone for good.
+        
+        Returns:
+            Dict with 'season', 'snapshots', 'weeks', 'rows_removed' and
+            'skipped' (why nothing was removed, or None)
+        """
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        
+        first_date, last_date, snapshot_count = cursor.execute(
+            f"SELECT MIN(date), MAX(date), COUNT(*) FROM snapshots WHERE {SEASON_SQL.format(col='date')} = ?",
+            (season,)
+        ).fetchone()
+        if not snapshot_count:
+            return {'season': season, 'snapshots': 0, 'weeks': 0, 'rows_removed': 0, 'skipped': None}
+        
+        if self.require_archive:
+            missing = self.unarchived_dates(season)
+            if missing is None:
+                skipped = "Parquet archive unavailable"
+            elif missing:
+                skipped = f"{len(missing)} of {snapshot_count} snapshot dates not archived (first {missing[0]})"
+            else:
+                skipped = None
+            if skipped:
+                print(f"Warning: Not compacting season {season}: {skipped}")
+                return {'season': season, 'snapshots': 0, 'weeks': 0, 'rows_removed': 0,
+                        'skipped': skipped}
+        
+        try:
+            cursor.execute(f"""
+                INSERT OR REPLACE INTO rankings_weekly
+                    (team_id, week_start, first_date, last_date, days, {', '.join(ROLLUP_COLUMNS)}, season)
+                SELECT *, ? FROM ({weekly_rollup_query('r.date BETWEEN ? AND ?')})
+            """, (season, first_date, last_date))
+            weeks = cursor.execute(
+                "SELECT COUNT(DISTINCT week_start) FROM rankings_weekly WHERE season = ?", (season,)
+            ).fetchone()[0]
+            
+            # Latest snapshot on or before Selection Sunday (None if the
+            # season's data starts after it)
+            selection_date = cursor.execute(
+                "SELECT MAX(date) FROM snapshots WHERE date BETWEEN ? AND ?",
+                (first_date, min(last_date, selection_sunday(season)))
+            ).fetchone()[0]
+            selection_select = ', '.join(f"sel.{col}" for col in RANKING_COLUMNS)
+            cursor.execute(f"""
+                INSERT OR REPLACE INTO rankings_season
+                    (team_id, season, selection_date, first_date, last_date, days,
+                     {', '.join(ROLLUP_COLUMNS)}, {', '.join(RANKING_COLUMNS)})
+                SELECT agg.*, {selection_select}
+                FROM (
+                    SELECT r.team_id, ?, ?, MIN(r.date), MAX(r.date), COUNT(*),
+                           {_rollup_select()}
+                    FROM rankings_daily r
+                    WHERE r.date BETWEEN ? AND ?
+                    GROUP BY r.team_id
+                ) agg
+                LEFT JOIN rankings_daily sel ON sel.team_id = agg.team_id AND sel.date = ?
+            """, (season, selection_date, first_date, last_date, selection_date))
+            
+            next_date = cursor.execute(
+                "SELECT MIN(date) FROM snapshots WHERE date > ?", (last_date,)
+            ).fetchone()[0]
+            if next_date is not None:
+                pinned = self.db._pin_snapshot(cursor, next_date)
+            
+            rows_removed = cursor.execute(
+                "DELETE FROM rankings WHERE date BETWEEN ? AND ?", (first_date, last_date)
+            ).rowcount
+            cursor.execute("DELETE FROM snapshots WHERE date BETWEEN ? AND ?", (first_date, last_date))
+            
+            if next_date is not None:
+                self.db._seal_snapshot(cursor, next_date, pinned)
+            
+            cursor.execute("""
+                INSERT OR REPLACE INTO compacted_seasons
+                    (season, first_date, last_date, snapshots, rows_removed)
+                VALUES (?, ?, ?, ?, ?)
+            """, (season, first_date, last_date, snapshot_count, rows_removed))
+            self.db._bump_generation(cursor)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        return {'season': season, 'snapshots': snapshot_count, 'weeks': weeks,
+                'rows_removed': rows_removed, 'skipped': None}
+    
+    def compact(self, max_seasons: Optional[int] = 1) -> List[Dict]:
+        """
+        Compact pending seasons, oldest first.
+        
+        Each season is its own transaction, and at most `max_seasons` are
+        handled per call (None for all), so a scheduled run does a bounded
+        amount of work and a backlog drains over successive runs.
+        """
+        pending = self.pending_seasons()
+        if max_seasons is not None:
+            pending = pending[:max_seasons]
+        return [self.compact_season(season) for season in pending]
+    
+    def close(self):
+        """Close the underlying database."""
+        self.db.close()
+
+
+def compact_rankings(max_seasons: Optional[int] = 1, keep_seasons: int = 1) -> List[Dict]:
+    """Open the default database, compact pending seasons and close it."""
+    retention = RankingsRetention(keep_seasons=keep_seasons)
+    try:
+        return retention.compact(max_seasons=max_seasons)
+    finally:
+        retention.close()
+
+
+if __name__ == "__main__":
+    # python retention.py [all]  - compact one pending season, or all of them
+    max_seasons = None if len(sys.argv) > 1 and sys.argv[1] == "all" else 1
+    results = compact_rankings(max_seasons=max_seasons)
+    if not results:
+        print("No past seasons left to compact.")
+    for result in results:
+        if result['skipped']:
+            print(f"[SKIPPED] Season {result['season']}: {result['skipped']}")
+            continue
+        print(f"[SUCCESS] Compacted season {result['season']}: {result['snapshots']} daily "
+              f"snapshots -> {result['weeks']} weeks, {result['rows_removed']} rows removed")
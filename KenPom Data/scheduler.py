@@ -6,12 +6,16 @@ import schedule
 import time
 import sys
 import importlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import browser_pool, run_history, tracing
 
 # Force fresh imports to avoid cached module issues
 # This ensures the scheduler always uses the latest scraper code
 def reload_modules():
     """Reload modules to ensure latest code is used."""
-    modules_to_reload = ['scraper', 'main', 'scrape_and_export']
+    modules_to_reload = ['scraper', 'main', 'scrape_and_export', 'retention']
     for module_name in modules_to_reload:
         if module_name in sys.modules:
             importlib.reload(sys.modules[module_name])
@@ -19,6 +23,42 @@ def reload_modules():
 from scrape_and_export import scrape_and_export_tableau
 
 
+def run_compaction():
+    """
+    Roll at most one past season into weekly/season rollups.
+    Runs after the export (and its Parquet archive step) so daily rows
+    are archived before they are dropped; a season the archive doesn't
+    fully cover is skipped. A backlog of old seasons drains one per run.
+    """
+    try:
+        from retention import compact_rankings
+        with tracing.span("retention.compact", source="kenpom") as s:
+            results = compact_rankings(max_seasons=1)
+            s.set(seasons=sum(not r['skipped'] for r in results),
+                  skipped=sum(bool(r['skipped']) for r in results))
+        for result in results:
+            if result['skipped']:
+                print(f"Skipped compacting season {result['season']}: {result['skipped']}")
+                continue
+            print(f"Compacted season {result['season']}: {result['snapshots']} daily snapshots "
+                  f"-> {result['weeks']} weeks ({result['rows_removed']} rows removed)")
+    except Exception as e:
+        print(f"Warning: Rankings compaction failed: {e}")
+
+
+def run_pipeline():
+    """
+    One scheduled run: scrape, export, then compact. Recorded in the run
+    history as a single 'kenpom' run (scrape_and_export_tableau joins it).
+    The shared browser is closed afterwards rather than idling until the
+    next day's run.
+    """
+    with run_history.record_run("kenpom"), browser_pool.session():
+        from scrape_and_export import scrape_and_export_tableau
+        scrape_and_export_tableau(export_format='csv')
+        run_compaction()
+
+
 def run_daily():
     """Run the scraper and exporter daily at a specified time."""
     # Schedule to run daily at 2:00 AM (adjust as needed)
@@ -26,8 +66,7 @@ def run_daily():
     # Reload modules before each scheduled run to ensure latest code
     def scheduled_scrape():
         reload_modules()
-        from scrape_and_export import scrape_and_export_tableau
-        scrape_and_export_tableau(export_format='csv')
+        run_pipeline()
     
     schedule.every().day.at("02:00").do(scheduled_scrape)
     
@@ -48,11 +87,10 @@ def run_daily():
 if __name__ == "__main__":
     # Reload modules to ensure we're using latest code
     reload_modules()
-    from scrape_and_export import scrape_and_export_tableau
     
     # You can also run immediately on start
     print("Running initial scrape and export...")
-    scrape_and_export_tableau(export_format='csv')
+    run_pipeline()
     
     print("\nStarting daily scheduler...")
     run_daily()
@@ -5,9 +5,13 @@ This is the recommended script for daily automation.
 import sys
 import os
 from datetime import datetime
+from pathlib import Path
 from main import scrape_and_store
 from export_to_tableau import export_to_csv, export_to_excel
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import run_history, tracing
+
 def log_message(message):
     """Log a message to both console and log file."""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -23,6 +27,8 @@ def log_message(message):
         print(f"Warning: Could not write to log file: {e}")
 
 
+@run_history.recorded("kenpom")
+@tracing.traced("run", source="kenpom")
 def scrape_and_export_tableau(export_format='csv'):
     """
     Scrape KenPom data and export to Tableau format in one operation.
@@ -58,6 +64,17 @@ def scrape_and_export_tableau(export_format='csv'):
             log_message(f"Unknown format: {export_format}. Using CSV.")
             export_to_csv(latest_only=True)  # Only latest date
         
+        # Keep the Parquet history archive in step (best effort - the CSV is
+        # what Tableau reads, so an archive failure shouldn't fail the run)
+        try:
+            from archive import archive_new_snapshots
+            with tracing.span("export.parquet") as s:
+                archived = archive_new_snapshots()
+                s.set(snapshots=archived)
+            log_message(f"Archived {archived} daily snapshot(s) to Parquet")
+        except Exception as e:
+            log_message(f"Warning: Parquet archive update failed: {e}")
+        
         log_message("=" * 60)
         log_message("SUCCESS: Data scraped and exported to Tableau!")
         log_message("=" * 60)
@@ -1,32 +1,35 @@
 """
 Scraper for Past National Champions from KenPom.com
 Scrapes historical data for NCAA tournament champions and exports to CSV.
+
+KenPom blocks plain HTTP clients, so the session is established once in
+the shared browser and its cookies reused for every season page over HTTP
+(shared/hybrid_session.py); the browser is only used again if challenged.
 """
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import re
+import sys
 from datetime import datetime
+from pathlib import Path
 from typing import List, Dict, Optional
-import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import browser_pool, tracing
+from shared.hybrid_session import HybridSession
 
 
 class ChampionsScraper:
     """Scraper for KenPom historical champions data."""
     
     def __init__(self):
-        """Initialize scraper with headers to mimic browser."""
+        """Initialize scraper with a browser-established HTTP session."""
         self.base_url = "https://kenpom.com"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Referer': 'https://kenpom.com/',
-        })
+        self.session = HybridSession(
+            "kenpom", f"{self.base_url}/",
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        )
     
     def _parse_number(self, text: str) -> Optional[float]:
         """Parse number from text, handling various formats."""
@@ -44,6 +47,7 @@ class ChampionsScraper:
         except ValueError:
             return None
     
+    @tracing.traced("scrape_year", source="kenpom")
     def scrape_year(self, year: int) -> Dict:
         """
         Scrape KenPom data for a specific year.
@@ -53,10 +57,10 @@ class ChampionsScraper:
         
         try:
             print(f"Fetching data for {year} season from {url}...")
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
+            html = self.session.get(url)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            with tracing.span("parse", year=year):
+                soup = BeautifulSoup(html, 'html.parser')
             
             # Find the ratings table
             table = soup.find('table', {'id': 'ratings-table'})
@@ -156,21 +160,28 @@ class ChampionsScraper:
         
         print(f"Scraping National Champions from {start_year} to {end_year}...")
         
-        for year in range(start_year, end_year + 1):
-            champion_data = self.scrape_year(year)
-            
-            if champion_data:
-                champions_data.append(champion_data)
-                print(f"  ✓ {year}: {champion_data['team_name']}")
-            else:
-                print(f"  ✗ {year}: No data found")
-            
-            # Be polite to the server
-            time.sleep(2)
+        # The browser is only needed to establish (or refresh) the session;
+        # close it once the crawl is done
+        with browser_pool.session():
+            for year in range(start_year, end_year + 1):
+                champion_data = self.scrape_year(year)
+                
+                if champion_data:
+                    champions_data.append(champion_data)
+                    print(f"  ✓ {year}: {champion_data['team_name']}")
+                else:
+                    print(f"  ✗ {year}: No data found")
+                
+                # Be polite to the server
+                tracing.sleep(2, reason="politeness delay")
         
+        stats = self.session.stats
+        print(f"Fetched {stats['http']} pages over HTTP, {stats['browser']} in the browser "
+              f"({stats['refreshes']} session refreshes, {stats['browser_only']} pages after giving up on HTTP)")
         return champions_data
 
 
+@tracing.traced("run", source="kenpom")
 def main():
     """Main function to scrape champions and save to CSV."""
     print("="*60)
@@ -206,7 +217,9 @@ def main():
     
     # Save to CSV
     output_file = 'kenpom_champions.csv'
-    df.to_csv(output_file, index=False)
+    with tracing.span("export.csv", path=output_file, rows=len(df)) as s:
+        df.to_csv(output_file, index=False)
+        s.set(bytes=tracing.file_size(output_file))
     
     print()
     print("="*60)
@@ -2,16 +2,25 @@
 Web scraper for KenPom.com college basketball data using Playwright.
 This version uses browser automation to avoid 403 blocking.
 """
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+import sys
 import time
 import re
+from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import browser_pool, table_extract, tracing
+
 
 class KenPomScraperPlaywright:
     """Scraper for KenPom.com data using Playwright browser automation."""
     
+    # The ratings table: team rows sit in several tbody sections with
+    # headers repeated between them; team names are links
+    TABLE_SPEC = {'selector': 'table#ratings-table', 'rows': 'tbody tr', 'cells': 'td', 'link_columns': (1,)}
+    
     def __init__(self):
         """Initialize scraper."""
         self.base_url = "https://kenpom.com"
@@ -52,6 +61,87 @@ class KenPomScraperPlaywright:
             value = self._parse_number(text)
             return value, None
     
+    def parse_rankings_html(self, html_content: str, verbose: bool = True) -> List[Dict]:
+        """
+        Parse team rows out of a rendered ratings page (table#ratings-table).
+        Needs no browser, so saved pages can be parsed or benchmarked offline.
+        """
+        table = table_extract.from_html(html_content, **self.TABLE_SPEC)
+        if table is None:
+            print("ERROR: Could not find ratings table")
+            return []
+        return self.parse_rankings_table(table, verbose)
+    
+    def parse_rankings_table(self, table: table_extract.Table, verbose: bool = True) -> List[Dict]:
+        """Parse team rows out of the extracted ratings table (see TABLE_SPEC)."""
+        teams_data = []
+        
+        if verbose:
+            print(f"Found {len(table.rows)} team rows")
+        
+        for cells, (team_links,) in zip(table.rows, table.row_links()):
+            try:
+                if len(cells) < 20:
+                    continue
+                
+                # Parse team info
+                rank_cell = cells[0]
+                
+                if not team_links:
+                    continue
+                
+                team_name = team_links[0]
+                conf = cells[2]
+                record = cells[3]
+                
+                # Parse metrics
+                adj_em = self._parse_number(cells[4])
+                adj_o, adj_o_rank = self._parse_value_and_rank(cells[5])
+                adj_d, adj_d_rank = self._parse_value_and_rank(cells[7])
+                adj_t, adj_t_rank = self._parse_value_and_rank(cells[9])
+                luck, luck_rank = self._parse_value_and_rank(cells[11])
+                sos_adj_em, sos_adj_em_rank = self._parse_value_and_rank(cells[13])
+                
+                # NCSOS metrics
+                ncsos_adj_em = None
+                ncsos_adj_em_rank = None
+                if len(cells) > 19:
+                    ncsos_adj_em, ncsos_adj_em_rank = self._parse_value_and_rank(cells[19])
+                
+                team_data = {
+                    'rank': int(rank_cell),
+                    'team': team_name,
+                    'team_name': team_name,  # For database compatibility
+                    'conf': conf,
+                    'conference': conf,  # For database compatibility
+                    'record': record,
+                    'adj_em': adj_em,
+                    'adj_o': adj_o,
+                    'adj_o_rank': adj_o_rank,
+                    'adj_d': adj_d,
+                    'adj_d_rank': adj_d_rank,
+                    'adj_t': adj_t,
+                    'adj_tempo': adj_t,  # For database compatibility
+                    'adj_t_rank': adj_t_rank,
+                    'luck': luck,
+                    'luck_rank': luck_rank,
+                    'sos_adj_em': sos_adj_em,
+                    'sos_adj_em_rank': sos_adj_em_rank,
+                    'opp_o': None,  # Not available in this format
+                    'opp_d': None,  # Not available in this format
+                    'ncsos_adj_em': ncsos_adj_em,
+                    'ncsos_adj_em_rank': ncsos_adj_em_rank,
+                    'date': datetime.now().strftime('%Y-%m-%d')
+                }
+                
+                teams_data.append(team_data)
+            
+            except Exception as e:
+                print(f"Error parsing row: {e}")
+                continue
+        
+        return teams_data
+    
     def scrape_rankings(self) -> List[Dict]:
         """
         Scrape current rankings from KenPom using Playwright.
@@ -59,124 +149,51 @@ class KenPomScraperPlaywright:
         """
         print(f"Fetching data from {self.rankings_url} using browser automation...")
         
-        with sync_playwright() as p:
-            # Launch browser in headless mode
-            browser = p.chromium.launch(headless=True)
-            
-            # Create context with realistic settings
-            context = browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
-            
+        # Context with realistic settings from the shared browser; images,
+        # fonts, CSS and third-party requests are blocked
+        with tracing.span("scrape", source="kenpom", url=self.rankings_url) as run, \
+                browser_pool.context(
+                    site="kenpom",
+                    viewport={'width': 1920, 'height': 1080},
+                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+                ) as context:
             page = context.new_page()
             
             try:
                 # Navigate to KenPom
                 print("Loading KenPom.com...")
-                page.goto(self.rankings_url, wait_until='networkidle', timeout=30000)
+                with tracing.span("page.goto", url=self.rankings_url, wait_until='networkidle'):
+                    page.goto(self.rankings_url, wait_until='networkidle', timeout=30000)
                 
                 # Wait for the ratings table to load
                 print("Waiting for rankings table...")
-                page.wait_for_selector('table#ratings-table', timeout=10000)
-                
-                # Get the page content
-                html_content = page.content()
+                with tracing.span("wait_for_selector", selector='table#ratings-table'):
+                    page.wait_for_selector('table#ratings-table', timeout=10000)
                 
-                # Parse the HTML
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(html_content, 'html.parser')
-                
-                # Find the ratings table
-                table = soup.find('table', {'id': 'ratings-table'})
-                if not table:
+                # Pull just the table's cell text out of the page
+                table = table_extract.extract_table(page, **self.TABLE_SPEC)
+                if table is None:
                     print("ERROR: Could not find ratings table")
+                    run.set(failed='no_table')
                     return []
                 
-                # Get all team rows from ALL tbody sections (table has multiple tbody with headers between)
-                teams_data = []
-                all_tbody = table.find_all('tbody')
-                rows = []
-                for tbody in all_tbody:
-                    rows.extend(tbody.find_all('tr'))
-                
-                print(f"Found {len(rows)} team rows across {len(all_tbody)} tbody sections")
-                
-                for row in rows:
-                    try:
-                        cells = row.find_all('td')
-                        if len(cells) < 20:
-                            continue
-                        
-                        # Parse team info
-                        rank_cell = cells[0].get_text(strip=True)
-                        team_cell = cells[1]
-                        team_link = team_cell.find('a')
-                        
-                        if not team_link:
-                            continue
-                        
-                        team_name = team_link.get_text(strip=True)
-                        conf = cells[2].get_text(strip=True)
-                        record = cells[3].get_text(strip=True)
-                        
-                        # Parse metrics
-                        adj_em = self._parse_number(cells[4].get_text(strip=True))
-                        adj_o, adj_o_rank = self._parse_value_and_rank(cells[5].get_text(strip=True))
-                        adj_d, adj_d_rank = self._parse_value_and_rank(cells[7].get_text(strip=True))
-                        adj_t, adj_t_rank = self._parse_value_and_rank(cells[9].get_text(strip=True))
-                        luck, luck_rank = self._parse_value_and_rank(cells[11].get_text(strip=True))
-                        sos_adj_em, sos_adj_em_rank = self._parse_value_and_rank(cells[13].get_text(strip=True))
-                        
-                        # NCSOS metrics
-                        ncsos_adj_em = None
-                        ncsos_adj_em_rank = None
-                        if len(cells) > 19:
-                            ncsos_adj_em, ncsos_adj_em_rank = self._parse_value_and_rank(cells[19].get_text(strip=True))
-                        
-                        team_data = {
-                            'rank': int(rank_cell),
-                            'team': team_name,
-                            'team_name': team_name,  # For database compatibility
-                            'conf': conf,
-                            'conference': conf,  # For database compatibility
-                            'record': record,
-                            'adj_em': adj_em,
-                            'adj_o': adj_o,
-                            'adj_o_rank': adj_o_rank,
-                            'adj_d': adj_d,
-                            'adj_d_rank': adj_d_rank,
-                            'adj_t': adj_t,
-                            'adj_tempo': adj_t,  # For database compatibility
-                            'adj_t_rank': adj_t_rank,
-                            'luck': luck,
-                            'luck_rank': luck_rank,
-                            'sos_adj_em': sos_adj_em,
-                            'sos_adj_em_rank': sos_adj_em_rank,
-                            'opp_o': None,  # Not available in this format
-                            'opp_d': None,  # Not available in this format
-                            'ncsos_adj_em': ncsos_adj_em,
-                            'ncsos_adj_em_rank': ncsos_adj_em_rank,
-                            'date': datetime.now().strftime('%Y-%m-%d')
-                        }
-                        
-                        teams_data.append(team_data)
-                        
-                    except Exception as e:
-                        print(f"Error parsing row: {e}")
-                        continue
+                # Parse the rows
+                with tracing.span("parse") as s:
+                    teams_data = self.parse_rankings_table(table)
+                    s.set(rows=len(teams_data))
                 
                 print(f"Successfully parsed {len(teams_data)} teams")
+                run.set(rows=len(teams_data))
                 return teams_data
                 
             except PlaywrightTimeout:
                 print("ERROR: Timeout loading KenPom page")
+                run.set(failed='timeout')
                 return []
             except Exception as e:
                 print(f"ERROR: {e}")
+                run.set(failed=type(e).__name__)
                 return []
-            finally:
-                browser.close()
 
 
 def main():
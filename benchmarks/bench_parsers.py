@@ -0,0 +1,427 @@
+"""
+Offline benchmark of the scraper parsers against stored fixtures.
+
+Each case parses a fixture (see fixtures.py) with the same code the
+scrapers run after page.content(), and reports wall time, peak Python
+memory and rows parsed. Results are checked against
+parser_thresholds.json; any case over its limits, or parsing a different
+number of rows, is a regression and the run exits non-zero.
+
+No network is used. The extract_table_from_page case drives a local
+headless Chromium (page.set_content, all requests blocked) and is
+skipped where no browser is installed.
+
+Usage:
+    python benchmarks/bench_parsers.py                      # all cases
+    python benchmarks/bench_parsers.py torvik cbb           # cases whose name contains a filter
+    python benchmarks/bench_parsers.py --repeat 10 --json bench.json
+    python benchmarks/bench_parsers.py --update-thresholds  # re-baseline after a deliberate change
+"""
+import argparse
+import contextlib
+import gc
+import importlib.util
+import io
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
+from pathlib import Path
+from typing import List, Dict, Optional
+
+import fixtures
+
+
+THRESHOLDS_FILE = Path(__file__).with_name("parser_thresholds.json")
+
+# Headroom applied when re-baselining, so normal machine-to-machine noise
+# doesn't trip the check but a real slowdown does
+TIME_HEADROOM = 3.0
+MEMORY_HEADROOM = 1.5
+
+# Floors for very fast cases, where timer and allocator noise dominate
+MIN_MAX_MS = 5.0
+MIN_MAX_PEAK_MB = 1.0
+
+
+class SkipCase(Exception):
+    """A case can't run in this environment (missing browser or package)."""
+
+
+_modules: Dict[str, object] = {}
+
+
+def load_module(relative_path: str):
+    """Import a scraper script by path (the source folders aren't packages)."""
+    if relative_path not in _modules:
+        path = fixtures.REPO_ROOT / relative_path
+        name = "bench_" + path.stem
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except ImportError as e:
+            raise SkipCase(f"{relative_path}: {e}")
+        _modules[relative_path] = module
+    return _modules[relative_path]
+
+
+# Each setup function prepares its fixture (untimed) and returns a
+# zero-argument callable that runs the parser once and returns rows parsed
+
+def setup_torvik_rankings(stack: ExitStack):
+    scraper = load_module("Bart Torvik/scraper_torvik.py").BartTorvikScraper()
+    page = fixtures.torvik_page()
+    return lambda: len(scraper.parse_rankings_html(page, verbose=False))
+
+
+def setup_torvik_historical(stack: ExitStack):
+    scraper = load_module("Bart Torvik/scrape_historical_seasons.py").HistoricalSeasonScraper()
+    page = fixtures.torvik_page()
+    return lambda: len(scraper.parse_season_html(page, 2026, "20260315", verbose=False))
+
+
+def setup_torvik_http_season(stack: ExitStack):
+    """The 'http' mode path: scan_html on the fetched page, then parse_season_table."""
+    module = load_module("Bart Torvik/scrape_historical_seasons.py")
+    scraper = module.HistoricalSeasonScraper(mode='http')
+    page = fixtures.torvik_page()
+    return lambda: len(scraper.parse_season_table(module.table_extract.scan_html(page), 2026, "20260315",
+                                                  verbose=False))
+
+
+def setup_torvik_team_row(stack: ExitStack):
+    """_parse_team_row alone, over pre-extracted cell texts (no HTML parsing in the timing)."""
+    module = load_module("Bart Torvik/scrape_historical_seasons.py")
+    scraper = module.HistoricalSeasonScraper()
+    table = module.table_extract.from_html(fixtures.torvik_page(), **scraper.TABLE_SPEC)
+    rows = [cells for cells in table.rows[1:] if len(cells) >= 8 and cells[0].isdigit()]
+    
+    def run():
+        for cells in rows:
+            scraper._parse_team_row(cells, 2026, "20260315")
+        return len(rows)
+    return run
+
+
+def setup_kenpom_ratings(stack: ExitStack):
+    scraper = load_module("KenPom Data/scraper_playwright.py").KenPomScraperPlaywright()
+    page = fixtures.kenpom_ratings_page()
+    return lambda: len(scraper.parse_rankings_html(page, verbose=False))
+
+
+def setup_ap_poll(stack: ExitStack):
+    module = load_module("ESPN AP Poll/scrape_ap_poll.py")
+    page = fixtures.espn_rankings_page()
+    return lambda: len(module.parse_ap_poll_html(page, verbose=False))
+
+
+def setup_evanmiya_extract_table(stack: ExitStack):
+    # The scraper logs to a file and the console at import; keep both quiet
+    os.environ.setdefault("TEAM_RATINGS_LOG", os.devnull)
+    module = load_module("Evan Miya/scraper/scrape_team_ratings.py")
+    logging.getLogger().setLevel(logging.WARNING)
+    
+    from playwright.sync_api import sync_playwright, Error as PlaywrightError
+    playwright = stack.enter_context(sync_playwright())
+    try:
+        browser = playwright.chromium.launch(headless=True)
+    except PlaywrightError as e:
+        raise SkipCase(f"no local Chromium ({str(e).splitlines()[0]})")
+    stack.callback(browser.close)
+    
+    # Page scripts off and every request blocked: only the static DOM is parsed
+    context = browser.new_context(java_script_enabled=False)
+    context.route("**/*", lambda route: route.abort())
+    page = context.new_page()
+    page.set_content(fixtures.evanmiya_rendered_page())
+    return lambda: len(module.extract_table_from_page(page))
+
+
+def cbb_frame(copies: int = 1):
+    """The CBB Analytics-style frame, its value columns repeated `copies` times (a merged export is ~200 wide)."""
+    import pandas as pd
+    frame = pd.DataFrame(fixtures.cbb_percentile_rows())
+    values = frame.drop(columns='Team')
+    parts = [frame[['Team']]] + [values.add_suffix(f"_{i}" if i else "") for i in range(copies)]
+    return pd.concat(parts, axis=1)
+
+
+def setup_cbb_clean_percentile_value(stack: ExitStack, copies: int = 1):
+    """The per-cell path: Series.apply(clean_percentile_value) column by column."""
+    module = load_module("CBB Analytics/scrape_cbb_analytics_clean.py")
+    frame = cbb_frame(copies)
+    columns = [c for c in frame.columns if c != 'Team']
+    
+    def run():
+        cleaned = frame.copy()
+        for col in columns:
+            cleaned[col] = cleaned[col].apply(module.clean_percentile_value)
+        return len(cleaned)
+    return run
+
+
+def setup_cbb_clean_columns(stack: ExitStack, copies: int = 1):
+    """The vectorized path, checked (untimed) to give the per-cell path's frame."""
+    import pandas as pd
+    module = load_module("CBB Analytics/scrape_cbb_analytics_clean.py")
+    frame = cbb_frame(copies)
+    columns = [c for c in frame.columns if c != 'Team']
+    
+    expected = frame.copy()
+    for col in columns:
+        expected[col] = expected[col].apply(module.clean_percentile_value)
+    pd.testing.assert_frame_equal(module.percentile_clean.clean_columns(frame.copy(), columns), expected)
+    # Columns with no decimal number (or no rows) take the same path
+    for values in (['45', 'Duke'], ['2347%'], ['87+17.6', None], []):
+        edge = pd.DataFrame({'a': pd.Series(values, dtype='str')})
+        expected = edge.assign(a=edge['a'].apply(module.clean_percentile_value))
+        pd.testing.assert_frame_equal(module.percentile_clean.clean_columns(edge, ['a']), expected)
+    return lambda: len(module.percentile_clean.clean_columns(frame.copy(), columns))
+
+
+def setup_cbb_merge_categories(stack: ExitStack):
+    """merge_categories + stat_column_names over the wide frame split into every category."""
+    module = load_module("CBB Analytics/scrape_cbb_analytics_clean.py")
+    scraper = module.CBBAnalyticsScraper
+    frame = cbb_frame(17)
+    frame['team_kenpom'] = frame['Team']
+    columns = [c for c in frame.columns if c not in ('Team', 'team_kenpom')]
+    keys = list(module.CATEGORIES)
+    all_data = {
+        key: frame[['Team'] + columns[i::len(keys)] + ['team_kenpom']].sample(frac=1, random_state=i)
+        for i, key in enumerate(keys)
+    }
+    
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            merged = scraper.merge_categories(all_data)
+        return len(merged.rename(columns=scraper.stat_column_names(merged.columns)))
+    return run
+
+
+def setup_cbb_clean_numeric_columns(stack: ExitStack):
+    """clean_numeric_columns over object columns (as scraped), checked (untimed) to change values."""
+    import pandas as pd
+    module = load_module("CBB Analytics/scrape_cbb_analytics_clean.py")
+    frame = pd.DataFrame(fixtures.cbb_percentile_rows()).astype(object)
+    cleaned = module.CBBAnalyticsScraper.clean_numeric_columns(frame.copy())
+    if cleaned.equals(frame):
+        raise AssertionError("clean_numeric_columns changed no values")
+    return lambda: len(module.CBBAnalyticsScraper.clean_numeric_columns(frame.copy()))
+
+
+def team_spellings(copies: int):
+    """Every spelling the team registry knows, shuffled, `copies` times over."""
+    import pandas as pd
+    team_registry = load_module("shared/team_registry.py")
+    spellings = list(team_registry.REGISTRY.index)
+    names = pd.Series(spellings * copies, name='Team')
+    return team_registry, names.sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def setup_team_registry_apply(stack: ExitStack):
+    """The per-row path: Series.apply with a dict lookup for each name."""
+    team_registry, names = team_spellings(100)
+    return lambda: int(names.apply(team_registry.team_id).count())
+
+
+def setup_team_registry_map_series(stack: ExitStack):
+    """map_series (one lookup per distinct name), checked (untimed) against the per-row path."""
+    team_registry, names = team_spellings(100)
+    expected = names.apply(team_registry.team_id)
+    assert (team_registry.map_series(names).astype(int) == expected).all()
+    return lambda: int(team_registry.map_series(names).count())
+
+
+def misspelled_teams():
+    """Every canonical team name with its middle letter dropped, and the trigram index of every spelling."""
+    team_registry = load_module("shared/team_registry.py")
+    team_matcher = load_module("shared/team_matcher.py")
+    names = [name[:len(name) // 2] + name[len(name) // 2 + 1:] for name in team_registry.TEAMS]
+    return team_matcher, team_matcher.NgramIndex(team_registry.REGISTRY.index), names
+
+
+def linear_best(team_matcher, index, name):
+    """Best Dice score for `name` comparing it with every spelling in turn."""
+    query = team_matcher.trigrams(team_matcher.fold(name))
+    return max(2 * len(query & grams) / (len(query) + len(grams)) for grams in index.grams)
+
+
+def setup_team_matcher_linear(stack: ExitStack):
+    """The unindexed path: score each misspelling against all ~1000 spellings."""
+    team_matcher, index, names = misspelled_teams()
+    return lambda: sum(linear_best(team_matcher, index, name) >= team_matcher.MIN_SCORE for name in names)
+
+
+def indexed_best(index, name):
+    """Best Dice score for `name` from the trigram index (0 if no spelling shares a trigram)."""
+    hits = index.search(name, limit=1)
+    return hits[0][0] if hits else 0.0
+
+
+def setup_team_matcher_index(stack: ExitStack):
+    """NgramIndex.search (postings of the query's trigrams), checked (untimed) against the linear scan."""
+    team_matcher, index, names = misspelled_teams()
+    for name in names:
+        assert abs(indexed_best(index, name) - linear_best(team_matcher, index, name)) < 1e-9
+    return lambda: sum(indexed_best(index, name) >= team_matcher.MIN_SCORE for name in names)
+
+
+CASES = [
+    ("torvik_rankings", "BartTorvikScraper.parse_rankings_html, torvik_debug.html", setup_torvik_rankings),
+    ("torvik_historical_season", "HistoricalSeasonScraper.parse_season_html, torvik_debug.html", setup_torvik_historical),
+    ("torvik_http_season", "table_extract.scan_html + parse_season_table, torvik_debug.html", setup_torvik_http_season),
+    ("torvik_parse_team_row", "HistoricalSeasonScraper._parse_team_row over every row", setup_torvik_team_row),
+    ("kenpom_ratings_table", "KenPomScraperPlaywright.parse_rankings_html, 365-team ratings table", setup_kenpom_ratings),
+    ("ap_poll", "parse_ap_poll_html, ESPN rankings page", setup_ap_poll),
+    ("evanmiya_extract_table", "extract_table_from_page, rendered reactable (local Chromium)", setup_evanmiya_extract_table),
+    ("cbb_clean_percentile_value", "clean_percentile_value over 365 x 12 scraped cells", setup_cbb_clean_percentile_value),
+    ("cbb_clean_columns", "percentile_clean.clean_columns, same 365 x 12 cells", setup_cbb_clean_columns),
+    ("cbb_clean_percentile_value_wide", "clean_percentile_value per cell over 365 x 204 cells",
+     lambda stack: setup_cbb_clean_percentile_value(stack, copies=17)),
+    ("cbb_clean_columns_wide", "percentile_clean.clean_columns over 365 x 204 cells",
+     lambda stack: setup_cbb_clean_columns(stack, copies=17)),
+    ("cbb_clean_numeric_columns", "CBBAnalyticsScraper.clean_numeric_columns, same frame", setup_cbb_clean_numeric_columns),
+    ("cbb_merge_categories", "merge_categories + stat_column_names, 204 columns over every category",
+     setup_cbb_merge_categories),
+    ("team_registry_apply", "team_registry.team_id per row over 100 x every known spelling", setup_team_registry_apply),
+    ("team_registry_map_series", "team_registry.map_series, same names", setup_team_registry_map_series),
+    ("team_matcher_linear", "Dice score against every spelling, 365 misspelled team names", setup_team_matcher_linear),
+    ("team_matcher_index", "team_matcher.NgramIndex.search, same names", setup_team_matcher_index),
+]
+
+
+def measure(run, repeat: int) -> Dict:
+    """Time `repeat` runs after a warm-up, then one traced run for peak memory."""
+    rows = run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'rows': rows,
+        'min_ms': round(min(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'peak_mb': round(peak / 2 ** 20, 2),
+    }
+
+
+def check(result: Dict, threshold: Optional[Dict]) -> List[str]:
+    """Regressions of one result against its thresholds."""
+    if not threshold:
+        return []
+    problems = []
+    if 'rows' in threshold and result['rows'] != threshold['rows']:
+        problems.append(f"rows {result['rows']} != {threshold['rows']}")
+    if 'max_ms' in threshold and result['median_ms'] > threshold['max_ms']:
+        problems.append(f"median {result['median_ms']}ms > {threshold['max_ms']}ms")
+    if 'max_peak_mb' in threshold and result['peak_mb'] > threshold['max_peak_mb']:
+        problems.append(f"peak {result['peak_mb']}MB > {threshold['max_peak_mb']}MB")
+    return problems
+
+
+def run_cases(filters: List[str], repeat: int) -> List[Dict]:
+    """Run every case matching the filters (all if none)."""
+    results = []
+    for name, description, setup in CASES:
+        if filters and not any(f in name for f in filters):
+            continue
+        print(f"  {name}...", flush=True)
+        result = {'name': name, 'description': description}
+        with ExitStack() as stack:
+            try:
+                result.update(measure(setup(stack), repeat))
+                result['status'] = 'ok'
+            except SkipCase as e:
+                result['status'] = 'skipped'
+                result['reason'] = str(e)
+            except Exception as e:
+                result['status'] = 'error'
+                result['reason'] = f"{type(e).__name__}: {e}"
+        results.append(result)
+    return results
+
+
+def print_report(results: List[Dict]):
+    """Print results as an aligned table."""
+    print(f"\n{'case':<28} {'rows':>6} {'min ms':>10} {'median ms':>10} {'peak MB':>8}  status")
+    print("-" * 80)
+    for r in results:
+        if r['status'] in ('skipped', 'error'):
+            print(f"{r['name']:<28} {'-':>6} {'-':>10} {'-':>10} {'-':>8}  {r['status']}: {r['reason']}")
+        else:
+            print(f"{r['name']:<28} {r['rows']:>6} {r['min_ms']:>10} {r['median_ms']:>10} "
+                  f"{r['peak_mb']:>8}  {r['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper parsers against stored fixtures")
+    parser.add_argument("filters", nargs="*", help="Only run cases whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (default 5)")
+    parser.add_argument("--json", metavar="PATH", help="Also write results as JSON")
+    parser.add_argument("--update-thresholds", action="store_true",
+                        help="Rewrite thresholds from this run instead of checking them")
+    args = parser.parse_args()
+    
+    thresholds = json.loads(THRESHOLDS_FILE.read_text()) if THRESHOLDS_FILE.exists() else {}
+    
+    print(f"Running parser benchmarks ({args.repeat} timed runs each)...")
+    results = run_cases(args.filters, args.repeat)
+    
+    regressions = errors = 0
+    for r in results:
+        if r['status'] == 'error':
+            errors += 1
+            continue
+        if r['status'] != 'ok':
+            continue
+        if args.update_thresholds:
+            thresholds[r['name']] = {
+                'rows': r['rows'],
+                'max_ms': max(round(r['median_ms'] * TIME_HEADROOM, 1), MIN_MAX_MS),
+                'max_peak_mb': max(round(r['peak_mb'] * MEMORY_HEADROOM, 1), MIN_MAX_PEAK_MB),
+            }
+            continue
+        if r['name'] not in thresholds:
+            r['status'] = 'no threshold'
+            continue
+        problems = check(r, thresholds[r['name']])
+        if problems:
+            r['status'] = 'REGRESSION: ' + '; '.join(problems)
+            regressions += 1
+    
+    print_report(results)
+    
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nWrote {args.json}")
+    
+    if args.update_thresholds:
+        THRESHOLDS_FILE.write_text(json.dumps(thresholds, indent=2, sort_keys=True) + "\n")
+        print(f"\nUpdated {THRESHOLDS_FILE.name}")
+    elif regressions:
+        print(f"\n{regressions} case(s) regressed")
+    # A case that raised is a failure whether or not thresholds were checked
+    if errors:
+        print(f"\n{errors} case(s) failed with an error")
+    if errors or (regressions and not args.update_thresholds):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
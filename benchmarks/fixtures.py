@@ -0,0 +1,169 @@
+"""
+HTML and DataFrame fixtures for the parser benchmarks.
+
+Torvik pages are read from the committed snapshot as-is. Pages that were
+never committed (KenPom ratings, ESPN rankings, a rendered Evan Miya
+table) are rebuilt from the committed CSV exports in the markup each
+parser expects, so every fixture is deterministic and offline.
+"""
+import csv
+import html
+from pathlib import Path
+from typing import List, Dict
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+TORVIK_PAGE = REPO_ROOT / "Bart Torvik" / "torvik_debug.html"
+TORVIK_CSV = REPO_ROOT / "Bart Torvik" / "torvik_tableau.csv"
+KENPOM_CSV = REPO_ROOT / "KenPom Data" / "kenpom_tableau.csv"
+AP_POLL_CSV = REPO_ROOT / "ESPN AP Poll" / "ap_poll_week6.csv"
+EVANMIYA_PAGE = REPO_ROOT / "Evan Miya" / "evanmiya_team_ratings.html"
+EVANMIYA_CSV = REPO_ROOT / "Evan Miya" / "scraper" / "team_ratings.csv"
+
+# KenPom repeats its header block every 40 teams, each group in its own tbody
+KENPOM_ROWS_PER_TBODY = 40
+
+# Container the Evan Miya reactable widget renders into
+EVANMIYA_CONTAINER = 'id="team_ratings_page-team_ratings" style="width:auto;height:auto;">'
+
+
+def read_csv(path: Path) -> List[Dict]:
+    """Rows of a committed CSV as dicts."""
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def torvik_page() -> str:
+    """The committed rendered T-Rank page (1.3 MB, 365 teams)."""
+    return TORVIK_PAGE.read_text(encoding='utf-8')
+
+
+def _signed(value: str, digits: int) -> str:
+    """Format like KenPom: explicit sign, fixed decimals."""
+    if value in ('', None):
+        return ''
+    return f"{float(value):+.{digits}f}"
+
+
+def kenpom_ratings_page() -> str:
+    """A table#ratings-table page built from kenpom_tableau.csv."""
+    header = (
+        '<thead><tr class="thead2"><th>Rk</th><th>Team</th><th>Conf</th><th>W-L</th>'
+        '<th>AdjEM</th><th colspan="2">AdjO</th><th colspan="2">AdjD</th>'
+        '<th colspan="2">AdjT</th><th colspan="2">Luck</th><th colspan="2">SOS AdjEM</th>'
+        '<th colspan="2">OppO</th><th colspan="2">OppD</th><th colspan="2">NCSOS AdjEM</th></tr></thead>'
+    )
+    rows = read_csv(KENPOM_CSV)
+    bodies = []
+    for start in range(0, len(rows), KENPOM_ROWS_PER_TBODY):
+        trs = []
+        for i, row in enumerate(rows[start:start + KENPOM_ROWS_PER_TBODY], start + 1):
+            paired = [
+                row['adj_o'], row['adj_d'], row['adj_tempo'], _signed(row['luck'], 3),
+                _signed(row['sos_adj_em'], 2), row['opp_o'], row['opp_d'],
+                _signed(row['ncsos_adj_em'], 2),
+            ]
+            cells = [
+                f'<td class="hard_left">{row["rank"]}</td>',
+                f'<td class="next_left"><a href="team.php?team={html.escape(row["team_name"])}">'
+                f'{html.escape(row["team_name"])}</a> <span class="seed">{(i - 1) // 4 + 1}</span></td>',
+                f'<td class="conf"><a href="conf.php?c={row["conference"]}">{row["conference"]}</a></td>',
+                '<td class="wl">20-3</td>',
+                f'<td>{_signed(row["adj_em"], 2)}</td>',
+            ]
+            for value in paired:
+                cells.append(f'<td class="td-left">{value}</td><td class="td-right"><span class="seed">{i}</span></td>')
+            trs.append(f'<tr>{"".join(cells)}</tr>')
+        bodies.append(header + '<tbody>' + ''.join(trs) + '</tbody>')
+    return (
+        '<html><head><title>Pomeroy College Basketball Ratings</title></head><body>'
+        '<div id="data-area"><table id="ratings-table">' + ''.join(bodies) + '</table></div>'
+        '</body></html>'
+    )
+
+
+def espn_rankings_page() -> str:
+    """An ESPN rankings page (AP table first, then the coaches poll) from ap_poll_week6.csv."""
+    rows = read_csv(AP_POLL_CSV)
+    trs = []
+    for row in rows:
+        name = html.escape(row['team_espn'])
+        abbrev = name[:4].upper()
+        trs.append(
+            f'<tr class="Table__TR"><td class="Table__TD">{row["rank"]}</td>'
+            f'<td class="Table__TD"><div class="team-link"><span class="pr3">'
+            f'<a href="/mens-college-basketball/team/_/id/{row["rank"]}"><img alt="{name}"/></a></span>'
+            f'<span><a href="/mens-college-basketball/team/_/id/{row["rank"]}"><abbr>{abbrev}</abbr></a></span>'
+            f'<a href="/mens-college-basketball/team/_/id/{row["rank"]}">{name}</a>'
+            f'<span class="pl2">({int(row["rank"]) % 7})</span></div></td>'
+            f'<td class="Table__TD">{row["record"]}</td><td class="Table__TD">{row["points"]}</td>'
+            f'<td class="Table__TD">{row["previous_rank"]}</td></tr>'
+        )
+    table = (
+        '<table class="Table"><thead><tr><th>RK</th><th>Team</th><th>REC</th><th>PTS</th>'
+        '<th>TREND</th></tr></thead><tbody>' + ''.join(trs) + '</tbody></table>'
+    )
+    return f'<html><body><h2>AP Top 25</h2>{table}<h2>Coaches Poll</h2>{table}</body></html>'
+
+
+def evanmiya_rendered_page() -> str:
+    """
+    The committed Evan Miya page with its reactable container filled in
+    from team_ratings.csv, as the widget renders it in the browser.
+    """
+    rows = read_csv(EVANMIYA_CSV)
+    columns = [c for c in rows[0] if c != 'scrape_time_utc']
+    head = ''.join(f'<div class="rt-th" role="columnheader">{html.escape(c)}</div>' for c in columns)
+    body = ''.join(
+        '<div class="rt-tr-group" role="rowgroup"><div class="rt-tr" role="row">'
+        + ''.join(f'<div class="rt-td" role="cell">{html.escape(row[c])}</div>' for c in columns)
+        + '</div></div>'
+        for row in rows
+    )
+    table = (
+        '<div class="Reactable ReactTable"><div class="rt-table" role="table">'
+        f'<div class="rt-thead" role="rowgroup"><div class="rt-tr" role="row">{head}</div></div>'
+        f'<div class="rt-tbody" role="rowgroup">{body}</div></div></div>'
+    )
+    page = EVANMIYA_PAGE.read_text(encoding='utf-8')
+    return page.replace(EVANMIYA_CONTAINER, EVANMIYA_CONTAINER + table, 1)
+
+
+# Torvik columns used to build CBB Analytics-style cells, with how the
+# site renders them: percentile rank glued to the value, '%' or signed
+CBB_SOURCE_COLUMNS = {
+    'ORtg': ('adj_oe', ''),
+    'DRtg': ('adj_de', ''),
+    'Net Rtg': ('wab', 'signed'),
+    'eFG%': ('efg_pct', '%'),
+    'eFG% allowed': ('efg_pct_d', '%'),
+    'TOV%': ('tor', '%'),
+    'ORB%': ('orb', '%'),
+    'FTA Rate': ('ftr', ''),
+    '2P%': ('two_p_pct', '%'),
+    '3P%': ('three_p_pct', '%'),
+    '3PA%': ('three_pr', '%'),
+    'Pace': ('adj_tempo', ''),
+}
+
+
+def cbb_percentile_rows() -> List[Dict]:
+    """
+    365 teams of CBB Analytics-style scraped strings (e.g. "9347.9%",
+    "87+17.6", "12118.4"), built from torvik_tableau.csv.
+    """
+    source = read_csv(TORVIK_CSV)
+    count = len(source)
+    rows = []
+    for i, team in enumerate(source):
+        percentile = round(100 * (count - 1 - i) / (count - 1))
+        row = {'Team': team['team_name']}
+        for column, (field, style) in CBB_SOURCE_COLUMNS.items():
+            value = float(team[field])
+            if style == 'signed':
+                row[column] = f"{percentile}{value:+.1f}"
+            else:
+                row[column] = f"{percentile}{value:.1f}{style}"
+        rows.append(row)
+    return rows
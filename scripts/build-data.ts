@@ -90,17 +90,44 @@ function loadCSV(filePath: string): any[] {
   return parse(content, { columns: true, skip_empty_lines: true });
 }
 
+// Lowercased alias -> slug, built once per mapping
+const aliasIndexes = new WeakMap<Record<string, TeamNameMapping>, Map<string, string>>();
+
+function aliasIndex(mapping: Record<string, TeamNameMapping>): Map<string, string> {
+  let index = aliasIndexes.get(mapping);
+  if (index) return index;
+  
+  index = new Map();
+  for (const value of Object.values(mapping)) {
+    for (const alias of value.aliases) {
+      const key = alias.toLowerCase();
+      if (!index.has(key)) index.set(key, value.slug);
+    }
+  }
+  
+  // Spellings the Python team matcher already resolved (shared/team_matcher.py)
+  const matchesPath = process.env.TEAM_MATCH_CACHE || path.join(__dirname, '..', 'team_matches.json');
+  if (fs.existsSync(matchesPath)) {
+    const matches: Record<string, { team: string }> = JSON.parse(fs.readFileSync(matchesPath, 'utf-8'));
+    for (const [spelling, decision] of Object.entries(matches)) {
+      const key = spelling.toLowerCase();
+      const slug = mapping[decision.team]?.slug;
+      if (slug && !index.has(key)) index.set(key, slug);
+    }
+  }
+  
+  aliasIndexes.set(mapping, index);
+  return index;
+}
+
 // Helper: Normalize team name to slug
 function normalizeTeamName(name: string, mapping: Record<string, TeamNameMapping>): string {
   // Direct match
   if (mapping[name]) return mapping[name].slug;
   
   // Try aliases
-  for (const [key, value] of Object.entries(mapping)) {
-    if (value.aliases.some(alias => alias.toLowerCase() === name.toLowerCase())) {
-      return value.slug;
-    }
-  }
+  const slug = aliasIndex(mapping).get(name.toLowerCase());
+  if (slug) return slug;
   
   // Fallback: slugify
   return name
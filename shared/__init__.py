@@ -0,0 +1,9 @@
+"""
+Helpers shared by the scrapers in the source folders.
+
+The source folders aren't packages, so scripts put the repository root
+on sys.path before importing from here:
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from shared import tracing
+"""
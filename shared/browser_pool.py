@@ -0,0 +1,471 @@
+"""
+Shared Chromium for the Playwright scrapers.
+
+One browser process is launched per pipeline run (or per script) and
+every scrape gets its own isolated context from it, instead of each
+scraper launching and tearing down Chromium. Contexts can carry a
+RouteFilter that aborts requests the tables don't need: images, fonts,
+media, ads, analytics, and optionally anything off the site's own domain.
+
+Usage:
+    from shared import browser_pool
+    
+    with browser_pool.context(site="kenpom", viewport={...}) as context:
+        page = context.new_page()
+        ...
+    
+    # Keep one browser warm across several scrapes (retries, seasons...)
+    # and close it at the end, even in a long-running process:
+    with browser_pool.session():
+        for year in years:
+            with browser_pool.context(site="torvik") as context:
+                ...
+
+Without a session() the browser stays up until the process exits.
+Playwright's sync API is bound to the thread that started it, so each
+thread gets its own pool.
+
+Persistent profiles: sites in PERSISTENT_SITES (the JS-heavy ones) run in
+a per-site Chromium profile under BROWSER_PROFILE_DIR (default
+.browser_profiles/ at the repo root; headed contexts use <site>-headed,
+since Chromium locks a profile to one browser and a scrape can have both
+modes open) via launch_persistent_context, so
+their HTTP cache - React bundle, Shiny assets, DataTables JS - survives
+between runs. Chromium's disk cache is capped at BROWSER_CACHE_MB, and a
+profile over BROWSER_PROFILE_MAX_MB has its caches cleared before launch.
+Playwright turns the HTTP cache off for routed contexts, so persistent
+contexts don't use RouteFilter.install(); blocked hosts are mapped to
+nowhere with Chromium's resolver rules instead (RouteFilter.launch_args).
+Only the cache is meant to carry over: cookies and site storage are
+cleared, so each scrape starts logged out exactly as with a fresh context.
+Set BROWSER_PROFILES=0 to turn profiles off.
+
+    python shared/browser_pool.py sizes
+    python shared/browser_pool.py purge [site ...] [--all]
+"""
+import argparse
+import atexit
+import os
+import shutil
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from playwright.sync_api import sync_playwright
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import tracing
+
+
+# Resource types never needed to read a stats table
+DEFAULT_BLOCKED_TYPES = frozenset({'image', 'media', 'font', 'texttrack', 'manifest', 'beacon', 'ping'})
+
+# Ad, analytics and web-font hosts seen on the scraped sites (subdomains included)
+TRACKER_HOSTS = frozenset({
+    'googletagmanager.com', 'google-analytics.com', 'googlesyndication.com',
+    'googleadservices.com', 'doubleclick.net', 'adservice.google.com', 'statcounter.com',
+    'facebook.net', 'connect.facebook.net', 'hotjar.com', 'segment.io', 'segment.com',
+    'scorecardresearch.com', 'quantserve.com', 'amazon-adsystem.com', 'adnxs.com',
+    'criteo.com', 'taboola.com', 'outbrain.com', 'chartbeat.com', 'chartbeat.net',
+    'nr-data.net', 'fonts.googleapis.com', 'fonts.gstatic.com',
+})
+
+PROFILE_ROOT = Path(os.environ.get(
+    "BROWSER_PROFILE_DIR", str(Path(__file__).resolve().parent.parent / ".browser_profiles")
+))
+PROFILES_ENABLED = os.environ.get("BROWSER_PROFILES", "1") != "0"
+CACHE_MAX_MB = int(os.environ.get("BROWSER_CACHE_MB", "200"))
+PROFILE_MAX_MB = int(os.environ.get("BROWSER_PROFILE_MAX_MB", "500"))
+
+# Sites whose scripts are worth caching between runs
+PERSISTENT_SITES = frozenset({'torvik', 'evanmiya', 'cbb_analytics'})
+
+# Cache directories inside a Chromium profile; purging these keeps cookies
+# and local storage
+_CACHE_DIRS = (
+    'Default/Cache', 'Default/Code Cache', 'Default/GPUCache',
+    'Default/Service Worker/CacheStorage', 'Default/Service Worker/ScriptCache',
+    'GrShaderCache', 'ShaderCache', 'GraphiteDawnCache',
+)
+
+# Profile directory suffix for headed contexts
+_HEADED_SUFFIX = '-headed'
+
+# Site storage wiped before a profile is opened (cookies are cleared per scrape)
+_STATE_DIRS = ('Default/Local Storage', 'Default/Session Storage', 'Default/IndexedDB')
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == d or host.endswith('.' + d) for d in domains)
+
+
+class RouteFilter:
+    """
+    Decides which requests a context lets through.
+    
+    Navigations are always allowed. Other requests are aborted when their
+    resource type is in blocked_types, their host is in blocked_hosts, or
+    first_party is set and the host is neither under it nor in allowed_hosts.
+    """
+    
+    def __init__(self, blocked_types: Iterable[str] = DEFAULT_BLOCKED_TYPES,
+                 blocked_hosts: Iterable[str] = TRACKER_HOSTS,
+                 first_party: Optional[str] = None,
+                 allowed_hosts: Iterable[str] = ()):
+        self.blocked_types = frozenset(blocked_types)
+        self.blocked_hosts = frozenset(blocked_hosts)
+        self.first_party = first_party
+        self.allowed_hosts = frozenset(allowed_hosts)
+    
+    def allows(self, url: str, resource_type: str, is_navigation: bool = False) -> bool:
+        """Whether a request should be let through."""
+        if is_navigation:
+            return True
+        if resource_type in self.blocked_types:
+            return False
+        host = (urlsplit(url).hostname or '').lower()
+        if not host:
+            return True  # data:, blob: and friends
+        if _host_matches(host, self.blocked_hosts):
+            return False
+        if self.first_party and not _host_matches(host, (self.first_party,)):
+            return _host_matches(host, self.allowed_hosts)
+        return True
+    
+    def install(self, context) -> Dict[str, int]:
+        """
+        Route every request of `context` through this filter. Returns a
+        dict of allowed/blocked counts that fills in as the context is used.
+        """
+        stats = {'allowed': 0, 'blocked': 0}
+        
+        def handle(route):
+            request = route.request
+            if self.allows(request.url, request.resource_type, request.is_navigation_request()):
+                stats['allowed'] += 1
+                route.continue_()
+            else:
+                stats['blocked'] += 1
+                route.abort()
+        
+        context.route("**/*", handle)
+        return stats
+    
+    def launch_args(self) -> List[str]:
+        """
+        Chromium flags approximating this filter without request routing
+        (which would disable the HTTP cache): blocked hosts resolve to
+        nothing and, if images are blocked, images are turned off. Other
+        resource types and the first-party rule can't be expressed this way.
+        """
+        rules = []
+        for host in sorted(self.blocked_hosts):
+            rules.append(f"MAP {host} ~NOTFOUND")
+            rules.append(f"MAP *.{host} ~NOTFOUND")
+        args = [f"--host-resolver-rules={', '.join(rules)}"] if rules else []
+        if 'image' in self.blocked_types:
+            args.append('--blink-settings=imagesEnabled=false')
+        return args
+
+
+# Per-site filters. Server-rendered tables (KenPom, Torvik, ESPN) don't
+# need stylesheets; the Shiny and React apps keep theirs because their
+# widgets and login forms depend on layout.
+SITE_FILTERS = {
+    'kenpom': RouteFilter(
+        blocked_types=DEFAULT_BLOCKED_TYPES | {'stylesheet'},
+        first_party='kenpom.com',
+    ),
+    'torvik': RouteFilter(
+        blocked_types=DEFAULT_BLOCKED_TYPES | {'stylesheet'},
+        first_party='barttorvik.com',
+        allowed_hosts=('code.jquery.com',),  # jQuery runs the T-Rank table
+    ),
+    'espn': RouteFilter(
+        blocked_types=DEFAULT_BLOCKED_TYPES | {'stylesheet'},
+        first_party='espn.com',
+        allowed_hosts=('espncdn.com',),
+    ),
+    'evanmiya': RouteFilter(first_party='evanmiya.com'),
+    # Login may go through a third-party identity provider, so no
+    # first-party restriction here
+    'cbb_analytics': RouteFilter(),
+}
+
+
+def profile_dir(site: str, headless: bool = True) -> Path:
+    """Where a site's persistent Chromium profile for a headless mode lives."""
+    return PROFILE_ROOT / (site if headless else site + _HEADED_SUFFIX)
+
+
+def dir_size(path: Path) -> int:
+    """Total size in bytes of the files under `path`."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def purge_profile(site: str, everything: bool = False) -> int:
+    """
+    Delete a site's cached files (or, with everything=True, its whole
+    profiles including cookies), headed and headless. Returns the bytes freed.
+    """
+    return sum(_purge_dir(profile_dir(site, headless), everything) for headless in (True, False))
+
+
+def _purge_dir(root: Path, everything: bool = False) -> int:
+    if not root.exists():
+        return 0
+    targets = [root] if everything else [root / d for d in _CACHE_DIRS]
+    freed = 0
+    for target in targets:
+        if target.exists():
+            freed += dir_size(target)
+            shutil.rmtree(target, ignore_errors=True)
+    return freed
+
+
+def _trim_profile(path: Path):
+    """Clear a profile's caches if it has outgrown PROFILE_MAX_MB."""
+    size = dir_size(path)
+    if size > PROFILE_MAX_MB * 1024 * 1024:
+        freed = _purge_dir(path)
+        print(f"Browser profile '{path.name}' was {size / 1e6:.0f} MB; cleared {freed / 1e6:.0f} MB of cache")
+
+
+class BrowserPool:
+    """
+    One lazily launched Chromium per headless mode, handing out contexts,
+    plus one persistent-profile context per (site, headless mode), each
+    in its own profile directory.
+    """
+    
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self._playwright = None
+        self._browsers = {}
+        self._persistent = {}
+        self.launches = 0
+    
+    def _start(self):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        return self._playwright
+    
+    def browser(self, headless: bool = True):
+        """The pool's browser for this headless mode, launched on first use."""
+        browser = self._browsers.get(headless)
+        if browser is not None and browser.is_connected():
+            return browser
+        with tracing.span("browser.launch", headless=headless, pooled=True):
+            browser = self._start().chromium.launch(headless=headless)
+        self._browsers[headless] = browser
+        self.launches += 1
+        return browser
+    
+    def persistent_context(self, site: str, headless: bool = True, **context_options):
+        """
+        The site's persistent-profile context, launched on first use and
+        kept for the life of the pool. Context options only apply at launch.
+        """
+        key = (site, headless)
+        context = self._persistent.get(key)
+        if context is not None:
+            return context
+        path = profile_dir(site, headless)
+        _trim_profile(path)
+        route_filter = SITE_FILTERS.get(site)
+        args = route_filter.launch_args() if route_filter is not None else []
+        args.append(f"--disk-cache-size={CACHE_MAX_MB * 1024 * 1024}")
+        for name in _STATE_DIRS:
+            shutil.rmtree(path / name, ignore_errors=True)
+        with tracing.span("browser.launch", headless=headless, persistent=True, site=site) as s:
+            s.set(profile_bytes=dir_size(path))
+            path.mkdir(parents=True, exist_ok=True)
+            context = self._start().chromium.launch_persistent_context(
+                str(path), headless=headless, args=args, **context_options
+            )
+        self._persistent[key] = context
+        self.launches += 1
+        return context
+    
+    @contextmanager
+    def context(self, site: Optional[str] = None, route_filter: Optional[RouteFilter] = None,
+                headless: bool = True, persistent: Optional[bool] = None, **context_options):
+        """
+        A browser context for one scrape.
+        
+        By default this is a fresh, isolated context, closed on exit. For
+        sites in PERSISTENT_SITES (or persistent=True) it is the site's
+        persistent-profile context instead, with its cookies cleared; only
+        the pages opened inside the block are closed on exit. If the profile can't be opened (in
+        use by another process, say) a fresh context is used.
+        
+        Args:
+            site: Key of SITE_FILTERS to filter requests with
+            route_filter: Explicit filter (overrides site); None with no
+                site means no filtering
+            headless: Which pooled browser to use
+            persistent: Use the site's persistent profile (default: if the
+                site is in PERSISTENT_SITES and profiles are enabled)
+            **context_options: Passed to browser.new_context (viewport,
+                user_agent, storage_state...)
+        """
+        if persistent is None:
+            persistent = PROFILES_ENABLED and site in PERSISTENT_SITES
+        if persistent and site is not None and route_filter is None:
+            try:
+                context = self.persistent_context(site, headless, **context_options)
+            except Exception as e:
+                print(f"Could not open browser profile for '{site}' ({e}); using a fresh context")
+            else:
+                with self._persistent_block(site, context):
+                    yield context
+                return
+        
+        if route_filter is None and site is not None:
+            route_filter = SITE_FILTERS[site]
+        browser = self.browser(headless)
+        with tracing.span("browser.context", site=site) as s:
+            context = browser.new_context(**context_options)
+            stats = route_filter.install(context) if route_filter is not None else None
+            try:
+                yield context
+            finally:
+                try:
+                    context.close()
+                except Exception:
+                    pass
+                if stats is not None:
+                    s.set(**stats)
+    
+    @contextmanager
+    def _persistent_block(self, site: str, context):
+        before = set(context.pages)
+        stats = {'requests': 0}
+        
+        def count(request):
+            stats['requests'] += 1
+        
+        with tracing.span("browser.context", site=site, persistent=True) as s:
+            context.clear_cookies()
+            context.on("request", count)
+            try:
+                yield context
+            finally:
+                context.remove_listener("request", count)
+                for page in context.pages:
+                    if page not in before:
+                        try:
+                            page.close()
+                        except Exception:
+                            pass
+                s.set(**stats)
+    
+    def close(self):
+        """Close every browser and persistent context and stop Playwright."""
+        for context in self._persistent.values():
+            try:
+                context.close()
+            except Exception:
+                pass
+        self._persistent.clear()
+        for browser in self._browsers.values():
+            try:
+                browser.close()
+            except Exception:
+                pass
+        self._browsers.clear()
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+
+_local = threading.local()
+_pools = []
+_pools_lock = threading.Lock()
+
+
+def get_pool() -> BrowserPool:
+    """This thread's shared pool."""
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        pool = _local.pool = BrowserPool()
+        with _pools_lock:
+            _pools.append(pool)
+    return pool
+
+
+def context(site: Optional[str] = None, route_filter: Optional[RouteFilter] = None,
+            headless: bool = True, persistent: Optional[bool] = None, **context_options):
+    """A context from this thread's shared pool; see BrowserPool.context."""
+    return get_pool().context(site=site, route_filter=route_filter, headless=headless,
+                              persistent=persistent, **context_options)
+
+
+@contextmanager
+def session():
+    """
+    Keep the shared browser warm for the duration of the block, then
+    close it. Nested sessions leave closing to the outermost one.
+    """
+    depth = getattr(_local, 'session_depth', 0)
+    _local.session_depth = depth + 1
+    try:
+        yield get_pool()
+    finally:
+        _local.session_depth = depth
+        if depth == 0:
+            get_pool().close()
+
+
+@atexit.register
+def _close_all():
+    # Playwright objects can only be used from the thread that made them,
+    # so only this (main) thread's pool is closed here; worker threads
+    # close theirs with session()
+    with _pools_lock:
+        pools = [pool for pool in _pools if pool.thread == threading.get_ident()]
+    for pool in pools:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent browser profiles")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("sizes", help="Disk used by each site's profile")
+    purge_parser = sub.add_parser("purge", help="Clear cached files from profiles")
+    purge_parser.add_argument("sites", nargs="*", help="Sites to purge (default: all)")
+    purge_parser.add_argument("--all", action="store_true",
+                              help="Delete the whole profile, cookies and logins included")
+    args = parser.parse_args()
+    
+    profiles = sorted(p for p in PROFILE_ROOT.iterdir() if p.is_dir()) if PROFILE_ROOT.exists() else []
+    if args.command == "purge":
+        sites = sorted({p.name.removesuffix(_HEADED_SUFFIX) for p in profiles})
+        for site in args.sites or sites:
+            freed = purge_profile(site, everything=args.all)
+            print(f"{site:<16} freed {freed / 1e6:>8.1f} MB")
+    else:
+        print(f"Profiles in {PROFILE_ROOT} (cache cap {CACHE_MAX_MB} MB, "
+              f"profile limit {PROFILE_MAX_MB} MB)")
+        for path in profiles:
+            total = dir_size(path)
+            cache = sum(dir_size(path / d) for d in _CACHE_DIRS)
+            print(f"{path.name:<23} {total / 1e6:>8.1f} MB  ({cache / 1e6:.1f} MB cache)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Pooled HTTP sessions for pages that don't need a browser.
+
+Some sites serve their tables as plain server-rendered HTML (Bart Torvik's
+trank.php), so a season is one GET instead of a Chromium page load. Each
+site gets one requests.Session per thread with a keep-alive connection
+pool and retries on 429/5xx, so a loop over seasons reuses the same TCP and
+TLS connection rather than reconnecting for every request.
+
+Usage:
+    from shared import http_client
+    
+    response = http_client.get("torvik", "https://barttorvik.com/trank.php",
+                               params={'year': 2024, 'end': '20240317'})
+    html = http_client.text(response)
+
+Every request is recorded as an "http.get" trace span with its status,
+bytes and whether it reused a pooled connection. requests.Session isn't
+safe to share between threads, so each thread gets its own sessions.
+
+A site whose 429/503 answers mean something other than "try again"
+(bot protection handled by hybrid_session) sets its own statuses with
+set_retry_statuses, so those responses come back at once.
+"""
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from shared import tracing
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+# Connections kept open per host
+POOL_SIZE = 4
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (10, 60)
+
+# Statuses retried (with backoff) before a response is returned
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_local = threading.local()
+
+# Site -> statuses retried for it, where not RETRY_STATUSES
+_site_retry_statuses: Dict[str, frozenset] = {}
+
+
+def _retry(statuses=RETRY_STATUSES) -> Retry:
+    return Retry(total=3, backoff_factor=1, status_forcelist=tuple(sorted(statuses)),
+                 allowed_methods=frozenset({'GET', 'HEAD'}), raise_on_status=False)
+
+
+def _mount(session: requests.Session, site: str):
+    retry = _retry(_site_retry_statuses.get(site, RETRY_STATUSES))
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def set_retry_statuses(site: str, statuses):
+    """
+    Retry only `statuses` for `site`. Applies to sessions created from now
+    on and to this thread's existing one (whose pooled connections are
+    dropped with its old adapter).
+    """
+    _site_retry_statuses[site] = frozenset(statuses)
+    session = getattr(_local, 'sessions', {}).get(site)
+    if session is not None:
+        _mount(session, site)
+
+
+def get_session(site: str, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    This thread's session for `site`, created on first use. `headers` are
+    added to the session (on creation or later, e.g. a Referer).
+    """
+    sessions = getattr(_local, 'sessions', None)
+    if sessions is None:
+        sessions = _local.sessions = {}
+    session = sessions.get(site)
+    if session is None:
+        session = requests.Session()
+        _mount(session, site)
+        session.headers.update(DEFAULT_HEADERS)
+        sessions[site] = session
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get(site: str, url: str, params: Optional[Dict] = None, timeout=DEFAULT_TIMEOUT,
+        raise_for_status: bool = True, **kwargs) -> requests.Response:
+    """
+    GET `url` with the site's pooled session.
+    
+    Raises:
+        requests.HTTPError: for a 4xx/5xx response (after retries), unless
+            raise_for_status is False
+        requests.RequestException: for connection errors and timeouts
+    """
+    session = get_session(site)
+    with tracing.span("http.get", url=url, params=params) as s:
+        pooled = _idle_connections(session, url)
+        response = session.get(url, params=params, timeout=timeout, **kwargs)
+        s.set(status=response.status_code, bytes=len(response.content), reused=pooled > 0,
+              server_ms=round(response.elapsed.total_seconds() * 1000, 1))
+        if raise_for_status:
+            response.raise_for_status()
+        return response
+
+
+def text(response: requests.Response) -> str:
+    """
+    Response body as text. Pages that don't declare a charset are read as
+    UTF-8 rather than requests' ISO-8859-1 default for text/html.
+    """
+    if 'charset' not in response.headers.get('Content-Type', '').lower():
+        response.encoding = 'utf-8'
+    return response.text
+
+
+def _idle_connections(session: requests.Session, url: str) -> int:
+    """Idle keep-alive connections the session holds for `url`'s host."""
+    try:
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        pools = session.get_adapter(url).poolmanager.pools
+        idle = 0
+        for key in pools.keys():
+            if key.key_host == parts.hostname and key.key_port == port:
+                pool = pools[key].pool
+                # The queue is padded with None placeholders for unopened slots
+                idle += sum(conn is not None for conn in list(pool.queue)) if pool is not None else 0
+        return idle
+    except Exception:
+        return 0
+
+
+def close(site: Optional[str] = None):
+    """Close this thread's session for `site` (or all of them)."""
+    sessions = getattr(_local, 'sessions', None) or {}
+    for name in [site] if site else list(sessions):
+        session = sessions.pop(name, None)
+        if session is not None:
+            session.close()
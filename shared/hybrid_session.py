@@ -0,0 +1,169 @@
+"""
+Browser-established sessions for plain-HTTP crawling.
+
+Sites behind bot protection (KenPom) block a bare requests.Session, but
+once a real browser has passed the check, its cookies and User-Agent are
+good for plain HTTP too. A HybridSession loads the site once in the shared
+browser pool, copies the context's cookies and User-Agent into the site's
+pooled http_client session, and then fetches pages over HTTP. A response
+that looks like a challenge (403/429/503 or a challenge page) triggers one
+browser refresh of the cookies; if HTTP is still challenged after that,
+the page itself is loaded in the browser, and so is every later page of
+the session rather than paying for another refused request and refresh
+each time. The site's HTTP session doesn't
+retry challenge statuses itself, so a challenge costs one request rather
+than four and several seconds of backoff.
+
+Usage:
+    session = hybrid_session.HybridSession("kenpom", "https://kenpom.com/")
+    for year in range(2002, 2026):
+        html = session.get(f"https://kenpom.com/index.php?y={year}")
+    print(session.stats)    # {'http': 24, 'browser': 1, 'refreshes': 0, 'browser_only': 0}
+
+Browser loads are "hybrid.browser" trace spans and HTTP fetches the usual
+"http.get" spans, so a trace shows how often the browser was needed.
+"""
+from typing import Callable, Dict, Optional
+
+import requests
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+from shared import browser_pool, http_client, tracing
+
+
+# Statuses bot protection answers with
+CHALLENGE_STATUSES = frozenset({403, 429, 503})
+
+# Text found on challenge and block pages (Cloudflare and similar)
+CHALLENGE_MARKERS = (
+    'challenge-platform', 'cf-chl-', 'Just a moment...', 'Attention Required!',
+    'Checking your browser', 'cf-turnstile',
+)
+
+
+class Challenged(requests.RequestException):
+    """The site kept answering with a challenge, over HTTP and in the browser."""
+
+
+def is_challenge(status: int, html: str) -> bool:
+    """Whether a response looks like bot protection rather than the page."""
+    if status in CHALLENGE_STATUSES:
+        return True
+    # Challenge pages are short; real pages can mention the markers in scripts
+    head = html[:20000]
+    return any(marker in head for marker in CHALLENGE_MARKERS)
+
+
+class HybridSession:
+    """Plain-HTTP fetching with cookies obtained from the shared browser."""
+    
+    def __init__(self, site: str, start_url: str, user_agent: Optional[str] = None,
+                 challenge: Callable[[int, str], bool] = is_challenge,
+                 route_filter: Optional[browser_pool.RouteFilter] = None, timeout_ms: int = 30000):
+        """
+        Args:
+            site: Site key for the browser filter and the HTTP session
+            start_url: Page loaded in the browser to establish the session
+            user_agent: User-Agent for the browser context (and so for HTTP);
+                the browser's own if None
+            challenge: Predicate on (status, html) telling a challenge apart
+                from the real page
+            route_filter: Filter for the browser context (default: the
+                site's own from SITE_FILTERS)
+            timeout_ms: Navigation timeout for browser loads
+        """
+        self.site = site
+        self.start_url = start_url
+        self.user_agent = user_agent
+        self.challenge = challenge
+        self.route_filter = route_filter
+        self.timeout_ms = timeout_ms
+        self.established = False
+        # Cleared once a refresh fails to get HTTP past the check
+        self.http_ok = True
+        # browser_only: pages loaded in the browser because HTTP was given up on
+        self.stats = {'http': 0, 'browser': 0, 'refreshes': 0, 'browser_only': 0}
+        # Challenges are answered with a browser refresh, not HTTP retries
+        http_client.set_retry_statuses(site, http_client.RETRY_STATUSES - CHALLENGE_STATUSES)
+    
+    def _context(self):
+        options = {'user_agent': self.user_agent} if self.user_agent else {}
+        return browser_pool.context(site=self.site, route_filter=self.route_filter, **options)
+    
+    def browser_get(self, url: str) -> str:
+        """
+        Load `url` in the browser, export the context's cookies and
+        User-Agent to the HTTP session, and return the page's HTML.
+        
+        Raises:
+            Challenged: if the page is still a challenge after loading
+        """
+        with tracing.span("hybrid.browser", site=self.site, url=url) as s, self._context() as context:
+            page = context.new_page()
+            try:
+                response = page.goto(url, wait_until='domcontentloaded', timeout=self.timeout_ms)
+                status = response.status if response is not None else 200
+                html = page.content()
+                if self.challenge(status, html):
+                    # Interstitials reload into the real page once solved
+                    try:
+                        page.wait_for_load_state('networkidle', timeout=self.timeout_ms)
+                    except PlaywrightTimeout:
+                        pass
+                    status, html = 200, page.content()
+                cookies = context.cookies()
+                user_agent = page.evaluate("navigator.userAgent")
+            finally:
+                page.close()
+            self.stats['browser'] += 1
+            s.set(status=status, cookies=len(cookies), bytes=len(html))
+        
+        if self.challenge(status, html):
+            raise Challenged(f"{url} is still a challenge page in the browser")
+        self._export(cookies, user_agent, url)
+        return html
+    
+    def _export(self, cookies, user_agent: str, referer: str):
+        session = http_client.get_session(self.site, headers={'User-Agent': user_agent, 'Referer': referer})
+        for cookie in cookies:
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'),
+                                path=cookie.get('path', '/'), secure=cookie.get('secure', False))
+        self.established = True
+    
+    def establish(self):
+        """Pass the site's check in the browser and take over its cookies."""
+        print(f"Establishing {self.site} session in the browser ({self.start_url})...")
+        self.browser_get(self.start_url)
+    
+    def get(self, url: str, params: Optional[Dict] = None) -> str:
+        """
+        HTML of `url`, over HTTP with the browser's session when possible.
+        
+        Raises:
+            Challenged: if neither HTTP nor the browser gets past the check
+            requests.RequestException: for connection errors and other
+                HTTP errors
+        """
+        if not self.http_ok:
+            self.stats['browser_only'] += 1
+            return self.browser_get(requests.Request('GET', url, params=params).prepare().url)
+        if not self.established:
+            self.establish()
+        
+        for attempt in range(2):
+            response = http_client.get(self.site, url, params=params, raise_for_status=False)
+            html = http_client.text(response)
+            if not self.challenge(response.status_code, html):
+                response.raise_for_status()
+                self.stats['http'] += 1
+                return html
+            if attempt == 0:
+                # Cookies expired or were never accepted: refresh them once
+                print(f"  Challenged over HTTP ({response.status_code}); refreshing the session in the browser")
+                self.stats['refreshes'] += 1
+                self.establish()
+        
+        print(f"  Still challenged over HTTP; loading this and later pages in the browser")
+        self.http_ok = False
+        self.stats['browser_only'] += 1
+        return self.browser_get(response.url)
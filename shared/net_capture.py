@@ -0,0 +1,143 @@
+"""
+Capture of the JSON responses a Playwright page receives.
+
+Single-page apps such as CBB Analytics render their tables from JSON API
+responses. Instead of driving the UI until the table shows every row and
+reading it back out of the DOM, a ResponseCapture listens on the page's
+"response" event and keeps the JSON ones, so the structured payload can
+be used directly: every row whatever the table's page size, and values
+and percentiles as separate fields.
+
+Usage:
+    capture = net_capture.ResponseCapture(page, match='cbbanalytics')
+    page.goto(url)
+    hit = capture.wait_for(lambda url, data: len(net_capture.find_records(data)) >= 300)
+    if hit:
+        url, data = hit
+        df = pd.json_normalize(net_capture.find_records(data))
+    
+    # Only what arrived after an action
+    mark = capture.mark()
+    page.click(...)
+    hit = capture.wait_for(predicate, since=mark)
+
+Bodies are read when first asked for, not inside the event handler (the
+sync API can't block there). Each wait is recorded as a "capture.wait"
+trace span. Set save_dir to also write every payload to disk, which is how
+field names for a new endpoint are found.
+"""
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from shared import tracing
+
+
+class ResponseCapture:
+    """Keeps the JSON responses a page receives while attached."""
+    
+    def __init__(self, page, match: Union[str, Callable, None] = None, save_dir: Optional[str] = None):
+        """
+        Args:
+            page: Playwright page to listen on
+            match: Substring of the response URL, or a predicate on the
+                Response; None keeps every JSON response
+            save_dir: Directory to write each payload to as it is read
+        """
+        self.page = page
+        self.match = (lambda r: match in r.url) if isinstance(match, str) else match
+        self.save_dir = Path(save_dir) if save_dir else None
+        self._responses = []
+        self._payloads: Dict[int, Any] = {}
+        page.on("response", self._on_response)
+    
+    def _on_response(self, response):
+        try:
+            if 'json' not in (response.headers.get('content-type') or ''):
+                return
+            if self.match is not None and not self.match(response):
+                return
+        except Exception:
+            return
+        self._responses.append(response)
+    
+    def __len__(self):
+        return len(self._responses)
+    
+    def mark(self) -> int:
+        """Position to pass as `since` to only see later responses."""
+        return len(self._responses)
+    
+    def _payload(self, index: int) -> Any:
+        if index not in self._payloads:
+            response = self._responses[index]
+            try:
+                data = response.json()
+            except Exception:
+                data = None
+            self._payloads[index] = data
+            if self.save_dir is not None and data is not None:
+                self.save_dir.mkdir(parents=True, exist_ok=True)
+                name = re.sub(r'[^\w.-]+', '_', response.url.split('://', 1)[-1])[:120]
+                (self.save_dir / f"{index:03d}_{name}.json").write_text(json.dumps(data, indent=1))
+        return self._payloads[index]
+    
+    def payloads(self, since: int = 0, until: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """(url, parsed JSON) of each captured response from `since` (up to `until`)."""
+        found = []
+        for index in range(since, len(self._responses) if until is None else until):
+            data = self._payload(index)
+            if data is not None:
+                found.append((self._responses[index].url, data))
+        return found
+    
+    def wait_for(self, predicate: Callable[[str, Any], bool], since: int = 0,
+                 timeout_ms: int = 30000, poll_ms: int = 100) -> Optional[Tuple[str, Any]]:
+        """
+        Wait for a response from `since` on whose (url, data) satisfies
+        `predicate`; the latest match is returned. None on timeout.
+        """
+        with tracing.span("capture.wait") as s:
+            deadline = time.monotonic() + timeout_ms / 1000
+            checked = since
+            hit = None
+            while True:
+                # Reading a body lets Playwright dispatch more responses,
+                # so only look at those already captured
+                end = len(self._responses)
+                for url, data in self.payloads(checked, end):
+                    if predicate(url, data):
+                        hit = (url, data)
+                checked = end
+                if hit is not None or time.monotonic() >= deadline:
+                    break
+                self.page.wait_for_timeout(poll_ms)
+            s.set(responses=checked - since, url=hit[0] if hit else None, timed_out=hit is None)
+            return hit
+    
+    def close(self):
+        """Stop listening (captured responses are kept)."""
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+
+
+def find_records(data: Any, min_rows: int = 1) -> List[Dict]:
+    """
+    The largest list of objects anywhere in a JSON payload (the table's
+    rows, however deeply the API wraps them), or [] if none has `min_rows`.
+    """
+    best: List[Dict] = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            if node and all(isinstance(item, dict) for item in node) and len(node) > len(best):
+                best = node
+            stack.extend(item for item in node if isinstance(item, (dict, list)))
+    return best if len(best) >= min_rows else []
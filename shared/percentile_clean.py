@@ -0,0 +1,433 @@
+"""
+Percentile-prefix cleaning for CBB Analytics frames.
+
+CBB Analytics shows each stat's percentile rank next to its value, and the
+scraped cell text runs the two together: "2347.9%" is percentile 23 and
+47.9%, "87+17.6" is percentile 87 and +17.6. clean_percentile_value()
+undoes that for one cell. clean_columns() does the same for whole columns
+at once with pandas string kernels and NumPy masks, and gives exactly the
+same result: cells in a shape it doesn't handle (text, stray whitespace,
+non-string objects) go through clean_percentile_value() one by one.
+
+Usage:
+    percentile_clean.clean_columns(df, numeric_cols)    # in place
+    df[col] = percentile_clean.clean_series(df[col])
+
+extract_first_numbers() is the vectorized form of the older "leading
+number" cleanup in CBBAnalyticsScraper.clean_numeric_columns.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+
+def clean_percentile_value(val):
+    """
+    Remove percentile prefix from values
+    CBB Analytics displays percentile rankings alongside actual values,
+    which get scraped as concatenated strings (e.g., "2347.9%" = percentile 23 + actual 47.9%)
+    """
+    if pd.isna(val) or val == '' or val == '-':
+        return val
+    
+    val_str = str(val).strip()
+    
+    if len(val_str) < 4:
+        return val
+    
+    # Check if value is already clean (no percentile prefix needed)
+    # Values already in typical ranges don't need cleaning
+    try:
+        val_float = float(val_str.replace('%', ''))
+        # If it's a percentage in 0-150% range, might already be clean
+        if val_str.endswith('%') and 0 <= val_float <= 150:
+            # But percentages like "2347.9%" clearly have prefixes
+            if val_float <= 100 and len(val_str) <= 7:  # e.g., "45.3%" or "99.9%"
+                return val  # Already clean
+        # If it's a non-percentage value in typical basketball ranges, might be clean
+        elif not val_str.endswith('%'):
+            # ORtg/DRtg range: 85-130
+            # PTS/G range: 50-100
+            # Per-game stats: 0-20
+            # If value is in these ranges AND has reasonable length AND no leading zeros, it might be clean
+            has_leading_zero = val_str[0] == '0' and len(val_str) > 3  # "093.6" or "0130.4"
+            if (not has_leading_zero and
+                (85 <= val_float <= 130 or 50 <= val_float <= 100 or 0 <= val_float <= 20) 
+                and len(val_str) <= 6):  # e.g., "88.1" or "93.9" (not "1199.7" or "093.6")
+                return val  # Already clean
+    except:
+        pass  # Continue with percentile removal logic
+    
+    # Pattern 1: "87+17.6" -> "17.6" (for Net Rtg with +)
+    match = re.match(r'^(\d{1,3})\+(.+)$', val_str)
+    if match and 0 <= int(match.group(1)) <= 100:
+        return match.group(2)
+    
+    # Pattern 2: "87-17.6" -> "-17.6" (for negative Net Rtg)
+    match = re.match(r'^(\d{1,3})(-\d+\.?\d*)$', val_str)
+    if match and 0 <= int(match.group(1)) <= 100:
+        return match.group(2)
+    
+    # Pattern 3: Percentage values like "2347.9%" or "645.3%" (percentile + percentage)
+    if val_str.endswith('%') and val_str[0].isdigit() and '.' in val_str:
+        candidates = []
+        
+        # Try 1-digit and 2-digit percentiles for percentage values
+        for percentile_len in [1, 2]:
+            if len(val_str) <= percentile_len + 1:
+                continue
+            
+            percentile_str = val_str[:percentile_len]
+            remaining = val_str[percentile_len:]
+            
+            try:
+                percentile = int(percentile_str)
+                if not (0 <= percentile <= 100):
+                    continue
+                
+                actual_val = float(remaining.replace('%', ''))
+                if 0 <= actual_val <= 150:
+                    candidates.append((percentile_len, remaining, actual_val))
+            except:
+                continue
+        
+        if candidates:
+            candidates_sorted = sorted(candidates, key=lambda x: (x[0], -x[2]))
+            
+            # Prefer values in typical percentage range (30-100%)
+            for percentile_len, remaining, actual_val in candidates_sorted:
+                if 30 <= actual_val <= 100:
+                    val_part = remaining.replace('%', '')
+                    if '.' in val_part:
+                        parts = val_part.split('.')
+                        parts[0] = parts[0].lstrip('0') or '0'
+                        val_part = '.'.join(parts)
+                    return val_part + '%'
+            
+            # If no candidate in typical range, try any value <= 100%
+            for percentile_len, remaining, actual_val in candidates_sorted:
+                if actual_val <= 100:
+                    val_part = remaining.replace('%', '')
+                    if '.' in val_part:
+                        parts = val_part.split('.')
+                        parts[0] = parts[0].lstrip('0') or '0'
+                        val_part = '.'.join(parts)
+                    return val_part + '%'
+            
+            # Take first candidate (shortest percentile)
+            percentile_len, remaining, actual_val = candidates_sorted[0]
+            val_part = remaining.replace('%', '')
+            if '.' in val_part:
+                parts = val_part.split('.')
+                parts[0] = parts[0].lstrip('0') or '0'
+                val_part = '.'.join(parts)
+            return val_part + '%'
+    
+    # Universal pattern for non-percentage numbers
+    if val_str[0].isdigit() and '.' in val_str and not val_str.endswith('%'):
+        # CHECK IF ALREADY CLEAN FIRST
+        try:
+            current_val = float(val_str)
+            # If value is already in expected ranges and short enough, it's probably clean
+            # BUT: Check for leading zeros (e.g., "0130.4") or values that are too long
+            # Clean values should be like "130.4" (5 chars), not "0130.4" (6 chars with leading 0)
+            has_leading_zero = val_str[0] == '0' and len(val_str) > 4  # "0130.4" has leading 0
+            if not has_leading_zero and current_val < 150 and len(val_str) <= 6:
+                # ORtg/DRtg range (85-135)
+                if 85 <= current_val <= 135:
+                    return val
+                # PTS/G, assists, rebounds, etc. range (0-85)
+                if 0 <= current_val < 85:
+                    return val
+        except:
+            pass
+        
+        candidates = []
+        
+        # Try all possible percentile lengths (1-3 digits)
+        for percentile_len in [1, 2, 3]:
+            if len(val_str) <= percentile_len:
+                continue
+            
+            percentile_str = val_str[:percentile_len]
+            remaining = val_str[percentile_len:]
+            
+            try:
+                percentile = int(percentile_str)
+                if not (0 <= percentile <= 100):
+                    continue
+                actual_val = float(remaining)
+                candidates.append((percentile_len, remaining, actual_val))
+            except:
+                continue
+        
+        if candidates:
+            candidates_sorted = sorted(candidates, key=lambda x: x[0])
+            
+            # First priority: ORtg/DRtg range (85-135) - extended to 135 to catch outliers
+            for percentile_len, actual_val_str, actual_val in candidates_sorted:
+                if 85 <= actual_val <= 135:
+                    if '.' in actual_val_str:
+                        parts = actual_val_str.split('.')
+                        parts[0] = parts[0].lstrip('0') or '0'
+                        return '.'.join(parts)
+                    return actual_val_str.lstrip('0') or '0'
+            
+            # Second priority: Medium/large ranges (20-85)
+            for percentile_len, actual_val_str, actual_val in candidates_sorted:
+                if 20 <= actual_val < 85:
+                    if '.' in actual_val_str:
+                        parts = actual_val_str.split('.')
+                        parts[0] = parts[0].lstrip('0') or '0'
+                        return '.'.join(parts)
+                    return actual_val_str.lstrip('0') or '0'
+            
+            # Third priority: Small per-game stats (0-20)
+            for percentile_len, actual_val_str, actual_val in candidates_sorted:
+                if 0 <= actual_val < 20:
+                    if '.' in actual_val_str:
+                        parts = actual_val_str.split('.')
+                        parts[0] = parts[0].lstrip('0') or '0'
+                        return '.'.join(parts)
+                    return actual_val_str.lstrip('0') or '0'
+            
+            # Fourth priority: Values over 130
+            for percentile_len, actual_val_str, actual_val in candidates_sorted:
+                if actual_val > 130:
+                    if '.' in actual_val_str:
+                        parts = actual_val_str.split('.')
+                        parts[0] = parts[0].lstrip('0') or '0'
+                        return '.'.join(parts)
+                    return actual_val_str.lstrip('0') or '0'
+            
+            # Fallback: Return first candidate
+            result = candidates_sorted[0][1]
+            if '.' in result:
+                parts = result.split('.')
+                parts[0] = parts[0].lstrip('0') or '0'
+                result = '.'.join(parts)
+            return result
+    
+    return val
+
+
+# Cell shapes cleaned without a Python call per cell. ASCII only, so they
+# mean the same to Python's re and to pyarrow's RE2; the whitespace around
+# them is what str.strip() would remove.
+_WHITESPACE = ' \t\n\r\f\v'
+_WS = r'[ \t\n\r\f\v]*'
+_NUMBER = rf'{_WS}[0-9]+(?:\.[0-9]+)?%?{_WS}'          # "2347.9%", "12118.4"; "45" is kept
+_PLUS = rf'{_WS}[0-9]{{1,3}}\+[!-~]+{_WS}'               # "87+17.6"
+_MINUS = rf'{_WS}[0-9]{{1,3}}-[0-9]+\.?[0-9]*{_WS}'      # "87-17.6"
+
+_LEADING_NUMBER = r'^(\d+)?(-?\d+\.?\d*)'
+
+
+def _is_text(series: pd.Series) -> bool:
+    """Whether every non-missing value is a str (and there is one)."""
+    return pd.api.types.infer_dtype(series, skipna=True) == 'string'
+
+
+def _mask(result: pd.Series) -> np.ndarray:
+    return np.array(result.to_numpy(dtype=bool, na_value=False))
+
+
+def _first(candidates) -> np.ndarray:
+    """For each cell, the width of the first (width, mask) candidate that holds, or 0."""
+    choice = np.zeros(len(candidates[0][1]), dtype=int)
+    for width, mask in candidates:
+        choice = np.where((choice == 0) & mask, width, choice)
+    return choice
+
+
+def _clean_decimals(text: pd.Series):
+    """
+    clean_percentile_value for stripped _NUMBER cells with a decimal point
+    and at most 15 digits.
+    
+    Values are compared as exact integers (the digits, with `scale` for
+    the decimal point); up to 15 digits that agrees with comparing float()s.
+    
+    Returns:
+        (changed, values): mask of the cells whose value changes, and the
+        new values of those cells
+    """
+    if not len(text):
+        # pyarrow-backed .str methods fail on an empty Series
+        return np.zeros(0, dtype=bool), np.empty(0, dtype=object)
+    body = text.str.removesuffix('%')
+    length = text.str.len().to_numpy()
+    percent = length > body.str.len().to_numpy()
+    point = body.str.find('.').to_numpy()
+    places = length - percent - point - 1
+    scale = 10 ** places
+    number = body.str.replace('.', '', regex=False).astype('int64').to_numpy()
+    leading_zero = _mask(body.str.startswith('0'))
+    
+    def between(scaled, low=None, high=None, below=None):
+        ok = np.ones(len(scaled), dtype=bool)
+        if low is not None:
+            ok &= scaled >= low * scale
+        if high is not None:
+            ok &= scaled <= high * scale
+        if below is not None:
+            ok &= scaled < below * scale
+        return ok
+    
+    # Already clean: percentages up to 100% in 7 characters, other values
+    # in the usual stat ranges without a leading zero, anything under 4 characters
+    keep = (length < 4) | np.where(
+        percent,
+        between(number, high=100) & (length <= 7),
+        (~leading_zero & (between(number, high=20) | between(number, 50, 130)) & (length <= 6))
+        | (~(leading_zero & (length > 4)) & (length <= 6) & between(number, high=135)),
+    )
+    
+    # What is left after a 1-, 2- or 3-digit percentile prefix
+    prefix = {}
+    for width in (1, 2, 3):
+        valid = point >= width
+        modulus = 10 ** np.maximum(point - width + places, 0)
+        rest = number % modulus
+        if width == 3:
+            valid &= number // modulus <= 100
+        prefix[width] = (rest, valid)
+    
+    def where(low=None, high=None, below=None, widths=(1, 2, 3)):
+        return [(w, prefix[w][1] & between(prefix[w][0], low, high, below)) for w in widths]
+    
+    # Percentages (1- or 2-digit prefixes, up to 150%): 30-100% first,
+    # then anything up to 100%, then the shortest prefix
+    pct_choice = _first(where(30, 100, widths=(1, 2)) + where(high=100, widths=(1, 2))
+                        + where(high=150, widths=(1, 2)))
+    # Other values: ratings (85-135) first, then 20-85, 0-20, over 135.
+    # Every rest is >= 0, so one of those always holds
+    value_choice = _first(where(85, 135) + where(20, below=85) + where(below=20) + where(low=0))
+    choice = np.where(keep, 0, np.where(percent, pct_choice, value_choice))
+    
+    # Written back with the integer part's leading zeros dropped
+    picked = np.empty(len(text), dtype=object)
+    for width in (1, 2, 3):
+        rows = choice == width
+        if rows.any():
+            rest = text[rows].str[width:].str.lstrip('0')
+            picked[rows] = rest.where(~_mask(rest.str.startswith('.')), '0' + rest).to_numpy(dtype=object)
+    changed = choice > 0
+    return changed, picked[changed]
+
+
+def _clean_text(values: np.ndarray) -> np.ndarray:
+    """clean_percentile_value over an object array of str and missing values."""
+    out = values.copy()
+    if not len(values):
+        return out
+    text = pd.Series(values, dtype="string")
+    todo = _mask(text.notna())
+    
+    # Numbers without a decimal point are kept; those with one and up to
+    # 15 digits are worked out together
+    number = _mask(text.str.fullmatch(_NUMBER))
+    todo &= ~number
+    if number.any():
+        stripped = text[number].str.strip(_WHITESPACE)
+        decimal = _mask(stripped.str.contains('.', regex=False))
+        long = decimal & _mask(stripped.str.removesuffix('%').str.len() > 16)
+        todo[np.flatnonzero(number)[long]] = True
+        decimal &= ~long
+        if decimal.any():
+            changed, new = _clean_decimals(stripped[decimal])
+            out[np.flatnonzero(number)[np.flatnonzero(decimal)[changed]]] = new
+    
+    # "87+17.6" -> "17.6", "87-17.6" -> "-17.6", for percentiles up to 100
+    for pattern, sign in ((_PLUS, '+'), (_MINUS, '-')):
+        if not todo.any():
+            break
+        matched = np.flatnonzero(todo)[_mask(text[todo].str.fullmatch(pattern))]
+        if not len(matched):
+            continue
+        parts = text.iloc[matched].str.strip(_WHITESPACE).str.split(sign, n=1, expand=True)
+        percentile, rest = parts[0], parts[1]
+        hit = _mask(((percentile.str.len() + 1 + rest.str.len()) >= 4)
+                    & ((percentile.str.len() < 3) | (percentile <= '100')))
+        rows = matched[hit]
+        out[rows] = (rest if sign == '+' else sign + rest).to_numpy(dtype=object)[hit]
+        todo[rows] = False
+    
+    # Everything else one cell at a time
+    for row in np.flatnonzero(todo):
+        out[row] = clean_percentile_value(values[row])
+    return out
+
+
+def clean_series(series: pd.Series) -> pd.Series:
+    """series.apply(clean_percentile_value), vectorized for string columns."""
+    if not _is_text(series):
+        return series.apply(clean_percentile_value)
+    return pd.Series(_clean_text(series.to_numpy(dtype=object)), index=series.index, name=series.name)
+
+
+def clean_columns(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """
+    Remove percentile prefixes from every cell of `columns`, in place.
+    
+    Equivalent to df[col] = df[col].apply(clean_percentile_value) for each
+    column, but string columns are cleaned together in one pass.
+    
+    Returns:
+        df
+    """
+    text_columns = []
+    for col in columns:
+        if _is_text(df[col]):
+            text_columns.append(col)
+        else:
+            df[col] = df[col].apply(clean_percentile_value)
+    if not text_columns or not len(df):
+        return df
+    
+    rows = len(df)
+    cleaned = _clean_text(np.concatenate([df[col].to_numpy(dtype=object) for col in text_columns]))
+    for i, col in enumerate(text_columns):
+        df[col] = pd.Series(cleaned[i * rows:(i + 1) * rows], index=df.index)
+    return df
+
+
+def extract_first_number(val):
+    """
+    The leading number of a value, dropping a 1- or 2-digit prefix glued to
+    it (CBBAnalyticsScraper.clean_numeric_columns, one cell).
+    """
+    if pd.isna(val):
+        return val
+    val_str = str(val)
+    # Match pattern like "126.2" or "-5.3" at the start, ignore what comes after
+    match = re.search(_LEADING_NUMBER, val_str)
+    if match:
+        # If we have a digit followed by another number, take the second (e.g., "95126.2" -> "126.2")
+        if match.group(1) and match.group(2):
+            full_match = match.group(1) + match.group(2)
+            # If the first group is 2 digits and looks like percentile (0-100)
+            if len(match.group(1)) <= 2 and int(match.group(1)) <= 100:
+                return match.group(2)
+            return full_match
+        # Otherwise just return the number
+        return match.group(2) if match.group(2) else match.group(1)
+    return val
+
+
+def extract_first_numbers(series: pd.Series) -> pd.Series:
+    """series.apply(extract_first_number), vectorized for columns of str (any string storage)."""
+    if series.empty or not _is_text(series):
+        return series.apply(extract_first_number)
+    # Python's re on an object column, so \d and backtracking match the per-cell form
+    text = series if series.dtype == object else series.astype(object)
+    groups = text.str.extract(_LEADING_NUMBER)
+    prefix, number = groups[0], groups[1]
+    out = series.to_numpy(dtype=object).copy()
+    found = number.notna().to_numpy()
+    joined = prefix.fillna('') + number
+    short = prefix.str.len().fillna(0).to_numpy() <= 2
+    out[found] = np.where(short, number.to_numpy(dtype=object), joined.to_numpy(dtype=object))[found]
+    # infer_objects settles the dtype the way apply's result inference does
+    return pd.Series(out, index=series.index, name=series.name).infer_objects()
@@ -0,0 +1,160 @@
+"""
+Readiness checks for Playwright pages, in place of fixed sleeps.
+
+A fixed sleep either wastes time (the table was ready after 300 ms) or
+isn't long enough (a slow night, a partial table). These helpers poll the
+page instead and return as soon as it is actually ready, with a hard
+timeout so a broken page can't hang a run:
+
+    # Table has its ~365 teams, or its row count stopped changing
+    rows = readiness.wait_for_rows(page, 'tbody tr', expected=readiness.FULL_TABLE_ROWS)
+    
+    # Clicking a category re-renders the table
+    before = readiness.snapshot(page, 'table')
+    page.click(...)
+    readiness.wait_for_change(page, 'table', before)
+    
+    # A specific XHR finished
+    response = readiness.wait_for_response(page, '/api/stats', lambda: page.click(...))
+
+Each wait is recorded as a "ready.*" trace span with what it saw and
+whether it timed out. On timeout the helpers return what they have
+rather than raising; callers go on as they did after a fixed sleep.
+"""
+import time
+from typing import Callable, Optional, Union
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+from shared import tracing
+
+
+# Division I has 361-365 teams depending on the season; a table with at
+# least this many rows is taken to be complete
+FULL_TABLE_ROWS = 360
+
+# How long the row count must hold once `expected` rows are present
+EXPECTED_STABLE_MS = 200
+
+_COUNT_JS = "sel => document.querySelectorAll(sel).length"
+
+# Signature of the largest element matching `sel`: row count, header text
+# and the first data row, enough to tell one rendering of a table from another
+_SNAPSHOT_JS = """
+sel => {
+    let best = null, bestRows = -1;
+    for (const el of document.querySelectorAll(sel)) {
+        const n = el.querySelectorAll('tr, [role="row"]').length;
+        if (n > bestRows) { best = el; bestRows = n; }
+    }
+    if (!best) return null;
+    const rows = best.querySelectorAll('tr, [role="row"]');
+    const head = best.querySelector('thead, [role="columnheader"]');
+    const first = rows.length > 1 ? rows[1].textContent : '';
+    return rows.length + '|' + (head ? head.textContent : '').slice(0, 500) + '|' + first.slice(0, 200);
+}
+"""
+
+
+def row_count(page, selector: str) -> int:
+    """Number of elements currently matching `selector`."""
+    return page.evaluate(_COUNT_JS, selector)
+
+
+def snapshot(page, selector: str) -> Optional[str]:
+    """Signature of the table matching `selector` (None if there is none)."""
+    return page.evaluate(_SNAPSHOT_JS, selector)
+
+
+def wait_for_rows(page, selector: str, expected: Optional[int] = None, min_rows: int = 1,
+                  stable_ms: int = 1000, timeout_ms: int = 30000, poll_ms: int = 100) -> int:
+    """
+    Wait until the rows matching `selector` have finished loading.
+    
+    Done when at least `expected` rows are present and the count holds for
+    EXPECTED_STABLE_MS, or when at least `min_rows` are present and the
+    count hasn't changed for `stable_ms` (seasons with fewer teams, tables
+    that never reach `expected`). Gives up after `timeout_ms`.
+    
+    Returns:
+        The last row count seen
+    """
+    with tracing.span("ready.rows", selector=selector, expected=expected) as s:
+        deadline = time.monotonic() + timeout_ms / 1000
+        count = -1
+        changed_at = time.monotonic()
+        polls = 0
+        while True:
+            current = row_count(page, selector)
+            polls += 1
+            now = time.monotonic()
+            if current != count:
+                count, changed_at = current, now
+            held_ms = (now - changed_at) * 1000
+            if expected is not None and count >= expected and held_ms >= EXPECTED_STABLE_MS:
+                break
+            if count >= min_rows and held_ms >= stable_ms:
+                break
+            if now >= deadline:
+                s.set(timed_out=True)
+                break
+            page.wait_for_timeout(poll_ms)
+        s.set(rows=count, polls=polls)
+        return count
+
+
+def wait_for_change(page, selector: str, before: Optional[str], stable_ms: int = 500,
+                    timeout_ms: int = 15000, poll_ms: int = 100) -> bool:
+    """
+    Wait until the table matching `selector` differs from the `before`
+    snapshot and then holds still for `stable_ms` (a re-render after a
+    click, a page-size change...).
+    
+    Returns:
+        Whether the table changed before the timeout
+    """
+    with tracing.span("ready.change", selector=selector) as s:
+        deadline = time.monotonic() + timeout_ms / 1000
+        last = before
+        changed = False
+        changed_at = time.monotonic()
+        while True:
+            current = snapshot(page, selector)
+            now = time.monotonic()
+            if current != last:
+                last, changed_at = current, now
+                changed = changed or current != before
+            if changed and current is not None and (now - changed_at) * 1000 >= stable_ms:
+                break
+            if now >= deadline:
+                s.set(timed_out=True)
+                break
+            page.wait_for_timeout(poll_ms)
+        s.set(changed=changed)
+        return changed
+
+
+def wait_for_response(page, match: Union[str, Callable], action: Callable[[], None],
+                      timeout_ms: int = 30000):
+    """
+    Run `action` (a click, a goto...) and wait for the response it triggers.
+    
+    Args:
+        match: Substring of the response URL, or a predicate on the Response
+        action: Callable that triggers the request
+    
+    Returns:
+        The finished Response, or None if none matched before the timeout
+    """
+    predicate = (lambda r: match in r.url) if isinstance(match, str) else match
+    with tracing.span("ready.response", match=match if isinstance(match, str) else None) as s:
+        try:
+            with page.expect_response(predicate, timeout=timeout_ms) as info:
+                action()
+            response = info.value
+            response.finished()
+        except PlaywrightTimeout:
+            s.set(timed_out=True)
+            return None
+        s.set(status=response.status, url=response.url)
+        return response
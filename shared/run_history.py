@@ -0,0 +1,487 @@
+"""
+Run history for the scheduled pipelines.
+
+Every recorded run stores its outcome, duration, rows, bytes written and
+retries in a local SQLite database, along with each traced stage (the
+spans from tracing.py: page.goto, sleeps, parse, db.write, export...).
+The report command turns that into p50/p95 stage latency, failure rates
+and a recent-vs-baseline trend, so a stage that slowly gets heavier
+shows up before it breaks the nightly window.
+
+Recording a pipeline:
+
+    @run_history.recorded("kenpom")
+    def scrape_and_export_tableau(...): ...
+    
+    with run_history.record_run("kenpom") as run:
+        ...
+        run.fail("no rows scraped")
+
+Runs nest: a recorded function called inside another recorded run joins
+it instead of starting its own.
+
+Reports (database: RUN_HISTORY_DB, default run_history.db at the repo root):
+    python shared/run_history.py report [--pipeline kenpom] [--last 30] [--recent 5]
+    python shared/run_history.py runs [--pipeline kenpom] [--limit 20]
+    python shared/run_history.py stage page.goto [--pipeline kenpom] [--limit 20]
+"""
+import argparse
+import contextvars
+import functools
+import json
+import os
+import sqlite3
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import tracing
+
+
+DEFAULT_DB = os.environ.get(
+    "RUN_HISTORY_DB", str(Path(__file__).resolve().parent.parent / "run_history.db")
+)
+
+# A stage whose recent p50 is this much above its baseline p50 is flagged,
+# if the difference is also large enough to matter in a nightly window
+SLOWDOWN_RATIO = 1.25
+SLOWDOWN_MIN_MS = 500
+
+# Span fields stored in their own columns; everything else goes to attrs
+_SPAN_FIELDS = {'ts', 'run', 'id', 'parent', 'source', 'span', 'ms', 'status', 'rows', 'bytes'}
+
+_active_run = contextvars.ContextVar("run_history_active", default=None)
+
+
+class RunHistoryDB:
+    """SQLite store of pipeline runs and their stages."""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DEFAULT_DB
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self._create_tables()
+    
+    def _create_tables(self):
+        """Create tables and indexes if they don't exist."""
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                pipeline TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                finished_at TEXT NOT NULL,
+                duration_ms REAL NOT NULL,
+                outcome TEXT NOT NULL,
+                error TEXT,
+                rows INTEGER,
+                bytes_written INTEGER,
+                retries INTEGER NOT NULL DEFAULT 0,
+                trace_run TEXT
+            );
+            
+            CREATE TABLE IF NOT EXISTS run_stages (
+                run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+                span_id INTEGER NOT NULL,
+                parent_id INTEGER,
+                stage TEXT NOT NULL,
+                source TEXT,
+                started_at TEXT,
+                duration_ms REAL NOT NULL,
+                status TEXT NOT NULL,
+                rows INTEGER,
+                bytes INTEGER,
+                attrs TEXT,
+                PRIMARY KEY (run_id, span_id)
+            );
+            
+            CREATE INDEX IF NOT EXISTS idx_runs_pipeline_started ON runs(pipeline, started_at);
+            CREATE INDEX IF NOT EXISTS idx_run_stages_stage ON run_stages(stage);
+        """)
+        self.conn.commit()
+    
+    def save_run(self, run: Dict, spans: List[Dict]):
+        """Insert one run and its stage spans in a single transaction."""
+        with self.conn:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO runs
+                    (run_id, pipeline, started_at, finished_at, duration_ms, outcome,
+                     error, rows, bytes_written, retries, trace_run)
+                VALUES (:run_id, :pipeline, :started_at, :finished_at, :duration_ms, :outcome,
+                        :error, :rows, :bytes_written, :retries, :trace_run)
+            """, run)
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO run_stages
+                    (run_id, span_id, parent_id, stage, source, started_at, duration_ms,
+                     status, rows, bytes, attrs)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (run['run_id'], s.get('id'), s.get('parent'), s.get('span'), s.get('source'),
+                 s.get('ts'), s.get('ms', 0), s.get('status', 'ok'), _as_int(s.get('rows')),
+                 _as_int(s.get('bytes')),
+                 json.dumps({k: v for k, v in s.items() if k not in _SPAN_FIELDS}, default=str))
+                for s in spans
+            ])
+    
+    def recent_runs(self, pipeline: Optional[str] = None, limit: int = 30) -> List[Dict]:
+        """Most recent runs, newest first."""
+        where, params = ("WHERE pipeline = ?", [pipeline]) if pipeline else ("", [])
+        rows = self.conn.execute(
+            f"SELECT * FROM runs {where} ORDER BY started_at DESC LIMIT ?", params + [limit]
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def stage_totals(self, run_ids: List[str]) -> List[Dict]:
+        """Per run and stage: total time, occurrences and errors."""
+        if not run_ids:
+            return []
+        placeholders = ','.join('?' * len(run_ids))
+        rows = self.conn.execute(f"""
+            SELECT run_id, COALESCE(source, '-') AS source, stage,
+                   SUM(duration_ms) AS total_ms, COUNT(*) AS count,
+                   SUM(status = 'error') AS errors
+            FROM run_stages
+            WHERE run_id IN ({placeholders})
+            GROUP BY run_id, source, stage
+        """, run_ids).fetchall()
+        return [dict(row) for row in rows]
+    
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+
+def _as_int(value) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='milliseconds')
+
+
+class RunRecorder:
+    """Collects the spans of one pipeline run; see record_run()."""
+    
+    def __init__(self, pipeline: str):
+        self.pipeline = pipeline
+        self.run_id = uuid.uuid4().hex
+        self.spans: List[Dict] = []
+        self.outcome = 'success'
+        self.error: Optional[str] = None
+        self.rows: Optional[int] = None
+        self.retries: Optional[int] = None
+    
+    def _collect(self, record: Dict):
+        # Listener for tracing: keep only spans emitted inside this run
+        if _active_run.get() is self:
+            self.spans.append(record)
+    
+    def fail(self, reason: str):
+        """Mark the run as failed (it still completes and is recorded)."""
+        self.outcome = 'failed'
+        self.error = reason
+    
+    def set(self, rows: Optional[int] = None, retries: Optional[int] = None):
+        """Override the row or retry counts derived from the spans."""
+        if rows is not None:
+            self.rows = rows
+        if retries is not None:
+            self.retries = retries
+    
+    def summary(self, started: float, duration_ms: float) -> Dict:
+        """The runs-table row for this run."""
+        exports = [s for s in self.spans if str(s.get('span', '')).startswith(('export.', 'db.write'))]
+        rows = self.rows
+        if rows is None:
+            counts = [_as_int(s.get('rows')) for s in exports]
+            counts = [c for c in counts if c is not None]
+            rows = max(counts) if counts else None
+        written = [_as_int(s.get('bytes')) for s in exports if str(s.get('span', '')).startswith('export.')]
+        written = [b for b in written if b is not None]
+        retries = self.retries
+        if retries is None:
+            retries = sum(1 for s in self.spans
+                          if s.get('span') == 'sleep' and str(s.get('reason', '')).startswith('retry'))
+        return {
+            'run_id': self.run_id,
+            'pipeline': self.pipeline,
+            'started_at': _iso(started),
+            'finished_at': _iso(started + duration_ms / 1000),
+            'duration_ms': round(duration_ms, 3),
+            'outcome': self.outcome,
+            'error': self.error,
+            'rows': rows,
+            'bytes_written': sum(written) if written else None,
+            'retries': retries,
+            'trace_run': tracing.run_id(),
+        }
+
+
+@contextmanager
+def record_run(pipeline: str, db_path: Optional[str] = None):
+    """
+    Record everything traced inside the block as one run of `pipeline`.
+    An exception marks the run as 'error' (and is re-raised); call
+    run.fail() for soft failures. Saving never raises into the pipeline.
+    """
+    current = _active_run.get()
+    if current is not None:
+        yield current
+        return
+    
+    recorder = RunRecorder(pipeline)
+    token = _active_run.set(recorder)
+    tracing.add_listener(recorder._collect)
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        with tracing.span("pipeline", pipeline=pipeline):
+            yield recorder
+    except BaseException as e:
+        recorder.outcome = 'error'
+        recorder.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        tracing.remove_listener(recorder._collect)
+        _active_run.reset(token)
+        try:
+            db = RunHistoryDB(db_path)
+            try:
+                db.save_run(recorder.summary(started, duration_ms), recorder.spans)
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"Warning: Could not save run history: {e}")
+
+
+def recorded(pipeline: str, db_path: Optional[str] = None):
+    """
+    Decorator recording each call as a run of `pipeline`. A False return
+    value marks the run as failed, matching the scrapers' convention.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with record_run(pipeline, db_path) as run:
+                result = func(*args, **kwargs)
+                if result is False:
+                    run.fail(f"{func.__name__} returned False")
+                return result
+        return wrapper
+    return decorator
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile (q in 0-100) of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def build_report(db: RunHistoryDB, pipeline: Optional[str] = None,
+                 last: int = 30, recent: int = 5) -> List[Dict]:
+    """
+    Per pipeline: run counts, failure rates and duration percentiles, plus
+    per-stage p50/p95 of time spent per run. The newest `recent` runs are
+    compared against the older ones in the window to flag slowdowns.
+    """
+    pipelines = [pipeline] if pipeline else [
+        row[0] for row in db.conn.execute("SELECT DISTINCT pipeline FROM runs ORDER BY pipeline")
+    ]
+    report = []
+    for name in pipelines:
+        runs = db.recent_runs(name, limit=last)
+        if not runs:
+            continue
+        recent_ids = {r['run_id'] for r in runs[:recent]}
+        
+        stages: Dict[tuple, Dict] = {}
+        for row in db.stage_totals([r['run_id'] for r in runs]):
+            key = (row['source'], row['stage'])
+            stage = stages.setdefault(key, {'source': key[0], 'stage': key[1], 'runs': 0,
+                                            'count': 0, 'errors': 0, 'all': [],
+                                            'recent': [], 'baseline': []})
+            stage['runs'] += 1
+            stage['count'] += row['count']
+            stage['errors'] += row['errors']
+            stage['all'].append(row['total_ms'])
+            stage['recent' if row['run_id'] in recent_ids else 'baseline'].append(row['total_ms'])
+        
+        stage_rows = []
+        for stage in stages.values():
+            recent_p50 = percentile(stage['recent'], 50)
+            baseline_p50 = percentile(stage['baseline'], 50)
+            change = (recent_p50 / baseline_p50 - 1) if recent_p50 and baseline_p50 else None
+            stage_rows.append({
+                'source': stage['source'],
+                'stage': stage['stage'],
+                'runs': stage['runs'],
+                'count': stage['count'],
+                'error_rate': stage['errors'] / stage['count'] if stage['count'] else 0,
+                'p50_ms': percentile(stage['all'], 50),
+                'p95_ms': percentile(stage['all'], 95),
+                'recent_p50_ms': recent_p50,
+                'baseline_p50_ms': baseline_p50,
+                'change': change,
+                'slower': (change is not None and change >= SLOWDOWN_RATIO - 1
+                           and recent_p50 - baseline_p50 >= SLOWDOWN_MIN_MS),
+            })
+        stage_rows.sort(key=lambda s: s['p50_ms'] or 0, reverse=True)
+        
+        recent_runs = runs[:recent]
+        baseline_runs = runs[recent:]
+        
+        def failure_rate(subset):
+            return sum(r['outcome'] != 'success' for r in subset) / len(subset) if subset else None
+        
+        durations = [r['duration_ms'] for r in runs]
+        report.append({
+            'pipeline': name,
+            'runs': len(runs),
+            'first_run': runs[-1]['started_at'],
+            'last_run': runs[0]['started_at'],
+            'last_outcome': runs[0]['outcome'],
+            'failure_rate': failure_rate(runs),
+            'recent_failure_rate': failure_rate(recent_runs),
+            'baseline_failure_rate': failure_rate(baseline_runs),
+            'p50_ms': percentile(durations, 50),
+            'p95_ms': percentile(durations, 95),
+            'recent_p50_ms': percentile([r['duration_ms'] for r in recent_runs], 50),
+            'baseline_p50_ms': percentile([r['duration_ms'] for r in baseline_runs], 50),
+            'retries': sum(r['retries'] or 0 for r in runs),
+            'stages': stage_rows,
+        })
+    return report
+
+
+def _seconds(ms: Optional[float]) -> str:
+    return f"{ms / 1000:.2f}" if ms is not None else '-'
+
+
+def _percent(rate: Optional[float]) -> str:
+    return f"{rate:.0%}" if rate is not None else '-'
+
+
+def print_report(report: List[Dict], recent: int):
+    """Print build_report() output as tables."""
+    if not report:
+        print("No runs recorded yet.")
+        return
+    for p in report:
+        print("=" * 100)
+        print(f"{p['pipeline']}: {p['runs']} runs {p['first_run'][:16]} -> {p['last_run'][:16]} "
+              f"(last: {p['last_outcome']})")
+        print("=" * 100)
+        print(f"  Duration   p50 {_seconds(p['p50_ms'])}s   p95 {_seconds(p['p95_ms'])}s   "
+              f"last {recent} p50 {_seconds(p['recent_p50_ms'])}s vs before {_seconds(p['baseline_p50_ms'])}s")
+        print(f"  Failures   {_percent(p['failure_rate'])} overall   "
+              f"last {recent} {_percent(p['recent_failure_rate'])} vs before "
+              f"{_percent(p['baseline_failure_rate'])}   retries {p['retries']}")
+        print()
+        print(f"  {'source':<14} {'stage':<28} {'runs':>5} {'p50 s':>8} {'p95 s':>8} "
+              f"{'recent s':>9} {'before s':>9} {'change':>8} {'err':>5}")
+        print("  " + "-" * 98)
+        for s in p['stages']:
+            change = f"{s['change']:+.0%}" if s['change'] is not None else '-'
+            flag = "  SLOWER" if s['slower'] else ""
+            print(f"  {s['source']:<14} {s['stage']:<28} {s['runs']:>5} {_seconds(s['p50_ms']):>8} "
+                  f"{_seconds(s['p95_ms']):>8} {_seconds(s['recent_p50_ms']):>9} "
+                  f"{_seconds(s['baseline_p50_ms']):>9} {change:>8} {_percent(s['error_rate']):>5}{flag}")
+        print()
+
+
+def print_runs(db: RunHistoryDB, pipeline: Optional[str], limit: int):
+    """Print the most recent runs."""
+    runs = db.recent_runs(pipeline, limit=limit)
+    if not runs:
+        print("No runs recorded yet.")
+        return
+    print(f"{'started (UTC)':<20} {'pipeline':<16} {'outcome':<8} {'secs':>8} {'rows':>6} "
+          f"{'bytes':>10} {'retries':>7}  error")
+    print("-" * 100)
+    for r in runs:
+        print(f"{r['started_at'][:19]:<20} {r['pipeline']:<16} {r['outcome']:<8} "
+              f"{_seconds(r['duration_ms']):>8} {r['rows'] if r['rows'] is not None else '-':>6} "
+              f"{r['bytes_written'] if r['bytes_written'] is not None else '-':>10} "
+              f"{r['retries']:>7}  {r['error'] or ''}")
+
+
+def print_stage(db: RunHistoryDB, stage: str, pipeline: Optional[str], limit: int):
+    """Print one stage's time per run, newest first (a quick trend view)."""
+    where = "AND r.pipeline = ?" if pipeline else ""
+    params = [stage] + ([pipeline] if pipeline else []) + [limit]
+    rows = db.conn.execute(f"""
+        SELECT r.started_at, r.pipeline, COALESCE(s.source, '-') AS source,
+               SUM(s.duration_ms) AS total_ms, COUNT(*) AS count, MAX(s.duration_ms) AS max_ms
+        FROM run_stages s JOIN runs r ON r.run_id = s.run_id
+        WHERE s.stage = ? {where}
+        GROUP BY s.run_id, s.source
+        ORDER BY r.started_at DESC
+        LIMIT ?
+    """, params).fetchall()
+    if not rows:
+        print(f"No '{stage}' spans recorded.")
+        return
+    print(f"{'started (UTC)':<20} {'pipeline':<16} {'source':<14} {'count':>6} {'total s':>9} {'max s':>8}")
+    print("-" * 78)
+    for row in rows:
+        print(f"{row['started_at'][:19]:<20} {row['pipeline']:<16} {row['source']:<14} "
+              f"{row['count']:>6} {_seconds(row['total_ms']):>9} {_seconds(row['max_ms']):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline run history and latency report")
+    parser.add_argument("--db", default=None, help=f"Run history database (default {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command")
+    
+    report_parser = sub.add_parser("report", help="p50/p95 stage latency, failure rates and trends")
+    report_parser.add_argument("--pipeline", help="Only this pipeline")
+    report_parser.add_argument("--last", type=int, default=30, help="Runs per pipeline to analyze (default 30)")
+    report_parser.add_argument("--recent", type=int, default=5,
+                               help="Newest runs compared against the rest (default 5)")
+    report_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    
+    runs_parser = sub.add_parser("runs", help="List recent runs")
+    runs_parser.add_argument("--pipeline", help="Only this pipeline")
+    runs_parser.add_argument("--limit", type=int, default=20)
+    
+    stage_parser = sub.add_parser("stage", help="One stage's time per run, newest first")
+    stage_parser.add_argument("stage", help="Span name, e.g. page.goto or sleep")
+    stage_parser.add_argument("--pipeline", help="Only this pipeline")
+    stage_parser.add_argument("--limit", type=int, default=20)
+    
+    args = parser.parse_args()
+    db = RunHistoryDB(args.db)
+    try:
+        if args.command == "runs":
+            print_runs(db, args.pipeline, args.limit)
+        elif args.command == "stage":
+            print_stage(db, args.stage, args.pipeline, args.limit)
+        else:
+            pipeline = getattr(args, 'pipeline', None)
+            last = getattr(args, 'last', 30)
+            recent = getattr(args, 'recent', 5)
+            report = build_report(db, pipeline, last=last, recent=recent)
+            if getattr(args, 'json', False):
+                print(json.dumps(report, indent=2))
+            else:
+                print_report(report, recent)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
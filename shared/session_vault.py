@@ -0,0 +1,168 @@
+"""
+Stored login sessions for the authenticated scrapers.
+
+Logging in through a site's UI costs a dozen clicks and fixed waits on
+every run, and repeated logins risk rate limits. After a successful login
+the context's Playwright storage state (cookies and localStorage) is saved
+per site; later runs restore it, check it with a cheap authenticated probe,
+and only go through the login UI when the probe says it has expired.
+
+Usage:
+    with browser_pool.context(site="cbb_analytics") as context:
+        page = context.new_page()
+        if not session_vault.ensure_login(context, page, "cbb_analytics",
+                                          login=scraper.login, probe=scraper.is_logged_in):
+            ...
+
+States are JSON files under SESSION_VAULT_DIR (default .sessions/ at the
+repo root, git-ignored, readable by the owner only) and are not used after
+SESSION_MAX_AGE_DAYS (7). They hold live session tokens: treat the folder
+like the .env files with the passwords.
+
+The state is applied with add_cookies and localStorage writes rather than
+new_context(storage_state=...), so it works for persistent-profile
+contexts too. Restores, probes and saves are "vault.*" trace spans.
+
+    python shared/session_vault.py list
+    python shared/session_vault.py clear [site ...]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import tracing
+
+
+VAULT_DIR = Path(os.environ.get(
+    "SESSION_VAULT_DIR", str(Path(__file__).resolve().parent.parent / ".sessions")
+))
+MAX_AGE_DAYS = float(os.environ.get("SESSION_MAX_AGE_DAYS", "7"))
+
+_SET_STORAGE_JS = """
+items => { for (const {name, value} of items) localStorage.setItem(name, value); }
+"""
+
+
+def state_path(site: str) -> Path:
+    """Where a site's stored session lives."""
+    return VAULT_DIR / f"{site}.json"
+
+
+def load(site: str) -> Optional[Dict]:
+    """The site's stored storage state, or None if missing, unreadable or too old."""
+    path = state_path(site)
+    try:
+        age_days = (time.time() - path.stat().st_mtime) / 86400
+        if age_days > MAX_AGE_DAYS:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save(context, site: str):
+    """Store the context's cookies and localStorage for `site` (owner-only file)."""
+    with tracing.span("vault.save", site=site) as s:
+        state = context.storage_state()
+        VAULT_DIR.mkdir(parents=True, exist_ok=True)
+        path = state_path(site)
+        tmp = path.with_suffix(".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+        s.set(cookies=len(state.get('cookies', [])), origins=len(state.get('origins', [])))
+
+
+def discard(site: str):
+    """Forget the site's stored session."""
+    try:
+        state_path(site).unlink()
+    except OSError:
+        pass
+
+
+def restore(context, page, state: Dict):
+    """
+    Apply a stored state to an open context: cookies directly, localStorage
+    by visiting each origin that had some.
+    """
+    with tracing.span("vault.restore", cookies=len(state.get('cookies', []))):
+        if state.get('cookies'):
+            context.add_cookies(state['cookies'])
+        for origin in state.get('origins', []):
+            if origin.get('localStorage'):
+                page.goto(origin['origin'], wait_until='domcontentloaded')
+                page.evaluate(_SET_STORAGE_JS, origin['localStorage'])
+
+
+def ensure_login(context, page, site: str, login: Callable[..., bool],
+                 probe: Callable[..., bool]) -> bool:
+    """
+    Make `page` logged in to `site`, as cheaply as possible.
+    
+    Restores the stored session and runs `probe(page)`; if that fails (or
+    nothing is stored) the session is dropped, `login(page)` runs, and on
+    success the new session is stored.
+    
+    Args:
+        login: Logs in through the site's UI; returns whether it worked
+        probe: Cheap authenticated check; returns whether the page is
+            logged in (it may navigate)
+    
+    Returns:
+        Whether the page ended up logged in
+    """
+    state = load(site)
+    if state is not None:
+        restore(context, page, state)
+        with tracing.span("vault.probe", site=site) as s:
+            valid = probe(page)
+            s.set(valid=valid)
+        if valid:
+            print(f"  ✓ Reused stored {site} session")
+            return True
+        print(f"  Stored {site} session has expired; logging in again")
+        discard(site)
+        context.clear_cookies()
+    
+    if not login(page):
+        return False
+    try:
+        save(context, site)
+    except Exception as e:
+        print(f"  ⚠️  Could not store {site} session: {e}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stored login sessions")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("list", help="Stored sessions and their age")
+    clear_parser = sub.add_parser("clear", help="Forget stored sessions")
+    clear_parser.add_argument("sites", nargs="*", help="Sites to clear (default: all)")
+    args = parser.parse_args()
+    
+    sites = sorted(p.stem for p in VAULT_DIR.glob("*.json")) if VAULT_DIR.exists() else []
+    if args.command == "clear":
+        for site in args.sites or sites:
+            discard(site)
+            print(f"{site:<16} cleared")
+    else:
+        print(f"Sessions in {VAULT_DIR} (used for {MAX_AGE_DAYS:g} days)")
+        for site in sites:
+            age_days = (time.time() - state_path(site).stat().st_mtime) / 86400
+            state = load(site)
+            status = "expired" if state is None else f"{len(state.get('cookies', []))} cookies"
+            print(f"{site:<16} {age_days:>6.1f} days  {status}")
+
+
+if __name__ == "__main__":
+    main()
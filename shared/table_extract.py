@@ -0,0 +1,342 @@
+"""
+Table extraction inside the browser.
+
+Instead of serializing the whole DOM with page.content() and re-parsing
+megabytes of HTML in Python, extract_table() runs one page.evaluate that
+walks a single table and returns only its header and cell text (plus link
+text for the columns that need it). The result is a Table: rows of cell
+strings, typed column arrays on request, or a DataFrame.
+
+Cell text matches BeautifulSoup's get_text(strip=True) - each text node
+stripped and joined with no separator - so the row parsers behave the
+same on a live page and on a saved one. text='collapse' gives pd.read_html's
+text instead (whitespace runs collapsed to one space), for frames that
+replace read_html. from_html() builds the same Table from saved HTML with
+BeautifulSoup, for fixtures, benchmarks and debugging; scan_html() builds it
+in one streaming pass for server-rendered pages fetched over plain HTTP.
+
+Usage:
+    table = table_extract.extract_table(page, 'table#ratings-table', rows='tbody tr',
+                                        cells='td', link_columns=(1,))
+    for cells, (team_links,) in zip(table.rows, table.row_links()):
+        ...
+    adj_oe = table.column('AdjOE', float)     # typed column array
+    df = table.to_frame()                     # numeric columns converted
+"""
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Sequence, Union
+
+from shared import tracing
+
+
+_EXTRACT_JS = """
+([sel, rowSel, cellSel, headSel, linkCols, largest, collapse]) => {
+    const tables = Array.from(document.querySelectorAll(sel));
+    if (!tables.length) return null;
+    let table = tables[0];
+    if (largest) {
+        let most = -1;
+        for (const t of tables) {
+            const n = t.querySelectorAll(rowSel).length;
+            if (n > most) { table = t; most = n; }
+        }
+    }
+    // Same text as BeautifulSoup's get_text(strip=True), or pd.read_html's
+    const text = (el) => {
+        if (collapse) return el.textContent.trim().replace(/[\r\n]+|\s{2,}/g, ' ');
+        const parts = [];
+        const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+        for (let n = walker.nextNode(); n; n = walker.nextNode()) {
+            const parent = n.parentNode.nodeName;
+            if (parent === 'SCRIPT' || parent === 'STYLE') continue;
+            const t = n.nodeValue.trim();
+            if (t) parts.push(t);
+        }
+        return parts.join('');
+    };
+    const headerRows = headSel
+        ? Array.from(table.querySelectorAll(headSel),
+                     tr => Array.from(tr.querySelectorAll('th, td'), c => [text(c), c.colSpan || 1]))
+        : [];
+    const rows = [];
+    const links = linkCols.map(() => []);
+    for (const tr of table.querySelectorAll(rowSel)) {
+        const cells = tr.querySelectorAll(cellSel);
+        rows.push(Array.from(cells, text));
+        linkCols.forEach((col, i) => {
+            links[i].push(cells[col] ? Array.from(cells[col].querySelectorAll('a'), text) : []);
+        });
+    }
+    return {headerRows, rows, links};
+}
+"""
+
+
+_WHITESPACE = re.compile(r"[\r\n]+|\s{2,}")
+_THOUSANDS = re.compile(r"^-?\d{1,3}(,\d{3})+(\.\d+)?$")
+
+
+def parse_number(text: Optional[str]) -> Optional[float]:
+    """Number in a cell ("+12.3", "1,024", "45.6%"), or None."""
+    if not text:
+        return None
+    cleaned = re.sub(r'[^\d\.\-]', '', text)
+    if not cleaned:
+        return None
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+_CASTS = {
+    str: lambda v: v,
+    float: parse_number,
+    int: lambda v: int(parse_number(v)) if parse_number(v) is not None else None,
+}
+
+
+class Table:
+    """
+    One extracted table.
+    
+    header_rows: each header row as (text, colspan) pairs
+    rows: cell text per body row
+    links: for each requested link column, the link texts of that cell per row
+    link_columns: the column indexes `links` refers to
+    """
+    
+    __slots__ = ('header_rows', 'rows', 'links', 'link_columns')
+    
+    def __init__(self, header_rows: List, rows: List[List[str]], links: List[List[List[str]]],
+                 link_columns: Sequence[int] = ()):
+        self.header_rows = header_rows
+        self.rows = rows
+        self.links = links
+        self.link_columns = tuple(link_columns)
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    @staticmethod
+    def _expand(header_row) -> List[str]:
+        names = []
+        for text, span in header_row:
+            names.extend([text] * max(int(span), 1))
+        return names
+    
+    @property
+    def headers(self) -> List[str]:
+        """Column names from the last header row, colspans expanded."""
+        return self._expand(self.header_rows[-1]) if self.header_rows else []
+    
+    def row_links(self):
+        """Per row, a tuple with the link texts of each link column."""
+        return zip(*self.links) if self.links else ((),) * len(self.rows)
+    
+    def column(self, key: Union[int, str], kind=str) -> list:
+        """
+        One column as a list, converted with `kind` (str, float or int;
+        unparseable numbers become None). `key` is an index or header name.
+        """
+        index = self.headers.index(key) if isinstance(key, str) else key
+        cast = _CASTS.get(kind, kind)
+        return [cast(row[index]) if index < len(row) else None for row in self.rows]
+    
+    def columns(self, kinds: Dict[Union[int, str], type]) -> Dict[Union[int, str], list]:
+        """Several typed columns at once: {key: kind} -> {key: values}."""
+        return {key: self.column(key, kind) for key, kind in kinds.items()}
+    
+    def to_frame(self):
+        """
+        DataFrame of the body rows, laid out like pd.read_html: multi-row
+        headers become MultiIndex columns (empty names as "Unnamed: ..."),
+        empty cells NaN, and all-numeric columns numeric.
+        """
+        import pandas as pd
+        width = max([len(r) for r in self.rows] + [len(self._expand(h)) for h in self.header_rows] + [0])
+        levels = [self._expand(h) for h in self.header_rows]
+        levels = [level + [''] * (width - len(level)) for level in levels]
+        if len(levels) > 1:
+            columns = pd.MultiIndex.from_tuples([
+                tuple(level[i] or f"Unnamed: {i}_level_{depth}" for depth, level in enumerate(levels))
+                for i in range(width)
+            ])
+        elif levels:
+            columns = [name or f"Unnamed: {i}" for i, name in enumerate(levels[0])]
+        else:
+            columns = list(range(width))
+        rows = [row + [''] * (width - len(row)) for row in self.rows]
+        df = pd.DataFrame(rows, columns=columns).replace('', float('nan'))
+        for i in range(width):
+            values = df.iloc[:, i]
+            present = values.dropna()
+            if len(present) and present.map(lambda v: bool(_THOUSANDS.match(v))).any():
+                values = values.str.replace(',', '', regex=False)
+            try:
+                df.isetitem(i, pd.to_numeric(values))
+            except (ValueError, TypeError):
+                pass
+        return df
+
+
+def extract_table(page, selector: str = 'table', rows: str = 'tbody tr', cells: str = 'td, th',
+                  header: Optional[str] = 'thead tr', link_columns: Sequence[int] = (),
+                  largest: bool = False, text: str = 'strip') -> Optional[Table]:
+    """
+    Extract one table from a live page with a single page.evaluate.
+    
+    Args:
+        selector: CSS selector of the table (the first match is used)
+        rows: Row selector within the table
+        cells: Cell selector within each row
+        header: Header row selector within the table (None for no headers)
+        link_columns: Column indexes whose link texts are also returned
+        largest: Use the matching table with the most rows instead of the first
+        text: 'strip' (BeautifulSoup get_text(strip=True)) or 'collapse'
+            (pd.read_html)
+    
+    Returns:
+        Table, or None if nothing matches `selector`
+    """
+    with tracing.span("extract.table", selector=selector) as s:
+        result = page.evaluate(_EXTRACT_JS, [selector, rows, cells, header, list(link_columns), largest,
+                                             text == 'collapse'])
+        if result is None:
+            s.set(rows=0)
+            return None
+        table = Table(result['headerRows'], result['rows'], result['links'], link_columns)
+        s.set(rows=len(table), columns=len(table.headers) or max((len(r) for r in table.rows), default=0))
+        return table
+
+
+def from_html(html: str, selector: str = 'table', rows: str = 'tbody tr', cells: str = 'td, th',
+              header: Optional[str] = 'thead tr', link_columns: Sequence[int] = (),
+              largest: bool = False, text: str = 'strip') -> Optional[Table]:
+    """The Table extract_table() would return, built from saved HTML with BeautifulSoup."""
+    from bs4 import BeautifulSoup
+    
+    def cell_text(el) -> str:
+        if text == 'collapse':
+            return _WHITESPACE.sub(' ', el.get_text().strip())
+        return el.get_text(strip=True)
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    tables = soup.select(selector)
+    if not tables:
+        return None
+    table = max(tables, key=lambda t: len(t.select(rows))) if largest else tables[0]
+    header_rows = [
+        [(cell_text(c), int(c.get('colspan') or 1)) for c in tr.select('th, td')]
+        for tr in table.select(header)
+    ] if header else []
+    body, links = [], [[] for _ in link_columns]
+    for tr in table.select(rows):
+        row_cells = tr.select(cells)
+        body.append([cell_text(c) for c in row_cells])
+        for i, col in enumerate(link_columns):
+            links[i].append([cell_text(a) for a in row_cells[col].find_all('a')]
+                            if col < len(row_cells) else [])
+    return Table(header_rows, body, links, link_columns)
+
+
+class _TableScanner(HTMLParser):
+    """Collects the header and body rows of the n-th top-level <table> in one pass."""
+    
+    _SKIP = {'script', 'style'}
+    
+    def __init__(self, index: int, body_only: bool):
+        super().__init__()
+        self.index = index
+        self.body_only = body_only
+        self.seen = -1
+        self.depth = 0          # table nesting, 1 inside the target table
+        self.section = None
+        self.skip = 0
+        self.header_rows, self.rows = [], []
+        self.row = None
+        self.cell = None
+        self.span = 1
+    
+    def _close_cell(self):
+        if self.cell is not None:
+            self.row.append((''.join(self.cell), self.span))
+            self.cell = None
+    
+    def _close_row(self):
+        self._close_cell()
+        if self.row is not None:
+            if self.section == 'thead':
+                self.header_rows.append(self.row)
+            if not self.body_only or self.section == 'tbody':
+                self.rows.append([text for text, _ in self.row])
+            self.row = None
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            if self.depth:
+                self.depth += 1
+            else:
+                self.seen += 1
+                self.depth = 1 if self.seen == self.index else 0
+            return
+        if self.depth != 1:
+            return
+        if tag in self._SKIP:
+            self.skip += 1
+        elif tag in ('thead', 'tbody', 'tfoot'):
+            self._close_row()
+            self.section = tag
+        elif tag == 'tr':
+            self._close_row()
+            self.row = []
+        elif tag in ('td', 'th') and self.row is not None:
+            self._close_cell()
+            self.cell = []
+            span = dict(attrs).get('colspan') or '1'
+            self.span = int(span) if span.isdigit() else 1
+    
+    def handle_endtag(self, tag):
+        if tag == 'table' and self.depth:
+            if self.depth == 1:
+                self._close_row()
+            self.depth -= 1
+            return
+        if self.depth != 1:
+            return
+        if tag in self._SKIP:
+            self.skip = max(self.skip - 1, 0)
+        elif tag in ('td', 'th'):
+            self._close_cell()
+        elif tag == 'tr':
+            self._close_row()
+        elif tag in ('thead', 'tbody', 'tfoot'):
+            self._close_row()
+            self.section = None
+    
+    def handle_data(self, data):
+        if self.cell is not None and not self.skip:
+            text = data.strip()
+            if text:
+                self.cell.append(text)
+
+
+def scan_html(html: str, index: int = 0, body_only: bool = False) -> Optional[Table]:
+    """
+    The Table from_html() would return for `selector='table'` (the `index`-th
+    top-level table), `rows='tr'` (or `'tbody tr'` with body_only), cells
+    'td, th' and headers 'thead tr', built in one streaming pass with the
+    standard-library HTML parser instead of a BeautifulSoup tree. Cell text
+    is get_text(strip=True); link texts aren't collected.
+    
+    For server-rendered pages fetched over HTTP, where building the whole
+    document tree would cost more than the request.
+    """
+    scanner = _TableScanner(index, body_only)
+    scanner.feed(html)
+    scanner.close()
+    if scanner.seen < index:
+        return None
+    scanner._close_row()
+    return Table(scanner.header_rows, scanner.rows, [], ())
@@ -0,0 +1,299 @@
+"""
+Fuzzy resolution of team names the registry doesn't know.
+
+When a source spells a team in a way that isn't in ALIASES, an exact
+lookup fails and the row would silently miss every join. The registry
+hands such names to a TeamMatcher, which scores them against every known
+spelling and accepts the best team when it is both close enough and
+clearly ahead of the next team.
+
+Candidates come from a character trigram inverted index (NgramIndex):
+each spelling is folded ("Mount St. Mary's" -> "mt st marys"), split
+into padded trigrams, and listed under each of them. A query only scores
+the spellings it shares a trigram with, by the Dice coefficient of the two
+trigram sets, instead of being compared with all of them. A candidate
+also has to account for every word of the name, spelled out or
+abbreviated ("N." or "Wash." as the start of the word, or "Fla." as at
+least three of its letters in order), so a known team plus a word that
+names another school ("Massachusetts-Lowell", "Michigan Tech") is not
+taken for that team. A name that folds to exactly one team's known
+spelling is accepted outright, and a single word that only starts
+several teams' names ("Loyola", "Boston") is never accepted.
+
+Accepted decisions are stored in TEAM_MATCH_CACHE (default
+team_matches.json at the repo root), so each new spelling is scored once
+and replayed as a plain dict lookup afterwards, and a human can review
+them (or move them into ALIASES). TEAM_MATCH_MIN_SCORE (0.75) and
+TEAM_MATCH_MIN_MARGIN (0.1) set how sure a match has to be; anything
+below stays unresolved. Each fuzzy match is a "team.match" trace span.
+
+Usage:
+    matcher = TeamMatcher(team_registry.REGISTRY.index, team_registry.REGISTRY.names)
+    matcher.resolve("Mount Saint Marys")     # ID of "Mount St. Mary's", now cached
+    
+    python shared/team_matcher.py "Mount Saint Marys" "Cal State Long Beach"
+    python shared/team_matcher.py list
+    python shared/team_matcher.py forget [spelling ...]
+"""
+import json
+import os
+import re
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Generic, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple, TypeVar
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import tracing
+
+
+CACHE_PATH = Path(os.environ.get(
+    "TEAM_MATCH_CACHE", str(Path(__file__).resolve().parent.parent / "team_matches.json")
+))
+MIN_SCORE = float(os.environ.get("TEAM_MATCH_MIN_SCORE", "0.75"))
+MIN_MARGIN = float(os.environ.get("TEAM_MATCH_MIN_MARGIN", "0.1"))
+
+# Word forms that vary between sources but never tell two teams apart
+_WORDS = {'state': 'st', 'saint': 'st', 'mount': 'mt', 'university': 'u', 'univ': 'u'}
+_DROP = re.compile(r"['.’]")
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+# Words a candidate doesn't have to account for
+_FILLER = frozenset({'of', 'the', 'at', 'u'})
+
+V = TypeVar('V')
+
+
+def fold(name: str) -> str:
+    """Spelling reduced for fuzzy comparison: lower case, no punctuation, common words shortened."""
+    text = _DROP.sub('', name.casefold().replace('&', ' and '))
+    return ' '.join(_WORDS.get(word, word) for word in _SEPARATORS.sub(' ', text).split())
+
+
+def trigrams(text: str) -> frozenset:
+    """Character trigrams of a folded string, padded so word edges count."""
+    padded = f" {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _abbreviates(word: str, full: str) -> bool:
+    """
+    Whether `word` is `full` or an abbreviation of it: the start of the
+    word, or at least three of its letters in order from the first.
+    """
+    if full.startswith(word):
+        return True
+    if len(word) < 3 or word[0] != full[0] or len(word) > len(full):
+        return False
+    letters = iter(full)
+    return all(letter in letters for letter in word)
+
+
+def covers(name: str, candidate: str) -> bool:
+    """Whether every word of `name` is a word of `candidate` or abbreviates one (both folded)."""
+    words = candidate.split()
+    return all(any(_abbreviates(word, full) for full in words)
+               for word in name.split() if word not in _FILLER)
+
+
+class NgramIndex(Generic[V]):
+    """Inverted index from character trigrams to the strings containing them."""
+    
+    def __init__(self, entries: Mapping[str, V]):
+        """
+        Args:
+            entries: String -> value; strings are folded before indexing
+        """
+        self.keys: List[str] = list(entries)
+        self.values: List[V] = [entries[key] for key in self.keys]
+        self.grams: List[frozenset] = [trigrams(fold(key)) for key in self.keys]
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        for position, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings[gram].append(position)
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def search(self, text: str, limit: int = 10) -> List[Tuple[float, str, V]]:
+        """
+        The `limit` best (score, key, value) for `text`, best first. Only
+        keys sharing a trigram with it are scored; score is the Dice
+        coefficient of the trigram sets (1.0 = same folded string).
+        """
+        query = trigrams(fold(text))
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in query:
+            for position in self.postings.get(gram, ()):
+                shared[position] += 1
+        scored = [
+            (2 * count / (len(query) + len(self.grams[position])), self.keys[position], self.values[position])
+            for position, count in shared.items()
+        ]
+        scored.sort(key=lambda hit: (-hit[0], hit[1]))
+        return scored[:limit]
+
+
+class Match(NamedTuple):
+    """A scored fuzzy match: the best team and how far ahead of the next it is."""
+    name: str
+    team_id: int
+    spelling: str
+    score: float
+    runner_up: float
+    accepted: bool
+
+
+class TeamMatcher:
+    """Fuzzy fallback for the team registry, with a persistent decision cache."""
+    
+    def __init__(self, spellings: Mapping[str, int], names: Sequence[str],
+                 cache_path: Optional[Path] = CACHE_PATH,
+                 min_score: float = MIN_SCORE, min_margin: float = MIN_MARGIN):
+        """
+        Args:
+            spellings: Every known spelling -> team ID (the registry's index)
+            names: Canonical name of each ID, for messages and the cache
+            cache_path: JSON file of accepted decisions (None: keep them in memory)
+            min_score: Lowest score a match is accepted with
+            min_margin: How far the best team must be ahead of the next
+        """
+        self.index = NgramIndex(spellings)
+        self.names = names
+        # Folded spelling -> teams, and first word of longer spellings -> teams
+        self.folded: Dict[str, Set[int]] = defaultdict(set)
+        self.leading: Dict[str, Set[int]] = defaultdict(set)
+        for spelling, team_id in spellings.items():
+            folded = fold(spelling)
+            self.folded[folded].add(team_id)
+            words = folded.split()
+            if len(words) > 1:
+                self.leading[words[0]].add(team_id)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self._lock = threading.Lock()
+        self.decisions: Dict[str, Dict] = self._load()
+        # Rejected names, so they are scored once per run (not stored)
+        self.rejected: set = set()
+    
+    def _load(self) -> Dict[str, Dict]:
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save(self):
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.decisions, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.cache_path)
+    
+    def match(self, name: str) -> Optional[Match]:
+        """
+        Score `name` against the known spellings; None if no spelling shares
+        a trigram with it and accounts for all its words.
+        """
+        folded = fold(name)
+        exact = self.folded.get(folded, ())
+        if len(exact) == 1:
+            return Match(name, next(iter(exact)), folded, 1.0, 0.0, True)
+        
+        best: Dict[int, Tuple[float, str]] = {}
+        for score, spelling, team_id in self.index.search(name, limit=20):
+            if team_id not in best and covers(folded, fold(spelling)):
+                best[team_id] = (score, spelling)
+        if not best:
+            return None
+        ranked = sorted(best.items(), key=lambda item: -item[1][0])
+        team_id, (score, spelling) = ranked[0]
+        runner_up = ranked[1][1][0] if len(ranked) > 1 else 0.0
+        accepted = score >= self.min_score and score - runner_up >= self.min_margin
+        # One word that begins several teams' names ("Loyola") says too little
+        if ' ' not in folded and len(self.leading.get(folded, ())) > 1:
+            accepted = False
+        return Match(name, team_id, spelling, round(score, 3), round(runner_up, 3), accepted)
+    
+    def resolve(self, name: str) -> Optional[int]:
+        """
+        Team ID for a spelling the registry doesn't know: a stored decision
+        if there is one, otherwise an accepted fuzzy match (which is stored).
+        """
+        key = ' '.join(name.split())
+        decision = self.decisions.get(key)
+        if decision is not None:
+            return decision['team_id']
+        if key in self.rejected:
+            return None
+        
+        with tracing.span("team.match", spelling=key) as s:
+            found = self.match(key)
+            s.set(team=self.names[found.team_id] if found else None,
+                  score=found.score if found else None, accepted=bool(found and found.accepted))
+        if found is None or not found.accepted:
+            self.rejected.add(key)
+            return None
+        
+        print(f"  Matched team name {key!r} to {self.names[found.team_id]!r} "
+              f"(score {found.score:.2f}, next {found.runner_up:.2f})")
+        with self._lock:
+            self.decisions[key] = {
+                'team_id': found.team_id, 'team': self.names[found.team_id],
+                'spelling': found.spelling, 'score': found.score,
+                'decided': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            try:
+                self._save()
+            except OSError as e:
+                print(f"  ⚠️  Could not store team match: {e}")
+        return found.team_id
+    
+    def forget(self, names: Optional[Sequence[str]] = None):
+        """Drop stored decisions (all of them if `names` is None)."""
+        with self._lock:
+            if names is None:
+                self.decisions.clear()
+            else:
+                for name in names:
+                    self.decisions.pop(' '.join(name.split()), None)
+            self.rejected.clear()
+            self._save()
+
+
+def main():
+    from shared import team_registry
+    registry = team_registry.REGISTRY
+    matcher = TeamMatcher(registry.index, registry.names)
+    args = sys.argv[1:]
+    
+    if args[:1] == ["list"]:
+        print(f"Team matches in {matcher.cache_path}")
+        for name, decision in sorted(matcher.decisions.items()):
+            print(f"  {name!r:<36} -> {decision['team']:<24} {decision['score']:.2f}  {decision['decided']}")
+    elif args[:1] == ["forget"]:
+        matcher.forget(args[1:] or None)
+        print(f"Forgot {', '.join(args[1:]) or 'every'} stored match")
+    else:
+        for name in args:
+            found = matcher.match(name)
+            if found is None:
+                print(f"{name!r}: no candidates")
+                continue
+            verdict = "accept" if found.accepted else "reject"
+            print(f"{name!r}: {verdict} {registry.names[found.team_id]!r} via {found.spelling!r} "
+                  f"(score {found.score:.2f}, next {found.runner_up:.2f})")
+            for score, spelling, team_id in matcher.index.search(name, limit=5):
+                print(f"    {score:.2f}  {spelling:<32} {registry.names[team_id]}")
+
+
+if __name__ == "__main__":
+    main()
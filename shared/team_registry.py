@@ -0,0 +1,557 @@
+"""
+Canonical team registry: one integer ID per Division I team, and every
+source's spelling of its name.
+
+Canonical names are KenPom's, which every export already normalizes to.
+A team's ID is its position in TEAMS counting from 1, so new programs go
+at the end of the tuple and existing IDs never change. ALIASES keeps each
+source's spellings apart for reference; when the registry is built they
+are all folded, together with the canonical names, into a single
+alias -> ID dict, so resolving a name is one hash lookup whatever source
+it came from. Keys are compared case-insensitively with whitespace runs
+collapsed.
+
+Usage:
+    from shared import team_registry
+    
+    team_registry.team_id("Ole Miss")              # 179
+    team_registry.canonical_name("UConn")          # 'Connecticut'
+    
+    # Whole columns: each distinct name is looked up once
+    df['team_id'] = team_registry.map_series(df['Team'])           # Int16, <NA> if unknown
+    df['team_kenpom'] = team_registry.canonical_names(df['Team'])  # unknown names kept
+
+Merging on team_id joins small integers rather than free text and does
+not depend on two sources agreeing on a spelling.
+
+A spelling that isn't in the index goes to the fuzzy matcher in
+team_matcher.py (trigram index, scored, decisions cached in
+team_matches.json), so a new spelling of a known team still gets its ID.
+Set TEAM_FUZZY=0 to resolve exact spellings only.
+
+    python shared/team_registry.py                  # teams and aliases per source
+    python shared/team_registry.py "UConn" "Ole Miss"
+"""
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FUZZY = os.environ.get("TEAM_FUZZY", "1") != "0"
+
+
+# Canonical (KenPom) names; ID = position + 1. Append new teams at the end.
+TEAMS = (
+    'Abilene Christian', 'Air Force', 'Akron', 'Alabama', 'Alabama A&M', 'Alabama St.',
+    'Albany', 'Alcorn St.', 'American', 'Appalachian St.', 'Arizona', 'Arizona St.',
+    'Arkansas', 'Arkansas Pine Bluff', 'Arkansas St.', 'Army', 'Auburn', 'Austin Peay',
+    'BYU', 'Ball St.', 'Baylor', 'Bellarmine', 'Belmont', 'Bethune Cookman',
+    'Binghamton', 'Boise St.', 'Boston College', 'Boston University', 'Bowling Green',
+    'Bradley', 'Brown', 'Bryant', 'Bucknell', 'Buffalo', 'Butler', 'CSUN',
+    'Cal Baptist', 'Cal Poly', 'Cal St. Bakersfield', 'Cal St. Fullerton', 'California',
+    'Campbell', 'Canisius', 'Central Arkansas', 'Central Connecticut',
+    'Central Michigan', 'Charleston', 'Charleston Southern', 'Charlotte', 'Chattanooga',
+    'Chicago St.', 'Cincinnati', 'Clemson', 'Cleveland St.', 'Coastal Carolina',
+    'Colgate', 'Colorado', 'Colorado St.', 'Columbia', 'Connecticut', 'Coppin St.',
+    'Cornell', 'Creighton', 'Dartmouth', 'Davidson', 'Dayton', 'DePaul', 'Delaware',
+    'Delaware St.', 'Denver', 'Detroit Mercy', 'Drake', 'Drexel', 'Duke', 'Duquesne',
+    'East Carolina', 'East Tennessee St.', 'East Texas A&M', 'Eastern Illinois',
+    'Eastern Kentucky', 'Eastern Michigan', 'Eastern Washington', 'Elon', 'Evansville',
+    'FIU', 'Fairfield', 'Fairleigh Dickinson', 'Florida', 'Florida A&M',
+    'Florida Atlantic', 'Florida Gulf Coast', 'Florida St.', 'Fordham', 'Fresno St.',
+    'Furman', 'Gardner Webb', 'George Mason', 'George Washington', 'Georgetown',
+    'Georgia', 'Georgia Southern', 'Georgia St.', 'Georgia Tech', 'Gonzaga',
+    'Grambling St.', 'Grand Canyon', 'Green Bay', 'Hampton', 'Harvard', 'Hawaii',
+    'High Point', 'Hofstra', 'Holy Cross', 'Houston', 'Houston Christian', 'Howard',
+    'IU Indy', 'Idaho', 'Idaho St.', 'Illinois', 'Illinois Chicago', 'Illinois St.',
+    'Incarnate Word', 'Indiana', 'Indiana St.', 'Iona', 'Iowa', 'Iowa St.',
+    'Jackson St.', 'Jacksonville', 'Jacksonville St.', 'James Madison', 'Kansas',
+    'Kansas City', 'Kansas St.', 'Kennesaw St.', 'Kent St.', 'Kentucky', 'LIU', 'LSU',
+    'La Salle', 'Lafayette', 'Lamar', 'Le Moyne', 'Lehigh', 'Liberty', 'Lindenwood',
+    'Lipscomb', 'Little Rock', 'Long Beach St.', 'Longwood', 'Louisiana',
+    'Louisiana Monroe', 'Louisiana Tech', 'Louisville', 'Loyola Chicago', 'Loyola MD',
+    'Loyola Marymount', 'Maine', 'Manhattan', 'Marist', 'Marquette', 'Marshall',
+    'Maryland', 'Maryland Eastern Shore', 'Massachusetts', 'McNeese', 'Memphis',
+    'Mercer', 'Mercyhurst', 'Merrimack', 'Miami FL', 'Miami OH', 'Michigan',
+    'Michigan St.', 'Middle Tennessee', 'Milwaukee', 'Minnesota', 'Mississippi',
+    'Mississippi St.', 'Mississippi Valley St.', 'Missouri', 'Missouri St.', 'Monmouth',
+    'Montana', 'Montana St.', 'Morehead St.', 'Morgan St.', "Mount St. Mary's",
+    'Murray St.', 'N.C. State', 'NJIT', 'Navy', 'Nebraska', 'Nebraska Omaha', 'Nevada',
+    'New Hampshire', 'New Haven', 'New Mexico', 'New Mexico St.', 'New Orleans',
+    'Niagara', 'Nicholls', 'Norfolk St.', 'North Alabama', 'North Carolina',
+    'North Carolina A&T', 'North Carolina Central', 'North Dakota', 'North Dakota St.',
+    'North Florida', 'North Texas', 'Northeastern', 'Northern Arizona',
+    'Northern Colorado', 'Northern Illinois', 'Northern Iowa', 'Northern Kentucky',
+    'Northwestern', 'Northwestern St.', 'Notre Dame', 'Oakland', 'Ohio', 'Ohio St.',
+    'Oklahoma', 'Oklahoma St.', 'Old Dominion', 'Oral Roberts', 'Oregon', 'Oregon St.',
+    'Pacific', 'Penn', 'Penn St.', 'Pepperdine', 'Pittsburgh', 'Portland',
+    'Portland St.', 'Prairie View A&M', 'Presbyterian', 'Princeton', 'Providence',
+    'Purdue', 'Purdue Fort Wayne', 'Queens', 'Quinnipiac', 'Radford', 'Rhode Island',
+    'Rice', 'Richmond', 'Rider', 'Robert Morris', 'Rutgers', 'SIUE', 'SMU',
+    'Sacramento St.', 'Sacred Heart', 'Saint Francis', "Saint Joseph's", 'Saint Louis',
+    "Saint Mary's", "Saint Peter's", 'Sam Houston St.', 'Samford', 'San Diego',
+    'San Diego St.', 'San Francisco', 'San Jose St.', 'Santa Clara', 'Seattle',
+    'Seton Hall', 'Siena', 'South Alabama', 'South Carolina', 'South Carolina St.',
+    'South Dakota', 'South Dakota St.', 'South Florida', 'Southeast Missouri',
+    'Southeastern Louisiana', 'Southern', 'Southern Illinois', 'Southern Indiana',
+    'Southern Miss', 'Southern Utah', 'St. Bonaventure', "St. John's", 'St. Thomas',
+    'Stanford', 'Stephen F. Austin', 'Stetson', 'Stonehill', 'Stony Brook', 'Syracuse',
+    'TCU', 'Tarleton St.', 'Temple', 'Tennessee', 'Tennessee Martin', 'Tennessee St.',
+    'Tennessee Tech', 'Texas', 'Texas A&M', 'Texas A&M Corpus Chris', 'Texas Southern',
+    'Texas St.', 'Texas Tech', 'The Citadel', 'Toledo', 'Towson', 'Troy', 'Tulane',
+    'Tulsa', 'UAB', 'UC Davis', 'UC Irvine', 'UC Riverside', 'UC San Diego',
+    'UC Santa Barbara', 'UCF', 'UCLA', 'UMBC', 'UMass Lowell', 'UNC Asheville',
+    'UNC Greensboro', 'UNC Wilmington', 'UNLV', 'USC', 'USC Upstate', 'UT Arlington',
+    'UT Rio Grande Valley', 'UTEP', 'UTSA', 'Utah', 'Utah St.', 'Utah Tech',
+    'Utah Valley', 'VCU', 'VMI', 'Valparaiso', 'Vanderbilt', 'Vermont', 'Villanova',
+    'Virginia', 'Virginia Tech', 'Wagner', 'Wake Forest', 'Washington',
+    'Washington St.', 'Weber St.', 'West Georgia', 'West Virginia', 'Western Carolina',
+    'Western Illinois', 'Western Kentucky', 'Western Michigan', 'Wichita St.',
+    'William & Mary', 'Winthrop', 'Wisconsin', 'Wofford', 'Wright St.', 'Wyoming',
+    'Xavier', 'Yale', 'Youngstown St.',
+)
+
+# Each source's spellings that differ from the canonical name
+ALIASES = {
+    'cbb_analytics': {
+        'A&M-Corpus Christi': 'Texas A&M Corpus Chris',
+        'Alabama State': 'Alabama St.',
+        'Albany (NY)': 'Albany',
+        'Alcorn': 'Alcorn St.',
+        'Alcorn State': 'Alcorn St.',
+        'App State': 'Appalachian St.',
+        'Appalachian State': 'Appalachian St.',
+        'Arizona State': 'Arizona St.',
+        'Ark.-Pine Bluff': 'Arkansas Pine Bluff',
+        'Arkansas State': 'Arkansas St.',
+        'Arkansas-Little Rock': 'Little Rock',
+        'Arkansas-Pine Bluff': 'Arkansas Pine Bluff',
+        'Army West Point': 'Army',
+        'Ball State': 'Ball St.',
+        'Bethune-Cookman': 'Bethune Cookman',
+        'Boise State': 'Boise St.',
+        'Boston U.': 'Boston University',
+        'Cal State Bakersfield': 'Cal St. Bakersfield',
+        'Cal State Fullerton': 'Cal St. Fullerton',
+        'Cal State Northridge': 'CSUN',
+        'California Baptist': 'Cal Baptist',
+        'Central Ark.': 'Central Arkansas',
+        'Central Conn. St.': 'Central Connecticut',
+        'Central Mich.': 'Central Michigan',
+        'Charleston So.': 'Charleston Southern',
+        'Chicago State': 'Chicago St.',
+        'Cleveland State': 'Cleveland St.',
+        'Col. of Charleston': 'Charleston',
+        'College of Charleston': 'Charleston',
+        'Colorado State': 'Colorado St.',
+        'Coppin State': 'Coppin St.',
+        'CSU Bakersfield': 'Cal St. Bakersfield',
+        'Delaware State': 'Delaware St.',
+        'Detroit': 'Detroit Mercy',
+        'East Tennessee State': 'East Tennessee St.',
+        'Eastern Ill.': 'Eastern Illinois',
+        'Eastern Ky.': 'Eastern Kentucky',
+        'Eastern Mich.': 'Eastern Michigan',
+        'Eastern Wash.': 'Eastern Washington',
+        'ETSU': 'East Tennessee St.',
+        'FDU': 'Fairleigh Dickinson',
+        'FGCU': 'Florida Gulf Coast',
+        'Fla. Atlantic': 'Florida Atlantic',
+        'Florida International': 'FIU',
+        'Florida State': 'Florida St.',
+        'Fort Wayne': 'Purdue Fort Wayne',
+        'Fresno State': 'Fresno St.',
+        'Ga. Southern': 'Georgia Southern',
+        'Gardner-Webb': 'Gardner Webb',
+        'Georgia State': 'Georgia St.',
+        'Grambling': 'Grambling St.',
+        "Hawai'i": 'Hawaii',
+        'Idaho State': 'Idaho St.',
+        'Illinois State': 'Illinois St.',
+        'Illinois-Chicago': 'Illinois Chicago',
+        'Indiana State': 'Indiana St.',
+        'Iowa State': 'Iowa St.',
+        'IUPUI': 'IU Indy',
+        'Jackson State': 'Jackson St.',
+        'Jacksonville State': 'Jacksonville St.',
+        'Kansas State': 'Kansas St.',
+        'Kennesaw State': 'Kennesaw St.',
+        'Kent State': 'Kent St.',
+        'Lamar University': 'Lamar',
+        'LIU Brooklyn': 'LIU',
+        'LMU (CA)': 'Loyola Marymount',
+        'Long Beach State': 'Long Beach St.',
+        'Long Island': 'LIU',
+        'Long Island University': 'LIU',
+        'Louisiana State': 'LSU',
+        'Louisiana-Lafayette': 'Louisiana',
+        'Louisiana-Monroe': 'Louisiana Monroe',
+        'Loyola Maryland': 'Loyola MD',
+        'Maryland-Baltimore County': 'UMBC',
+        'Maryland-Eastern Shore': 'Maryland Eastern Shore',
+        'McNeese State': 'McNeese',
+        'Miami (FL)': 'Miami FL',
+        'Miami (Fla.)': 'Miami FL',
+        'Miami (OH)': 'Miami OH',
+        'Michigan State': 'Michigan St.',
+        'Middle Tenn.': 'Middle Tennessee',
+        'Mississippi State': 'Mississippi St.',
+        'Mississippi Val.': 'Mississippi Valley St.',
+        'Mississippi Valley State': 'Mississippi Valley St.',
+        'Missouri State': 'Missouri St.',
+        'Missouri-Kansas City': 'Kansas City',
+        'Montana State': 'Montana St.',
+        'Morehead State': 'Morehead St.',
+        'Morgan State': 'Morgan St.',
+        "Mount Saint Mary's": "Mount St. Mary's",
+        'Murray State': 'Murray St.',
+        'N.C. A&T': 'North Carolina A&T',
+        'N.C. Central': 'North Carolina Central',
+        'NC State': 'N.C. State',
+        'Nevada-Las Vegas': 'UNLV',
+        'Nevada-Reno': 'Nevada',
+        'New Mexico State': 'New Mexico St.',
+        'Nicholls State': 'Nicholls',
+        'NIU': 'Northern Illinois',
+        'Norfolk State': 'Norfolk St.',
+        'North Ala.': 'North Alabama',
+        'North Carolina State': 'N.C. State',
+        'North Dakota State': 'North Dakota St.',
+        'Northern Ariz.': 'Northern Arizona',
+        'Northern Colo.': 'Northern Colorado',
+        'Northern Ky.': 'Northern Kentucky',
+        'Northwestern State': 'Northwestern St.',
+        'Ohio State': 'Ohio St.',
+        'Oklahoma State': 'Oklahoma St.',
+        'Ole Miss': 'Mississippi',
+        'Omaha': 'Nebraska Omaha',
+        'Oregon State': 'Oregon St.',
+        'Penn State': 'Penn St.',
+        'Portland State': 'Portland St.',
+        'Prairie View': 'Prairie View A&M',
+        'Queens (NC)': 'Queens',
+        'Sacramento State': 'Sacramento St.',
+        'Saint Bonaventure': 'St. Bonaventure',
+        'Saint Francis (PA)': 'Saint Francis',
+        "Saint Mary's (CA)": "Saint Mary's",
+        'Sam Houston': 'Sam Houston St.',
+        'Sam Houston State': 'Sam Houston St.',
+        'San Diego State': 'San Diego St.',
+        'San Jose State': 'San Jose St.',
+        'Seattle U': 'Seattle',
+        'SFA': 'Stephen F. Austin',
+        'SIU Edwardsville': 'SIUE',
+        'South Carolina State': 'South Carolina St.',
+        'South Carolina Upstate': 'USC Upstate',
+        'South Dakota State': 'South Dakota St.',
+        'South Fla.': 'South Florida',
+        'Southeast Missouri State': 'Southeast Missouri',
+        'Southeast Mo. St.': 'Southeast Missouri',
+        'Southeastern La.': 'Southeastern Louisiana',
+        'Southern California': 'USC',
+        'Southern Ill.': 'Southern Illinois',
+        'Southern Ind.': 'Southern Indiana',
+        'Southern Miss.': 'Southern Miss',
+        'Southern Mississippi': 'Southern Miss',
+        'Southern U.': 'Southern',
+        "St. John's (NY)": "St. John's",
+        "St. Mary's": "Saint Mary's",
+        'St. Thomas (MN)': 'St. Thomas',
+        'Tarleton State': 'Tarleton St.',
+        'Tennessee State': 'Tennessee St.',
+        'Tennessee-Martin': 'Tennessee Martin',
+        'Texas A&M-Corpus Christi': 'Texas A&M Corpus Chris',
+        'Texas State': 'Texas St.',
+        'Texas-Rio Grande Valley': 'UT Rio Grande Valley',
+        'UAlbany': 'Albany',
+        'UConn': 'Connecticut',
+        'UIC': 'Illinois Chicago',
+        'UIW': 'Incarnate Word',
+        'ULM': 'Louisiana Monroe',
+        'UMES': 'Maryland Eastern Shore',
+        'UNCW': 'UNC Wilmington',
+        'UNI': 'Northern Iowa',
+        'UT Martin': 'Tennessee Martin',
+        'Utah State': 'Utah St.',
+        'UTRGV': 'UT Rio Grande Valley',
+        'Washington State': 'Washington St.',
+        'Weber State': 'Weber St.',
+        'West Ga.': 'West Georgia',
+        'Western Caro.': 'Western Carolina',
+        'Western Ill.': 'Western Illinois',
+        'Western Ky.': 'Western Kentucky',
+        'Western Mich.': 'Western Michigan',
+        'WI Green Bay': 'Green Bay',
+        'Wichita State': 'Wichita St.',
+        'Wright State': 'Wright St.',
+        'Youngstown State': 'Youngstown St.',
+    },
+    'espn': {
+        'Michigan State': 'Michigan St.',
+        'UConn': 'Connecticut',
+    },
+    'evanmiya': {
+        'Alabama State': 'Alabama St.',
+        'Alcorn State': 'Alcorn St.',
+        'Appalachian State': 'Appalachian St.',
+        'Arizona State': 'Arizona St.',
+        'Arkansas State': 'Arkansas St.',
+        'Arkansas-Little Rock': 'Little Rock',
+        'Arkansas-Pine Bluff': 'Arkansas Pine Bluff',
+        'Ball State': 'Ball St.',
+        'Bethune-Cookman': 'Bethune Cookman',
+        'Boise State': 'Boise St.',
+        'Cal State Bakersfield': 'Cal St. Bakersfield',
+        'Cal State Fullerton': 'Cal St. Fullerton',
+        'Cal State Northridge': 'CSUN',
+        'California Baptist': 'Cal Baptist',
+        'Chicago State': 'Chicago St.',
+        'Cleveland State': 'Cleveland St.',
+        'College of Charleston': 'Charleston',
+        'Colorado State': 'Colorado St.',
+        'Coppin State': 'Coppin St.',
+        'Delaware State': 'Delaware St.',
+        'Detroit': 'Detroit Mercy',
+        'East Tennessee State': 'East Tennessee St.',
+        'Florida International': 'FIU',
+        'Florida State': 'Florida St.',
+        'Fort Wayne': 'Purdue Fort Wayne',
+        'Fresno State': 'Fresno St.',
+        'Gardner-Webb': 'Gardner Webb',
+        'Georgia State': 'Georgia St.',
+        'Grambling': 'Grambling St.',
+        'Idaho State': 'Idaho St.',
+        'Illinois State': 'Illinois St.',
+        'Illinois-Chicago': 'Illinois Chicago',
+        'Indiana State': 'Indiana St.',
+        'Iowa State': 'Iowa St.',
+        'Jackson State': 'Jackson St.',
+        'Jacksonville State': 'Jacksonville St.',
+        'Kansas State': 'Kansas St.',
+        'Kennesaw State': 'Kennesaw St.',
+        'Kent State': 'Kent St.',
+        'Long Beach State': 'Long Beach St.',
+        'Long Island': 'LIU',
+        'Louisiana State': 'LSU',
+        'Louisiana-Lafayette': 'Louisiana',
+        'Louisiana-Monroe': 'Louisiana Monroe',
+        'Loyola Maryland': 'Loyola MD',
+        'Maryland-Eastern Shore': 'Maryland Eastern Shore',
+        'McNeese State': 'McNeese',
+        'Miami (Fla.)': 'Miami FL',
+        'Miami (OH)': 'Miami OH',
+        'Michigan State': 'Michigan St.',
+        'Mississippi State': 'Mississippi St.',
+        'Mississippi Valley State': 'Mississippi Valley St.',
+        'Missouri State': 'Missouri St.',
+        'Missouri-Kansas City': 'Kansas City',
+        'Montana State': 'Montana St.',
+        'Morehead State': 'Morehead St.',
+        'Morgan State': 'Morgan St.',
+        'Murray State': 'Murray St.',
+        'NC State': 'N.C. State',
+        'New Mexico State': 'New Mexico St.',
+        'Nicholls State': 'Nicholls',
+        'Norfolk State': 'Norfolk St.',
+        'North Carolina State': 'N.C. State',
+        'North Dakota State': 'North Dakota St.',
+        'Northwestern State': 'Northwestern St.',
+        'Ohio State': 'Ohio St.',
+        'Oklahoma State': 'Oklahoma St.',
+        'Ole Miss': 'Mississippi',
+        'Omaha': 'Nebraska Omaha',
+        'Oregon State': 'Oregon St.',
+        'Penn State': 'Penn St.',
+        'Portland State': 'Portland St.',
+        'Prairie View': 'Prairie View A&M',
+        'Sacramento State': 'Sacramento St.',
+        'Saint Bonaventure': 'St. Bonaventure',
+        'Saint Francis (PA)': 'Saint Francis',
+        'Sam Houston State': 'Sam Houston St.',
+        'San Diego State': 'San Diego St.',
+        'San Jose State': 'San Jose St.',
+        'SIU Edwardsville': 'SIUE',
+        'South Carolina State': 'South Carolina St.',
+        'South Carolina Upstate': 'USC Upstate',
+        'South Dakota State': 'South Dakota St.',
+        'Southeast Missouri State': 'Southeast Missouri',
+        'Southern Mississippi': 'Southern Miss',
+        "St. Mary's": "Saint Mary's",
+        'St. Thomas (MN)': 'St. Thomas',
+        'Tarleton State': 'Tarleton St.',
+        'Tennessee State': 'Tennessee St.',
+        'Tennessee-Martin': 'Tennessee Martin',
+        'Texas A&M-Corpus Christi': 'Texas A&M Corpus Chris',
+        'Texas State': 'Texas St.',
+        'Texas-Rio Grande Valley': 'UT Rio Grande Valley',
+        'Utah State': 'Utah St.',
+        'Washington State': 'Washington St.',
+        'Weber State': 'Weber St.',
+        'Wichita State': 'Wichita St.',
+        'Wright State': 'Wright St.',
+        'Youngstown State': 'Youngstown St.',
+    },
+    'torvik': {
+        'Cal St. Northridge': 'CSUN',
+        'McNeese St.': 'McNeese',
+        'Nicholls St.': 'Nicholls',
+        'SIU Edwardsville': 'SIUE',
+        'Southeast Missouri St.': 'Southeast Missouri',
+        'UMKC': 'Kansas City',
+    },
+}
+
+
+def _key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+class TeamRegistry:
+    """Integer team IDs with a precomputed alias -> ID index."""
+    
+    def __init__(self, teams: Iterable[str] = TEAMS,
+                 aliases: Mapping[str, Mapping[str, str]] = ALIASES,
+                 fuzzy: bool = False):
+        """
+        Args:
+            teams: Canonical names in ID order (the first is ID 1)
+            aliases: Source -> {spelling: canonical name}
+            fuzzy: Resolve unknown spellings with a TeamMatcher
+        
+        Raises:
+            ValueError: if an alias names a team that isn't in `teams`, or
+                one spelling is given to two different teams
+        """
+        self.names = ("",) + tuple(teams)
+        self.index: Dict[str, int] = {}
+        for team_id, name in enumerate(self.names[1:], 1):
+            self._add(name, team_id, "teams")
+        canonical = dict(self.index)
+        for source, spellings in aliases.items():
+            for alias, name in spellings.items():
+                team_id = canonical.get(_key(name))
+                if team_id is None:
+                    raise ValueError(f"{source} alias {alias!r} points at unknown team {name!r}")
+                self._add(alias, team_id, source)
+        self.fuzzy = fuzzy
+        self._matcher = None
+    
+    def _add(self, name: str, team_id: int, source: str):
+        key = _key(name)
+        existing = self.index.setdefault(key, team_id)
+        if existing != team_id:
+            raise ValueError(f"{source}: {name!r} is already {self.names[existing]!r}, "
+                             f"not {self.names[team_id]!r}")
+    
+    def __len__(self):
+        return len(self.names) - 1
+    
+    @property
+    def matcher(self):
+        """The fuzzy matcher over every spelling, built on first use."""
+        if self._matcher is None:
+            from shared.team_matcher import TeamMatcher
+            self._matcher = TeamMatcher(self.index, self.names)
+        return self._matcher
+    
+    def _lookup(self, name: str) -> Optional[int]:
+        key = _key(name)
+        team_id = self.index.get(key)
+        if team_id is None and self.fuzzy and key:
+            team_id = self.matcher.resolve(name)
+        return team_id
+    
+    def team_id(self, name) -> Optional[int]:
+        """ID of any known spelling (or accepted fuzzy match), or None."""
+        if not isinstance(name, str):
+            return None
+        return self._lookup(name)
+    
+    def name(self, team_id: int) -> str:
+        """Canonical name of an ID."""
+        if not 0 < team_id < len(self.names):
+            raise KeyError(team_id)
+        return self.names[team_id]
+    
+    def canonical_name(self, name):
+        """Canonical name of a known spelling; anything else comes back stripped (or as is if not text)."""
+        if not isinstance(name, str):
+            return name
+        team_id = self._lookup(name)
+        return self.names[team_id] if team_id else name.strip()
+    
+    def map_series(self, series: pd.Series) -> pd.Series:
+        """
+        A column of team names as IDs (nullable Int16, <NA> where the name is
+        missing or unknown), keeping the index and name.
+        """
+        codes, uniques = pd.factorize(series)
+        # Last slot for factorize's -1 (missing); 0 is never an ID
+        lookup = np.array([self.team_id(name) or 0 for name in uniques] + [0], dtype=np.int16)
+        ids = lookup[codes]
+        return pd.Series(pd.arrays.IntegerArray(ids, ids == 0), index=series.index, name=series.name)
+    
+    def canonical_names(self, series: pd.Series) -> pd.Series:
+        """
+        A column of team names in canonical spelling. Unknown names are kept
+        (stripped), as are missing values.
+        """
+        codes, uniques = pd.factorize(series)
+        lookup = np.array([self.canonical_name(name) for name in uniques] + [None], dtype=object)
+        names = pd.Series(lookup[codes], index=series.index, name=series.name)
+        return names.where(codes != -1, series)
+    
+    def names_of(self, ids: pd.Series) -> pd.Series:
+        """Canonical names for a column of IDs (missing where the ID is)."""
+        lookup = np.array(self.names + (None,), dtype=object)
+        codes = ids.fillna(len(self.names)).to_numpy(dtype=np.int64)
+        return pd.Series(lookup[codes], index=ids.index, name=ids.name)
+
+
+REGISTRY = TeamRegistry(fuzzy=FUZZY)
+
+
+def team_id(name) -> Optional[int]:
+    """ID of any known spelling in the shared registry, or None."""
+    return REGISTRY.team_id(name)
+
+
+def canonical_name(name):
+    """Canonical (KenPom) name of a spelling; unknown names come back stripped."""
+    return REGISTRY.canonical_name(name)
+
+
+def map_series(series: pd.Series) -> pd.Series:
+    """Team names -> nullable Int16 IDs, one lookup per distinct name."""
+    return REGISTRY.map_series(series)
+
+
+def canonical_names(series: pd.Series) -> pd.Series:
+    """Team names -> canonical names, one lookup per distinct name."""
+    return REGISTRY.canonical_names(series)
+
+
+def names_of(ids: pd.Series) -> pd.Series:
+    """Team IDs -> canonical names."""
+    return REGISTRY.names_of(ids)
+
+
+def main():
+    if len(sys.argv) > 1:
+        for name in sys.argv[1:]:
+            found = REGISTRY.team_id(name)
+            print(f"{name!r:<32} {found if found else '-':>4}  {REGISTRY.canonical_name(name)}")
+        return
+    print(f"{len(REGISTRY)} teams, {len(REGISTRY.index)} spellings")
+    for source, spellings in ALIASES.items():
+        print(f"  {source:<16} {len(spellings):>4} aliases")
+
+
+if __name__ == "__main__":
+    main()
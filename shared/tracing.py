@@ -0,0 +1,314 @@
+"""
+Lightweight tracing for scrape runs.
+
+Each stage of a scrape (browser launch, page.goto, selector waits, fixed
+sleeps, page.content(), HTML parsing, normalization, DB writes, exports)
+is wrapped in a span. When tracing is on, every finished span is written
+as one JSON line with its duration and whatever it recorded (bytes, rows,
+url, selector...). When it's off, span() returns a shared no-op object,
+so instrumented code pays one function call per stage.
+
+Turn it on with an environment variable (file path, or "-" for stderr):
+
+    SCRAPE_TRACE=trace.jsonl python main.py
+
+or from code with tracing.enable("trace.jsonl"). Listeners added with
+add_listener() get every span record too, file or not (run_history.py
+uses this to keep per-run stage timings).
+
+Usage:
+    with tracing.span("page.goto", url=url):
+        page.goto(url)
+    
+    with tracing.span("page.content") as s:
+        html = page.content()
+        s.set(bytes=len(html))
+    
+    tracing.sleep(5)    # time.sleep, recorded as a "sleep" span
+    
+    @tracing.traced("run", source="kenpom")
+    def scrape_and_export(): ...
+
+Summarize a trace (where did the time go?):
+    python shared/tracing.py trace.jsonl
+"""
+import contextvars
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Dict, Optional
+
+
+TRACE_ENV = "SCRAPE_TRACE"
+RUN_ENV = "SCRAPE_TRACE_RUN"
+
+_sink = None
+_listeners: List = []
+_active = False
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_current = contextvars.ContextVar("scrape_trace_span", default=None)
+_run_id = os.environ.get(RUN_ENV) or uuid.uuid4().hex[:12]
+
+
+class _NullSpan:
+    """Stand-in returned by span() while tracing is off."""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed stage. Attributes added with set() go into its JSON line."""
+    
+    __slots__ = ('name', 'attrs', 'id', 'parent', 'source', '_start', '_wall', '_token')
+    
+    def __init__(self, name: str, attrs: Dict):
+        self.name = name
+        self.attrs = attrs
+        self.id = next(_ids)
+        self.parent = None
+        self.source = attrs.pop('source', None)
+    
+    def set(self, **attrs):
+        """Record extra fields (bytes, rows, ...) on this span."""
+        self.attrs.update(attrs)
+    
+    def __enter__(self):
+        self.parent = _current.get()
+        if self.source is None and self.parent is not None:
+            self.source = self.parent.source
+        self._token = _current.set(self)
+        self._wall = time.time()
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._start
+        _current.reset(self._token)
+        record = {
+            'ts': datetime.fromtimestamp(self._wall, timezone.utc).isoformat(timespec='milliseconds'),
+            'run': _run_id,
+            'id': self.id,
+            'parent': self.parent.id if self.parent is not None else None,
+            'source': self.source,
+            'span': self.name,
+            'ms': round(duration * 1000, 3),
+            'status': 'ok' if exc_type is None else 'error',
+        }
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        record.update(self.attrs)
+        _emit(record)
+        return False
+
+
+def _emit(record: Dict):
+    for listener in tuple(_listeners):
+        try:
+            listener(record)
+        except Exception:
+            pass
+    with _lock:
+        sink = _sink
+        if sink is None:
+            return
+        try:
+            sink.write(json.dumps(record, default=str) + "\n")
+            sink.flush()
+        except (OSError, ValueError):
+            # Never let a full disk or closed file break a scrape
+            pass
+
+
+def _update_active():
+    global _active
+    _active = _sink is not None or bool(_listeners)
+
+
+def enable(path: Optional[str] = None):
+    """
+    Start writing spans to `path` (appended), "-" for stderr, or the
+    SCRAPE_TRACE environment variable if no path is given.
+    """
+    global _sink
+    path = path or os.environ.get(TRACE_ENV)
+    if not path:
+        raise ValueError(f"No trace path given and {TRACE_ENV} is not set")
+    with _lock:
+        if _sink is not None and _sink is not sys.stderr:
+            _sink.close()
+        _sink = sys.stderr if path == "-" else open(path, "a", encoding="utf-8")
+        _update_active()
+
+
+def disable():
+    """Stop tracing and close the trace file."""
+    global _sink
+    with _lock:
+        if _sink is not None and _sink is not sys.stderr:
+            _sink.close()
+        _sink = None
+        _update_active()
+
+
+def enabled() -> bool:
+    """Whether spans are being written to a trace file."""
+    return _sink is not None
+
+
+def add_listener(listener):
+    """
+    Call `listener(record)` with every finished span's record, whether or
+    not a trace file is open (the run-history store collects spans this way).
+    """
+    with _lock:
+        _listeners.append(listener)
+        _update_active()
+
+
+def remove_listener(listener):
+    """Stop sending span records to `listener`."""
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+        _update_active()
+
+
+def run_id() -> str:
+    """Identifier shared by every span of this process (SCRAPE_TRACE_RUN to override)."""
+    return _run_id
+
+
+def span(name: str, **attrs):
+    """
+    Context manager timing one stage. Keyword arguments become fields of
+    the span's JSON line; `source` names the scraper and is inherited by
+    nested spans.
+    """
+    if not _active:
+        return _NULL_SPAN
+    return Span(name, attrs)
+
+
+def annotate(**attrs):
+    """Add fields to the innermost open span (no-op while tracing is off)."""
+    if not _active:
+        return
+    current = _current.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+def traced(name: str, **attrs):
+    """Decorator form of span(), for timing a whole function."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return func(*args, **kwargs)
+            with Span(name, dict(attrs)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def sleep(seconds: float, reason: Optional[str] = None):
+    """time.sleep() recorded as a "sleep" span, so fixed waits show up in traces."""
+    if not _active:
+        time.sleep(seconds)
+        return
+    with Span("sleep", {'seconds': seconds, 'reason': reason} if reason else {'seconds': seconds}):
+        time.sleep(seconds)
+
+
+def file_size(path) -> Optional[int]:
+    """Size of a written file for a span's bytes field (None if missing)."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def load(path: str) -> List[Dict]:
+    """Read the spans of a JSON-lines trace file, skipping damaged lines."""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                continue
+    return spans
+
+
+def summarize(spans: List[Dict]) -> List[Dict]:
+    """
+    Total time per (source, span name), largest first. Each row's share is
+    its total over the summed time of root spans in the same runs.
+    """
+    totals: Dict[tuple, Dict] = {}
+    root_ms = 0.0
+    for s in spans:
+        if s.get('parent') is None:
+            root_ms += s.get('ms', 0)
+        key = (s.get('source') or '-', s.get('span'))
+        row = totals.setdefault(key, {'source': key[0], 'span': key[1], 'count': 0,
+                                      'total_ms': 0.0, 'max_ms': 0.0, 'errors': 0})
+        row['count'] += 1
+        row['total_ms'] += s.get('ms', 0)
+        row['max_ms'] = max(row['max_ms'], s.get('ms', 0))
+        row['errors'] += s.get('status') == 'error'
+    rows = sorted(totals.values(), key=lambda r: r['total_ms'], reverse=True)
+    for row in rows:
+        row['share'] = row['total_ms'] / root_ms if root_ms else None
+    return rows
+
+
+def print_summary(path: str, run: Optional[str] = None):
+    """Print where the time went in a trace file (optionally one run only)."""
+    spans = load(path)
+    if run:
+        spans = [s for s in spans if s.get('run') == run]
+    if not spans:
+        print("No spans found.")
+        return
+    runs = sorted({s.get('run') for s in spans})
+    print(f"{len(spans)} spans from {len(runs)} run(s)")
+    print(f"\n{'source':<12} {'span':<24} {'count':>6} {'total s':>10} {'mean ms':>10} "
+          f"{'max ms':>10} {'share':>7} {'errors':>7}")
+    print("-" * 92)
+    for row in summarize(spans):
+        share = f"{row['share']:.1%}" if row['share'] is not None else '-'
+        print(f"{row['source']:<12} {row['span']:<24} {row['count']:>6} "
+              f"{row['total_ms'] / 1000:>10.2f} {row['total_ms'] / row['count']:>10.1f} "
+              f"{row['max_ms']:>10.1f} {share:>7} {row['errors']:>7}")
+
+
+if os.environ.get(TRACE_ENV):
+    enable()
+
+
+if __name__ == "__main__":
+    # python shared/tracing.py trace.jsonl [run_id]
+    if len(sys.argv) < 2:
+        print("Usage: python shared/tracing.py <trace.jsonl> [run_id]")
+        sys.exit(1)
+    print_summary(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,47 @@
+"""
+Headed and headless persistent contexts for one site must not share a
+Chromium profile directory, which Chromium locks to a single browser.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+browser_pool = pytest.importorskip("shared.browser_pool")
+
+
+class FakeChromium:
+    """Records persistent launches instead of starting a browser."""
+    
+    def __init__(self):
+        self.profiles = []
+    
+    def launch_persistent_context(self, user_data_dir, **options):
+        self.profiles.append(user_data_dir)
+        return object()
+
+
+def test_headed_and_headless_use_separate_profiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_pool, 'PROFILE_ROOT', tmp_path)
+    chromium = FakeChromium()
+    pool = browser_pool.BrowserPool()
+    monkeypatch.setattr(pool, '_start', lambda: type('Playwright', (), {'chromium': chromium}))
+    
+    headless = pool.persistent_context('cbb_analytics', headless=True)
+    headed = pool.persistent_context('cbb_analytics', headless=False)
+    
+    assert headless is not headed
+    assert pool.persistent_context('cbb_analytics', headless=False) is headed
+    assert chromium.profiles == [str(tmp_path / 'cbb_analytics'), str(tmp_path / 'cbb_analytics-headed')]
+
+
+def test_purge_clears_both_profiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_pool, 'PROFILE_ROOT', tmp_path)
+    for headless in (True, False):
+        cache = browser_pool.profile_dir('torvik', headless) / 'Default' / 'Cache'
+        cache.mkdir(parents=True)
+        (cache / 'data_0').write_bytes(b'x' * 100)
+    
+    assert browser_pool.purge_profile('torvik') == 200
+    assert (tmp_path / 'torvik-headed').exists()
@@ -0,0 +1,74 @@
+"""
+Capture mode must build each category from its own API fields only, and
+leave categories without declared fields to the rendered table.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "CBB Analytics"))
+import scrape_cbb_analytics
+from scrape_cbb_analytics import CATEGORIES, CBBAnalyticsScraper
+
+
+TEAMS = ['Duke', 'Houston', 'Auburn', 'Florida', 'Alabama', 'Tennessee']
+
+
+def payload():
+    """A captured team stats payload: nested stats, percentiles beside their values."""
+    rows = []
+    for i in range(scrape_cbb_analytics.MIN_TEAM_ROWS + 10):
+        rows.append({
+            'teamId': i,
+            'teamMarket': TEAMS[i % len(TEAMS)] if i < len(TEAMS) else f"Team {i}",
+            'stats': {
+                'ortg': 110.0 + i, 'ortgPctile': 99 - i,
+                'drtg': 95.0 + i, 'drtgPctile': 90 - i,
+                'fg3Pct': 0.35, 'fg3PctPctile': 50,
+                'ptsPerGame': 80.0 - i,
+            },
+        })
+    return {'data': {'rows': rows}}
+
+
+@pytest.fixture
+def fields(monkeypatch):
+    monkeypatch.setitem(CATEGORIES['team_four_factors'], 'api_fields',
+                        {'stats.ortg': 'ORtg', 'stats.drtg': 'DRtg'})
+    monkeypatch.setitem(CATEGORIES['traditional_boxscore'], 'api_fields',
+                        {'stats.ptsPerGame': 'PTS/G', 'stats.fg3Pct': '3P%'})
+
+
+def capture(key, baseline):
+    scraper = CBBAnalyticsScraper(email='', password='', capture=True)
+    # Every field is in the baseline, so neither the page nor the capture is touched
+    return scraper.capture_category(None, None, key, baseline=baseline)
+
+
+def test_each_category_gets_only_its_fields(fields):
+    baseline = scrape_cbb_analytics.net_capture.find_records(payload(), min_rows=scrape_cbb_analytics.MIN_TEAM_ROWS)
+    
+    factors = capture('team_four_factors', baseline)
+    boxscore = capture('traditional_boxscore', baseline)
+    
+    extra = ['team_original', 'team_kenpom']
+    assert list(factors.columns) == ['Team', 'ORtg', 'ORtg Pctile', 'DRtg', 'DRtg Pctile'] + extra
+    assert list(boxscore.columns) == ['Team', 'PTS/G', '3P%', '3P% Pctile'] + extra
+    assert factors['ORtg'].iloc[0] == 110.0
+
+
+def test_category_without_fields_is_not_captured(fields):
+    baseline = scrape_cbb_analytics.net_capture.find_records(payload(), min_rows=scrape_cbb_analytics.MIN_TEAM_ROWS)
+    
+    assert capture('advanced_offense', baseline) is None
+
+
+def test_cli_capture_needs_declared_fields(monkeypatch):
+    for category in CATEGORIES.values():
+        monkeypatch.delitem(category, 'api_fields', raising=False)
+    assert not scrape_cbb_analytics.capture_supported()
+    
+    monkeypatch.setitem(CATEGORIES['foul_related'], 'api_fields', {'stats.pf': 'PF'})
+    
+    assert scrape_cbb_analytics.capture_supported()
@@ -0,0 +1,53 @@
+"""
+Retry policy of the pooled HTTP sessions.
+"""
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import http_client
+
+
+@pytest.fixture
+def unavailable():
+    """A local server answering every GET with 503; yields (url, hit list)."""
+    hits = []
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        
+        def log_message(self, *args):
+            pass
+    
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/", hits
+    server.shutdown()
+
+
+def test_retries_503_by_default(unavailable, monkeypatch):
+    url, hits = unavailable
+    retry = http_client._retry
+    monkeypatch.setattr(http_client, '_retry', lambda statuses: retry(statuses).new(backoff_factor=0))
+    
+    assert http_client.get("test-default", url, raise_for_status=False).status_code == 503
+    assert len(hits) == 4
+
+
+def test_hybrid_session_does_not_retry_challenges(unavailable):
+    hybrid_session = pytest.importorskip("shared.hybrid_session")
+    url, hits = unavailable
+    http_client.get_session("test-hybrid")
+    
+    hybrid_session.HybridSession("test-hybrid", url)
+    
+    assert http_client.get("test-hybrid", url, raise_for_status=False).status_code == 503
+    assert len(hits) == 1
@@ -0,0 +1,56 @@
+"""
+A HybridSession whose browser refresh doesn't get HTTP past the challenge
+must stay in the browser instead of refreshing again on every page.
+"""
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+hybrid_session = pytest.importorskip("shared.hybrid_session")
+
+
+@pytest.fixture
+def challenged():
+    """A local server answering every GET with 403; yields (url, hit list)."""
+    hits = []
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(403)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        
+        def log_message(self, *args):
+            pass
+    
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/", hits
+    server.shutdown()
+
+
+def test_stays_in_browser_after_failed_refresh(challenged, monkeypatch):
+    url, hits = challenged
+    session = hybrid_session.HybridSession("test-challenged", url)
+    loaded = []
+    
+    def browser_get(page_url):
+        # Stands in for a browser that gets through where HTTP doesn't
+        loaded.append(page_url)
+        session.stats['browser'] += 1
+        session.established = True
+        return "<html>ok</html>"
+    monkeypatch.setattr(session, 'browser_get', browser_get)
+    
+    for year in (2024, 2025, 2026):
+        assert session.get(url + "index.php", params={'y': year}) == "<html>ok</html>"
+    
+    # Establish, one refresh, then every page in the browser; HTTP only twice
+    assert len(hits) == 2
+    assert loaded[2:] == [f"{url}index.php?y={year}" for year in (2024, 2025, 2026)]
+    assert session.stats == {'http': 0, 'browser': 5, 'refreshes': 1, 'browser_only': 3}
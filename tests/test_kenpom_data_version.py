@@ -0,0 +1,70 @@
+"""
+The KenPom data version must change on every write, including ones that
+add no ranking rows, and the API must reject a malformed Content-Length.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "KenPom Data"))
+from database import KenPomDB
+from api_server import APIServer, RatingsAPI
+
+
+ROWS = [
+    {'team_name': 'Duke', 'conference': 'ACC', 'rank': 1, 'adj_em': 30.0},
+    {'team_name': 'Houston', 'conference': 'B12', 'rank': 2, 'adj_em': 28.0},
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = KenPomDB(str(tmp_path / "kenpom.db"))
+    yield db
+    db.close()
+
+
+def test_unchanged_day_changes_version(db):
+    db.ingest_snapshot("2026-04-10", ROWS)
+    before = db.data_version()
+    
+    result = db.ingest_snapshot("2026-04-11", ROWS)
+    
+    assert result['rows_written'] == 0
+    assert db.data_version() != before
+
+
+def test_rerun_that_only_deletes_changes_version(db):
+    db.ingest_snapshot("2026-04-10", ROWS)
+    db.ingest_snapshot("2026-04-11", [dict(row, adj_em=row['adj_em'] + 1) for row in ROWS])
+    before = db.data_version()
+    
+    # Same-day rerun matching the previous day: its rows are deleted, none written
+    result = db.ingest_snapshot("2026-04-11", ROWS)
+    
+    assert result['rows_written'] == 0
+    assert db.data_version() != before
+
+
+async def request(server, head: bytes) -> bytes:
+    listener = await asyncio.start_server(server.handle_client, '127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(head)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+    return response
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_bad_content_length_is_400(db, tmp_path, length):
+    api = RatingsAPI(db, evanmiya_db=str(tmp_path / "missing.db"))
+    head = b"GET /api/version HTTP/1.1\r\nHost: localhost\r\nContent-Length: " + length + b"\r\n\r\n"
+    
+    response = asyncio.run(request(APIServer(api), head))
+    
+    assert response.startswith(b"HTTP/1.1 400 ")
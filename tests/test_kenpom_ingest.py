@@ -0,0 +1,69 @@
+"""
+ingest_snapshot stores a whole day in one transaction: a failure part way
+leaves the database as it was, and the next ingest still works.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "KenPom Data"))
+from database import KenPomDB
+
+
+DAY_ONE = [
+    {'team_name': 'Duke', 'conference': 'ACC', 'rank': 1, 'adj_em': 30.0},
+    {'team_name': 'Houston', 'conference': 'B12', 'rank': 2, 'adj_em': 28.0},
+]
+DAY_TWO = DAY_ONE + [{'team_name': 'Auburn', 'conference': 'SEC', 'rank': 3, 'adj_em': 25.0}]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = KenPomDB(str(tmp_path / "kenpom.db"))
+    db.ingest_snapshot("2025-01-10", DAY_ONE)
+    yield db
+    db.close()
+
+
+def contents(db):
+    with db.read_connection() as conn:
+        return {
+            table: conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+            for table in ('teams', 'rankings', 'snapshots', 'latest_rankings', 'data_generation')
+        }
+
+
+def fail_late(db, monkeypatch):
+    """Make the next ingest raise after its ranking rows are written."""
+    def boom(cursor, date, team_ids=None):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(db, '_update_latest', boom)
+
+
+def test_failed_ingest_rolls_back_everything(db, monkeypatch):
+    before = contents(db)
+    version = db.data_version()
+    fail_late(db, monkeypatch)
+    
+    with pytest.raises(RuntimeError):
+        db.ingest_snapshot("2025-01-11", DAY_TWO)
+    
+    assert contents(db) == before
+    assert db.data_version() == version
+
+
+def test_ingest_after_rollback_stores_new_teams(db, monkeypatch):
+    fail_late(db, monkeypatch)
+    with pytest.raises(RuntimeError):
+        db.ingest_snapshot("2025-01-11", DAY_TWO)
+    monkeypatch.undo()
+    
+    assert db.ingest_snapshot("2025-01-11", DAY_TWO)['teams'] == 3
+    
+    with db.read_connection() as conn:
+        teams = conn.execute("""
+            SELECT t.team_name FROM rankings_daily d JOIN teams t ON t.id = d.team_id
+            WHERE d.date = '2025-01-11' ORDER BY t.team_name
+        """).fetchall()
+    assert [row[0] for row in teams] == ['Auburn', 'Duke', 'Houston']
@@ -0,0 +1,76 @@
+"""
+get_latest_rankings reads the materialized latest_rankings table, which
+must always hold the same rows as the newest day of rankings_daily.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "KenPom Data"))
+from database import KenPomDB
+
+
+def snapshot(**adj_em):
+    ranked = sorted(adj_em.items(), key=lambda item: -item[1])
+    return [{'team_name': team, 'conference': 'ACC', 'rank': i + 1, 'adj_em': value}
+            for i, (team, value) in enumerate(ranked)]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = KenPomDB(str(tmp_path / "kenpom.db"))
+    yield db
+    db.close()
+
+
+def from_daily(db, limit=50):
+    """What get_latest_rankings returns, computed from the full history."""
+    with db.read_connection() as conn:
+        rows = conn.execute("""
+            SELECT t.team_name, t.conference, d.rank, d.adj_em, d.adj_o, d.adj_d,
+                   d.adj_tempo, d.luck, d.date
+            FROM rankings_daily d
+            JOIN teams t ON d.team_id = t.id
+            WHERE d.date = (SELECT MAX(date) FROM snapshots)
+            ORDER BY d.rank
+            LIMIT ?
+        """, (limit,)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def test_new_dates(db):
+    db.ingest_snapshot("2025-01-10", snapshot(Duke=30.0, Houston=28.0))
+    db.ingest_snapshot("2025-01-11", snapshot(Duke=30.0, Houston=31.0))
+    
+    assert db.get_latest_rankings() == from_daily(db)
+    assert [row['team_name'] for row in db.get_latest_rankings()] == ['Houston', 'Duke']
+    assert {row['date'] for row in db.get_latest_rankings()} == {"2025-01-11"}
+
+
+def test_backfill_leaves_latest_alone(db):
+    db.ingest_snapshot("2025-01-11", snapshot(Duke=30.0, Houston=28.0))
+    latest = db.get_latest_rankings()
+    
+    db.ingest_snapshot("2025-01-10", snapshot(Duke=25.0, Houston=28.0, Auburn=29.0))
+    
+    assert db.get_latest_rankings() == latest == from_daily(db)
+
+
+def test_rerun_and_dropped_team(db):
+    db.ingest_snapshot("2025-01-10", snapshot(Duke=30.0, Houston=28.0))
+    db.ingest_snapshot("2025-01-11", snapshot(Duke=31.0, Houston=28.0))
+    
+    db.ingest_snapshot("2025-01-11", snapshot(Duke=30.0))
+    
+    assert db.get_latest_rankings() == from_daily(db)
+    assert [row['team_name'] for row in db.get_latest_rankings()] == ['Duke']
+
+
+def test_single_team_insert(db):
+    db.ingest_snapshot("2025-01-10", snapshot(Duke=30.0, Houston=28.0))
+    
+    db.insert_ranking(db.insert_team('Houston'), "2025-01-10", {'rank': 1, 'adj_em': 32.0})
+    
+    assert db.get_latest_rankings() == from_daily(db)
+    assert {row['team_name']: row['adj_em'] for row in db.get_latest_rankings()} == {'Duke': 30.0, 'Houston': 32.0}
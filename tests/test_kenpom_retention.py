@@ -0,0 +1,86 @@
+"""
+Compaction must never drop daily rows the Parquet archive doesn't hold.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "KenPom Data"))
+from database import KenPomDB
+from retention import RankingsRetention
+
+
+def snapshot(offset=0.0):
+    return [
+        {'team_name': 'Duke', 'conference': 'ACC', 'rank': 1, 'adj_em': 30.0 + offset},
+        {'team_name': 'Houston', 'conference': 'B12', 'rank': 2, 'adj_em': 28.0 + offset},
+    ]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = KenPomDB(str(tmp_path / "kenpom.db"))
+    db.ingest_snapshot("2024-01-10", snapshot())
+    db.ingest_snapshot("2024-01-11", snapshot(0.5))
+    db.ingest_snapshot("2025-01-10", snapshot(1.0))
+    yield db
+    db.close()
+
+
+def daily_dates(db):
+    with db.read_connection() as conn:
+        return [row[0] for row in conn.execute("SELECT DISTINCT date FROM rankings_daily ORDER BY date")]
+
+
+def test_refuses_season_missing_from_archive(db, tmp_path):
+    pytest.importorskip("pyarrow")
+    retention = RankingsRetention(db, archive_root=str(tmp_path / "archive"))
+    
+    results = retention.compact()
+    
+    assert results[0]['season'] == 2024
+    assert results[0]['skipped']
+    assert results[0]['rows_removed'] == 0
+    assert daily_dates(db) == ["2024-01-10", "2024-01-11", "2025-01-10"]
+
+
+def test_refuses_partially_archived_season(db, tmp_path):
+    pytest.importorskip("pyarrow")
+    from archive import RankingsArchive
+    RankingsArchive(str(tmp_path / "archive")).archive_from_db(db, dates=["2024-01-10"])
+    retention = RankingsRetention(db, archive_root=str(tmp_path / "archive"))
+    
+    assert retention.unarchived_dates(2024) == ["2024-01-11"]
+    assert retention.compact()[0]['skipped']
+    assert "2024-01-11" in daily_dates(db)
+
+
+def test_empty_snapshot_date_does_not_block_compaction(db, tmp_path):
+    pytest.importorskip("pyarrow")
+    from archive import RankingsArchive
+    # A stored date before any team has a row reconstructs to nothing
+    conn = db._get_connection()
+    conn.execute("INSERT INTO snapshots (date, team_count, rows_written) VALUES ('2024-01-05', 0, 0)")
+    conn.commit()
+    archive = RankingsArchive(str(tmp_path / "archive"))
+    archive.archive_from_db(db)
+    retention = RankingsRetention(db, archive_root=str(tmp_path / "archive"))
+    
+    assert retention.unarchived_dates(2024) == []
+    assert archive.read(seasons=[2024])['date'].nunique() == 2
+    assert retention.compact()[0]['skipped'] is None
+    assert daily_dates(db) == ["2025-01-10"]
+
+
+def test_compacts_fully_archived_season(db, tmp_path):
+    pytest.importorskip("pyarrow")
+    from archive import RankingsArchive
+    RankingsArchive(str(tmp_path / "archive")).archive_from_db(db)
+    retention = RankingsRetention(db, archive_root=str(tmp_path / "archive"))
+    
+    result = retention.compact()[0]
+    
+    assert result['skipped'] is None
+    assert result['snapshots'] == 2
+    assert daily_dates(db) == ["2025-01-10"]
@@ -0,0 +1,106 @@
+"""
+Delta-encoded snapshots: only changed teams get a row, and rankings_daily
+must still reconstruct every stored day exactly as it was ingested.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "KenPom Data"))
+from database import KenPomDB
+
+
+def snapshot(**adj_em):
+    return [{'team_name': team, 'conference': 'ACC', 'rank': i + 1, 'adj_em': value}
+            for i, (team, value) in enumerate(adj_em.items())]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = KenPomDB(str(tmp_path / "kenpom.db"))
+    yield db
+    db.close()
+
+
+def day(db, date):
+    """Reconstructed snapshot for a date as {team_name: adj_em}."""
+    with db.read_connection() as conn:
+        rows = conn.execute("""
+            SELECT t.team_name, d.adj_em FROM rankings_daily d
+            JOIN teams t ON t.id = d.team_id WHERE d.date = ?
+        """, (date,)).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+
+def stored(db, date):
+    """Rows physically stored for a date, as {team_name: adj_em}."""
+    with db.read_connection() as conn:
+        rows = conn.execute("""
+            SELECT t.team_name, r.adj_em FROM rankings r
+            JOIN teams t ON t.id = r.team_id WHERE r.date = ?
+        """, (date,)).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+
+def test_unchanged_team_writes_no_row_but_is_reconstructed(db):
+    db.ingest_snapshot("2025-01-10", snapshot(Duke=30.0, Houston=28.0))
+    
+    result = db.ingest_snapshot("2025-01-11", snapshot(Duke=30.0, Houston=28.5))
+    
+    assert result == {'teams': 2, 'rows_written': 1}
+    assert stored(db, "2025-01-11") == {'Houston': 28.5}
+    assert day(db, "2025-01-11") == {'Duke': 30.0, 'Houston': 28.5}
+    assert day(db, "2025-01-10") == {'Duke': 30.0, 'Houston': 28.0}
+
+
+def test_backfill_before_existing_date_leaves_it_unchanged(db):
+    db.ingest_snapshot("2025-01-12", snapshot(Duke=30.0, Houston=28.0))
+    
+    # Older day with a changed value and a team the later day doesn't have
+    db.ingest_snapshot("2025-01-10", snapshot(Duke=31.0, Houston=28.0, Auburn=25.0))
+    
+    assert day(db, "2025-01-10") == {'Duke': 31.0, 'Houston': 28.0, 'Auburn': 25.0}
+    assert day(db, "2025-01-12") == {'Duke': 30.0, 'Houston': 28.0}
+
+
+def test_backfill_between_dates(db):
+    db.ingest_snapshot("2025-01-10", snapshot(Duke=30.0, Houston=28.0))
+    db.ingest_snapshot("2025-01-12", snapshot(Duke=30.0, Houston=28.0))
+    
+    result = db.ingest_snapshot("2025-01-11", snapshot(Duke=32.0, Houston=28.0))
+    
+    assert result['rows_written'] == 1
+    assert day(db, "2025-01-10") == {'Duke': 30.0, 'Houston': 28.0}
+    assert day(db, "2025-01-11") == {'Duke': 32.0, 'Houston': 28.0}
+    assert day(db, "2025-01-12") == {'Duke': 30.0, 'Houston': 28.0}
+
+
+def test_rerun_of_same_date_replaces_it(db):
+    db.ingest_snapshot("2025-01-10", snapshot(Duke=30.0, Houston=28.0))
+    db.ingest_snapshot("2025-01-11", snapshot(Duke=31.0, Houston=28.0))
+    
+    db.ingest_snapshot("2025-01-11", snapshot(Duke=29.0, Houston=27.0))
+    assert stored(db, "2025-01-11") == {'Duke': 29.0, 'Houston': 27.0}
+    assert day(db, "2025-01-11") == {'Duke': 29.0, 'Houston': 27.0}
+    
+    # A rerun matching the day before stores nothing for the date
+    result = db.ingest_snapshot("2025-01-11", snapshot(Duke=30.0, Houston=28.0))
+    assert result['rows_written'] == 0
+    assert stored(db, "2025-01-11") == {}
+    assert day(db, "2025-01-11") == {'Duke': 30.0, 'Houston': 28.0}
+
+
+def test_dropped_team_is_tombstoned(db):
+    db.ingest_snapshot("2025-01-10", snapshot(Duke=30.0, Houston=28.0))
+    
+    db.ingest_snapshot("2025-01-11", snapshot(Duke=30.0))
+    db.ingest_snapshot("2025-01-12", snapshot(Duke=30.0))
+    db.ingest_snapshot("2025-01-13", snapshot(Duke=30.0, Houston=28.0))
+    
+    # The tombstone is the dropped team's only row on that date
+    assert stored(db, "2025-01-11") == {'Houston': None}
+    assert day(db, "2025-01-10") == {'Duke': 30.0, 'Houston': 28.0}
+    assert day(db, "2025-01-11") == {'Duke': 30.0}
+    assert day(db, "2025-01-12") == {'Duke': 30.0}
+    assert day(db, "2025-01-13") == {'Duke': 30.0, 'Houston': 28.0}
@@ -0,0 +1,49 @@
+"""
+clean_columns and extract_first_numbers must give the same result as their
+per-cell forms, whatever the string storage.
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import percentile_clean
+from shared.percentile_clean import clean_columns, clean_percentile_value
+
+
+VALUES = [
+    ['45', 'Duke'],
+    ['2347%'],
+    ['45', '12'],
+    ['9.5', 'x'],
+    [None, '45'],
+    ['87+17.6', '45'],
+    ['2347.9%', '99112.3', '-'],
+    [],
+]
+
+
+@pytest.mark.parametrize("dtype", ['str', 'string[python]', 'string[pyarrow]', object])
+@pytest.mark.parametrize("values", VALUES)
+def test_matches_per_cell_clean(values, dtype):
+    pytest.importorskip("pyarrow")
+    frame = pd.DataFrame({'a': pd.Series(values, dtype=dtype)})
+    expected = frame.assign(a=frame['a'].apply(clean_percentile_value))
+    
+    pd.testing.assert_frame_equal(clean_columns(frame, ['a']), expected)
+
+
+@pytest.mark.parametrize("dtype", ['str', 'string[python]', 'string[pyarrow]', object])
+@pytest.mark.parametrize("values", VALUES)
+def test_first_numbers_match_per_cell(values, dtype, monkeypatch):
+    pytest.importorskip("pyarrow")
+    series = pd.Series(values, dtype=dtype)
+    expected = series.apply(percentile_clean.extract_first_number)
+    
+    # A text column must take the vectorized path, not fall back to apply
+    if len(series.dropna()):
+        monkeypatch.setattr(pd.Series, 'apply', lambda *args, **kwargs: pytest.fail("per-cell apply"))
+    
+    pd.testing.assert_series_equal(percentile_clean.extract_first_numbers(series), expected)
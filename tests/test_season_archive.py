@@ -0,0 +1,38 @@
+"""
+A category must read back across seasons even when a placeholder or a
+text value made one season store a column differently.
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "CBB Analytics"))
+from season_archive import SeasonArchive, to_columns
+
+
+def test_placeholders_are_missing_numbers():
+    frame = to_columns(pd.DataFrame({'team_kenpom': ['Duke', 'Kansas'], 'eFG%': ['55.1%', '-']}), '1')
+    
+    assert frame['eFG%'].dtype == 'float64'
+    assert frame['eFG%'].isna().tolist() == [False, True]
+
+
+def test_reads_seasons_with_different_column_types(tmp_path):
+    archive = SeasonArchive(str(tmp_path))
+    archive.write_partition('1', 'shooting', pd.DataFrame(
+        {'team_kenpom': ['Duke', 'Kansas'], 'eFG%': ['55.1%', '-'], 'Rec': ['12-3', '10-5']}))
+    archive.write_partition('2', 'shooting', pd.DataFrame(
+        {'team_kenpom': ['Duke', 'Kansas'], 'eFG%': ['', ''], 'Rec': ['-', '-']}))
+    archive.write_partition('3', 'shooting', pd.DataFrame(
+        {'team_kenpom': ['Duke', 'Kansas'], 'eFG%': ['54.0%', '50.2%'], 'Rec': ['11-4', '9-6']}))
+    
+    df = archive.read('shooting')
+    
+    assert len(df) == 6
+    assert df['eFG%'].dtype == 'float64'
+    assert df.loc[('3', 'Kansas'), 'eFG%'] == 50.2
+    assert df.loc[('1', 'Duke'), 'Rec'] == '12-3'
+    assert archive.read('shooting', columns=['eFG%'], teams=['Duke'])['eFG%'].tolist()[::2] == [55.1, 54.0]
@@ -0,0 +1,52 @@
+"""
+Fuzzy team matching: confident matches resolve, ambiguous ones don't.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared import team_registry
+from shared.team_matcher import TeamMatcher, _abbreviates
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return TeamMatcher(team_registry.REGISTRY.index, team_registry.REGISTRY.names, cache_path=None)
+
+
+@pytest.mark.parametrize("name, team", [
+    ("South Carolina St", "South Carolina St."),
+    ("North Carolina St", "N.C. State"),
+    ("Mount Saint Marys", "Mount St. Mary's"),
+    ("Eastern Wash", "Eastern Washington"),
+    ("Fla. Gulf Coast", "Florida Gulf Coast"),
+])
+def test_accepts(matcher, name, team):
+    assert matcher.resolve(name) == team_registry.team_id(team)
+
+
+@pytest.mark.parametrize("name", [
+    "Loyola", "Boston", "Massachusetts-Lowell", "Michigan Tech", "Texas A&M-CC", "Florida Southern",
+])
+def test_rejects(matcher, name):
+    assert matcher.resolve(name) is None
+    assert name not in matcher.decisions
+
+
+def test_abbreviations():
+    assert _abbreviates('n', 'north')
+    assert _abbreviates('fla', 'florida')
+    assert not _abbreviates('st', 'south')
+
+
+def test_decisions_persist(tmp_path):
+    cache = tmp_path / "matches.json"
+    first = TeamMatcher(team_registry.REGISTRY.index, team_registry.REGISTRY.names, cache_path=cache)
+    team_id = first.resolve("Eastern Wash")
+    
+    second = TeamMatcher(team_registry.REGISTRY.index, team_registry.REGISTRY.names, cache_path=cache)
+    
+    assert second.decisions["Eastern Wash"]['team_id'] == team_id
+    assert second.resolve("Eastern Wash") == team_id